@@ -1,6 +1,18 @@
 import re
 import streamlit as st
 
+# Valores padrão da configuração de deslocamento
+CONFIG_PADRAO = {
+    "valor_combustivel": 7.50,
+    "consumo_medio": 13.0,
+    "valor_por_km": 0.0,
+    "adicional_noturno": 350.0,
+    "outros_adicionais": 0.0,
+    "valor_refeicao": 60.0,
+    "valor_tecnico": 100.0,
+    "margem_percentual": 30.0,
+}
+
 # Converte '1h20min' em minutos
 def tempo_para_minutos(t: str):
     m = re.match(r"(\d+)h(?:(\d+)min)?", t.replace(" ", ""))
@@ -0,0 +1,93 @@
+"""Micro-benchmark da conversão de preços e do catálogo em cache.
+
+Uso: ``python benchmark_precos.py [linhas]``
+"""
+
+import re
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from catalogo_precos import (
+    converter_coluna_moeda,
+    limpar_cache_precos,
+    obter_tabela_precos,
+)
+
+
+def _parse_float_field(valor):
+    """Cópia da conversão linha a linha usada antes em ``custos_materiais``."""
+    if valor is None:
+        return 0.0
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = str(valor).strip()
+    if not texto:
+        return 0.0
+    texto = texto.replace("R$", "").replace("r$", "").replace(" ", "").strip()
+    texto = re.sub(r"[^0-9,.-]", "", texto)
+    if "," in texto and "." in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    else:
+        texto = texto.replace(",", ".")
+    try:
+        return float(texto)
+    except ValueError:
+        return 0.0
+
+
+def _gerar_precos(linhas: int) -> pd.Series:
+    """Gera uma coluna de preços com os formatos encontrados nos CSVs."""
+    rng = np.random.default_rng(0)
+    valores = rng.uniform(1, 50_000, linhas).round(2)
+    formatos = [
+        lambda v: f"R$ {v:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
+        lambda v: f"R$ {v:.2f}".replace(".", ","),
+        lambda v: f"{v:.2f}",
+        lambda v: v,
+    ]
+    return pd.Series(
+        [formatos[i % len(formatos)](v) for i, v in enumerate(valores)], dtype=object
+    )
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    """Retorna o melhor tempo (em ms) de ``repeticoes`` execuções."""
+    return min(timeit.repeat(funcao, number=1, repeat=repeticoes)) * 1000
+
+
+def main(linhas: int = 10_000) -> None:
+    serie = _gerar_precos(linhas)
+    esperado = serie.apply(_parse_float_field)
+    obtido = converter_coluna_moeda(serie)
+    if not np.allclose(esperado.to_numpy(), obtido.to_numpy()):
+        raise SystemExit("Conversão vetorizada divergiu da conversão linha a linha.")
+
+    t_apply = _medir(lambda: serie.apply(_parse_float_field), 5)
+    t_vetor = _medir(lambda: converter_coluna_moeda(serie), 5)
+    print(f"Conversão de {linhas} preços")
+    print(f"  .apply(_parse_float_field): {t_apply:8.2f} ms")
+    print(f"  converter_coluna_moeda:     {t_vetor:8.2f} ms ({t_apply / t_vetor:.1f}x)")
+
+    def _ler_e_converter():
+        limpar_cache_precos()
+        df = pd.read_csv("valores_eletrodutos.csv", sep=";")
+        return df["Preco"].apply(_parse_float_field)
+
+    obter_tabela_precos("valores_eletrodutos.csv", converter_precos=True)
+    t_csv = _medir(_ler_e_converter, 20)
+    t_cache = _medir(
+        lambda: obter_tabela_precos("valores_eletrodutos.csv", converter_precos=True)[
+            "Preco"
+        ],
+        20,
+    )
+    print("Tabela valores_eletrodutos.csv")
+    print(f"  read_csv + .apply:          {t_csv:8.3f} ms")
+    print(f"  catálogo (preço em float):  {t_cache:8.3f} ms ({t_csv / t_cache:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -1,15 +1,40 @@
 from __future__ import annotations
 
+import sqlite3
 from decimal import Decimal
 from typing import Any
 
-import pandas as pd
 import streamlit as st
 
 from calculo_servico_graficos import (
     renderizar_grafico_blocos_resumo,
     renderizar_grafico_custos_detalhados,
 )
+from catalogo_compartilhado import CHAVE_VERSAO, tabela_catalogo
+from grafo_derivados import GRAFO
+from motor_cenarios import (
+    OPCOES_CENARIOS,
+    EntradaCenario,
+    combinar_cenarios,
+    comparar_cenarios,
+)
+from motor_custos import calcular_totais_servico, carregar_tabelas_materiais
+from motor_demanda import sugerir_transformador
+from motor_dimensionamento import DimensionamentoInput
+from motor_risco import (
+    historico_categorias,
+    parametros_categorias,
+    resumir_risco,
+    simular_risco,
+)
+from dados_transformadores import obter_produtos_transformadores_padrao
+from registro_dados import (
+    ARQUIVO_REGISTRO,
+    ErroPlanilhaLegada,
+    caminho_planilha,
+    exportar_xlsx,
+    registrar,
+)
 
 
 def _converter_para_float(valor: float | int | str | None) -> float | None:
@@ -88,6 +113,225 @@ def parse_price_to_positive_float(value: Any) -> float:
     return abs(converted)
 
 
+@GRAFO.registrar(
+    "totais_servico",
+    (
+        ("total_custos_materiais", 0.0),
+        ("total_custo_mao_obra", 0.0),
+        ("total_custo_deslocamento", 0.0),
+        ("custo_adicional", 0.0),
+        ("total_servicos_adicionais", 0.0),
+        ("custo_emissao_trt", 80.0),
+        ("custo_projeto_unifilar", 500.0),
+        ("lucro_percentual", 35.0),
+        ("imposto_percentual", 11.0),
+        ("total_carregadores", 0.0),
+    ),
+    publicar=False,
+)
+def _totais_servico(*valores) -> dict[str, float]:
+    return calcular_totais_servico(*valores)
+
+
+@GRAFO.registrar("total_calculo_servico", ("totais_servico",))
+def _total_calculo_servico(totais) -> float:
+    return totais["total_servico"]
+
+
+# Tabelas de preço usadas nos cenários, lidas do catálogo compartilhado
+_TABELAS_CENARIOS = (
+    "valores_cabos.csv",
+    "valores_eletrodutos.csv",
+    "valores_sealtubo.csv",
+    "valores_disjuntor_din.csv",
+    "valores_idr.csv",
+    "valores_dps.csv",
+    "valores_barra_pente.csv",
+    "valores_paineis_quadros.csv",
+)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _tabelas_materiais(versao: int):
+    # Preparadas uma vez por versão do catálogo para todas as sessões; as
+    # buscas já feitas valem para as próximas comparações.
+    tabelas = {}
+    for csv in _TABELAS_CENARIOS:
+        try:
+            tabelas[csv] = tabela_catalogo(csv)
+        except FileNotFoundError:
+            tabelas[csv] = None
+    return carregar_tabelas_materiais(tabelas)
+
+
+@GRAFO.registrar("tabelas_cenarios", ((CHAVE_VERSAO, 0),), publicar=False)
+def _tabelas_cenarios(versao):
+    return _tabelas_materiais(versao)
+
+
+def entrada_cenario_atual() -> EntradaCenario:
+    """Orçamento atual da sessão no formato de ``motor_cenarios``."""
+    estado = st.session_state
+    percursos = tuple(
+        (direcao, float(metros or 0.0)) for direcao, metros in estado.get("percursos", [])
+    )
+    transformador = ""
+    preco_transformador = 0.0
+    if estado.get("transformador") == "Sim":
+        transformador = estado.get("transformador_material_custos") or estado.get(
+            "transformador_produto", ""
+        )
+        preco_transformador = parse_price_to_positive_float(
+            estado.get("custos_preco_transformador", 0.0)
+        ) * parse_price_to_positive_float(estado.get("custos_quantidade_transformador", 1))
+    return EntradaCenario(
+        dimensionamento=DimensionamentoInput(
+            potencia_kw=float(GRAFO.obter("potencia_kw") or 0.0),
+            distancia_m=sum(metros for _, metros in percursos),
+            tensoes_ff=(
+                estado.get("tensao_rs", ""),
+                estado.get("tensao_rt", ""),
+                estado.get("tensao_st", ""),
+            ),
+            tipo_cabos=estado.get("tipo_cabos") or "Cabo PVC",
+            quantidade_carregadores=int(estado.get("quantidade_carregadores", 1) or 1),
+            tipo_quadro=estado.get("tipo_quadro_resumo") or "PVC",
+            instalacao=estado.get("instalacao_sistema") or None,
+        ),
+        percursos=percursos,
+        tipo_servico=estado.get("tipo_servico_orcamento") or estado.get("tipo_servico", ""),
+        transformador=transformador,
+        preco_transformador=preco_transformador,
+        total_mao_obra=float(estado.get("total_custo_mao_obra", 0.0) or 0.0),
+        custo_deslocamento=float(estado.get("total_custo_deslocamento", 0.0) or 0.0),
+        custo_adicional=float(estado.get("custo_adicional", 0.0) or 0.0),
+        servicos_adicionais=float(estado.get("total_servicos_adicionais", 0.0) or 0.0),
+        custo_emissao_trt=float(estado.get("custo_emissao_trt", 80.0) or 0.0),
+        custo_projeto_unifilar=float(estado.get("custo_projeto_unifilar", 500.0) or 0.0),
+        lucro_percentual=float(estado.get("lucro_percentual", 35.0) or 0.0),
+        imposto_percentual=float(estado.get("imposto_percentual", 11.0) or 0.0),
+        total_carregadores=float(estado.get("total_carregadores", 0.0) or 0.0),
+    )
+
+
+def _render_comparacao_cenarios(format_currency) -> None:
+    """Tabela lado a lado de variantes de cabo, quadro e transformador."""
+    with st.expander("⚖️ Comparar Cenários", expanded=False):
+        grupos = st.multiselect(
+            "Variar",
+            list(OPCOES_CENARIOS),
+            default=list(OPCOES_CENARIOS),
+            key="cenarios_grupos",
+        )
+        if not grupos or not st.toggle("Calcular comparação", key="cenarios_calcular"):
+            return
+
+        base = entrada_cenario_atual()
+        opcoes = {grupo: dict(OPCOES_CENARIOS[grupo]) for grupo in grupos}
+        if "Transformador" in opcoes:
+            produto = base.transformador or sugerir_transformador(
+                base.dimensionamento.potencia_kw,
+                obter_produtos_transformadores_padrao(),
+            )
+            if produto:
+                opcoes["Transformador"]["Com transformador"] = {"transformador": produto}
+            else:
+                opcoes["Transformador"].pop("Com transformador")
+
+        tabela = comparar_cenarios(
+            base,
+            combinar_cenarios(opcoes),
+            GRAFO.obter("tabelas_cenarios"),
+            materiais_atual=parse_price_to_positive_float(
+                st.session_state.get("total_custos_materiais", 0.0)
+            ),
+        )
+        colunas_valor = [
+            "Cabos",
+            "Infra-seca",
+            "Quadro de Proteção",
+            "Transformador (R$)",
+            "Materiais",
+            "Total do Serviço",
+            "Diferença",
+        ]
+        exibicao = tabela.copy()
+        for coluna in colunas_valor:
+            exibicao[coluna] = exibicao[coluna].map(format_currency)
+        st.dataframe(exibicao, hide_index=True)
+        st.caption(
+            "Cada cenário parte do total atual de materiais e soma a diferença "
+            "de cabos, infra-seca, quadro de proteção e transformador."
+        )
+
+
+# Blocos da aba de Custos com Materiais simulados em ``motor_risco``
+_CATEGORIAS_RISCO = (
+    ("Cabos", "total_cabos"),
+    ("Infra-seca", "total_infra_seca"),
+    ("Quadro de proteção", "total_quadro_protecao"),
+    ("Material adicional", "total_material_adicional"),
+)
+
+
+def _render_risco_precos(format_currency) -> None:
+    """P50/P90 do custo e da margem com os preços de material sorteados."""
+    with st.expander("🎲 Risco de Preços", expanded=False):
+        if not st.toggle("Simular variação de preços", key="risco_calcular"):
+            return
+
+        estado = st.session_state
+        categorias = parametros_categorias(
+            {
+                categoria: parse_price_to_positive_float(estado.get(chave, 0.0))
+                for categoria, chave in _CATEGORIAS_RISCO
+            },
+            historico=historico_categorias(),
+        )
+        # Semente fixa: o resultado só muda quando o orçamento muda
+        resultado = simular_risco(
+            categorias,
+            float(estado.get("total_custo_mao_obra", 0.0) or 0.0),
+            semente=0,
+            custo_deslocamento=float(estado.get("total_custo_deslocamento", 0.0) or 0.0),
+            custo_adicional=float(estado.get("custo_adicional", 0.0) or 0.0),
+            servicos_adicionais=float(estado.get("total_servicos_adicionais", 0.0) or 0.0),
+            custo_emissao_trt=float(estado.get("custo_emissao_trt", 80.0) or 0.0),
+            custo_projeto_unifilar=float(estado.get("custo_projeto_unifilar", 500.0) or 0.0),
+            lucro_percentual=float(estado.get("lucro_percentual", 35.0) or 0.0),
+            imposto_percentual=float(estado.get("imposto_percentual", 11.0) or 0.0),
+            total_carregadores=float(estado.get("total_carregadores", 0.0) or 0.0),
+        )
+
+        resumo = resumir_risco(resultado)
+        for coluna in ("Cotado", "P50", "P90"):
+            resumo[coluna] = resumo[coluna].map(format_currency)
+        st.dataframe(resumo, hide_index=True)
+        st.markdown(
+            f"**Chance de o aumento de custo consumir o lucro:** "
+            f"{resultado.probabilidade_prejuizo:.1%}"
+        )
+        st.dataframe(
+            [
+                {
+                    "Categoria": categoria,
+                    "Custo": format_currency(parametro.total),
+                    "Idade dos preços (anos)": round(parametro.idade_anos, 2),
+                    "Deriva anual": f"{parametro.deriva_anual:.1%}",
+                    "Volatilidade anual": f"{parametro.volatilidade_anual:.1%}",
+                    "Origem": "Histórico" if parametro.estimado else "Padrão",
+                }
+                for categoria, parametro in categorias.items()
+            ],
+            hide_index=True,
+        )
+        st.caption(
+            "O preço de cada categoria varia desde a data de atualização do "
+            "catálogo; preços sem data contam como atualizados há um ano. "
+            "Na margem, o P90 é o valor garantido em 90% das simulações."
+        )
+
+
 def render_calculo_servico_tab(tab_calculo_servico, format_currency):
     """Renderiza a aba 'Cálculo de serviço'."""
     with tab_calculo_servico:
@@ -383,21 +627,12 @@ def render_calculo_servico_tab(tab_calculo_servico, format_currency):
 
         st.session_state["total_carregadores"] = total_carregadores
 
-        base_sem_carregador = (
-            total_materiais
-            + total_mao_obra
-            + custo_deslocamento
-            + custo_adicional
-            + total_servicos_adicionais
-            + custo_emissao_trt
-            + custo_projeto_unifilar
-        )
-
-        depreciacao = 0.05 * base_sem_carregador
+        # As porcentagens de lucro e imposto já estão na sessão (ou usam o
+        # padrão dos campos abaixo) antes dos campos serem desenhados.
+        totais = GRAFO.obter("totais_servico")
+        depreciacao = totais["depreciacao"]
         st.session_state["depreciacao"] = depreciacao
 
-        total_base = base_sem_carregador + depreciacao
-
         with st.expander("📊 Resultado e Condições", expanded=True):
             st.markdown(
                 f"<p style='color: black; font-size: 20px;'>📉 Depreciação: {format_currency(depreciacao)}</p>",
@@ -420,8 +655,7 @@ def render_calculo_servico_tab(tab_calculo_servico, format_currency):
                     label_visibility="collapsed",
                 )
 
-            lucro_percentual = st.session_state.get("lucro_percentual", 35.0)
-            lucro = (lucro_percentual / 100) * total_base
+            lucro = totais["lucro"]
             st.markdown(
                 f"<p style='color: green; font-size: 20px;'>💰 Lucro: {format_currency(lucro)}</p>",
                 unsafe_allow_html=True,
@@ -445,30 +679,15 @@ def render_calculo_servico_tab(tab_calculo_servico, format_currency):
                     label_visibility="collapsed",
                 )
 
-            imposto_percentual = st.session_state.get("imposto_percentual", 11.0)
-            imposto = (imposto_percentual / 100) * (total_base + lucro)
+            imposto = totais["imposto"]
             st.markdown(
                 f"<p style='color: black; font-size: 20px;'>🧾 Imposto: {format_currency(imposto)}</p>",
                 unsafe_allow_html=True,
             )
             st.session_state["imposto"] = imposto
 
-        total_projeto = custo_emissao_trt + custo_projeto_unifilar
-
-        total_servico = (
-            total_materiais
-            + total_mao_obra
-            + custo_deslocamento
-            + custo_adicional
-            + total_servicos_adicionais
-            + custo_emissao_trt
-            + custo_projeto_unifilar
-            + total_carregadores
-            + depreciacao
-            + lucro
-            + imposto
-        )
-        total_instalacao = total_servico - total_projeto - total_carregadores
+        total_servico = GRAFO.obter("total_calculo_servico")
+        total_instalacao = totais["total_instalacao"]
 
         total_instalacao_formatado = format_currency(total_instalacao)
         st.session_state["total_instalacao_calculo_servico"] = total_instalacao_formatado
@@ -482,7 +701,9 @@ def render_calculo_servico_tab(tab_calculo_servico, format_currency):
             f"<p style='color: black; font-size: 30px;'>💰 Total Serviço: {format_currency(total_servico)}</p>",
             unsafe_allow_html=True,
         )
-        st.session_state["total_calculo_servico"] = total_servico
+
+        _render_comparacao_cenarios(format_currency)
+        _render_risco_precos(format_currency)
 
         st.markdown("---")
         st.subheader("📈 Visualização dos Custos")
@@ -518,26 +739,9 @@ def render_calculo_servico_tab(tab_calculo_servico, format_currency):
             }
         )
 
+        ordem_venda = st.session_state.get("ordem_venda", "")
+        base_name = "Dados do Cálculo de Serviço"
         if st.button("Salvar Dados do Cálculo de Serviço"):
-            try:
-                from openpyxl import load_workbook
-            except ImportError:
-                load_workbook = None
-
-            from pathlib import Path
-
-            docs_dir = Path(__file__).with_name("Docs Salvos")
-            docs_dir.mkdir(exist_ok=True)
-
-            ordem_venda = st.session_state.get("ordem_venda", "")
-            base_name = "Dados do Cálculo de Serviço"
-            filename = (
-                f"{base_name} {ordem_venda}.xlsx"
-                if ordem_venda
-                else f"{base_name}.xlsx"
-            )
-            filepath = docs_dir / filename
-
             dados_calculo = {
                 "Ordem de Venda": ordem_venda,
                 "Cliente": st.session_state.get("cliente", ""),
@@ -549,43 +753,44 @@ def render_calculo_servico_tab(tab_calculo_servico, format_currency):
                 "Total Serviços Adicionais": float(total_servicos_adicionais),
                 "Custo Emissão TRT": float(custo_emissao_trt),
                 "Custo Projeto Unifilar": float(custo_projeto_unifilar),
-                "Total Projeto": float(total_projeto),
+                "Total Projeto": float(custo_emissao_trt + custo_projeto_unifilar),
                 "Total Carregadores": float(total_carregadores),
                 "Depreciação": float(depreciacao),
-                "Lucro (%)": float(lucro_percentual),
+                "Lucro (%)": float(st.session_state.get("lucro_percentual", 35.0)),
                 "Lucro": float(lucro),
-                "Imposto (%)": float(imposto_percentual),
+                "Imposto (%)": float(st.session_state.get("imposto_percentual", 11.0)),
                 "Imposto": float(imposto),
                 "Soma Parcial Custos": float(soma_custos),
-                "Base Sem Carregador": float(base_sem_carregador),
-                "Base Total": float(total_base),
+                "Base Sem Carregador": float(totais["base_sem_carregador"]),
+                "Base Total": float(totais["base_sem_carregador"] + depreciacao),
                 "Total Instalação": float(total_instalacao),
                 "Total Serviço": float(total_servico),
             }
 
-            df = pd.DataFrame([dados_calculo])
+            try:
+                registrar(
+                    "calculo_servico",
+                    dados_calculo,
+                    ordem_venda,
+                    planilha_legada=caminho_planilha(base_name, ordem_venda),
+                )
+            except (sqlite3.Error, ErroPlanilhaLegada) as exc:
+                st.error(f"Não foi possível salvar os dados do cálculo de serviço: {exc}")
+            else:
+                st.success(f"Dados salvos em {ARQUIVO_REGISTRO}")
 
-            if filepath.exists():
-                if load_workbook is None:
-                    st.error(
-                        "Não foi possível atualizar o arquivo Excel porque a biblioteca "
-                        "'openpyxl' não está instalada. Execute `pip install openpyxl` e tente novamente."
-                    )
-                else:
-                    book = load_workbook(filepath)
-                    with pd.ExcelWriter(filepath, engine="openpyxl") as writer:
-                        writer.book = book
-                        writer.sheets = {ws.title: ws for ws in book.worksheets}
-                        startrow = book.active.max_row
-                        df.to_excel(writer, index=False, header=False, startrow=startrow)
-                    st.success(f"Dados salvos em {filepath}")
+        if st.button("Exportar Dados do Cálculo de Serviço para Excel"):
+            filepath = caminho_planilha(base_name, ordem_venda)
+            try:
+                total_linhas = exportar_xlsx(
+                    "calculo_servico", filepath, ordem_venda=ordem_venda
+                )
+            except ImportError:
+                st.error(
+                    "Não foi possível criar o arquivo Excel porque a biblioteca "
+                    "'openpyxl' não está instalada. Execute `pip install openpyxl` e tente novamente."
+                )
+            except (sqlite3.Error, ErroPlanilhaLegada, OSError) as exc:
+                st.error(f"Não foi possível exportar a planilha: {exc}")
             else:
-                try:
-                    df.to_excel(filepath, index=False)
-                except ImportError:
-                    st.error(
-                        "Não foi possível criar o arquivo Excel porque a biblioteca "
-                        "'openpyxl' não está instalada. Execute `pip install openpyxl` e tente novamente."
-                    )
-                else:
-                    st.success(f"Dados salvos em {filepath}")
+                st.success(f"{total_linhas} registro(s) exportado(s) para {filepath}")
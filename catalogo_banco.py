@@ -0,0 +1,871 @@
+"""Catálogo de preços em SQLite, uma tabela por categoria.
+
+Os ``valores_*.csv`` passam a ser apenas formatos de importação e
+exportação. Na primeira leitura de uma tabela o CSV é importado para o banco
+``catalogo_precos.sqlite3`` (na mesma pasta do CSV) e, daí em diante, as abas
+de Atualizações gravam no banco com :func:`salvar_tabelas`.
+
+Cada gravação é uma única transação ``BEGIN IMMEDIATE`` que substitui as
+linhas das tabelas salvas e incrementa a versão de cada uma em
+``catalogo_versoes``. Gravações simultâneas de várias sessões são
+serializadas pelo SQLite (modo WAL), várias tabelas são salvas juntas ou
+nenhuma é, e com ``versoes_esperadas`` uma sessão que editou uma versão
+antiga recebe :class:`ConflitoCatalogo` em vez de sobrescrever a edição da
+outra.
+
+As tabelas guardam as colunas do CSV como texto, na ordem original, de modo
+que ler do banco devolve o mesmo DataFrame que ``pd.read_csv`` devolvia. O
+nome do material normalizado e a categoria ficam em colunas indexadas,
+consultadas por :func:`consultar_catalogo`.
+
+Cada gravação também acrescenta, na mesma transação, os preços que mudaram à
+tabela ``historico_precos`` (item, categoria, preço, data e responsável),
+que nunca é alterada nem apagada. Ela é indexada por item e data, de modo
+que :func:`preco_na_data` e :func:`tabela_na_data` reconstroem os preços de
+qualquer data passada e :func:`historico_precos` alimenta os gráficos de
+tendência. Na importação inicial de um CSV, a data registrada de cada preço
+é a da coluna "Atualizado", quando preenchida.
+
+:func:`referencia_catalogo` identifica o conteúdo atual do catálogo por um
+resumo de 32 caracteres, guardado nas propostas geradas. O conteúdo de cada
+tabela referenciada fica gravado uma única vez (``catalogo_conteudos``,
+pelo resumo do próprio conteúdo) e :func:`tabelas_referencia` devolve as
+tabelas exatamente como estavam.
+"""
+from __future__ import annotations
+
+import csv
+import datetime as _dt
+import functools
+import hashlib
+import io
+import json
+import math
+import re
+import sqlite3
+import threading
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Mapping, Optional
+
+import pandas as pd
+
+NOME_BANCO = "catalogo_precos.sqlite3"
+
+# Tabelas de preço das abas de Atualizações (CSV de cada uma)
+TABELAS_CATALOGO = (
+    "valores_cabos.csv",
+    "valores_eletrodutos.csv",
+    "valores_disjuntor_din.csv",
+    "valores_idr.csv",
+    "valores_dps.csv",
+    "valores_barra_pente.csv",
+    "valores_paineis_quadros.csv",
+    "valores_disjuntor_caixa_moldada.csv",
+    "valores_barra_roscada.csv",
+    "valores_eletrocalhas.csv",
+    "valores_tomadas_industriais.csv",
+    "valores_medidores.csv",
+    "valores_servico.csv",
+    "valores_profissionais.csv",
+    "tabela_precos_ce.csv",
+)
+
+# Tempo máximo (ms) aguardando outra sessão liberar a escrita
+_TEMPO_ESPERA_MS = 10_000
+
+# Colunas (normalizadas) usadas como nome do material e como categoria,
+# em ordem de preferência
+_COLUNAS_MATERIAL = ("material", "modelo", "cabo", "servico", "profissional", "sealtubo")
+_COLUNAS_CATEGORIA = ("categoria", "fabricante")
+
+# Fragmentos que identificam colunas monetárias (já normalizados) e a coluna
+# com a data da última atualização de cada preço
+_COLUNAS_PRECO = ("preco", "valor hora")
+_COLUNA_ATUALIZADO = "atualizado"
+_FORMATO_ATUALIZADO = "%d/%m/%Y"
+
+# Uma conexão de leitura por banco, compartilhada entre as sessões
+_CONEXOES: dict = {}
+_LOCK_CONEXOES = threading.Lock()
+
+# Resumo do conteúdo de cada tabela, por (caminho, assinatura da versão)
+_RESUMOS: dict = {}
+
+
+class ConflitoCatalogo(RuntimeError):
+    """A tabela mudou no banco desde a versão editada na sessão."""
+
+
+@functools.lru_cache(maxsize=65_536)
+def _normalizar(valor) -> str:
+    valor = unicodedata.normalize("NFKD", "" if valor is None else str(valor))
+    valor = "".join(ch for ch in valor if not unicodedata.combining(ch)).lower()
+    return re.sub(r"[^a-z0-9]+", " ", valor).strip()
+
+
+def caminho_banco(caminho_csv) -> Path:
+    """Banco do catálogo usado para o CSV informado."""
+    return Path(caminho_csv).resolve().with_name(NOME_BANCO)
+
+
+def nome_tabela(caminho_csv) -> str:
+    """Nome da tabela do banco correspondente ao CSV (``valores_cabos``)."""
+    return re.sub(r"\W", "_", Path(caminho_csv).stem)
+
+
+def _identificador(nome: str) -> str:
+    return '"' + str(nome).replace('"', '""') + '"'
+
+
+def _coluna_preferida(colunas, opcoes) -> Optional[int]:
+    normalizadas = [_normalizar(coluna) for coluna in colunas]
+    for opcao in opcoes:
+        for posicao, coluna in enumerate(normalizadas):
+            if coluna.startswith(opcao):
+                return posicao
+    return None
+
+
+def _preparar_esquema(conexao: sqlite3.Connection) -> None:
+    conexao.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalogo_versoes (
+            tabela TEXT PRIMARY KEY,
+            arquivo TEXT NOT NULL,
+            colunas TEXT NOT NULL,
+            versao INTEGER NOT NULL,
+            atualizado_em TEXT NOT NULL
+        )
+        """
+    )
+    conexao.execute(
+        """
+        CREATE TABLE IF NOT EXISTS historico_precos (
+            id INTEGER PRIMARY KEY,
+            tabela TEXT NOT NULL,
+            item TEXT NOT NULL,
+            material TEXT NOT NULL,
+            categoria TEXT NOT NULL,
+            coluna TEXT NOT NULL,
+            preco REAL,
+            registrado_em TEXT NOT NULL,
+            usuario TEXT NOT NULL
+        )
+        """
+    )
+    conexao.execute(
+        "CREATE INDEX IF NOT EXISTS idx_historico_item "
+        "ON historico_precos (tabela, item, coluna, registrado_em)"
+    )
+    conexao.execute(
+        "CREATE INDEX IF NOT EXISTS idx_historico_data "
+        "ON historico_precos (tabela, registrado_em)"
+    )
+    conexao.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalogo_conteudos (
+            resumo TEXT PRIMARY KEY,
+            tabela TEXT NOT NULL,
+            dados BLOB NOT NULL
+        )
+        """
+    )
+    conexao.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalogo_referencias (
+            referencia TEXT PRIMARY KEY,
+            tabelas TEXT NOT NULL,
+            criado_em TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _abrir(banco: Path) -> sqlite3.Connection:
+    banco.parent.mkdir(parents=True, exist_ok=True)
+    conexao = sqlite3.connect(
+        banco, timeout=_TEMPO_ESPERA_MS / 1000, check_same_thread=False
+    )
+    conexao.execute(f"PRAGMA busy_timeout = {_TEMPO_ESPERA_MS}")
+    conexao.execute("PRAGMA journal_mode = WAL")
+    conexao.execute("PRAGMA synchronous = NORMAL")
+    with conexao:
+        _preparar_esquema(conexao)
+    return conexao
+
+
+def _leitura(banco: Path) -> tuple[sqlite3.Connection, threading.Lock]:
+    """Conexão de leitura compartilhada do ``banco`` e o lock que a protege."""
+    chave = str(banco)
+    with _LOCK_CONEXOES:
+        if chave not in _CONEXOES:
+            _CONEXOES[chave] = (_abrir(banco), threading.Lock())
+        return _CONEXOES[chave]
+
+
+def _ler_csv_texto(origem, sep: str = ";") -> pd.DataFrame:
+    """Lê um CSV mantendo cada célula como o texto gravado no arquivo."""
+    return pd.read_csv(origem, sep=sep, dtype=str, keep_default_na=False)
+
+
+def _texto_tabela(df: pd.DataFrame) -> pd.DataFrame:
+    """Células de ``df`` como o texto que ``to_csv`` gravaria."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, sep=";", index=False)
+    buffer.seek(0)
+    return _ler_csv_texto(buffer)
+
+
+def _texto_banco(conexao: sqlite3.Connection, tabela: str, colunas: list) -> pd.DataFrame:
+    """Linhas gravadas da tabela, como texto, antes de serem substituídas."""
+    selecao = ", ".join(_identificador(f"c{i}") for i in range(len(colunas)))
+    linhas = conexao.execute(
+        f"SELECT {selecao or 'NULL'} FROM {_identificador(tabela)} ORDER BY linha"
+    ).fetchall()
+    return pd.DataFrame(linhas, columns=colunas or None, dtype=object)
+
+
+def _colunas_preco(colunas: list) -> list[tuple[int, list[int], Optional[int]]]:
+    """Posição de cada coluna de preço, das colunas que nomeiam o item e da data.
+
+    Em tabelas com mais de um preço por linha (``Cabo 750V``/``Preco 750V``)
+    o item é a coluna com o mesmo sufixo do preço; nas demais, o conjunto das
+    colunas descritivas (``Modelo``, ``Corrente``, ``Fabricante``).
+    """
+    normalizadas = [_normalizar(coluna) for coluna in colunas]
+    precos = [
+        i for i, nome in enumerate(normalizadas)
+        if any(fragmento in nome for fragmento in _COLUNAS_PRECO)
+    ]
+    datas = [
+        i for i, nome in enumerate(normalizadas) if nome.startswith(_COLUNA_ATUALIZADO)
+    ]
+    descritivas = [i for i in range(len(colunas)) if i not in precos and i not in datas]
+    resultado = []
+    for posicao in precos:
+        sufixo = normalizadas[posicao]
+        for fragmento in _COLUNAS_PRECO:
+            sufixo = sufixo.replace(fragmento, "")
+        sufixo = sufixo.strip()
+        identidade = [
+            i for i in descritivas if sufixo and normalizadas[i].endswith(sufixo)
+        ] or descritivas
+        nome_data = f"{_COLUNA_ATUALIZADO} {sufixo}".strip()
+        data = next(
+            (i for i in datas if normalizadas[i] == nome_data),
+            datas[0] if len(datas) == 1 else None,
+        )
+        if identidade:
+            resultado.append((posicao, identidade, data))
+    return resultado
+
+
+def _itens_preco(texto: pd.DataFrame) -> list[tuple[str, pd.DataFrame]]:
+    """Item, material, categoria, preço e data de cada linha, por coluna de preço."""
+    # Importado aqui: ``catalogo_precos`` importa este módulo
+    from catalogo_precos import converter_coluna_moeda
+
+    colunas = [str(coluna) for coluna in texto.columns]
+    posicao_categoria = _coluna_preferida(colunas, _COLUNAS_CATEGORIA)
+    categoria = (
+        texto.iloc[:, posicao_categoria].fillna("").astype(str).str.strip()
+        if posicao_categoria is not None
+        else ""
+    )
+    resultado = []
+    for posicao, identidade, data in _colunas_preco(colunas):
+        partes = texto.iloc[:, identidade].fillna("").astype(str)
+        material = partes.iloc[:, 0]
+        for i in range(1, len(identidade)):
+            material = material + " " + partes.iloc[:, i]
+        itens = pd.DataFrame(
+            {
+                "item": material.map(_normalizar),
+                "material": material.str.split().str.join(" "),
+                "categoria": categoria,
+                "preco": converter_coluna_moeda(texto.iloc[:, posicao], preencher=None),
+                "data": (
+                    texto.iloc[:, data].fillna("").astype(str) if data is not None else ""
+                ),
+            }
+        )
+        resultado.append((colunas[posicao], itens))
+    return resultado
+
+
+def _precos_tabela(texto: pd.DataFrame) -> dict:
+    """Preço de cada (item, coluna de preço) com material, categoria e data."""
+    precos = {}
+    for coluna, itens in _itens_preco(texto):
+        for item, material, categoria, preco, data in itens.itertuples(index=False):
+            if item:
+                precos[(item, coluna)] = (
+                    material,
+                    categoria,
+                    None if pd.isna(preco) else float(preco),
+                    data,
+                )
+    return precos
+
+
+def _mesmo_preco(anterior: Optional[float], atual: Optional[float]) -> bool:
+    if anterior is None or atual is None:
+        return anterior is atual
+    return math.isclose(anterior, atual, rel_tol=0.0, abs_tol=1e-9)
+
+
+def _data_atualizado(texto: str) -> Optional[str]:
+    """Data da coluna "Atualizado" (dd/mm/aaaa) como instante ISO."""
+    try:
+        return _dt.datetime.strptime(texto.strip(), _FORMATO_ATUALIZADO).isoformat()
+    except ValueError:
+        return None
+
+
+def _tem_historico(conexao: sqlite3.Connection, tabela: str) -> bool:
+    return (
+        conexao.execute(
+            "SELECT 1 FROM historico_precos WHERE tabela = ? LIMIT 1", (tabela,)
+        ).fetchone()
+        is not None
+    )
+
+
+def _registrar_historico(
+    conexao: sqlite3.Connection,
+    tabela: str,
+    anterior: Optional[pd.DataFrame],
+    texto: pd.DataFrame,
+    agora: str,
+    usuario: str,
+) -> int:
+    """Acrescenta ao histórico os preços novos, alterados e removidos.
+
+    Sem ``anterior`` (importação inicial do CSV), cada preço é registrado na
+    data da sua coluna "Atualizado", se houver. Itens removidos da tabela
+    ganham um registro sem preço. Retorna o número de registros.
+    """
+    antigos = {} if anterior is None else _precos_tabela(anterior)
+    novos = _precos_tabela(texto)
+    registros = []
+    for (item, coluna), (material, categoria, preco, data) in novos.items():
+        if (item, coluna) in antigos:
+            if _mesmo_preco(antigos[item, coluna][2], preco):
+                continue
+            quando = agora
+        elif preco is None:
+            continue
+        else:
+            quando = (anterior is None and _data_atualizado(data)) or agora
+        registros.append(
+            (tabela, item, material, categoria, coluna, preco, quando, usuario)
+        )
+    for (item, coluna), (material, categoria, preco, _) in antigos.items():
+        if (item, coluna) not in novos and preco is not None:
+            registros.append(
+                (tabela, item, material, categoria, coluna, None, agora, usuario)
+            )
+    conexao.executemany(
+        "INSERT INTO historico_precos "
+        "(tabela, item, material, categoria, coluna, preco, registrado_em, usuario) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        registros,
+    )
+    return len(registros)
+
+
+def _gravar(
+    conexao: sqlite3.Connection,
+    caminho_csv,
+    df: pd.DataFrame,
+    agora: str,
+    usuario: str = "",
+) -> int:
+    """Substitui as linhas da tabela do CSV; deve rodar dentro da transação."""
+    tabela = nome_tabela(caminho_csv)
+    texto = _texto_tabela(df)
+    colunas = [str(coluna) for coluna in texto.columns]
+    linha = conexao.execute(
+        "SELECT colunas, versao FROM catalogo_versoes WHERE tabela = ?", (tabela,)
+    ).fetchone()
+    anterior = (
+        None if linha is None else _texto_banco(conexao, tabela, json.loads(linha[0]))
+    )
+
+    if linha is None or json.loads(linha[0]) != colunas:
+        conexao.execute(f"DROP TABLE IF EXISTS {_identificador(tabela)}")
+        definicoes = ", ".join(f"{_identificador(f'c{i}')} TEXT" for i in range(len(colunas)))
+        conexao.execute(
+            f"CREATE TABLE {_identificador(tabela)} ("
+            "linha INTEGER PRIMARY KEY, material TEXT NOT NULL, "
+            f"categoria TEXT NOT NULL{', ' + definicoes if definicoes else ''})"
+        )
+        conexao.execute(
+            f"CREATE INDEX {_identificador(f'idx_{tabela}_material')} "
+            f"ON {_identificador(tabela)} (material)"
+        )
+        conexao.execute(
+            f"CREATE INDEX {_identificador(f'idx_{tabela}_categoria')} "
+            f"ON {_identificador(tabela)} (categoria, material)"
+        )
+    else:
+        conexao.execute(f"DELETE FROM {_identificador(tabela)}")
+
+    posicao_material = _coluna_preferida(colunas, _COLUNAS_MATERIAL)
+    posicao_categoria = _coluna_preferida(colunas, _COLUNAS_CATEGORIA)
+    valores = texto.to_numpy(dtype=object)
+    marcadores = ", ".join("?" * (len(colunas) + 3))
+    conexao.executemany(
+        f"INSERT INTO {_identificador(tabela)} VALUES ({marcadores})",
+        [
+            (
+                i,
+                _normalizar(celulas[posicao_material]) if posicao_material is not None else "",
+                _normalizar(celulas[posicao_categoria]) if posicao_categoria is not None else "",
+                *celulas,
+            )
+            for i, celulas in enumerate(valores)
+        ],
+    )
+    if anterior is not None and not _tem_historico(conexao, tabela):
+        # Banco anterior ao histórico: registra antes os preços já gravados
+        _registrar_historico(conexao, tabela, None, anterior, agora, "")
+    _registrar_historico(conexao, tabela, anterior, texto, agora, usuario)
+    versao = (linha[1] if linha else 0) + 1
+    conexao.execute(
+        "INSERT OR REPLACE INTO catalogo_versoes "
+        "(tabela, arquivo, colunas, versao, atualizado_em) VALUES (?, ?, ?, ?, ?)",
+        (
+            tabela,
+            Path(caminho_csv).name,
+            json.dumps(colunas, ensure_ascii=False),
+            versao,
+            agora,
+        ),
+    )
+    return versao
+
+
+def salvar_tabelas(
+    tabelas: Mapping[str, pd.DataFrame],
+    versoes_esperadas: Optional[Mapping[str, int]] = None,
+    banco=None,
+    usuario: str = "",
+) -> dict[str, int]:
+    """Grava as ``tabelas`` (pelo nome do CSV) em uma única transação.
+
+    Retorna a nova versão de cada tabela. Com ``versoes_esperadas``, lança
+    :class:`ConflitoCatalogo` (sem gravar nada) se alguma tabela já estiver
+    em outra versão no banco. Os preços alterados entram no histórico em
+    nome de ``usuario``.
+    """
+    if not tabelas:
+        return {}
+    banco = Path(banco) if banco else caminho_banco(next(iter(tabelas)))
+    agora = _dt.datetime.now().isoformat(timespec="seconds")
+    conexao = _abrir(banco)
+    try:
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            for caminho, esperada in (versoes_esperadas or {}).items():
+                atual = _versao(conexao, caminho)
+                if esperada is not None and atual is not None and atual != esperada:
+                    raise ConflitoCatalogo(
+                        f"A tabela {Path(caminho).name} foi alterada em outra sessão "
+                        f"(versão {atual}, editada a partir da {esperada})."
+                    )
+            return {
+                caminho: _gravar(conexao, caminho, df, agora, usuario)
+                for caminho, df in tabelas.items()
+            }
+    finally:
+        conexao.close()
+
+
+def salvar_tabela(
+    caminho_csv,
+    df: pd.DataFrame,
+    versao_esperada: Optional[int] = None,
+    usuario: str = "",
+) -> int:
+    """Grava uma tabela do catálogo e retorna a nova versão."""
+    versoes = None if versao_esperada is None else {caminho_csv: versao_esperada}
+    return salvar_tabelas({caminho_csv: df}, versoes, usuario=usuario)[caminho_csv]
+
+
+def importar_csv(caminho_csv, origem=None, sep: str = ";", usuario: str = "") -> int:
+    """Importa ``origem`` (ou o próprio CSV) para a tabela de ``caminho_csv``."""
+    return salvar_tabela(
+        caminho_csv, _ler_csv_texto(origem or caminho_csv, sep), usuario=usuario
+    )
+
+
+def _versao(conexao: sqlite3.Connection, caminho_csv) -> Optional[int]:
+    linha = conexao.execute(
+        "SELECT versao FROM catalogo_versoes WHERE tabela = ?",
+        (nome_tabela(caminho_csv),),
+    ).fetchone()
+    return None if linha is None else int(linha[0])
+
+
+def versao_tabela(caminho_csv, sep: str = ";") -> Optional[int]:
+    """Versão atual da tabela, importando o CSV na primeira consulta.
+
+    Retorna ``None`` quando a tabela não está no banco e o CSV não existe.
+    """
+    conexao, lock = _leitura(caminho_banco(caminho_csv))
+    with lock:
+        versao = _versao(conexao, caminho_csv)
+    if versao is not None:
+        return versao
+    if not Path(caminho_csv).exists():
+        return None
+    banco = caminho_banco(caminho_csv)
+    escrita = _abrir(banco)
+    try:
+        with escrita:
+            escrita.execute("BEGIN IMMEDIATE")
+            # Outra sessão pode ter importado enquanto esperávamos a escrita
+            versao = _versao(escrita, caminho_csv)
+            if versao is None:
+                agora = _dt.datetime.now().isoformat(timespec="seconds")
+                versao = _gravar(
+                    escrita, caminho_csv, _ler_csv_texto(caminho_csv, sep), agora
+                )
+            return versao
+    finally:
+        escrita.close()
+
+
+def assinatura_tabela(caminho_csv) -> Optional[str]:
+    """Versão e data da última gravação da tabela (``"3:2025-08-13T10:00:00"``).
+
+    Identifica o conteúdo da tabela mesmo que o banco seja recriado.
+    """
+    conexao, lock = _leitura(caminho_banco(caminho_csv))
+    with lock:
+        linha = conexao.execute(
+            "SELECT versao, atualizado_em FROM catalogo_versoes WHERE tabela = ?",
+            (nome_tabela(caminho_csv),),
+        ).fetchone()
+    return None if linha is None else f"{linha[0]}:{linha[1]}"
+
+
+def versoes_catalogo(banco) -> pd.DataFrame:
+    """Tabelas do banco com arquivo de origem, versão e data da gravação."""
+    conexao, lock = _leitura(Path(banco))
+    with lock:
+        return pd.read_sql_query(
+            "SELECT tabela, arquivo, versao, atualizado_em FROM catalogo_versoes "
+            "ORDER BY tabela",
+            conexao,
+        )
+
+
+def _linhas(caminho_csv, filtro: str = "", parametros=()) -> tuple[list, list]:
+    """Colunas e linhas (texto) da tabela do CSV, na ordem original."""
+    if versao_tabela(caminho_csv) is None:
+        raise FileNotFoundError(caminho_csv)
+    tabela = nome_tabela(caminho_csv)
+    conexao, lock = _leitura(caminho_banco(caminho_csv))
+    with lock:
+        (colunas,) = conexao.execute(
+            "SELECT colunas FROM catalogo_versoes WHERE tabela = ?", (tabela,)
+        ).fetchone()
+        colunas = json.loads(colunas)
+        selecao = ", ".join(_identificador(f"c{i}") for i in range(len(colunas)))
+        linhas = conexao.execute(
+            f"SELECT {selecao or 'NULL'} FROM {_identificador(tabela)} {filtro} "
+            "ORDER BY linha",
+            parametros,
+        ).fetchall()
+    return colunas, linhas
+
+
+def _dataframe(colunas: list, linhas: list) -> pd.DataFrame:
+    """DataFrame com os tipos que ``pd.read_csv`` daria ao CSV equivalente."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=";", lineterminator="\n")
+    escritor.writerow(colunas)
+    escritor.writerows(linhas)
+    buffer.seek(0)
+    return pd.read_csv(buffer, sep=";")
+
+
+def ler_tabela(caminho_csv) -> pd.DataFrame:
+    """Tabela do catálogo como ``pd.read_csv`` leria o CSV exportado.
+
+    Lança ``FileNotFoundError`` se a tabela não existe no banco nem em CSV.
+    """
+    return _dataframe(*_linhas(caminho_csv))
+
+
+def consultar_catalogo(
+    caminho_csv, material: Optional[str] = None, categoria: Optional[str] = None
+) -> pd.DataFrame:
+    """Linhas cujo material normalizado começa com ``material``.
+
+    ``material`` e ``categoria`` são normalizados como no catálogo (sem
+    acentos e pontuação, em minúsculas) e consultados pelos índices da
+    tabela, sem percorrer as demais linhas.
+    """
+    condicoes, parametros = [], []
+    if categoria is not None:
+        condicoes.append("categoria = ?")
+        parametros.append(_normalizar(categoria))
+    if material is not None:
+        prefixo = _normalizar(material)
+        condicoes.append("material >= ? AND material < ?")
+        parametros.extend([prefixo, prefixo + "\U0010ffff"])
+    filtro = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return _dataframe(*_linhas(caminho_csv, filtro, parametros))
+
+
+def exportar_csv(caminho_csv, destino=None) -> int:
+    """Grava a tabela em CSV (no próprio arquivo se ``destino`` for omitido).
+
+    ``destino`` pode ser um caminho ou um buffer de texto. Retorna o número
+    de linhas exportadas.
+    """
+    colunas, linhas = _linhas(caminho_csv)
+    if destino is None or isinstance(destino, (str, Path)):
+        with open(destino or caminho_csv, "w", encoding="utf-8", newline="") as arquivo:
+            return exportar_csv(caminho_csv, arquivo)
+    escritor = csv.writer(destino, delimiter=";", lineterminator="\n")
+    escritor.writerow(colunas)
+    escritor.writerows(linhas)
+    return len(linhas)
+
+
+def _instante(data, fim_do_dia: bool = True) -> str:
+    """Instante ISO de ``data``; datas sem hora valem até o fim do dia (ou
+    desde o início, com ``fim_do_dia=False``)."""
+    if isinstance(data, _dt.datetime):
+        return data.isoformat(timespec="seconds")
+    texto = data.isoformat() if isinstance(data, _dt.date) else str(data)
+    if "T" in texto:
+        return texto
+    return f"{texto}T23:59:59" if fim_do_dia else f"{texto}T00:00:00"
+
+
+def historico_precos(
+    caminho_csv, material: Optional[str] = None, inicio=None, fim=None
+) -> pd.DataFrame:
+    """Registros do histórico de preços da tabela, em ordem de data.
+
+    Colunas ``Item``, ``Material``, ``Categoria``, ``Coluna``, ``Preco``,
+    ``Data`` e ``Usuario``. ``material`` filtra um único item (pelo nome
+    normalizado) e ``inicio``/``fim`` limitam o período; todos os filtros
+    usam os índices do histórico.
+    """
+    condicoes, parametros = ["tabela = ?"], [nome_tabela(caminho_csv)]
+    if material is not None:
+        condicoes.append("item = ?")
+        parametros.append(_normalizar(material))
+    if inicio is not None:
+        condicoes.append("registrado_em >= ?")
+        parametros.append(_instante(inicio, fim_do_dia=False))
+    if fim is not None:
+        condicoes.append("registrado_em <= ?")
+        parametros.append(_instante(fim))
+    versao_tabela(caminho_csv)
+    conexao, lock = _leitura(caminho_banco(caminho_csv))
+    with lock:
+        historico = pd.read_sql_query(
+            "SELECT item AS Item, material AS Material, categoria AS Categoria, "
+            "coluna AS Coluna, preco AS Preco, registrado_em AS Data, "
+            f"usuario AS Usuario FROM historico_precos WHERE {' AND '.join(condicoes)} "
+            "ORDER BY registrado_em, id",
+            conexao,
+            params=parametros,
+        )
+    historico["Preco"] = historico["Preco"].astype("float64")
+    historico["Data"] = pd.to_datetime(historico["Data"])
+    return historico
+
+
+def preco_na_data(
+    caminho_csv, material: str, data, coluna: Optional[str] = None
+) -> Optional[float]:
+    """Preço do item vigente em ``data`` (``None`` se ainda não existia ou
+    já tinha sido removido)."""
+    condicoes = "tabela = ? AND item = ? AND registrado_em <= ?"
+    parametros = [nome_tabela(caminho_csv), _normalizar(material), _instante(data)]
+    if coluna is not None:
+        condicoes += " AND coluna = ?"
+        parametros.append(coluna)
+    versao_tabela(caminho_csv)
+    conexao, lock = _leitura(caminho_banco(caminho_csv))
+    with lock:
+        linha = conexao.execute(
+            f"SELECT preco FROM historico_precos WHERE {condicoes} "
+            "ORDER BY registrado_em DESC, id DESC LIMIT 1",
+            parametros,
+        ).fetchone()
+    return None if linha is None or linha[0] is None else float(linha[0])
+
+
+def precos_na_data(caminho_csv, data) -> pd.DataFrame:
+    """Preço vigente em ``data`` de cada item da tabela.
+
+    Colunas ``Item``, ``Coluna``, ``Material``, ``Categoria`` e ``Preco``;
+    itens removidos até ``data`` não aparecem.
+    """
+    versao_tabela(caminho_csv)
+    conexao, lock = _leitura(caminho_banco(caminho_csv))
+    with lock:
+        # Uma busca no índice por item, em vez de agrupar todo o histórico
+        linhas = conexao.execute(
+            "SELECT h.item, h.coluna, h.material, h.categoria, h.preco FROM ("
+            "SELECT DISTINCT item, coluna FROM historico_precos WHERE tabela = ?1"
+            ") AS k "
+            "JOIN historico_precos AS h ON h.id = ("
+            "SELECT id FROM historico_precos WHERE tabela = ?1 AND item = k.item "
+            "AND coluna = k.coluna AND registrado_em <= ?2 "
+            "ORDER BY registrado_em DESC, id DESC LIMIT 1)",
+            (nome_tabela(caminho_csv), _instante(data)),
+        ).fetchall()
+    precos = pd.DataFrame(
+        [linha[:5] for linha in linhas if linha[4] is not None],
+        columns=["Item", "Coluna", "Material", "Categoria", "Preco"],
+    )
+    precos["Preco"] = precos["Preco"].astype("float64")
+    return precos
+
+
+def tabela_na_data(caminho_csv, data) -> pd.DataFrame:
+    """Tabela atual com as colunas de preço (float64) vigentes em ``data``.
+
+    Itens que ainda não tinham preço em ``data`` ficam com ``NaN``.
+    """
+    colunas, linhas = _linhas(caminho_csv)
+    tabela = _dataframe(colunas, linhas)
+    vigentes = precos_na_data(caminho_csv, data)
+    mapa = dict(zip(zip(vigentes["Item"], vigentes["Coluna"]), vigentes["Preco"]))
+    texto = pd.DataFrame(linhas, columns=colunas or None, dtype=object)
+    for coluna, itens in _itens_preco(texto):
+        tabela[coluna] = [mapa.get((item, coluna), math.nan) for item in itens["item"]]
+        tabela[coluna] = tabela[coluna].astype("float64")
+    return tabela
+
+
+def _resumo(dados: bytes) -> str:
+    return hashlib.blake2b(dados, digest_size=16).hexdigest()
+
+
+def _resumo_tabela(caminho_csv) -> Optional[tuple[tuple, str, Optional[bytes]]]:
+    """Chave da versão, resumo do conteúdo da tabela e o conteúdo serializado
+    (``None`` se o resumo da versão atual já foi gravado)."""
+    if versao_tabela(caminho_csv) is None:
+        return None
+    chave = (str(Path(caminho_csv).resolve()), assinatura_tabela(caminho_csv))
+    if chave in _RESUMOS:
+        return chave, _RESUMOS[chave], None
+    dados = json.dumps(
+        _linhas(caminho_csv), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    return chave, _resumo(dados), dados
+
+
+def referencia_catalogo(caminhos=TABELAS_CATALOGO) -> str:
+    """Referência de conteúdo das tabelas ``caminhos`` como estão no banco.
+
+    A referência é o resumo (BLAKE2b, 32 caracteres) da lista de tabelas e
+    dos resumos do conteúdo de cada uma: o mesmo conteúdo gera sempre a
+    mesma referência. O conteúdo ainda não gravado é guardado, compactado,
+    para :func:`tabelas_referencia`.
+    """
+    resumos, novos, conteudos = {}, {}, []
+    for caminho in caminhos:
+        tabela = _resumo_tabela(caminho)
+        if tabela is None:
+            continue
+        chave, resumo, dados = tabela
+        resumos[Path(caminho).name] = resumo
+        if dados is not None:
+            novos[chave] = resumo
+            conteudos.append((resumo, nome_tabela(caminho), zlib.compress(dados)))
+    tabelas = json.dumps(resumos, ensure_ascii=False, sort_keys=True)
+    referencia = _resumo(tabelas.encode("utf-8"))
+    conexao = _abrir(caminho_banco(caminhos[0]))
+    try:
+        with conexao:
+            conexao.executemany(
+                "INSERT OR IGNORE INTO catalogo_conteudos (resumo, tabela, dados) "
+                "VALUES (?, ?, ?)",
+                conteudos,
+            )
+            conexao.execute(
+                "INSERT OR IGNORE INTO catalogo_referencias "
+                "(referencia, tabelas, criado_em) VALUES (?, ?, ?)",
+                (referencia, tabelas, _dt.datetime.now().isoformat(timespec="seconds")),
+            )
+    finally:
+        conexao.close()
+    _RESUMOS.update(novos)
+    return referencia
+
+
+def _banco_padrao(banco) -> Path:
+    return Path(banco) if banco else caminho_banco(TABELAS_CATALOGO[0])
+
+
+def resumos_referencia(referencia: str, banco=None) -> dict[str, str]:
+    """Resumo do conteúdo de cada tabela (pelo nome do CSV) da referência.
+
+    Lança ``KeyError`` se a referência não está no banco.
+    """
+    conexao, lock = _leitura(_banco_padrao(banco))
+    with lock:
+        linha = conexao.execute(
+            "SELECT tabelas FROM catalogo_referencias WHERE referencia = ?",
+            (referencia,),
+        ).fetchone()
+    if linha is None:
+        raise KeyError(referencia)
+    return json.loads(linha[0])
+
+
+def tabelas_referencia(referencia: str, banco=None) -> dict[str, pd.DataFrame]:
+    """Tabelas da referência, pelo nome do CSV, como ``pd.read_csv`` as leria."""
+    resumos = resumos_referencia(referencia, banco)
+    conexao, lock = _leitura(_banco_padrao(banco))
+    with lock:
+        dados = dict(
+            conexao.execute(
+                "SELECT resumo, dados FROM catalogo_conteudos WHERE resumo IN "
+                f"({', '.join('?' * len(resumos))})",
+                list(resumos.values()),
+            ).fetchall()
+        )
+    return {
+        arquivo: _dataframe(*json.loads(zlib.decompress(dados[resumo])))
+        for arquivo, resumo in resumos.items()
+    }
+
+
+__all__ = [
+    "ConflitoCatalogo",
+    "NOME_BANCO",
+    "TABELAS_CATALOGO",
+    "assinatura_tabela",
+    "caminho_banco",
+    "consultar_catalogo",
+    "exportar_csv",
+    "historico_precos",
+    "importar_csv",
+    "ler_tabela",
+    "nome_tabela",
+    "preco_na_data",
+    "precos_na_data",
+    "referencia_catalogo",
+    "resumos_referencia",
+    "salvar_tabela",
+    "salvar_tabelas",
+    "tabela_na_data",
+    "tabelas_referencia",
+    "versao_tabela",
+    "versoes_catalogo",
+]
@@ -0,0 +1,130 @@
+"""Catálogo de preços compartilhado, somente leitura, entre as sessões.
+
+As abas guardavam a tabela de cada editor em ``st.session_state``
+(``valores_cabos_df`` e semelhantes): cada sessão mantinha a sua cópia de
+todas as tabelas e as demais sessões continuavam lendo a versão anterior
+até reiniciar. Aqui as tabelas ficam em um único objeto do processo
+(``st.cache_resource``), entregues sem cópia a todas as sessões, que não
+devem alterá-las (``preparar_precos_*`` e ``DataFrame.assign`` já trabalham
+sobre cópias).
+
+Um contador de versão do catálogo é incrementado a cada gravação feita pelo
+aplicativo (:func:`invalidar_catalogo`, chamada por
+``valores_catalogo.salvar_tabela_catalogo``) e descarta as tabelas
+carregadas. A sessão recebe a versão em ``st.session_state["catalogo_versao"]``
+(:func:`sincronizar_versao`, no início de cada fragmento), que é a chave de
+que dependem os fragmentos e os valores derivados que usam preços: uma
+gravação em qualquer sessão faz as demais recalcularem na próxima execução.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from catalogo_precos import obter_tabela_precos
+from motor_custos import sealtubo_de_eletrodutos
+
+CHAVE_VERSAO = "catalogo_versao"
+
+# O sealtubo não tem arquivo próprio: é gravado na tabela de eletrodutos
+ARQUIVO_SEALTUBO = "valores_sealtubo.csv"
+ARQUIVO_ELETRODUTOS = "valores_eletrodutos.csv"
+
+
+class _Catalogo:
+    """Tabelas carregadas na versão atual do catálogo."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.versao = 0
+        # (caminho absoluto, preços convertidos) -> tabela, ou None se ausente
+        self._tabelas: dict[tuple[str, bool], pd.DataFrame | None] = {}
+
+    def tabela(self, caminho, sep: str, converter_precos: bool) -> pd.DataFrame:
+        chave = (str(Path(caminho).resolve()), bool(converter_precos))
+        with self._lock:
+            versao = self.versao
+            if chave in self._tabelas:
+                tabela = self._tabelas[chave]
+                if tabela is None:
+                    raise FileNotFoundError(caminho)
+                return tabela
+        tabela = self._carregar(caminho, sep, converter_precos)
+        with self._lock:
+            # Uma gravação durante a leitura já descartou esta versão
+            if versao == self.versao:
+                self._tabelas.setdefault(chave, tabela)
+        if tabela is None:
+            raise FileNotFoundError(caminho)
+        return tabela
+
+    def _carregar(self, caminho, sep: str, converter_precos: bool):
+        try:
+            return obter_tabela_precos(
+                caminho, sep=sep, converter_precos=converter_precos, copiar=False
+            )
+        except FileNotFoundError:
+            if Path(caminho).name != ARQUIVO_SEALTUBO:
+                return None
+        try:
+            eletrodutos = self.tabela(
+                Path(caminho).with_name(ARQUIVO_ELETRODUTOS), sep, converter_precos
+            )
+        except FileNotFoundError:
+            return None
+        return sealtubo_de_eletrodutos(eletrodutos)
+
+    def invalidar(self) -> int:
+        with self._lock:
+            self.versao += 1
+            self._tabelas.clear()
+            return self.versao
+
+
+@st.cache_resource(show_spinner=False)
+def _catalogo() -> _Catalogo:
+    return _Catalogo()
+
+
+def tabela_catalogo(
+    caminho, sep: str = ";", converter_precos: bool = True
+) -> pd.DataFrame:
+    """Tabela de preço compartilhada entre as sessões (somente leitura).
+
+    ``valores_sealtubo.csv``, se não existir, vem das linhas de sealtubo da
+    tabela de eletrodutos e acompanha as gravações e importações dela.
+    Lança ``FileNotFoundError`` quando a tabela não existe, assim como
+    :func:`catalogo_precos.obter_tabela_precos`.
+    """
+    return _catalogo().tabela(caminho, sep, converter_precos)
+
+
+def versao_catalogo() -> int:
+    """Versão atual do catálogo no processo."""
+    return _catalogo().versao
+
+
+def invalidar_catalogo() -> int:
+    """Descarta as tabelas carregadas após uma gravação e publica a nova versão."""
+    versao = _catalogo().invalidar()
+    st.session_state[CHAVE_VERSAO] = versao
+    return versao
+
+
+def sincronizar_versao() -> None:
+    """Publica na sessão a versão do catálogo, se outra sessão o alterou."""
+    versao = versao_catalogo()
+    if st.session_state.get(CHAVE_VERSAO) != versao:
+        st.session_state[CHAVE_VERSAO] = versao
+
+
+__all__ = [
+    "CHAVE_VERSAO",
+    "invalidar_catalogo",
+    "sincronizar_versao",
+    "tabela_catalogo",
+    "versao_catalogo",
+]
@@ -0,0 +1,156 @@
+"""Catálogo de preços compartilhado entre as abas do aplicativo.
+
+As tabelas ficam no banco SQLite do catálogo (``catalogo_banco``), que
+importa cada ``valores_*.csv`` na primeira leitura. Cada tabela é lida do
+banco uma única vez por processo e mantida em memória, indexada pelo caminho
+do CSV e pela versão da tabela no banco. Quando uma aba salva a tabela, a
+nova versão invalida a entrada e a próxima consulta relê a tabela. Se o
+snapshot Arrow (``snapshot_catalogo``) tiver sido criado, a primeira leitura
+de cada versão em um processo vem dele, e cada nova versão é regravada nele.
+"""
+
+import threading
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from catalogo_banco import assinatura_tabela, ler_tabela, versao_tabela
+from snapshot_catalogo import gravar_catalogo, ler_catalogo
+
+_CACHE_TABELAS = {}
+_CACHE_LOCK = threading.Lock()
+
+# Fragmentos que identificam colunas monetárias nos CSVs (já normalizados)
+_COLUNAS_PRECO = ("preco", "valor hora")
+
+
+def converter_coluna_moeda(serie, preencher: float | None = 0.0) -> pd.Series:
+    """Converte uma coluna com valores em Real ("R$ 1.234,56") para float64.
+
+    A conversão é vetorizada (``pyarrow.compute``) e aceita os mesmos formatos
+    tratados pelos campos manuais: prefixo ``R$``/``r$``, espaço não
+    separável, separador de milhar com ponto e decimal com vírgula ou ponto.
+    Colunas já numéricas são apenas convertidas para float64. Entradas
+    inválidas viram ``preencher`` (ou ``NaN`` se ``None``).
+    """
+    serie = pd.Series(serie, copy=False)
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        valores = serie.astype("float64")
+    else:
+        try:
+            # Colunas lidas do CSV já são texto: sem ``astype(str)`` por valor
+            texto = pa.array(
+                serie.to_numpy(dtype=object), type=pa.string(), from_pandas=True
+            )
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            texto = pa.array(
+                serie.astype(str).to_numpy(dtype=object), type=pa.string()
+            )
+        texto = pc.utf8_trim_whitespace(pc.replace_substring(texto, "R$", ""))
+        # A limpeza por regex, a operação mais cara, só nas entradas que precisam
+        sujo = pc.invert(pc.match_substring_regex(texto, r"^[0-9,.\-]*$"))
+        if pc.any(sujo).as_py():
+            limpo = pc.replace_substring_regex(
+                texto.filter(sujo), r"[^0-9,.\-]+", ""
+            )
+            texto = pc.replace_with_mask(texto, sujo, limpo)
+        com_milhar = pc.and_(
+            pc.match_substring(texto, ","), pc.match_substring(texto, ".")
+        )
+        texto = pc.if_else(com_milhar, pc.replace_substring(texto, ".", ""), texto)
+        texto = pc.replace_substring(texto, ",", ".")
+        valido = pc.match_substring_regex(texto, r"^-?(?:\d+\.?\d*|\.\d+)$")
+        texto = pc.if_else(valido, texto, pa.scalar(None, pa.string()))
+        valores = pd.Series(
+            pc.cast(texto, pa.float64()).to_numpy(zero_copy_only=False),
+            index=serie.index,
+            name=serie.name,
+        )
+    if preencher is not None:
+        valores = valores.fillna(preencher)
+    return valores
+
+
+def _eh_coluna_preco(coluna) -> bool:
+    """Indica se o nome da coluna corresponde a um valor monetário."""
+    nome = (
+        unicodedata.normalize("NFKD", str(coluna))
+        .encode("ASCII", "ignore")
+        .decode("ASCII")
+        .lower()
+    )
+    return any(fragmento in nome for fragmento in _COLUNAS_PRECO)
+
+
+def _converter_precos(df: pd.DataFrame) -> pd.DataFrame:
+    """Retorna uma cópia da tabela com as colunas de preço em float64."""
+    convertido = df.copy()
+    for coluna in convertido.columns:
+        if _eh_coluna_preco(coluna):
+            convertido[coluna] = converter_coluna_moeda(convertido[coluna])
+    return convertido
+
+
+def _chave_arquivo(caminho, sep: str = ";") -> tuple:
+    """Retorna a chave de cache (caminho absoluto, versão no banco) da tabela."""
+    versao = versao_tabela(caminho, sep=sep)
+    if versao is None:
+        raise FileNotFoundError(caminho)
+    return str(Path(caminho).resolve()), versao
+
+
+def _carregar_tabela(caminho) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Tabela original e com preços em float64, do snapshot ou do banco."""
+    origem = assinatura_tabela(caminho)
+    tabelas = ler_catalogo(caminho, origem) if origem else None
+    if tabelas is None:
+        bruto = ler_tabela(caminho)
+        tabelas = (bruto, _converter_precos(bruto))
+        if origem:
+            gravar_catalogo(caminho, *tabelas, origem)
+    return tabelas
+
+
+def obter_tabela_precos(
+    caminho, sep: str = ";", converter_precos: bool = False, copiar: bool = True
+) -> pd.DataFrame:
+    """Retorna a tabela do CSV informado a partir do cache do processo.
+
+    Por padrão a tabela armazenada não é entregue diretamente: cada chamada
+    recebe uma cópia, de modo que as abas podem ajustar colunas sem afetar
+    as demais sessões. Com ``converter_precos`` as colunas de preço chegam em float64,
+    convertidas uma única vez no carregamento da tabela. ``sep`` é o
+    separador do CSV na importação para o banco. Lança ``FileNotFoundError``
+    quando a tabela não está no banco e o CSV não existe, assim como
+    ``pd.read_csv``. Com ``copiar=False`` a tabela armazenada é devolvida
+    sem cópia e deve ser tratada como somente leitura (é o que faz o
+    catálogo compartilhado entre as sessões, ``catalogo_compartilhado``).
+    """
+    try:
+        chave = _chave_arquivo(caminho, sep)
+    except FileNotFoundError:
+        raise FileNotFoundError(caminho) from None
+
+    caminho_absoluto = chave[0]
+    with _CACHE_LOCK:
+        entrada = _CACHE_TABELAS.get(caminho_absoluto)
+        if entrada is None or entrada[0] != chave:
+            entrada = (chave, *_carregar_tabela(caminho_absoluto))
+            _CACHE_TABELAS[caminho_absoluto] = entrada
+    tabela = entrada[2 if converter_precos else 1]
+    return tabela.copy() if copiar else tabela
+
+
+def limpar_cache_precos(caminho=None) -> None:
+    """Descarta o cache de um arquivo específico ou de todo o catálogo."""
+    with _CACHE_LOCK:
+        if caminho is None:
+            _CACHE_TABELAS.clear()
+        else:
+            _CACHE_TABELAS.pop(str(Path(caminho).resolve()), None)
+
+
+__all__ = ["converter_coluna_moeda", "obter_tabela_precos", "limpar_cache_precos"]
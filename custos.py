@@ -5,8 +5,10 @@ from Deslocamento import calcula_custo_deslocamento, render_deslocamento_tab
 from valores_material import render_valores_material_tab
 from valores_servico import render_valores_servico_tab
 from valores_ce import render_valores_ce_tab
+from valores_catalogo import render_valores_catalogo_tab
 from custos_materiais import render_custos_materiais_tab
 from custos_servico import render_custos_servico_tab
+from fragmentos import renderizar_fragmento
 
 def format_currency(value: float) -> str:
 
@@ -16,6 +18,53 @@ def format_currency(value: float) -> str:
     )
 
 
+def _render_deslocamento_custos(tab_desloc):
+    """Renderiza a sub-aba de custo de deslocamento."""
+    with tab_desloc:
+        if st.session_state.get("deslocamento_necessario") == "Sim":
+            custo_total = calcula_custo_deslocamento(
+                st.session_state.get("distancia_km", 0.0),
+                st.session_state.get("tempo_viagem", ""),
+                st.session_state.get("custo_pedagios", 0.0),
+                st.session_state["desloc_config"],
+            )
+            st.session_state["total_custo_deslocamento"] = custo_total
+            st.success(
+                f"💰 Custo estimado de deslocamento: R$ {custo_total:,.2f}"
+            )
+        else:
+            st.session_state["total_custo_deslocamento"] = 0.0
+            st.info("Nenhum custo de deslocamento calculado.")
+
+
+def _render_atualizacoes(tab_atualizacoes):
+    """Renderiza as tabelas de preços editáveis da sub-aba Atualizações."""
+    with tab_atualizacoes:
+        st.text_input(
+            "Responsável pelas alterações",
+            key="usuario_catalogo",
+            help="Registrado no histórico de preços a cada gravação.",
+        )
+        (
+            tab_material,
+            tab_valores_servico,
+            tab_valores_ce,
+            tab_config_desloc,
+            tab_catalogo,
+        ) = st.tabs([
+            "Valores de Material",
+            "Valores de Serviço",
+            "Valores de CE",
+            "Configuração de Deslocamento",
+            "Catálogo (CSV)",
+        ])
+        render_valores_material_tab(tab_material, format_currency)
+        render_valores_servico_tab(tab_valores_servico, format_currency)
+        render_valores_ce_tab(tab_valores_ce, format_currency)
+        render_deslocamento_tab(tab_config_desloc)
+        render_valores_catalogo_tab(tab_catalogo)
+
+
 def render_custos_tab(tab_custos):
     """Renderiza a aba de custos."""
     with tab_custos:
@@ -29,39 +78,19 @@ def render_custos_tab(tab_custos):
             ]
         )
 
-        render_custos_materiais_tab(tab_resumo, format_currency)
-        render_custos_servico_tab(tab_servico, format_currency)
-
-        with tab_desloc:
-            if st.session_state.get("deslocamento_necessario") == "Sim":
-                custo_total = calcula_custo_deslocamento(
-                    st.session_state.get("distancia_km", 0.0),
-                    st.session_state.get("tempo_viagem", ""),
-                    st.session_state.get("custo_pedagios", 0.0),
-                    st.session_state["desloc_config"],
-                )
-                st.session_state["total_custo_deslocamento"] = custo_total
-                st.success(
-                    f"💰 Custo estimado de deslocamento: R$ {custo_total:,.2f}"
-                )
-            else:
-                st.session_state["total_custo_deslocamento"] = 0.0
-                st.info("Nenhum custo de deslocamento calculado.")
-
-        with tab_atualizacoes:
-            (
-                tab_material,
-                tab_valores_servico,
-                tab_valores_ce,
-                tab_config_desloc,
-            ) = st.tabs([
-                "Valores de Material",
-                "Valores de Serviço",
-                "Valores de CE",
-                "Configuração de Deslocamento",
-            ])
-            render_valores_material_tab(tab_material, format_currency)
-            render_valores_servico_tab(tab_valores_servico, format_currency)
-            render_valores_ce_tab(tab_valores_ce, format_currency)
-            render_deslocamento_tab(tab_config_desloc)
-
+        # Cada sub-aba é um fragmento: interações em uma delas não reexecutam
+        # as demais (ver ``fragmentos.DEPENDENCIAS``).
+        renderizar_fragmento(
+            "custos_materiais",
+            tab_resumo,
+            render_custos_materiais_tab,
+            format_currency,
+        )
+        renderizar_fragmento(
+            "custos_servico",
+            tab_servico,
+            render_custos_servico_tab,
+            format_currency,
+        )
+        renderizar_fragmento("deslocamento", tab_desloc, _render_deslocamento_custos)
+        renderizar_fragmento("atualizacoes", tab_atualizacoes, _render_atualizacoes)
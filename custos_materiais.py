@@ -1,45 +1,118 @@
 import streamlit as st
 import pandas as pd
 import re
-import math
 import unicodedata
 from typing import Optional
-from collections.abc import Mapping
 from io import BytesIO
 
+from catalogo_compartilhado import tabela_catalogo
+from catalogo_precos import converter_coluna_moeda
 from Deslocamento import calcula_custo_deslocamento
 from dados_transformadores import obter_transformadores_padrao
+from diagnostico import medir
 from grafico_custos_materiais import render_pizza_custos_materiais
-
-
-def _load_editor_dataframe(state_key: str):
-    """Retrieve and normalize a DataFrame stored in session_state."""
-    raw = st.session_state.get(state_key)
-    if raw is None:
+from grafo_derivados import GRAFO
+from motor_custos import (
+    avisos_materiais,
+    colunas_cabo,
+    extrair_bitola,
+    obter_acessorios_infra,
+    obter_preco_barra_pente,
+    obter_preco_cabo,
+    obter_preco_disjuntor,
+    obter_preco_dps,
+    obter_preco_idr,
+    obter_preco_quadro,
+    preparar_precos_barra_pente,
+    preparar_precos_cabos,
+    preparar_precos_disjuntores,
+    preparar_precos_dps,
+    preparar_precos_eletrodutos,
+    preparar_precos_idr,
+    preparar_precos_paineis,
+    preparar_precos_sealtubo,
+    sugerir_quantidade_componente,
+)
+from motor_eletrodutos import Circuito
+from motor_percursos import (
+    analisar_rede,
+    derivacoes_da_tabela,
+    metragem_cabos,
+    montar_rede,
+    quantidades_infra_trechos,
+    somar_quantidades_infra,
+)
+
+
+@GRAFO.registrar(
+    "total_custos_materiais",
+    (
+        ("total_cabos", 0.0),
+        ("total_infra_seca", 0.0),
+        ("total_quadro_protecao", 0.0),
+        ("total_material_adicional", 0.0),
+    ),
+)
+def _total_custos_materiais(
+    total_cabos, total_infra_seca, total_quadro_protecao, total_material_adicional
+) -> float:
+    return total_cabos + total_infra_seca + total_quadro_protecao + total_material_adicional
+
+
+@GRAFO.registrar(
+    "rede_percursos",
+    (
+        ("percursos", []),
+        ("percursos_quadro", []),
+        ("instalacao_sistema", ""),
+        ("bitola_sugerida", ""),
+        ("bitola_neutro_sugerida", ""),
+        ("bitola_terra_sugerida", ""),
+        ("tipo_cabos", ""),
+        "circuitos_carregadores",
+        ("derivacoes_carregadores", None),
+    ),
+    publicar=False,
+)
+def _rede_percursos(
+    percursos,
+    percursos_quadro,
+    instalacao,
+    fase,
+    neutro,
+    terra,
+    tipo_cabos,
+    carregadores,
+    derivacoes,
+):
+    """Trechos e circuitos do percurso; o circuito 0 usa as bitolas da aba."""
+    alimentador = Circuito(
+        instalacao,
+        extrair_bitola(fase),
+        extrair_bitola(neutro),
+        extrair_bitola(terra),
+        tipo_cabos,
+    )
+    return montar_rede(
+        percursos,
+        alimentador,
+        percursos_quadro,
+        carregadores,
+        derivacoes_da_tabela(derivacoes),
+    )
+
+
+def _tabela_precos(csv_path: str) -> Optional[pd.DataFrame]:
+    """Tabela do catálogo compartilhado (somente leitura), ou ``None`` se ausente."""
+    try:
+        return tabela_catalogo(csv_path)
+    except FileNotFoundError:
         return None
-    if isinstance(raw, pd.DataFrame):
-        return raw
-    if isinstance(raw, list):
-        return pd.DataFrame(raw)
-    if isinstance(raw, Mapping):
-        if "data" in raw and "columns" in raw:
-            return pd.DataFrame(raw["data"], columns=raw["columns"])
-        normalized = {
-            k: list(v.values()) if isinstance(v, Mapping) else v
-            for k, v in raw.items()
-        }
-        return pd.DataFrame(normalized)
-    return pd.DataFrame(raw)
 
 
 def render_custos_materiais_tab(tab_resumo, format_currency):
     """Renderiza a aba 'Custos com Materiais'."""
     with tab_resumo:
-        def _parse_bitola(valor):
-            """Extrai o valor numérico de uma bitola, retornando 0 se inválido."""
-            match = re.search(r"(\d+(?:[.,]\d+)?)", str(valor))
-            return float(match.group(1).replace(",", ".")) if match else 0.0
-
         def _parse_float_field(valor):
             """Converte um campo textual em float, aceitando formatos de moeda."""
             if valor is None:
@@ -65,25 +138,17 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
             except ValueError:
                 return 0.0
 
-        def _load_price_table(session_key, editor_key, csv_path, fallback_rows=None):
-            """Carrega uma tabela de preços considerando sessão, editor e arquivo CSV."""
-
-            df_preco = st.session_state.get(session_key)
-            if df_preco is None and editor_key:
-                df_preco = _load_editor_dataframe(editor_key)
+        def _load_price_table(csv_path, fallback_rows=None):
+            """Carrega uma tabela de preços do catálogo compartilhado."""
 
+            df_preco = _tabela_precos(csv_path)
             if df_preco is None:
-                try:
-                    df_preco = pd.read_csv(csv_path, sep=";")
-                except FileNotFoundError:
-                    if fallback_rows is None:
-                        return pd.DataFrame()
-                    df_preco = pd.DataFrame(fallback_rows)
+                if fallback_rows is None:
+                    return pd.DataFrame()
+                df_preco = pd.DataFrame(fallback_rows)
             else:
-                df_preco = pd.DataFrame(df_preco)
-
-            if not isinstance(df_preco, pd.DataFrame):
-                df_preco = pd.DataFrame(df_preco)
+                # Cópia: as colunas abaixo não podem alterar a tabela compartilhada
+                df_preco = df_preco.copy()
 
             def _find_price_column(columns: pd.Index) -> Optional[str]:
                 for coluna in columns:
@@ -100,8 +165,8 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
             coluna_preco = _find_price_column(df_preco.columns)
 
             if coluna_preco:
-                df_preco["_PrecoNumerico"] = df_preco[coluna_preco].apply(
-                    _parse_float_field
+                df_preco["_PrecoNumerico"] = converter_coluna_moeda(
+                    df_preco[coluna_preco]
                 )
             elif "_PrecoNumerico" not in df_preco.columns:
                 df_preco["_PrecoNumerico"] = 0.0
@@ -143,12 +208,8 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
         possui_carregador = st.session_state.get("possui_carregador", "")
 
         if possui_carregador == "Não":
-            with st.expander("⚡ Custo Carregador", expanded=True):
-                tabela_precos_ce = _load_price_table(
-                    "tabela_precos_ce_df",
-                    "tabela_precos_ce_editor",
-                    "tabela_precos_ce.csv",
-                )
+            with medir("custos_materiais/carregador"), st.expander("⚡ Custo Carregador", expanded=True):
+                tabela_precos_ce = _load_price_table("tabela_precos_ce.csv")
 
                 if tabela_precos_ce.empty:
                     st.info(
@@ -255,125 +316,53 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
             st.session_state.pop("tensao_carregador_orcamento", None)
             st.session_state.pop("preco_carregador_orcamento", None)
 
-        with st.expander("🔌 Custo com Cabos", expanded=True):
-
-            percursos = st.session_state.get("percursos", [])
-            soma_distancias = sum(trecho for _, trecho in percursos)
-    
-            bitola_fase1 = st.session_state.get("bitola_sugerida", "")
-            bitola_fase1_val = _parse_bitola(bitola_fase1)
-            bitola_neutro = st.session_state.get("bitola_neutro_sugerida", "")
-            bitola_neutro_val = _parse_bitola(bitola_neutro)
-            bitola_terra = st.session_state.get("bitola_terra_sugerida", "")
-            bitola_terra_val = _parse_bitola(bitola_terra)
-            instalacao = st.session_state.get("instalacao_sistema", "")
-    
-            if bitola_fase1_val > 0:
-                quantidade_preto = {
-                    "Monofásico": 1,
-                    "Bifásico": 2,
-                    "Trifásico": 3,
-                }.get(instalacao, 1)
-            else:
-                quantidade_preto = 0
-            quantidade_azul = 1 if bitola_neutro_val > 0 and instalacao != "Bifásico" else 0
-            quantidade_verde = 1 if bitola_terra_val > 0 else 0
-    
-            metragem_cabo_preto = soma_distancias * quantidade_preto
-            metragem_cabo_azul = soma_distancias * quantidade_azul
-            metragem_cabo_verde = soma_distancias * quantidade_verde
+        for aviso in avisos_materiais(
+            st.session_state.get("bitola_sugerida", ""),
+            st.session_state.get("disjuntor_recomendado", ""),
+            st.session_state.get("idr_recomendado", ""),
+            GRAFO.obter("distancia_total"),
+        ):
+            st.error(aviso)
+
+        with medir("custos_materiais/cabos"), st.expander("🔌 Custo com Cabos", expanded=True):
+
+            trechos, circuitos = GRAFO.obter("rede_percursos")
+
+            # Bitolas da aba Dimensionamento exibidas como foram digitadas
+            rotulos_bitola = {
+                ("Preto", extrair_bitola(st.session_state.get("bitola_sugerida", ""))):
+                    st.session_state.get("bitola_sugerida", ""),
+                ("Azul", extrair_bitola(st.session_state.get("bitola_neutro_sugerida", ""))):
+                    st.session_state.get("bitola_neutro_sugerida", ""),
+                ("Verde", extrair_bitola(st.session_state.get("bitola_terra_sugerida", ""))):
+                    st.session_state.get("bitola_terra_sugerida", ""),
+            }
+            metragens = metragem_cabos(trechos, circuitos)
     
             # --- Tabela de quantidade e custo dos cabos ---
-            df_cabos_preco = st.session_state.get("valores_cabos_df")
-            if df_cabos_preco is None:
-                df_cabos_preco = _load_editor_dataframe("valores_cabos_editor")
-            if df_cabos_preco is None:
-                try:
-                    df_cabos_preco = pd.read_csv("valores_cabos.csv", sep=";")
-                except FileNotFoundError:
-                    df_cabos_preco = pd.DataFrame()
-    
-            # Define colunas de cabo e preço conforme o tipo selecionado
+            df_cabos_preco = preparar_precos_cabos(_tabela_precos("valores_cabos.csv"))
             tipo_cabos = st.session_state.get("tipo_cabos", "")
-            tipo_cabo_label = (
-                "HEPR" if "HEPR" in str(tipo_cabos).upper() else "PVC"
-            )
-            col_cabo = "Cabo 750V"
-            col_preco = "Preco 750V"
-            if tipo_cabo_label == "HEPR":
-                col_cabo = "Cabo 1kV"
-                col_preco = "Preco 1kV"
-    
+            tipo_cabo_label = colunas_cabo(tipo_cabos)[0]
             cabos_dados = []
-            if not df_cabos_preco.empty:
-                for col in ["Preco 750V", "Preco 1kV"]:
-                    df_cabos_preco[col] = (
-                        df_cabos_preco[col]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
-                    )
-                df_cabos_preco["bitola"] = (
-                    df_cabos_preco[col_cabo]
-                    .astype(str)
-                    .str.extract(r"(\d+(?:[.,]\d+)?)\s*mm")[0]
-                    .str.replace(",", ".")
-                    .astype(float)
-                )
-    
+
             def _obter_preco(bitola_val: float) -> float:
-                preco_unit = 0.0
-                if bitola_val > 0 and not df_cabos_preco.empty:
-                    preco_match = df_cabos_preco.loc[
-                        df_cabos_preco["bitola"] == bitola_val, col_preco
-                    ]
-                    if not preco_match.empty:
-                        preco_unit = float(preco_match.iloc[0])
-                return preco_unit
-    
-            preco_preto = _obter_preco(bitola_fase1_val)
-            preco_azul = _obter_preco(bitola_neutro_val)
-            preco_verde = _obter_preco(bitola_terra_val)
+                return obter_preco_cabo(df_cabos_preco, bitola_val, tipo_cabos)
     
             total_cabos_valor = 0.0
     
-            if quantidade_preto > 0:
-                total_preto = preco_preto * metragem_cabo_preto
-                total_cabos_valor += total_preto
-                cabos_dados.append(
-                    {
-                        "Item": f"Cabo Preto {tipo_cabo_label}",
-                        "Bitola (mm²)": bitola_fase1,
-                        "Valor Unitário": format_currency(preco_preto),
-                        "Quantidade (m)": f"{metragem_cabo_preto:.2f}",
-                        "Total": format_currency(total_preto),
-                    }
-                )
-            if quantidade_azul > 0:
-                total_azul = preco_azul * metragem_cabo_azul
-                total_cabos_valor += total_azul
-                cabos_dados.append(
-                    {
-                        "Item": f"Cabo Azul {tipo_cabo_label}",
-                        "Bitola (mm²)": bitola_neutro,
-                        "Valor Unitário": format_currency(preco_azul),
-                        "Quantidade (m)": f"{metragem_cabo_azul:.2f}",
-                        "Total": format_currency(total_azul),
-                    }
-                )
-            if quantidade_verde > 0:
-                total_verde = preco_verde * metragem_cabo_verde
-                total_cabos_valor += total_verde
+            for cor, bitola_val, metragem in metragens.itertuples(index=False):
+                preco = _obter_preco(bitola_val)
+                total = preco * metragem
+                total_cabos_valor += total
                 cabos_dados.append(
                     {
-                        "Item": f"Cabo Verde {tipo_cabo_label}",
-                        "Bitola (mm²)": bitola_terra,
-                        "Valor Unitário": format_currency(preco_verde),
-                        "Quantidade (m)": f"{metragem_cabo_verde:.2f}",
-                        "Total": format_currency(total_verde),
+                        "Item": f"Cabo {cor} {tipo_cabo_label}",
+                        "Bitola (mm²)": rotulos_bitola.get(
+                            (cor, bitola_val), f"{bitola_val:g} mm²"
+                        ),
+                        "Valor Unitário": format_currency(preco),
+                        "Quantidade (m)": f"{metragem:.2f}",
+                        "Total": format_currency(total),
                     }
                 )
     
@@ -381,7 +370,25 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
             st.table(tabela_cabos)
             if total_cabos_valor > 0:
                 st.write(f"Total: {format_currency(total_cabos_valor)}")
-        with st.expander("🏗️ Custo com Infra-Seca", expanded=False):
+            st.session_state["total_cabos"] = total_cabos_valor
+
+            if len(trechos) > 1:
+                st.markdown("**Trechos do percurso**")
+                st.dataframe(
+                    analisar_rede(trechos, circuitos)[
+                        [
+                            "Trecho",
+                            "Comprimento (m)",
+                            "Curvas",
+                            "Conduletes",
+                            "Circuitos",
+                            "Condutores",
+                            "Eletroduto Mínimo",
+                        ]
+                    ],
+                    hide_index=True,
+                )
+        with medir("custos_materiais/infra_seca"), st.expander("🏗️ Custo com Infra-Seca", expanded=False):
     
             tamanho_eletroduto_raw = str(
                 st.session_state.get("tamanho_eletroduto", "")
@@ -390,269 +397,29 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 r'["\u201d]', "", tamanho_eletroduto_raw
             ).strip()
     
-            df_eletrodutos_preco = st.session_state.get("valores_eletrodutos_df")
-            if df_eletrodutos_preco is None:
-                df_eletrodutos_preco = _load_editor_dataframe(
-                    "valores_eletrodutos_editor"
-                )
-            if df_eletrodutos_preco is None:
-                try:
-                    df_eletrodutos_preco = pd.read_csv("valores_eletrodutos.csv", sep=";")
-                except FileNotFoundError:
-                    df_eletrodutos_preco = pd.DataFrame()
-    
-            if not df_eletrodutos_preco.empty:
-                df_eletrodutos_preco["Categoria"] = (
-                    df_eletrodutos_preco["Categoria"]
-                    .astype(str)
-                    .str.replace("\u201d", "", regex=False)
-                    .str.replace('"', "", regex=False)
-                    .str.strip()
-                )
-                df_eletrodutos_preco["Preco"] = (
-                    df_eletrodutos_preco["Preco"]
-                    .astype(str)
-                    .str.replace(r"R\$\s*", "", regex=True)
-                    .str.replace(r"\.", "", regex=True)
-                    .str.replace(",", ".", regex=True)
-                    .pipe(pd.to_numeric, errors="coerce")
-                    .fillna(0.0)
-                )
-    
-            df_sealtubo_preco = st.session_state.get("valores_sealtubo_df")
-            if df_sealtubo_preco is None:
-                df_sealtubo_preco = pd.DataFrame(
-                    {
-                        "Sealtubo": [
-                            f"Sealtubo com capa {t}\""
-                            for t in ["3/4", "1", "1 1/4", "1 1/2", "2"]
-                        ],
-                        "Preco": [8.70, 10.69, 17.28, 19.65, 26.31],
-                    }
-                )
-            if not df_sealtubo_preco.empty:
-                df_sealtubo_preco["Sealtubo"] = (
-                    df_sealtubo_preco["Sealtubo"]
-                    .astype(str)
-                    .str.replace("\u201d", "", regex=False)
-                    .str.replace('"', "", regex=False)
-                    .str.strip()
-                )
-                df_sealtubo_preco["Preco"] = (
-                    df_sealtubo_preco["Preco"]
-                    .astype(str)
-                    .str.replace(r"R\$\s*", "", regex=True)
-                    .apply(lambda x: x.replace(".", "").replace(",", ".") if "," in x else x)
-                    .pipe(pd.to_numeric, errors="coerce")
-                    .fillna(0.0)
-                )
-            def _obter_eletroduto_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                "Eletroduto Galv Pre-Zinc", case=False
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = re.sub(
-                            r'["\u201d]', "", str(linha.iloc[0]["Material"])
-                        ).strip()
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_condulete_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                "Condulete s/rosca", case=False
-                            )
-                        )
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                r"(?:C|LL|LR|X)$", case=False, regex=True
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = f"Condulete s/rosca {tamanho} C/LL/LR/X"
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_condulete_t_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                "Condulete s/rosca", case=False
-                            )
-                        )
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                r"T$", case=False, regex=True
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = f"Condulete s/rosca {tamanho} T"
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_unidut_reto_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                "Unidut Reto comum", case=False
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = re.sub(
-                            r'["\u201d]', "", str(linha.iloc[0]["Material"])
-                        ).strip()
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_unidut_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                "Unidut Conico comum", case=False
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = re.sub(
-                            r'["\u201d]', "", str(linha.iloc[0]["Material"])
-                        ).strip()
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_unilet_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                "Unilet comum 90º", case=False
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = re.sub(
-                            r'["\u201d]', "", str(linha.iloc[0]["Material"])
-                        ).strip()
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_curva_galv_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                r"Curva Galv Eletro\s*90º", case=False, regex=True
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = re.sub(
-                            r'["\u201d]', "", str(linha.iloc[0]["Material"])
-                        ).strip()
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_abracadeira_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_eletrodutos_preco.empty:
-                    categoria = f"Eletroduto de {tamanho}"
-                    linha = df_eletrodutos_preco.loc[
-                        (df_eletrodutos_preco["Categoria"] == categoria)
-                        & (
-                            df_eletrodutos_preco["Material"].str.contains(
-                                "Abraçadeira D e cunha", case=False
-                            )
-                        )
-                    ]
-                    if not linha.empty:
-                        material = re.sub(
-                            r'["\u201d]', "", str(linha.iloc[0]["Material"])
-                        ).strip()
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            def _obter_sealtubo_info(tamanho: str) -> tuple[str, float]:
-                tamanho = re.sub(r'["\u201d]', "", str(tamanho)).strip()
-                if tamanho and not df_sealtubo_preco.empty:
-                    linha = df_sealtubo_preco.loc[
-                        df_sealtubo_preco["Sealtubo"].str.contains(tamanho)
-                    ]
-                    if not linha.empty:
-                        material = re.sub(
-                            r'["\u201d]', "", str(linha.iloc[0]["Sealtubo"])
-                        ).strip()
-                        preco = float(linha.iloc[0]["Preco"])
-                        return material, preco
-                return "", 0.0
-    
-            material_eletroduto, preco_eletroduto = _obter_eletroduto_info(
-                tamanho_eletroduto
+            df_eletrodutos_preco = preparar_precos_eletrodutos(
+                _tabela_precos("valores_eletrodutos.csv")
             )
-            material_sealtubo, preco_sealtubo = _obter_sealtubo_info(
-                tamanho_eletroduto
+            df_sealtubo_preco = preparar_precos_sealtubo(
+                _tabela_precos("valores_sealtubo.csv")
             )
-            material_curva, preco_curva = _obter_curva_galv_info(
-                tamanho_eletroduto
-            )
-            material_condulete, preco_condulete = _obter_condulete_info(
-                tamanho_eletroduto
-            )
-            material_condulete_t, preco_condulete_t = _obter_condulete_t_info(
-                tamanho_eletroduto
-            )
-            material_unidut_reto, preco_unidut_reto = _obter_unidut_reto_info(
-                tamanho_eletroduto
-            )
-            material_unidut_conico, preco_unidut_conico = _obter_unidut_info(
-                tamanho_eletroduto
-            )
-            material_unilet, preco_unilet = _obter_unilet_info(
-                tamanho_eletroduto
-            )
-            material_abracadeira, preco_abracadeira = _obter_abracadeira_info(
-                tamanho_eletroduto
+
+            acessorios_infra = obter_acessorios_infra(
+                df_eletrodutos_preco, tamanho_eletroduto, df_sealtubo_preco
             )
+            material_eletroduto, preco_eletroduto = acessorios_infra["eletroduto"]
+            material_sealtubo, preco_sealtubo = acessorios_infra["sealtubo"]
+            material_curva, preco_curva = acessorios_infra["curva_galv_eletro_90"]
+            material_condulete, preco_condulete = acessorios_infra["condulete"]
+            material_condulete_t, preco_condulete_t = acessorios_infra["condulete_t"]
+            material_unidut_reto, preco_unidut_reto = acessorios_infra["unidut_reto"]
+            material_unidut_conico, preco_unidut_conico = acessorios_infra[
+                "unidut_conico"
+            ]
+            material_unilet, preco_unilet = acessorios_infra["unilet"]
+            material_abracadeira, preco_abracadeira = acessorios_infra["abracadeira"]
+            # Quantidades derivadas das direções de cada trecho do percurso
+            sugestoes_infra = somar_quantidades_infra(quantidades_infra_trechos(trechos))
 
             custos_campos = [
                 ("custo_eletrodutos", material_eletroduto),
@@ -725,10 +492,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            metragem_sugerida = soma_distancias
-            quantidade_eletrodutos = (
-                math.ceil(metragem_sugerida / 3) if metragem_sugerida else 0
-            )
+            quantidade_eletrodutos = sugestoes_infra["eletroduto"]
             col_sug, col_qtd_label, col_qtd_input, col_total = st.columns([1, 1, 2, 1])
             quantidade_eletrodutos_sugestao = f"{quantidade_eletrodutos}"
             _definir_quantidade_padrao(
@@ -784,9 +548,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_conduletes = (
-                math.ceil((soma_distancias / 3) * 1.5) if soma_distancias else 0
-            )
+            quantidade_conduletes = sugestoes_infra["condulete"]
             col_sug_c, col_qtd_label_c, col_qtd_input_c, col_total_c = st.columns(
                 [1, 1, 2, 1]
             )
@@ -844,7 +606,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_conduletes_t = 1
+            quantidade_conduletes_t = sugestoes_infra["condulete_t"]
             col_sug_t, col_qtd_label_t, col_qtd_input_t, col_total_t = st.columns(
                 [1, 1, 2, 1]
             )
@@ -903,9 +665,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_unidut_reto = (
-                math.ceil((soma_distancias / 3) * 1.5) if soma_distancias else 0
-            )
+            quantidade_unidut_reto = sugestoes_infra["unidut_reto"]
             col_sug_ur, col_qtd_label_ur, col_qtd_input_ur, col_total_ur = st.columns(
                 [1, 1, 2, 1]
             )
@@ -963,7 +723,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_unidut_conico = 3
+            quantidade_unidut_conico = sugestoes_infra["unidut_conico"]
             col_sug_uc, col_qtd_label_uc, col_qtd_input_uc, col_total_uc = st.columns(
                 [1, 1, 2, 1]
             )
@@ -1022,9 +782,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_curva = (
-                math.ceil((soma_distancias / 3) * 1.2) if soma_distancias else 0
-            )
+            quantidade_curva = sugestoes_infra["curva_galv_eletro_90"]
             col_sug_curva, col_qtd_label_curva, col_qtd_input_curva, col_total_curva = st.columns(
                 [1, 1, 2, 1]
             )
@@ -1083,7 +841,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_unilet = 0
+            quantidade_unilet = sugestoes_infra["unilet"]
             col_sug_un, col_qtd_label_un, col_qtd_input_un, col_total_un = st.columns(
                 [1, 1, 2, 1]
             )
@@ -1142,7 +900,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_abracadeira = soma_distancias
+            quantidade_abracadeira = sugestoes_infra["abracadeira"]
             col_sug_ab, col_qtd_label_ab, col_qtd_input_ab, col_total_ab = st.columns([1, 1, 2, 1])
             quantidade_abracadeira_sugestao = f"{quantidade_abracadeira:g}"
             _definir_quantidade_padrao(
@@ -1198,9 +956,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 label_visibility="collapsed",
             )
     
-            quantidade_sealtubo = (
-                soma_distancias / 20 if soma_distancias else 0.0
-            )
+            quantidade_sealtubo = sugestoes_infra["sealtubo"]
             col_sug_seal, col_qtd_label_seal, col_qtd_input_seal, col_total_seal = st.columns(
                 [1, 1, 2, 1]
             )
@@ -1247,6 +1003,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 st.write(
                     f"Total Infra-Seca: {format_currency(total_infra_seca_valor)}"
                 )
+            st.session_state["total_infra_seca"] = total_infra_seca_valor
 
             if st.session_state.get("deslocamento_necessario") == "Sim":
                 custo_total = calcula_custo_deslocamento(
@@ -1264,530 +1021,23 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                 st.info("Nenhum custo de deslocamento calculado.")
 
             st.markdown("---")
-        with st.expander("🛡️ Quadro de Proteção", expanded=False):
-
-            def _normalizar_texto(valor: str) -> str:
-                if valor is None:
-                    valor = ""
-                valor = unicodedata.normalize("NFKD", str(valor))
-                valor = "".join(ch for ch in valor if not unicodedata.combining(ch))
-                valor = valor.lower()
-                valor = re.sub(r"[^a-z0-9]+", " ", valor)
-                return valor.strip()
+        with medir("custos_materiais/quadro_protecao"), st.expander("🛡️ Quadro de Proteção", expanded=False):
 
             def _normalizar_chave(valor: str, indice: int) -> str:
                 base = re.sub(r"[^0-9a-zA-Z]+", "_", valor).strip("_").lower()
                 return f"{base}_{indice}" if base else f"item_{indice}"
 
-            def _obter_sugestao_quantidade(descricao: str) -> float:
-                if not descricao:
-                    return 1.0
-                match = re.match(r"\s*(\d+(?:[.,]\d+)?)\s*[xX]", descricao)
-                if match:
-                    try:
-                        return float(match.group(1).replace(",", "."))
-                    except ValueError:
-                        return 1.0
-                return 1.0
-
-            df_disjuntores_din_preco = _load_editor_dataframe(
-                "valores_disjuntores_din_df"
-            )
-            if df_disjuntores_din_preco is None or df_disjuntores_din_preco.empty:
-                try:
-                    df_disjuntores_din_preco = pd.read_csv(
-                        "valores_disjuntor_din.csv", sep=";"
-                    )
-                except FileNotFoundError:
-                    df_disjuntores_din_preco = pd.DataFrame()
-            else:
-                df_disjuntores_din_preco = df_disjuntores_din_preco.copy()
-
-            if not df_disjuntores_din_preco.empty:
-                if "Material" in df_disjuntores_din_preco.columns:
-                    df_disjuntores_din_preco["Material"] = (
-                        df_disjuntores_din_preco["Material"].astype(str)
-                    )
-                if "Preco" in df_disjuntores_din_preco.columns:
-                    df_disjuntores_din_preco["_PrecoNumerico"] = (
-                        df_disjuntores_din_preco["Preco"].apply(_parse_float_field)
-                    )
-                else:
-                    df_disjuntores_din_preco["_PrecoNumerico"] = 0.0
-            else:
-                df_disjuntores_din_preco = pd.DataFrame(
-                    columns=["Material", "Preco", "_PrecoNumerico"]
-                )
-
-            df_idr_preco = _load_editor_dataframe("valores_idr_df")
-            if df_idr_preco is None or df_idr_preco.empty:
-                try:
-                    df_idr_preco = pd.read_csv("valores_idr.csv", sep=";")
-                except FileNotFoundError:
-                    df_idr_preco = pd.DataFrame(
-                        columns=[
-                            "Material",
-                            "Preco",
-                            "Atualizado",
-                            "_PrecoNumerico",
-                            "_Polos",
-                            "_Corrente",
-                            "_Sensibilidade",
-                        ]
-                    )
-            else:
-                df_idr_preco = df_idr_preco.copy()
-
-            if not df_idr_preco.empty:
-                if "Material" in df_idr_preco.columns:
-                    df_idr_preco["Material"] = df_idr_preco["Material"].astype(str)
-                else:
-                    df_idr_preco["Material"] = ""
-                if "Preco" in df_idr_preco.columns:
-                    df_idr_preco["_PrecoNumerico"] = df_idr_preco["Preco"].apply(
-                        _parse_float_field
-                    )
-                else:
-                    df_idr_preco["_PrecoNumerico"] = 0.0
-                df_idr_preco["_Polos"] = (
-                    df_idr_preco["Material"]
-                    .str.extract(r"(\dP)", expand=False)
-                    .str.upper()
-                    .fillna("")
-                )
-                df_idr_preco["_Corrente"] = pd.to_numeric(
-                    df_idr_preco["Material"]
-                    .str.extract(r"(\d+(?:[.,]\d+)?)(?:\s*)A", expand=False)
-                    .str.replace(",", ".", regex=False),
-                    errors="coerce",
-                )
-                df_idr_preco["_Sensibilidade"] = pd.to_numeric(
-                    df_idr_preco["Material"]
-                    .str.extract(r"(\d+)(?:\s*)mA", expand=False),
-                    errors="coerce",
-                )
-            else:
-                df_idr_preco = pd.DataFrame(
-                    columns=[
-                        "Material",
-                        "Preco",
-                        "_PrecoNumerico",
-                        "_Polos",
-                        "_Corrente",
-                        "_Sensibilidade",
-                    ]
-                )
-
-            df_dps_preco = _load_editor_dataframe("valores_dps_df")
-            if df_dps_preco is None or df_dps_preco.empty:
-                try:
-                    df_dps_preco = pd.read_csv("valores_dps.csv", sep=";")
-                except FileNotFoundError:
-                    df_dps_preco = pd.DataFrame(
-                        columns=[
-                            "Material",
-                            "Preco",
-                            "Atualizado",
-                            "_PrecoNumerico",
-                            "_Ka",
-                            "_Tipo",
-                        ]
-                    )
-            else:
-                df_dps_preco = df_dps_preco.copy()
-
-            if not df_dps_preco.empty:
-                if "Material" in df_dps_preco.columns:
-                    df_dps_preco["Material"] = df_dps_preco["Material"].astype(str)
-                else:
-                    df_dps_preco["Material"] = ""
-                if "Preco" in df_dps_preco.columns:
-                    df_dps_preco["_PrecoNumerico"] = df_dps_preco["Preco"].apply(
-                        _parse_float_field
-                    )
-                else:
-                    df_dps_preco["_PrecoNumerico"] = 0.0
-                df_dps_preco["_Ka"] = pd.to_numeric(
-                    df_dps_preco["Material"]
-                    .str.extract(r"(\d+(?:[.,]\d+)?)\s*kA", expand=False)
-                    .str.replace(",", ".", regex=False),
-                    errors="coerce",
-                )
-                df_dps_preco["_Tipo"] = pd.to_numeric(
-                    df_dps_preco["Material"].str.extract(r"tipo\s*(\d+)", expand=False),
-                    errors="coerce",
-                )
-            else:
-                df_dps_preco = pd.DataFrame(
-                    columns=["Material", "Preco", "_PrecoNumerico", "_Ka", "_Tipo"]
-                )
-
-            df_barra_pente_preco = _load_editor_dataframe("valores_barra_pente_df")
-            if df_barra_pente_preco is None or df_barra_pente_preco.empty:
-                try:
-                    df_barra_pente_preco = pd.read_csv("valores_barra_pente.csv", sep=";")
-                except FileNotFoundError:
-                    df_barra_pente_preco = pd.DataFrame(
-                        columns=[
-                            "Material",
-                            "Preco",
-                            "Atualizado",
-                            "_PrecoNumerico",
-                            "_MaterialNormalizado",
-                        ]
-                    )
-            else:
-                df_barra_pente_preco = df_barra_pente_preco.copy()
-
-            if not df_barra_pente_preco.empty:
-                if "Material" in df_barra_pente_preco.columns:
-                    df_barra_pente_preco["Material"] = (
-                        df_barra_pente_preco["Material"].astype(str)
-                    )
-                else:
-                    df_barra_pente_preco["Material"] = ""
-                if "Preco" in df_barra_pente_preco.columns:
-                    df_barra_pente_preco["_PrecoNumerico"] = (
-                        df_barra_pente_preco["Preco"].apply(_parse_float_field)
-                    )
-                else:
-                    df_barra_pente_preco["_PrecoNumerico"] = 0.0
-                df_barra_pente_preco["_MaterialNormalizado"] = (
-                    df_barra_pente_preco["Material"].apply(_normalizar_texto)
-                )
-            else:
-                df_barra_pente_preco = pd.DataFrame(
-                    columns=[
-                        "Material",
-                        "Preco",
-                        "_PrecoNumerico",
-                        "_MaterialNormalizado",
-                    ]
-                )
-
-            df_paineis_quadros_preco = _load_editor_dataframe("valores_paineis_quadros_df")
-            if df_paineis_quadros_preco is None or df_paineis_quadros_preco.empty:
-                try:
-                    df_paineis_quadros_preco = pd.read_csv(
-                        "valores_paineis_quadros.csv", sep=";"
-                    )
-                except FileNotFoundError:
-                    df_paineis_quadros_preco = pd.DataFrame(
-                        columns=[
-                            "Material",
-                            "Preco",
-                            "Atualizado",
-                            "_PrecoNumerico",
-                            "_MaterialNormalizado",
-                        ]
-                    )
-            else:
-                df_paineis_quadros_preco = df_paineis_quadros_preco.copy()
-
-            if not df_paineis_quadros_preco.empty:
-                if "Material" in df_paineis_quadros_preco.columns:
-                    df_paineis_quadros_preco["Material"] = (
-                        df_paineis_quadros_preco["Material"].astype(str)
-                    )
-                else:
-                    df_paineis_quadros_preco["Material"] = ""
-                df_paineis_quadros_preco["Material"] = df_paineis_quadros_preco[
-                    "Material"
-                ].str.replace("×", "x", regex=False)
-                if "Preco" in df_paineis_quadros_preco.columns:
-                    df_paineis_quadros_preco["_PrecoNumerico"] = (
-                        df_paineis_quadros_preco["Preco"].apply(_parse_float_field)
-                    )
-                else:
-                    df_paineis_quadros_preco["_PrecoNumerico"] = 0.0
-                df_paineis_quadros_preco["_MaterialNormalizado"] = (
-                    df_paineis_quadros_preco["Material"].apply(_normalizar_texto)
-                )
-            else:
-                df_paineis_quadros_preco = pd.DataFrame(
-                    columns=[
-                        "Material",
-                        "Preco",
-                        "_PrecoNumerico",
-                        "_MaterialNormalizado",
-                    ]
-                )
-
-            def _obter_preco_disjuntor(descricao: str) -> float:
-                """Retorna o preço do disjuntor com base na tabela de atualização."""
-                if not descricao:
-                    return 0.0
-                if df_disjuntores_din_preco.empty:
-                    return 0.0
-
-                match = re.search(r"(1P\+N|\dP)\s*(\d+(?:[.,]\d+)?)\s*A", descricao, re.IGNORECASE)
-                if not match:
-                    return 0.0
-
-                polos = match.group(1).upper()
-                corrente_txt = match.group(2).replace(",", ".")
-                try:
-                    corrente = int(round(float(corrente_txt)))
-                except ValueError:
-                    return 0.0
-
-                polos_busca = "2P" if polos == "1P+N" else polos
-
-                material_mask = (
-                    df_disjuntores_din_preco["Material"].str.contains(
-                        polos_busca, case=False, na=False
-                    )
-                    & df_disjuntores_din_preco["Material"].str.contains(
-                        f"{corrente}A", case=False, na=False
-                    )
-                )
-                linha_correspondente = df_disjuntores_din_preco.loc[material_mask]
-                if linha_correspondente.empty:
-                    return 0.0
-
-                preco = linha_correspondente.iloc[0]["_PrecoNumerico"]
-                if pd.isna(preco):
-                    return 0.0
-                return float(preco)
-
-            def _obter_preco_idr(descricao: str) -> float:
-                """Retorna o preço do IDR correspondente à descrição informada."""
-                if not descricao or df_idr_preco.empty:
-                    return 0.0
-
-                polos_match = re.search(r"(\dP)", descricao, re.IGNORECASE)
-                corrente_match = re.search(
-                    r"(\d+(?:[.,]\d+)?)(?:\s*)A", descricao, re.IGNORECASE
-                )
-                sensibilidade_match = re.search(
-                    r"(\d+)(?:\s*)mA", descricao, re.IGNORECASE
-                )
-
-                if not polos_match or not corrente_match:
-                    return 0.0
-
-                polos = polos_match.group(1).upper()
-                try:
-                    corrente = int(round(float(corrente_match.group(1).replace(",", "."))))
-                except ValueError:
-                    return 0.0
-
-                sensibilidade = None
-                if sensibilidade_match:
-                    try:
-                        sensibilidade = int(sensibilidade_match.group(1))
-                    except ValueError:
-                        sensibilidade = None
-
-                for _, linha in df_idr_preco.iterrows():
-                    if str(linha.get("_Polos", "")).upper() != polos:
-                        continue
-                    corrente_linha = linha.get("_Corrente")
-                    if pd.isna(corrente_linha):
-                        continue
-                    try:
-                        corrente_linha = int(round(float(corrente_linha)))
-                    except (TypeError, ValueError):
-                        continue
-                    if corrente_linha != corrente:
-                        continue
-
-                    sensibilidade_linha = linha.get("_Sensibilidade")
-                    if sensibilidade is not None and not pd.isna(sensibilidade_linha):
-                        try:
-                            sensibilidade_linha = int(round(float(sensibilidade_linha)))
-                        except (TypeError, ValueError):
-                            sensibilidade_linha = None
-                        if (
-                            sensibilidade_linha is not None
-                            and sensibilidade_linha != sensibilidade
-                        ):
-                            continue
-
-                    preco = linha.get("_PrecoNumerico")
-                    if pd.isna(preco):
-                        continue
-                    return float(preco)
-
-                return 0.0
-
-            def _obter_preco_dps(descricao: str) -> float:
-                """Retorna o preço do DPS correspondente à descrição informada."""
-                if not descricao or df_dps_preco.empty:
-                    return 0.0
-
-                ka_match = re.search(r"(\d+(?:[.,]\d+)?)\s*kA", descricao, re.IGNORECASE)
-                tipo_match = re.search(r"tipo\s*(\d+)", descricao, re.IGNORECASE)
-
-                ka_val = None
-                if ka_match:
-                    try:
-                        ka_val = float(ka_match.group(1).replace(",", "."))
-                    except ValueError:
-                        ka_val = None
-
-                tipo_val = None
-                if tipo_match:
-                    try:
-                        tipo_val = float(tipo_match.group(1))
-                    except ValueError:
-                        tipo_val = None
-
-                if ka_val is None and tipo_val is None:
-                    return 0.0
-
-                mask = pd.Series(True, index=df_dps_preco.index, dtype=bool)
-                if ka_val is not None and "_Ka" in df_dps_preco.columns:
-                    mask &= df_dps_preco["_Ka"].round().fillna(-1.0) == ka_val
-                if tipo_val is not None and "_Tipo" in df_dps_preco.columns:
-                    mask &= df_dps_preco["_Tipo"].round().fillna(-1.0) == tipo_val
-
-                linha_correspondente = df_dps_preco.loc[mask]
-
-                if linha_correspondente.empty:
-                    texto_busca = df_dps_preco["Material"].astype(str).str.lower()
-                    mask = pd.Series(True, index=df_dps_preco.index, dtype=bool)
-                    if ka_val is not None:
-                        mask &= texto_busca.str.contains(
-                            rf"{ka_val:g}\s*kA", case=False, na=False, regex=True
-                        )
-                    if tipo_val is not None:
-                        mask &= texto_busca.str.contains(
-                            rf"tipo\s*{tipo_val:g}", case=False, na=False, regex=True
-                        )
-                    linha_correspondente = df_dps_preco.loc[mask]
-
-                if linha_correspondente.empty:
-                    return 0.0
-
-                preco = linha_correspondente.iloc[0].get("_PrecoNumerico")
-                if pd.isna(preco):
-                    return 0.0
-                return float(preco)
-
-            def _obter_preco_quadro(
-                descricao: str, titulo_componente: str
-            ) -> float:
-                """Retorna o preço do quadro ou painel informado."""
-                if not descricao or df_paineis_quadros_preco.empty:
-                    return 0.0
-
-                descricao = str(descricao).replace("×", "x")
-                desc_norm = _normalizar_texto(descricao)
-                if not desc_norm:
-                    return 0.0
-
-                candidatos = df_paineis_quadros_preco.copy()
-                titulo_norm = _normalizar_texto(titulo_componente)
-
-                if "pvc" in titulo_norm:
-                    candidatos = candidatos[
-                        candidatos["_MaterialNormalizado"].str.contains(
-                            "pvc", na=False
-                        )
-                    ]
-                elif "metal" in titulo_norm:
-                    candidatos = candidatos[
-                        candidatos["_MaterialNormalizado"].str.contains(
-                            "metal", na=False
-                        )
-                    ]
-
-                numeros = re.findall(r"\d+", desc_norm)
-                for numero in numeros:
-                    if candidatos.empty:
-                        break
-                    candidatos = candidatos[
-                        candidatos["_MaterialNormalizado"].str.contains(
-                            numero, na=False
-                        )
-                    ]
-
-                if candidatos.empty:
-                    tokens = [
-                        token
-                        for token in desc_norm.split()
-                        if token not in {"quadro", "de", "posicoes", "posicao"}
-                    ]
-                    melhor_preco = 0.0
-                    melhor_score = 0
-                    for _, linha in df_paineis_quadros_preco.iterrows():
-                        material_norm = str(
-                            linha.get("_MaterialNormalizado", "")
-                        )
-                        if not material_norm:
-                            continue
-                        score = sum(1 for token in tokens if token in material_norm)
-                        if score > melhor_score and not pd.isna(
-                            linha.get("_PrecoNumerico")
-                        ):
-                            melhor_score = score
-                            melhor_preco = float(linha["_PrecoNumerico"])
-                    return melhor_preco
-
-                preco = candidatos.iloc[0].get("_PrecoNumerico")
-                if pd.isna(preco):
-                    return 0.0
-                return float(preco)
-
-            def _obter_preco_barra_pente(descricao: str, dps_descricao: str) -> float:
-                """Retorna o preço da barra pente associado ao DPS informado."""
-                if df_barra_pente_preco.empty:
-                    return 0.0
-
-                descricao_norm = _normalizar_texto(descricao)
-                dps_norm = _normalizar_texto(dps_descricao)
-                instalacao_norm = _normalizar_texto(
-                    st.session_state.get("instalacao_sistema", "")
-                )
-
-                chaves_busca = []
-                if re.search(r"\btri", descricao_norm) or "tripolar" in descricao_norm:
-                    chaves_busca.append("tri")
-                if re.search(r"\bbip?", descricao_norm) or "bipolar" in descricao_norm:
-                    chaves_busca.append("bif")
-                if "monopolar" in descricao_norm or "mono" in descricao_norm:
-                    chaves_busca.append("mono")
-
-                if not chaves_busca and dps_norm:
-                    quantidade_match = re.search(r"(\d+)x", dps_norm)
-                    if quantidade_match:
-                        try:
-                            quantidade = int(quantidade_match.group(1))
-                            if quantidade >= 3:
-                                chaves_busca.append("tri")
-                            else:
-                                chaves_busca.append("bif")
-                        except ValueError:
-                            pass
-
-                if not chaves_busca and instalacao_norm:
-                    if "tri" in instalacao_norm:
-                        chaves_busca.append("tri")
-                    elif "bi" in instalacao_norm or "bif" in instalacao_norm:
-                        chaves_busca.append("bif")
-                    elif "mono" in instalacao_norm:
-                        chaves_busca.append("mono")
-
-                if not chaves_busca:
-                    chaves_busca = ["bif", "tri", "mono"]
-
-                chaves_busca = list(dict.fromkeys(chaves_busca))
-
-                for chave in chaves_busca:
-                    mask = df_barra_pente_preco["_MaterialNormalizado"].str.contains(
-                        chave, na=False
-                    )
-                    linha_correspondente = df_barra_pente_preco.loc[mask]
-                    if not linha_correspondente.empty:
-                        preco = linha_correspondente.iloc[0].get("_PrecoNumerico")
-                        if not pd.isna(preco):
-                            return float(preco)
-
-                preco_fallback = df_barra_pente_preco.iloc[0].get("_PrecoNumerico")
-                if pd.isna(preco_fallback):
-                    return 0.0
-                return float(preco_fallback)
+            df_disjuntores_din_preco = preparar_precos_disjuntores(
+                _tabela_precos("valores_disjuntor_din.csv")
+            )
+            df_idr_preco = preparar_precos_idr(_tabela_precos("valores_idr.csv"))
+            df_dps_preco = preparar_precos_dps(_tabela_precos("valores_dps.csv"))
+            df_barra_pente_preco = preparar_precos_barra_pente(
+                _tabela_precos("valores_barra_pente.csv")
+            )
+            df_paineis_quadros_preco = preparar_precos_paineis(
+                _tabela_precos("valores_paineis_quadros.csv")
+            )
 
             def _render_mini_disjuntor_inputs() -> None:
                 st.markdown("**Mini-Disjuntor Adicional**")
@@ -1813,7 +1063,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                     )
                     preco_key = "mini_disjuntor_preco_unitario"
                     preco_ref_key = "mini_disjuntor_preco_unitario_ref"
-                    preco_padrao = _obter_preco_disjuntor(mini_disjuntor_tipo)
+                    preco_padrao = obter_preco_disjuntor(df_disjuntores_din_preco, mini_disjuntor_tipo)
                     if preco_padrao > 0:
                         preco_padrao_texto = format_currency(preco_padrao)
                         ref_anterior = st.session_state.get(preco_ref_key)
@@ -1895,7 +1145,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
             else:
                 for indice, (titulo_componente, descricao) in enumerate(quadro_componentes):
                     chave_item = _normalizar_chave(titulo_componente, indice)
-                    sugestao = _obter_sugestao_quantidade(descricao)
+                    sugestao = sugerir_quantidade_componente(descricao)
                     if titulo_componente == "Disjuntor":
                         sugestao = 2.0
                     if (
@@ -1943,7 +1193,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                         preco_key = f"preco_quadro_{chave_item}"
                         preco_ref_key = f"{preco_key}_ref"
                         if titulo_componente == "Disjuntor":
-                            preco_padrao = _obter_preco_disjuntor(descricao)
+                            preco_padrao = obter_preco_disjuntor(df_disjuntores_din_preco, descricao)
                             if preco_padrao > 0:
                                 preco_padrao_texto = format_currency(preco_padrao)
                                 ref_anterior = st.session_state.get(preco_ref_key)
@@ -1951,7 +1201,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                                     st.session_state[preco_key] = preco_padrao_texto
                                     st.session_state[preco_ref_key] = descricao
                         elif titulo_componente == "Mini-Disjuntor Adicional":
-                            preco_padrao = _obter_preco_disjuntor(descricao)
+                            preco_padrao = obter_preco_disjuntor(df_disjuntores_din_preco, descricao)
                             if preco_padrao > 0:
                                 preco_padrao_texto = format_currency(preco_padrao)
                                 ref_anterior = st.session_state.get(preco_ref_key)
@@ -1962,7 +1212,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                             titulo_componente
                             == "IDR (Interruptor Diferencial Residual)"
                         ):
-                            preco_padrao = _obter_preco_idr(descricao)
+                            preco_padrao = obter_preco_idr(df_idr_preco, descricao)
                             if preco_padrao > 0:
                                 preco_padrao_texto = format_currency(preco_padrao)
                                 ref_anterior = st.session_state.get(preco_ref_key)
@@ -1973,7 +1223,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                             titulo_componente
                             == "DPS (Dispositivo de Proteção contra Surtos)"
                         ):
-                            preco_padrao = _obter_preco_dps(descricao)
+                            preco_padrao = obter_preco_dps(df_dps_preco, descricao)
                             if preco_padrao > 0:
                                 preco_padrao_texto = format_currency(preco_padrao)
                                 ref_anterior = st.session_state.get(preco_ref_key)
@@ -1981,7 +1231,12 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                                     st.session_state[preco_key] = preco_padrao_texto
                                     st.session_state[preco_ref_key] = descricao
                         elif titulo_componente == "Barra Pente":
-                            preco_padrao = _obter_preco_barra_pente(descricao, dps_val)
+                            preco_padrao = obter_preco_barra_pente(
+                                df_barra_pente_preco,
+                                descricao,
+                                dps_val,
+                                st.session_state.get("instalacao_sistema", ""),
+                            )
                             if preco_padrao > 0:
                                 preco_padrao_texto = format_currency(preco_padrao)
                                 ref_anterior = st.session_state.get(preco_ref_key)
@@ -1989,7 +1244,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                                     st.session_state[preco_key] = preco_padrao_texto
                                     st.session_state[preco_ref_key] = descricao
                         elif titulo_componente in {"Quadro PVC", "Quadro Metálico"}:
-                            preco_padrao = _obter_preco_quadro(
+                            preco_padrao = obter_preco_quadro(df_paineis_quadros_preco, 
                                 descricao, titulo_componente
                             )
                             if preco_padrao > 0:
@@ -2026,6 +1281,11 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                             st.write(f"Total: {format_currency(total_item)}")
                         else:
                             st.write("Total:")
+                    if preco_padrao <= 0 and preco_valor <= 0 and quantidade_valor > 0:
+                        st.warning(
+                            f"Sem preço no catálogo para {descricao}: informe o preço "
+                            "unitário para incluí-lo no total."
+                        )
 
                     if total_item > 0:
                         total_quadro_protecao_valor += total_item
@@ -2087,7 +1347,7 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
         )
 
         if mostrar_material_adicional:
-            with st.expander("📦 Material Adicional", expanded=False):
+            with medir("custos_materiais/material_adicional"), st.expander("📦 Material Adicional", expanded=False):
                 if st.session_state.get("disjuntor_caixa_moldada") == "Sim":
                     st.markdown("**Disjuntor Caixa Moldada**")
                     disjuntor_fallback = [
@@ -2165,8 +1425,6 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                         },
                     ]
                     df_disjuntores = _load_price_table(
-                        "valores_disjuntores_df",
-                        "valores_disjuntores_editor",
                         "valores_disjuntor_caixa_moldada.csv",
                         disjuntor_fallback,
                     )
@@ -2289,8 +1547,6 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                         }
                     ]
                     df_barra = _load_price_table(
-                        "valores_barra_roscada_df",
-                        "valores_barra_roscada_editor",
                         "valores_barra_roscada.csv",
                         barra_fallback,
                     )
@@ -2417,8 +1673,6 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                         {"Material": "Eletrocalha perfurada #24 300x100mm", "Preco": 150.00},
                     ]
                     df_eletrocalha = _load_price_table(
-                        "valores_eletrocalhas_df",
-                        "valores_eletrocalhas_editor",
                         "valores_eletrocalhas.csv",
                         eletrocalha_fallback,
                     )
@@ -2556,8 +1810,6 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                         },
                     ]
                     df_tomadas = _load_price_table(
-                        "valores_tomadas_industriais_df",
-                        "valores_tomadas_industriais_editor",
                         "valores_tomadas_industriais.csv",
                         tomada_fallback,
                     )
@@ -2667,8 +1919,6 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
                         {"Material": "Medidor Bipolar", "Preco": 349.50},
                     ]
                     df_medidores = _load_price_table(
-                        "valores_medidores_df",
-                        "valores_medidores_editor",
                         "valores_medidores.csv",
                         medidor_fallback,
                     )
@@ -2979,17 +2229,11 @@ def render_custos_materiais_tab(tab_resumo, format_currency):
         else:
             st.session_state["total_material_adicional"] = 0.0
 
-        total_materiais_valor = (
-            total_cabos_valor
-            + total_infra_seca_valor
-            + total_quadro_protecao_valor
-            + total_material_adicional_valor
-        )
+        total_materiais_valor = GRAFO.obter("total_custos_materiais")
         st.markdown(
             f"<p style='color: green; font-size: 40px;'>💰 Total Custos com Materiais: {format_currency(total_materiais_valor)}</p>",
             unsafe_allow_html=True,
         )
-        st.session_state["total_custos_materiais"] = total_materiais_valor
 
         blocos_totais = [
             ("Cabos", total_cabos_valor),
@@ -1,8 +1,15 @@
 import streamlit as st
 import pandas as pd
-import math
 from io import BytesIO
 
+from catalogo_compartilhado import tabela_catalogo
+from motor_custos import (
+    VALOR_REFEICAO,
+    CustoMaoObra,
+    calcular_custo_mao_obra,
+    valores_hora_profissionais,
+)
+
 
 def render_custos_servico_tab(tab_servico, format_currency):
     """Renderiza a aba 'Custo Mão de Obra'."""
@@ -35,32 +42,22 @@ def render_custos_servico_tab(tab_servico, format_currency):
                 if st.checkbox(opcao, key=checkbox_key):
                     instalacao_selecionados.append(opcao)
         st.session_state["instalacao_selecionados"] = instalacao_selecionados
-        df_profs = st.session_state.get("valores_profissionais_df")
-        if df_profs is None:
-            try:
-                df_profs = pd.read_csv("valores_profissionais.csv", sep=";")
-            except FileNotFoundError:
-                df_profs = pd.DataFrame(columns=["Profissional", "Valor Hora"])
-        if not df_profs.empty:
-            df_profs["Valor Hora"] = (
-                df_profs["Valor Hora"]
-                .astype(str)
-                .str.replace(r"R\$\s*", "", regex=True)
-                .str.replace(r"\.", "", regex=True)
-                .str.replace(",", ".", regex=True)
-                .pipe(pd.to_numeric, errors="coerce")
-                .fillna(0.0)
+        try:
+            valores_hora = valores_hora_profissionais(
+                tabela_catalogo("valores_profissionais.csv")
             )
-        total_tecnicos = 0.0
-        total_alimentacao = 0.0
+        except FileNotFoundError:
+            valores_hora = {}
+        custo = CustoMaoObra()
         tecnico_dados = []
-        total_refeicoes = 0
         if instalacao_selecionados:
             header_cols = st.columns([3, 2, 2])
             header_cols[0].write("Técnico")
             header_cols[1].write("Horas previstas")
             header_cols[2].write("Total (R$)")
 
+            horas_tecnicos = []
+            colunas_total = []
             for idx, tecnico in enumerate(instalacao_selecionados):
                 col1, col2, col3 = st.columns([3, 2, 2])
                 col1.write(tecnico)
@@ -76,28 +73,21 @@ def render_custos_servico_tab(tab_servico, format_currency):
                     value=st.session_state.get(horas_key, 0.0),
                     key=horas_key,
                 )
-                valor_hora = 0.0
-                if not df_profs.empty:
-                    match = df_profs.loc[
-                        df_profs["Profissional"] == tecnico, "Valor Hora"
-                    ]
-                    if not match.empty:
-                        valor_hora = float(match.iloc[0])
-                total = horas * valor_hora
-                total_tecnicos += total
-                refeicoes = max(1, math.ceil(horas / 8))
-                total_alimentacao += refeicoes * 40.0
-                total_refeicoes += refeicoes
+                horas_tecnicos.append((tecnico, horas))
+                colunas_total.append(col3)
+
+            custo = calcular_custo_mao_obra(horas_tecnicos, valores_hora)
+            for idx, (item, col3) in enumerate(zip(custo.itens, colunas_total)):
                 tecnico_dados.append(
                     {
-                        "Item": tecnico,
-                        "Valor Unitário": format_currency(valor_hora),
-                        "Quantidade": f"{horas:.2f}",
-                        "Total": format_currency(total),
+                        "Item": item["Técnico"],
+                        "Valor Unitário": format_currency(item["Valor Hora"]),
+                        "Quantidade": f"{item['Horas']:.2f}",
+                        "Total": format_currency(item["Total"]),
                     }
                 )
                 total_key = f"total_{idx}"
-                st.session_state[total_key] = format_currency(total)
+                st.session_state[total_key] = format_currency(item["Total"])
                 col3.text_input(
                     "Total",
                     value=st.session_state[total_key],
@@ -105,20 +95,20 @@ def render_custos_servico_tab(tab_servico, format_currency):
                     key=total_key,
                 )
 
-            st.write(f"Total: {format_currency(total_tecnicos)}")
+            st.write(f"Total: {format_currency(custo.total_tecnicos)}")
             st.markdown(
                 "<span style='font-size:20px;'>🍽️ <strong>Alimentação</strong></span>",
                 unsafe_allow_html=True,
             )
             st.text_input(
                 "Alimentação (Total)",
-                value=format_currency(total_alimentacao),
+                value=format_currency(custo.total_alimentacao),
                 disabled=True,
                 key="alimentacao_total",
                 label_visibility="collapsed",
             )
-            st.session_state["total_tecnicos_servico"] = total_tecnicos
-            st.session_state["total_alimentacao_servico"] = total_alimentacao
+            st.session_state["total_tecnicos_servico"] = custo.total_tecnicos
+            st.session_state["total_alimentacao_servico"] = custo.total_alimentacao
         else:
             st.info("Nenhum técnico selecionado.")
 
@@ -169,20 +159,20 @@ def render_custos_servico_tab(tab_servico, format_currency):
 
         st.session_state["total_servicos_adicionais"] = total_servicos_adicionais
 
-        total_mao_obra_valor = total_tecnicos + total_alimentacao + total_servicos_adicionais
+        total_mao_obra_valor = custo.total + total_servicos_adicionais
         st.markdown(
             f"<p style='color: green; font-size: 40px;'>💰 Total Custo Mão de Obra: {format_currency(total_mao_obra_valor)}</p>",
             unsafe_allow_html=True,
         )
         st.session_state["total_custo_mao_obra"] = total_mao_obra_valor
         relatorio_dados = tecnico_dados.copy()
-        if total_alimentacao > 0:
+        if custo.total_alimentacao > 0:
             relatorio_dados.append(
                 {
                     "Item": "Alimentação",
-                    "Valor Unitário": format_currency(40.0),
-                    "Quantidade": f"{total_refeicoes}",
-                    "Total": format_currency(total_alimentacao),
+                    "Valor Unitário": format_currency(VALOR_REFEICAO),
+                    "Quantidade": f"{custo.refeicoes}",
+                    "Total": format_currency(custo.total_alimentacao),
                 }
             )
         if total_servicos_adicionais > 0:
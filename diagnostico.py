@@ -0,0 +1,239 @@
+"""Medição de desempenho por execução do aplicativo e painel de diagnóstico.
+
+Ativada pela variável de ambiente ``ALFERIONPLUS_DIAGNOSTICO``. Com ela, cada
+execução do script (completa ou só de um fragmento) registra o tempo de cada
+trecho medido por ``medir`` (abas e blocos de Custos com Materiais), o número
+de chamadas a ``pd.read_csv`` e o tamanho do ``st.session_state``. As últimas
+execuções da sessão e os avisos registrados (:func:`registrar_aviso`)
+aparecem na aba "Diagnóstico", exibida apenas quando a URL traz
+``?diagnostico=<valor da variável>``.
+
+Se ``ALFERIONPLUS_DIAGNOSTICO_JSONL`` apontar para um arquivo, cada execução
+de todas as sessões é acrescentada a ele como uma linha JSON, o que permite
+comparar versões do aplicativo com ``pd.read_json(arquivo, lines=True)``.
+Sem a variável de ambiente, ``medir`` e as demais funções não fazem nada.
+"""
+from __future__ import annotations
+
+import datetime as _dt
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+CHAVE_ACESSO = os.environ.get("ALFERIONPLUS_DIAGNOSTICO", "")
+ATIVO = bool(CHAVE_ACESSO)
+ARQUIVO_JSONL = os.environ.get("ALFERIONPLUS_DIAGNOSTICO_JSONL") or None
+
+# Execuções mantidas na tabela do painel
+HISTORICO_MAXIMO = 50
+
+_HISTORICO = "_diagnostico_historico"
+# Avisos da sessão (dependências de fragmentos não declaradas), sem repetição
+_AVISOS = "_diagnostico_avisos"
+
+# Execução em andamento na thread do script (cada sessão roda em sua thread)
+_LOCAL = threading.local()
+_LOCK_ARQUIVO = threading.Lock()
+
+
+def _leituras_csv() -> int:
+    return getattr(_LOCAL, "leituras_csv", 0)
+
+
+def _contar_leituras(read_csv):
+    """Envolve ``pd.read_csv`` para contar as leituras da thread atual."""
+
+    @functools.wraps(read_csv)
+    def _read_csv(*args, **kwargs):
+        _LOCAL.leituras_csv = _leituras_csv() + 1
+        return read_csv(*args, **kwargs)
+
+    _read_csv._contador_diagnostico = True
+    return _read_csv
+
+
+if ATIVO and not getattr(pd.read_csv, "_contador_diagnostico", False):
+    pd.read_csv = _contar_leituras(pd.read_csv)
+
+
+def iniciar_execucao(tipo: str = "completa") -> None:
+    """Começa o registro de uma execução do script ou de um fragmento."""
+    if not ATIVO:
+        return
+    _LOCAL.execucao = {
+        "inicio": _dt.datetime.now().isoformat(timespec="milliseconds"),
+        "tipo": tipo,
+        "relogio": time.perf_counter(),
+        "leituras_csv": _leituras_csv(),
+        "secoes": {},
+    }
+
+
+@contextmanager
+def medir(nome: str):
+    """Mede o tempo e as leituras de CSV do bloco ``nome`` na execução atual."""
+    execucao = getattr(_LOCAL, "execucao", None) if ATIVO else None
+    if execucao is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    leituras = _leituras_csv()
+    try:
+        yield
+    finally:
+        secao = execucao["secoes"].setdefault(nome, {"ms": 0.0, "read_csv": 0})
+        secao["ms"] += (time.perf_counter() - inicio) * 1000
+        secao["read_csv"] += _leituras_csv() - leituras
+
+
+def _tamanho_valor(valor) -> int:
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    return sys.getsizeof(valor)
+
+
+def _tamanho_sessao() -> tuple[int, int]:
+    """Número de chaves e tamanho aproximado (bytes) do ``st.session_state``."""
+    chaves = 0
+    tamanho = 0
+    for chave in list(st.session_state.keys()):
+        if chave == _HISTORICO:
+            continue
+        chaves += 1
+        try:
+            tamanho += _tamanho_valor(st.session_state[chave])
+        except Exception:
+            pass
+    return chaves, tamanho
+
+
+def _gravar_jsonl(registro: dict) -> None:
+    caminho = Path(ARQUIVO_JSONL)
+    linha = json.dumps(registro, ensure_ascii=False) + "\n"
+    with _LOCK_ARQUIVO:
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        with caminho.open("a", encoding="utf-8") as arquivo:
+            arquivo.write(linha)
+
+
+def finalizar_execucao() -> None:
+    """Fecha o registro da execução atual e o acrescenta ao histórico."""
+    execucao = getattr(_LOCAL, "execucao", None) if ATIVO else None
+    if execucao is None:
+        return
+    _LOCAL.execucao = None
+    chaves, tamanho = _tamanho_sessao()
+    registro = {
+        "inicio": execucao["inicio"],
+        "tipo": execucao["tipo"],
+        "ms": (time.perf_counter() - execucao["relogio"]) * 1000,
+        "read_csv": _leituras_csv() - execucao["leituras_csv"],
+        "chaves_sessao": chaves,
+        "tamanho_sessao_kb": tamanho / 1024,
+        "secoes": execucao["secoes"],
+    }
+    historico = st.session_state.setdefault(_HISTORICO, deque(maxlen=HISTORICO_MAXIMO))
+    historico.append(registro)
+    if ARQUIVO_JSONL:
+        try:
+            _gravar_jsonl(registro)
+        except OSError:
+            pass
+
+
+def registrar_aviso(mensagem: str) -> None:
+    """Acrescenta ``mensagem`` aos avisos exibidos na aba de diagnóstico."""
+    if not ATIVO:
+        return
+    avisos = st.session_state.setdefault(_AVISOS, [])
+    if mensagem not in avisos:
+        avisos.append(mensagem)
+
+
+def painel_visivel() -> bool:
+    """Indica se a aba de diagnóstico deve ser exibida nesta sessão."""
+    return ATIVO and st.query_params.get("diagnostico") == CHAVE_ACESSO
+
+
+def _tabela_execucoes(historico) -> pd.DataFrame:
+    linhas = []
+    for registro in reversed(historico):
+        linha = {
+            "Início": registro["inicio"],
+            "Tipo": registro["tipo"],
+            "Total (ms)": registro["ms"],
+            "read_csv": registro["read_csv"],
+            "Chaves na sessão": registro["chaves_sessao"],
+            "Sessão (KB)": registro["tamanho_sessao_kb"],
+        }
+        for nome, secao in registro["secoes"].items():
+            linha[f"{nome} (ms)"] = secao["ms"]
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def _tabela_secoes(historico) -> pd.DataFrame:
+    linhas = [
+        {"Trecho": nome, "ms": secao["ms"], "read_csv": secao["read_csv"]}
+        for registro in historico
+        for nome, secao in registro["secoes"].items()
+    ]
+    if not linhas:
+        return pd.DataFrame(columns=["Trecho", "Execuções", "Média (ms)", "Máximo (ms)", "read_csv"])
+    tabela = (
+        pd.DataFrame(linhas)
+        .groupby("Trecho")
+        .agg(
+            **{
+                "Execuções": ("ms", "size"),
+                "Média (ms)": ("ms", "mean"),
+                "Máximo (ms)": ("ms", "max"),
+                "read_csv": ("read_csv", "sum"),
+            }
+        )
+    )
+    return tabela.sort_values("Média (ms)", ascending=False)
+
+
+def render_diagnostico_tab(tab) -> None:
+    """Renderiza a aba de diagnóstico com as últimas execuções da sessão."""
+    with tab:
+        st.title("⏱️ Diagnóstico")
+        avisos = st.session_state.get(_AVISOS, [])
+        for aviso in avisos:
+            st.warning(aviso)
+        historico = list(st.session_state.get(_HISTORICO, ()))
+        if not historico:
+            st.info("Nenhuma execução registrada ainda.")
+            return
+        st.caption(
+            f"Últimas {len(historico)} execuções desta sessão (a mais recente primeiro)."
+        )
+        st.dataframe(_tabela_execucoes(historico), hide_index=True)
+        st.subheader("Média por trecho")
+        st.dataframe(_tabela_secoes(historico))
+        if ARQUIVO_JSONL:
+            st.caption(f"Execuções gravadas também em {ARQUIVO_JSONL}")
+        if st.button("Limpar histórico"):
+            st.session_state[_HISTORICO].clear()
+            avisos.clear()
+
+
+__all__ = [
+    "ATIVO",
+    "finalizar_execucao",
+    "iniciar_execucao",
+    "medir",
+    "painel_visivel",
+    "registrar_aviso",
+    "render_diagnostico_tab",
+]
@@ -1,11 +1,54 @@
 import streamlit as st
 import math
 import re
-from pathlib import Path
-from collections.abc import Mapping
+import sqlite3
 from typing import Any, Optional
 import pandas as pd
+from catalogo_compartilhado import CHAVE_VERSAO, tabela_catalogo
+from custos import format_currency
 from dados_transformadores import obter_produtos_transformadores_padrao
+from grafo_derivados import GRAFO
+from motor_custos import preparar_precos_eletrodutos, preparar_precos_sealtubo
+from motor_demanda import (
+    CURVA_PADRAO,
+    LIMITE_CARREGADORES_INDIVIDUAIS,
+    OPCAO_FATOR_INFORMADO,
+    calcular_demanda,
+    sugerir_transformador,
+)
+from registro_dados import (
+    ARQUIVO_REGISTRO,
+    ErroPlanilhaLegada,
+    caminho_planilha,
+    exportar_xlsx,
+    registrar,
+)
+from motor_eletrodutos import (
+    TAMANHOS_ELETRODUTO,
+    Circuito,
+    dimensionar_trechos,
+    eletroduto_minimo_lote,
+)
+from motor_percursos import (
+    analisar_infra,
+    comprimentos_carregadores,
+    derivacoes_da_tabela,
+)
+from motor_queda_tensao import QUEDA_MAXIMA_PADRAO, tabela_queda_tensao, tensao_circuito
+from motor_dimensionamento import (
+    BARRA_PENTE_POR_SISTEMA,
+    QUADRO_METALICO_POR_SISTEMA,
+    QUADRO_PVC_POR_SISTEMA,
+    aviso_bitola,
+    aviso_protecao,
+    calcular_corrente,
+    contar_cabos,
+    dimensionar_disjuntor,
+    dimensionar_dps,
+    dimensionar_idr,
+    obter_bitola_cabo_estendida,
+    sugerir_instalacao,
+)
 from tabelas_eletricas import (
     TABELA_BITOLAS,
     TABELA_NEUTRO_TERRA,
@@ -23,30 +66,12 @@ def _sincronizar_tamanho_eletroduto_personalizado():
     st.session_state["tamanho_eletroduto_manual"] = valor_personalizado != sugerido
 
 
-def _load_editor_dataframe(state_key: str) -> Optional[pd.DataFrame]:
-    """Carrega um DataFrame salvo em session_state pelos editores de tabela."""
-    raw = st.session_state.get(state_key)
-    if raw is None:
-        return None
-    if isinstance(raw, pd.DataFrame):
-        return raw
-    if isinstance(raw, list):
-        return pd.DataFrame(raw)
-    if isinstance(raw, Mapping):
-        if "data" in raw and "columns" in raw:
-            return pd.DataFrame(raw["data"], columns=raw["columns"])
-        return pd.DataFrame(raw)
-    return pd.DataFrame(raw)
-
-
-def _obter_opcoes_material(state_key: str, arquivo_csv: str) -> list[str]:
-    """Retorna opções de materiais a partir do editor ou do arquivo CSV."""
-    df = _load_editor_dataframe(state_key)
-    if df is None or df.empty:
-        try:
-            df = pd.read_csv(arquivo_csv, sep=";")
-        except FileNotFoundError:
-            return [""]
+def _obter_opcoes_material(arquivo_csv: str) -> list[str]:
+    """Retorna opções de materiais a partir do catálogo compartilhado."""
+    try:
+        df = tabela_catalogo(arquivo_csv, converter_precos=False)
+    except FileNotFoundError:
+        return [""]
     if "Material" not in df.columns:
         return [""]
     opcoes: list[str] = [""]
@@ -116,19 +141,63 @@ def _extrair_potencia_kw(valor: Any) -> float:
         return 0.0
 
 
-def _obter_potencia_total_carregadores() -> float:
-    """Soma a potência (kW) dos carregadores selecionados na aba Visita."""
-    quantidade = int(st.session_state.get("quantidade_carregadores", 0) or 0)
-    potencia_total = 0.0
+def _potencias_carregadores(quantidade: int, escolhas, outros, grupos) -> tuple:
+    """Potências (kW) dos carregadores da aba Visita e quantidade de cada uma.
 
+    Até ``LIMITE_CARREGADORES_INDIVIDUAIS`` carregadores cada um tem sua
+    potência; acima disso a aba Visita pede grupos de potência e quantidade.
+    """
+    if quantidade > LIMITE_CARREGADORES_INDIVIDUAIS and isinstance(grupos, pd.DataFrame):
+        potencias = pd.to_numeric(grupos.get("Potência (kW)"), errors="coerce")
+        quantidades = pd.to_numeric(grupos.get("Quantidade"), errors="coerce")
+        return potencias.fillna(0.0).to_numpy(), quantidades.fillna(0).to_numpy()
+
+    escolhas = dict(escolhas)
+    outros = dict(outros)
+    potencias = []
     for i in range(1, quantidade + 1):
-        potencia = st.session_state.get(f"potencia_carregador_{i}", "")
+        potencia = escolhas.get(f"potencia_carregador_{i}", "")
         if potencia == "Outro":
-            potencia_total += float(st.session_state.get(f"pot_outro_valor_{i}", 0.0) or 0.0)
+            potencias.append(float(outros.get(f"pot_outro_valor_{i}", 0.0) or 0.0))
         else:
-            potencia_total += _extrair_potencia_kw(potencia)
+            potencias.append(_extrair_potencia_kw(potencia))
+    return potencias, None
+
+
+@GRAFO.registrar(
+    "potencias_carregadores",
+    (
+        ("quantidade_carregadores", 0),
+        "potencia_carregador_*",
+        "pot_outro_valor_*",
+        ("grupos_carregadores", None),
+    ),
+    publicar=False,
+)
+def _potencias_carregadores_sessao(quantidade, escolhas, outros, grupos) -> tuple:
+    return _potencias_carregadores(int(quantidade or 0), escolhas, outros, grupos)
+
+
+@GRAFO.registrar(
+    "demanda_carregadores",
+    (
+        "potencias_carregadores",
+        ("curva_simultaneidade", CURVA_PADRAO),
+        ("fator_simultaneidade_informado", 1.0),
+        ("limite_gestao_carga_kw", 0.0),
+    ),
+    publicar=False,
+)
+def _demanda_carregadores(potencias_carregadores, curva, fator_informado, limite_gestao_kw):
+    potencias, quantidades = potencias_carregadores
+    if curva == OPCAO_FATOR_INFORMADO:
+        curva = float(fator_informado or 1.0)
+    return calcular_demanda(potencias, quantidades, curva, float(limite_gestao_kw or 0.0))
 
-    return potencia_total
+
+def _obter_potencia_total_carregadores() -> float:
+    """Soma a potência (kW) dos carregadores selecionados na aba Visita."""
+    return GRAFO.obter("demanda_carregadores").potencia_instalada_kw
 
 
 def _normalizar_valor_bitola(valor) -> Optional[float]:
@@ -224,35 +293,319 @@ def _normalizar_tabela_cabos(
     return tabela
 
 
-def _registrar_bitola_calculada(
-    chave_valor: str, chave_sugestao: str, chave_manual: str, valor: str
-) -> None:
-    """Armazena a bitola calculada e respeita ajustes manuais existentes."""
+# Potência (kW) de cada opção do seletor de potência do carregador
+_POTENCIAS_CARREGADOR = {
+    "0 kW": 0.0,
+    "1,9 kW": 1.9,
+    "3,7 kW": 3.7,
+    "7,4 kW": 7.4,
+    "11 kW": 11.0,
+    "22 kW": 22.0,
+    "44 kW": 44.0,
+}
+
+# Bitolas ajustáveis: (valor exibido, sugestão calculada, ajuste manual, origem)
+_BITOLAS_AJUSTAVEIS = (
+    ("bitola_sugerida", "bitola_sugerida_calculada", "bitola_fase_manual", "bitola_fase_calculada"),
+    ("bitola_fase2_sugerida", "bitola_fase2_sugerida_calculada", "bitola_fase2_manual", "bitola_fase_calculada"),
+    ("bitola_fase3_sugerida", "bitola_fase3_sugerida_calculada", "bitola_fase3_manual", "bitola_fase_calculada"),
+    ("bitola_neutro_sugerida", "bitola_neutro_sugerida_calculada", "bitola_neutro_manual", "bitola_neutro_terra_calculada"),
+    ("bitola_terra_sugerida", "bitola_terra_sugerida_calculada", "bitola_terra_manual", "bitola_neutro_terra_calculada"),
+)
+
+
+@GRAFO.registrar(
+    "potencia_kw",
+    (("potencia_carregador", ""), ("pot_outro_valor", 0.0), "demanda_carregadores"),
+    publicar=False,
+)
+def _potencia_kw(potencia_escolhida, pot_outro_valor, demanda) -> float:
+    # ``potencia_carregador`` (sem índice) vem de sessões antigas com uma
+    # única potência; sem ela vale a demanda de projeto de todos os carregadores.
+    if potencia_escolhida == "Outro":
+        return pot_outro_valor
+    if potencia_escolhida in _POTENCIAS_CARREGADOR:
+        return _POTENCIAS_CARREGADOR[potencia_escolhida]
+    return demanda.potencia_kw
+
+
+@GRAFO.registrar("distancia_total", (("percursos", []),), publicar=False)
+def _distancia_total(percursos) -> float:
+    return sum(t for _, t in percursos)
+
+
+@GRAFO.registrar(
+    "corrente_calculada",
+    ("potencia_kw", ("tensao_rs", ""), ("tensao_rt", ""), ("tensao_st", "")),
+)
+def _corrente_calculada(potencia_kw, tensao_rs, tensao_rt, tensao_st):
+    return calcular_corrente(potencia_kw, (tensao_rs, tensao_rt, tensao_st))
+
+
+# Entradas do cálculo das bitolas: além da tabela (até 150 m), a queda de
+# tensão depende do sistema, das tensões medidas e do tipo de cabo.
+_ENTRADAS_BITOLA = (
+    "distancia_total",
+    "potencia_kw",
+    ("instalacao_sistema", "Monofásico"),
+    ("tensao_rs", ""),
+    ("tensao_rt", ""),
+    ("tensao_st", ""),
+    ("tipo_cabos", "Cabo PVC"),
+)
+
+
+def _calcular_bitola(
+    tabela, distancia_total, potencia_kw, instalacao, tensao_rs, tensao_rt, tensao_st, tipo_cabos
+) -> str:
+    if not (distancia_total > 0 and potencia_kw > 0):
+        return ""
+    tensoes = (tensao_rs, tensao_rt, tensao_st)
+    # Mesma sugestão de sistema que a aba publica logo depois
+    instalacao = sugerir_instalacao(potencia_kw, tensoes, instalacao)
+    return obter_bitola_cabo_estendida(
+        distancia_total, potencia_kw, instalacao, tensoes, tipo_cabos, tabela
+    )
+
+
+@GRAFO.registrar("bitola_fase_calculada", _ENTRADAS_BITOLA, publicar=False)
+def _bitola_fase_calculada(*entradas) -> str:
+    return _calcular_bitola(TABELA_BITOLAS, *entradas)
+
+
+@GRAFO.registrar("bitola_neutro_terra_calculada", _ENTRADAS_BITOLA, publicar=False)
+def _bitola_neutro_terra_calculada(*entradas) -> str:
+    return _calcular_bitola(TABELA_NEUTRO_TERRA, *entradas)
+
+
+# A sugestão de cada bitola segue o cálculo; o valor exibido só a acompanha
+# enquanto o usuário não o alterar.
+for _valor, _sugestao, _manual, _origem in _BITOLAS_AJUSTAVEIS:
+    GRAFO.registrar(_sugestao, (_origem,), ajuste=(_valor, _manual))(lambda bitola: bitola)
+
+
+@GRAFO.registrar(
+    "circuitos_carregadores",
+    (
+        ("quadro_distribuicao", ""),
+        "potencias_carregadores",
+        ("percursos", []),
+        ("derivacoes_carregadores", None),
+        ("instalacao_sistema", "Monofásico"),
+        ("tensao_rs", ""),
+        ("tensao_rt", ""),
+        ("tensao_st", ""),
+        ("tipo_cabos", "Cabo PVC"),
+    ),
+    publicar=False,
+)
+def _circuitos_carregadores(
+    quadro_distribuicao,
+    potencias_carregadores,
+    percursos,
+    derivacoes,
+    instalacao,
+    tensao_rs,
+    tensao_rt,
+    tensao_st,
+    tipo_cabos,
+) -> tuple:
+    """Circuito de cada carregador saindo do quadro de distribuição.
+
+    Cada circuito é dimensionado pelo próprio comprimento (ramal comum até a
+    derivação do carregador mais a derivação). Sem quadro de distribuição os
+    carregadores ficam no circuito único dimensionado pela demanda e a tupla
+    é vazia.
+    """
+    if quadro_distribuicao != "Sim":
+        return ()
+    potencias, quantidades = potencias_carregadores
+    if quantidades is None:
+        quantidades = [1] * len(potencias)
+    tensoes = (tensao_rs, tensao_rt, tensao_st)
+    carregadores = [
+        float(potencia or 0.0)
+        for potencia, quantidade in zip(potencias, quantidades)
+        if float(potencia or 0.0) > 0 and quantidade and quantidade > 0
+        for _ in range(int(quantidade))
+    ]
+    comprimentos = comprimentos_carregadores(
+        percursos, len(carregadores), derivacoes_da_tabela(derivacoes)
+    )
+    circuitos: dict[tuple[float, float], Circuito] = {}
+    resultado = []
+    for potencia, comprimento in zip(carregadores, comprimentos):
+        if (potencia, comprimento) not in circuitos:
+            sistema = sugerir_instalacao(potencia, tensoes, instalacao)
+            fase, neutro_terra = (
+                _normalizar_valor_bitola(
+                    obter_bitola_cabo_estendida(
+                        comprimento, potencia, sistema, tensoes, tipo_cabos, tabela
+                    )
+                )
+                or 0.0
+                for tabela in (TABELA_BITOLAS, TABELA_NEUTRO_TERRA)
+            )
+            circuitos[potencia, comprimento] = Circuito(
+                sistema, fase, neutro_terra, neutro_terra, tipo_cabos
+            )
+        resultado.append(circuitos[potencia, comprimento])
+    return tuple(resultado)
+
+
+@GRAFO.registrar(
+    "area_total_ocupada", (("tipo_cabos", "Cabo PVC"), "tabela_cabos_pvc", "tabela_cabos_hepr")
+)
+def _area_total_ocupada(tipo_cabos, tabela_pvc, tabela_hepr) -> float:
+    tabela = tabela_pvc if tipo_cabos == "Cabo PVC" else tabela_hepr
+    if tabela is None or "Área Ocupável Condutores" not in tabela:
+        return 0.0
+    return tabela["Área Ocupável Condutores"].sum()
+
+
+@GRAFO.registrar(
+    "condutores_eletroduto",
+    (("tipo_cabos", "Cabo PVC"), "tabela_cabos_pvc", "tabela_cabos_hepr"),
+    publicar=False,
+)
+def _condutores_eletroduto(tipo_cabos, tabela_pvc, tabela_hepr) -> int:
+    tabela = tabela_pvc if tipo_cabos == "Cabo PVC" else tabela_hepr
+    if tabela is None or "Quantidade de Cabos" not in tabela:
+        return 0
+    return int(pd.to_numeric(tabela["Quantidade de Cabos"], errors="coerce").fillna(0).sum())
+
+
+@GRAFO.registrar(
+    "tamanho_eletroduto_sugerido", ("area_total_ocupada", "condutores_eletroduto")
+)
+def _tamanho_eletroduto_sugerido(area_total_ocupada, condutores) -> str:
+    indice = int(eletroduto_minimo_lote(area_total_ocupada, condutores))
+    return TAMANHOS_ELETRODUTO[indice] if indice >= 0 else ""
+
+
+@GRAFO.registrar(
+    "eletroduto_economico",
+    (
+        "distancia_total",
+        ("percursos", []),
+        ("instalacao_sistema", ""),
+        ("bitola_sugerida", ""),
+        ("bitola_neutro_sugerida", ""),
+        ("bitola_terra_sugerida", ""),
+        ("tipo_cabos", "Cabo PVC"),
+        (CHAVE_VERSAO, 0),
+    ),
+    publicar=False,
+)
+def _eletroduto_economico(
+    distancia_total,
+    percursos,
+    instalacao,
+    fase,
+    neutro,
+    terra,
+    tipo_cabos,
+    _versao_catalogo,
+):
+    """(tamanho, paralelos, custo) mais barato para o circuito, ou ``None``.
+
+    Depende da versão do catálogo para ser recalculado quando os preços mudam.
+    """
+    circuito = Circuito(
+        instalacao,
+        _normalizar_valor_bitola(fase) or 0.0,
+        _normalizar_valor_bitola(neutro) or 0.0,
+        _normalizar_valor_bitola(terra) or 0.0,
+        tipo_cabos,
+    )
+    if distancia_total <= 0 or circuito.bitola_fase <= 0:
+        return None
+    try:
+        df_eletrodutos = tabela_catalogo("valores_eletrodutos.csv")
+    except FileNotFoundError:
+        return None
+    try:
+        df_sealtubo = tabela_catalogo("valores_sealtubo.csv")
+    except FileNotFoundError:
+        df_sealtubo = None
+    opcoes = dimensionar_trechos(
+        [circuito],
+        [[0]],
+        [distancia_total],
+        preparar_precos_eletrodutos(df_eletrodutos),
+        preparar_precos_sealtubo(df_sealtubo),
+        quantidades_infra=[analisar_infra(percursos)],
+    )
+    if "Eletroduto Econômico" not in opcoes or not opcoes["Eletroduto Econômico"].iloc[0]:
+        return None
+    linha = opcoes.iloc[0]
+    return (
+        linha["Eletroduto Econômico"],
+        int(linha["Paralelos"]),
+        float(linha["Custo Econômico"]),
+    )
+
+
+# A proteção segue a corrente de projeto, limitada pela bitola de fase escolhida
+_ENTRADAS_PROTECAO = (
+    ("instalacao_sistema", ""),
+    ("bitola_sugerida", ""),
+    "corrente_calculada",
+)
+
 
-    valor_normalizado = valor or ""
-    sugestao_anterior = st.session_state.get(chave_sugestao, valor_normalizado)
-    manual_atual = st.session_state.get(chave_manual, False)
+@GRAFO.registrar("disjuntor_recomendado", _ENTRADAS_PROTECAO)
+def _disjuntor_recomendado(instalacao_sistema, bitola_sugerida, corrente):
+    return dimensionar_disjuntor(instalacao_sistema, bitola_sugerida, corrente)
 
-    if (
-        not manual_atual
-        and chave_valor in st.session_state
-        and st.session_state.get(chave_valor) != sugestao_anterior
-    ):
-        manual_atual = True
-        st.session_state[chave_manual] = True
 
-    if chave_manual not in st.session_state:
-        st.session_state[chave_manual] = manual_atual
-    if chave_valor not in st.session_state:
-        st.session_state[chave_valor] = valor_normalizado
+@GRAFO.registrar("idr_recomendado", _ENTRADAS_PROTECAO)
+def _idr_recomendado(instalacao_sistema, bitola_sugerida, corrente):
+    return dimensionar_idr(instalacao_sistema, bitola_sugerida, corrente)
 
-    st.session_state[chave_sugestao] = valor_normalizado
 
-    if (
-        not st.session_state.get(chave_manual, False)
-        or not st.session_state.get(chave_valor)
-    ):
-        st.session_state[chave_valor] = valor_normalizado
+@GRAFO.registrar(
+    "dps_recomendado",
+    _ENTRADAS_PROTECAO + (("quantidade_carregadores", 1),),
+)
+def _dps_recomendado(instalacao_sistema, bitola_sugerida, corrente, quantidade_carregadores):
+    return dimensionar_dps(
+        instalacao_sistema, bitola_sugerida, quantidade_carregadores, corrente
+    )
+
+
+def _render_queda_tensao(potencia_kw: float, instalacao: str, tipo_cabos: str) -> None:
+    """Mostra a queda de tensão da bitola de fase escolhida e de todas as bitolas."""
+    distancia_total = GRAFO.obter("distancia_total")
+    if not (distancia_total > 0 and potencia_kw > 0):
+        return
+    tensoes = [
+        float(str(valor).replace(",", "."))
+        for valor in (
+            st.session_state.get(campo, "")
+            for campo in ("tensao_rs", "tensao_rt", "tensao_st")
+        )
+        if re.fullmatch(r"\s*\d+(?:[.,]\d+)?\s*", str(valor))
+    ]
+    tensao = tensao_circuito(instalacao, sum(tensoes) / len(tensoes) if tensoes else None)
+    tabela = tabela_queda_tensao(
+        potencia_kw, distancia_total, tensao, instalacao, tipo_cabos
+    )
+    match = re.search(r"\d+(?:[.,]\d+)?", str(st.session_state.get("bitola_sugerida", "")))
+    if match:
+        bitola = float(match.group(0).replace(",", "."))
+        linha = tabela[tabela["Cabo (mm²)"] == bitola]
+        if not linha.empty:
+            queda = linha["Queda de Tensão (%)"].iloc[0]
+            capacidade = linha["Capacidade (A)"].iloc[0]
+            aviso = st.caption if linha["Atende"].iloc[0] else st.warning
+            aviso(
+                f"Queda de tensão estimada com {bitola:g} mm² em {distancia_total:g} m "
+                f"a {tensao:.0f} V: {queda:.2f}% (limite {QUEDA_MAXIMA_PADRAO:g}%) · "
+                f"capacidade {capacidade:g} A"
+            )
+    if st.toggle("Mostrar queda de tensão por bitola", key="mostrar_queda_tensao"):
+        st.dataframe(tabela, hide_index=True)
 
 
 def _render_bitola_select(
@@ -314,128 +667,6 @@ def _render_bitola_select(
         st.caption("Valor ajustado manualmente.")
 
 
-def obter_bitola_cabo(
-    distancia: float, potencia_kw: float, tabela=TABELA_BITOLAS
-) -> str:
-    """Retorna a bitola recomendada usando a tabela informada."""
-    colunas = {
-        1.9: "1,9kW",
-        3.7: "3,7kW",
-        7.4: "7,4kW",
-        14.8: "2x7,4",
-        11.0: "11,0kW",
-        22.0: "22,0kW",
-        44.0: "44,0kW",
-    }
-    if potencia_kw <= 0:
-        return ""
-    potencia_ref = min(colunas.keys(), key=lambda x: abs(x - potencia_kw))
-    coluna = colunas[potencia_ref]
-    linha = tabela[tabela["Distância (m)"] >= distancia]
-    if linha.empty:
-        return ""
-    bitola = linha.iloc[0][coluna]
-    return f"{bitola} mm²"
-
-
-def dimensionar_disjuntor(instalacao: str, bitola_fase: str) -> str:
-    """Sugere um disjuntor a partir da instalação e da bitola das fases."""
-    match = re.search(r"(\d+(?:[.,]\d+)?)", str(bitola_fase))
-    if not match:
-        return ""
-    bitola = float(match.group(1).replace(",", "."))
-    mapa = {
-        1.5: 16,
-        2.5: 20,
-        4.0: 25,
-        6.0: 32,
-        10.0: 40,
-        16.0: 63,
-        25.0: 80,
-        35.0: 100,
-        50.0: 125,
-        70.0: 160,
-    }
-    corrente = mapa.get(bitola)
-    if corrente is None:
-        return ""
-    polos = {
-        "Monofásico": "1P+N",
-        "Bifásico": "2P",
-        "Trifásico": "3P",
-    }.get(instalacao, "")
-    return f"{polos} {corrente} A - DIN Curva C"
-
-
-def dimensionar_idr(instalacao: str, bitola_fase: str) -> str:
-    """Sugere um IDR de classe A a partir da instalação e da bitola das fases."""
-    match = re.search(r"(\d+(?:[.,]\d+)?)", str(bitola_fase))
-    if not match:
-        return ""
-    bitola = float(match.group(1).replace(",", "."))
-    mapa = {
-        1.5: 16,
-        2.5: 20,
-        4.0: 25,
-        6.0: 32,
-        10.0: 40,
-        16.0: 63,
-        25.0: 80,
-        35.0: 100,
-        50.0: 125,
-        70.0: 160,
-    }
-    corrente = mapa.get(bitola)
-    if corrente is None:
-        return ""
-    polos = {
-        "Monofásico": "2P",
-        "Bifásico": "2P",
-        "Trifásico": "4P",
-    }.get(instalacao, "")
-    return f"{polos} {corrente} A - IDR Classe A 30 mA"
-
-
-def dimensionar_dps(
-    instalacao: str, bitola_fase: str, quantidade_carregadores: int
-) -> str:
-    """Sugere um DPS Tipo 2 de 1 polo a partir da instalação, bitola e quantidade."""
-    match = re.search(r"(\d+(?:[.,]\d+)?)", str(bitola_fase))
-    if not match:
-        return ""
-    bitola = float(match.group(1).replace(",", "."))
-    mapa_corrente = {
-        1.5: 16,
-        2.5: 20,
-        4.0: 25,
-        6.0: 32,
-        10.0: 40,
-        16.0: 63,
-        25.0: 80,
-        35.0: 100,
-        50.0: 125,
-        70.0: 160,
-    }
-    corrente = mapa_corrente.get(bitola)
-    if corrente is None:
-        return ""
-    if corrente <= 63:
-        ka = 20
-    elif corrente <= 125:
-        ka = 40
-    else:
-        ka = 65
-    condutores = {
-        "Monofásico": 2,
-        "Bifásico": 2,
-        "Trifásico": 4,
-    }.get(instalacao)
-    if not condutores:
-        return ""
-    quantidade = condutores * max(1, quantidade_carregadores)
-    return f"{quantidade}x 1P {ka} kA - DPS Tipo 2"
-
-
 def render_dimensionamento_tab(tab_dimensionamento):
     """Renderiza a aba de Dimensionamento."""
     with tab_dimensionamento:
@@ -495,7 +726,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     st.markdown(f"**OCPP:** {tipo_conectividade_dim}")
 
                 percursos = st.session_state.get("percursos", [])
-                distancia_total = sum(t for _, t in percursos)
+                distancia_total = GRAFO.obter("distancia_total")
                 if percursos:
                     distancia_total_str = f"{distancia_total:g}"
                     st.markdown(
@@ -579,78 +810,12 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     "T": st.session_state.get("corrente_t", ""),
                 }
 
-                # Cálculo de corrente a partir da potência e média de tensões entre fases
-                potencias_disponiveis = {
-                    "0 kW": 0.0,
-                    "1,9 kW": 1.9,
-                    "3,7 kW": 3.7,
-                    "7,4 kW": 7.4,
-                    "11 kW": 11.0,
-                    "22 kW": 22.0,
-                    "44 kW": 44.0,
-                }
-                potencia_escolhida = st.session_state.get("potencia_carregador", "")
-                if potencia_escolhida == "Outro":
-                    potencia_kw = st.session_state.get("pot_outro_valor", 0.0)
-                else:
-                    potencia_kw = potencias_disponiveis.get(potencia_escolhida, 0.0)
-                tensoes_ff_vals = []
-                for val in tensoes_ff.values():
-                    try:
-                        tensoes_ff_vals.append(float(str(val).replace(',', '.')))
-                    except (ValueError, TypeError):
-                        pass
-                media_tensao = (
-                    sum(tensoes_ff_vals) / len(tensoes_ff_vals)
-                    if tensoes_ff_vals
-                    else 0.0
-                )
-                corrente_calc = ""
-                if potencia_kw > 0 and media_tensao > 0:
-                    if potencia_kw >= 11.0:
-                        corrente_val = (potencia_kw * 1000) / (media_tensao * math.sqrt(3))
-                    else:
-                        corrente_val = (potencia_kw * 1000) / media_tensao
-                    corrente_calc = f"{corrente_val:.2f}"
-                st.session_state["corrente_calculada"] = corrente_calc
-
-                bitola_calc = ""
-                bitola_neutro_terra_calc = ""
-                if distancia_total > 0 and potencia_kw > 0:
-                    bitola_calc = obter_bitola_cabo(distancia_total, potencia_kw)
-                    bitola_neutro_terra_calc = obter_bitola_cabo(
-                        distancia_total, potencia_kw, TABELA_NEUTRO_TERRA
-                    )
-                _registrar_bitola_calculada(
-                    "bitola_sugerida",
-                    "bitola_sugerida_calculada",
-                    "bitola_fase_manual",
-                    bitola_calc,
-                )
-                _registrar_bitola_calculada(
-                    "bitola_fase2_sugerida",
-                    "bitola_fase2_sugerida_calculada",
-                    "bitola_fase2_manual",
-                    bitola_calc,
-                )
-                _registrar_bitola_calculada(
-                    "bitola_fase3_sugerida",
-                    "bitola_fase3_sugerida_calculada",
-                    "bitola_fase3_manual",
-                    bitola_calc,
-                )
-                _registrar_bitola_calculada(
-                    "bitola_neutro_sugerida",
-                    "bitola_neutro_sugerida_calculada",
-                    "bitola_neutro_manual",
-                    bitola_neutro_terra_calc,
-                )
-                _registrar_bitola_calculada(
-                    "bitola_terra_sugerida",
-                    "bitola_terra_sugerida_calculada",
-                    "bitola_terra_manual",
-                    bitola_neutro_terra_calc,
-                )
+                # Corrente a partir da potência e média de tensões entre fases e
+                # bitolas sugeridas (recalculadas só quando as entradas mudam)
+                potencia_kw = GRAFO.obter("potencia_kw")
+                GRAFO.obter("corrente_calculada")
+                for _, chave_sugestao, _, _ in _BITOLAS_AJUSTAVEIS:
+                    GRAFO.obter(chave_sugestao)
 
                 tensoes_fn_vals = []
                 for val in tensoes_fn.values():
@@ -755,6 +920,14 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     disabled=True,
                     label_visibility="collapsed",
                 )
+                demanda = GRAFO.obter("demanda_carregadores")
+                if demanda.potencia_kw < demanda.potencia_instalada_kw:
+                    st.caption(
+                        f"Demanda de {demanda.potencia_kw:.1f} kW de "
+                        f"{demanda.potencia_instalada_kw:.1f} kW instalados "
+                        f"(fator de simultaneidade {demanda.fator_simultaneidade:.2f}"
+                        + (", gestão de carga)" if demanda.limitada_pela_gestao else ")")
+                    )
             with cols_corrente[1]:
                 st.markdown(
                     "<p style='font-size:24px; font-weight:bold;'>Corrente Nominal (A)</p>",
@@ -766,23 +939,15 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     label_visibility="collapsed",
                     on_change=_atualizar_corrente_nominal_manual,
                 )
-            tensoes = []
-            for campo in ("tensao_rs", "tensao_rt", "tensao_st"):
-                try:
-                    tensoes.append(
-                        float(str(st.session_state.get(campo, "")).replace(",", "."))
-                    )
-                except (ValueError, TypeError):
-                    pass
-            instalacao_sugerida = st.session_state.get("instalacao_sistema", "Monofásico")
-            if potencia_kw >= 11:
-                instalacao_sugerida = "Trifásico"
-            elif potencia_kw <= 7.4 and len(tensoes) == 3:
-                if all(t > 360 for t in tensoes):
-                    instalacao_sugerida = "Monofásico"
-                elif all(210 <= t <= 240 for t in tensoes):
-                    instalacao_sugerida = "Bifásico"
-            st.session_state["instalacao_sistema"] = instalacao_sugerida
+            tensoes = [
+                st.session_state.get(campo, "")
+                for campo in ("tensao_rs", "tensao_rt", "tensao_st")
+            ]
+            st.session_state["instalacao_sistema"] = sugerir_instalacao(
+                potencia_kw,
+                tensoes,
+                st.session_state.get("instalacao_sistema", "Monofásico"),
+            )
             with st.expander("🧵 Dimensionamento dos Cabos", expanded=False):
                 col_instalacao, col_tipo = st.columns(2)
                 with col_instalacao:
@@ -903,6 +1068,14 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     opcoes_bitola,
                     cor="#008000",
                 )
+                aviso = aviso_bitola(
+                    st.session_state.get("corrente_calculada", ""),
+                    GRAFO.obter("distancia_total"),
+                    st.session_state.get("bitola_sugerida", ""),
+                )
+                if aviso:
+                    st.error(aviso)
+                _render_queda_tensao(potencia_kw, instalacao_sistema, tipo_cabos)
 
         with tab_tabelas_eletricas:
             st.subheader("📘 Tabela de Fases")
@@ -938,34 +1111,17 @@ def render_dimensionamento_tab(tab_dimensionamento):
 
             # Preenche automaticamente a quantidade de cabos com base nas
             # bitolas recomendadas para fases, neutro e terra.
-            def _parse_bitola(valor):
-                match = re.search(r"(\d+(?:[.,]\d+)?)", str(valor))
-                if not match:
-                    return None
-                return float(match.group(1).replace(",", "."))
-
-            bitola_fase = _parse_bitola(st.session_state.get("bitola_sugerida"))
-            bitola_neutro = _parse_bitola(
-                st.session_state.get("bitola_neutro_sugerida")
+            quantidades = contar_cabos(
+                instalacao_sistema,
+                st.session_state.get("bitola_sugerida"),
+                st.session_state.get("bitola_neutro_sugerida"),
+                st.session_state.get("bitola_terra_sugerida"),
             )
-            bitola_terra = _parse_bitola(
-                st.session_state.get("bitola_terra_sugerida")
-            )
-            quantidade_fases = {"Monofásico": 1, "Bifásico": 2, "Trifásico": 3}.get(
-                instalacao_sistema, 0
-            )
-            quantidades = {}
-            if bitola_fase is not None:
-                quantidades[bitola_fase] = quantidades.get(bitola_fase, 0) + quantidade_fases
-            if bitola_neutro is not None and instalacao_sistema != "Bifásico":
-                quantidades[bitola_neutro] = quantidades.get(bitola_neutro, 0) + 1
-            if bitola_terra is not None:
-                quantidades[bitola_terra] = quantidades.get(bitola_terra, 0) + 1
-
-            for bitola, qtd in quantidades.items():
-                mask = tabela_cabos["Cabo (mm²)"] == bitola
-                tabela_cabos.loc[mask, "Quantidade de Cabos"] = tabela_cabos.loc[mask,
-                    "Quantidade de Cabos"].replace(0, qtd)
+
+            # Só preenche as bitolas ainda sem quantidade informada
+            sugeridas = tabela_cabos["Cabo (mm²)"].map(quantidades)
+            preencher = sugeridas.notna() & (tabela_cabos["Quantidade de Cabos"] == 0)
+            tabela_cabos.loc[preencher, "Quantidade de Cabos"] = sugeridas[preencher]
 
             tabela_cabos["Área do Cabo (mm²)"] = (
                 math.pi * (tabela_cabos["Diâmetro Externo (mm)"] / 2) ** 2
@@ -994,8 +1150,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                 * tabela_cabos["Quantidade de Cabos"]
             )
             st.session_state[tabela_key] = tabela_cabos
-            area_total_ocupada = tabela_cabos["Área Ocupável Condutores"].sum()
-            st.session_state["area_total_ocupada"] = area_total_ocupada
+            area_total_ocupada = GRAFO.obter("area_total_ocupada")
             st.markdown(
                 """
                 <style>
@@ -1017,18 +1172,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                 disabled=True,
                 label_visibility="collapsed",
             )
-            tamanho_eletroduto = ""
-            if area_total_ocupada > 0:
-                linha_eletroduto = TABELA_ELETRODUTOS[
-                    TABELA_ELETRODUTOS["Área Ocupável 40% (mm²)"]
-                    >= area_total_ocupada
-                ]
-                if not linha_eletroduto.empty:
-                    tamanho_eletroduto = linha_eletroduto.iloc[0][
-                        "Eletroduto (Pol)"
-                    ]
-
-            st.session_state["tamanho_eletroduto_sugerido"] = tamanho_eletroduto
+            tamanho_eletroduto = GRAFO.obter("tamanho_eletroduto_sugerido")
             tamanho_atual = st.session_state.get("tamanho_eletroduto", "")
 
             if tamanho_atual == tamanho_eletroduto:
@@ -1065,6 +1209,16 @@ def render_dimensionamento_tab(tab_dimensionamento):
                 disabled=True,
                 label_visibility="collapsed",
             )
+            economico = GRAFO.obter("eletroduto_economico")
+            if economico is not None and (economico[0], economico[1]) != (
+                tamanho_eletroduto,
+                1,
+            ):
+                tamanho_economico, paralelos, custo_economico = economico
+                st.caption(
+                    f"Opção mais econômica de infra-seca: {paralelos}x {tamanho_economico} "
+                    f"({format_currency(custo_economico)} em eletroduto e acessórios)"
+                )
 
         if tab_quadro_distribuicao is not None:
             with tab_quadro_distribuicao:
@@ -1178,6 +1332,21 @@ def render_dimensionamento_tab(tab_dimensionamento):
                         value=f"{potencia_total_carregadores:g} kW",
                         disabled=True,
                     )
+                    demanda = GRAFO.obter("demanda_carregadores")
+                    st.text_input(
+                        "Demanda de projeto",
+                        value=f"{demanda.potencia_kw:.1f} kW",
+                        disabled=True,
+                    )
+                    detalhes_demanda = (
+                        f"Fator de simultaneidade {demanda.fator_simultaneidade:.2f} "
+                        f"para {demanda.quantidade} carregadores"
+                    )
+                    if demanda.limitada_pela_gestao:
+                        detalhes_demanda += (
+                            f"; limitada a {demanda.limite_gestao_kw:g} kW pela gestão de carga"
+                        )
+                    st.caption(detalhes_demanda)
 
                 with st.expander("🧰 Painel", expanded=False):
                     st.radio(
@@ -1252,11 +1421,13 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     st.caption(f"Sugestão automática: {tamanho_sugerido}")
 
             with st.expander("🛡️ Quadro de Proteção", expanded=False):
-                disjuntor_val = dimensionar_disjuntor(
-                    st.session_state.get("instalacao_sistema", ""),
+                disjuntor_val = GRAFO.obter("disjuntor_recomendado")
+                aviso = aviso_protecao(
                     st.session_state.get("bitola_sugerida", ""),
+                    st.session_state.get("corrente_calculada", ""),
                 )
-                st.session_state["disjuntor_recomendado"] = disjuntor_val
+                if aviso:
+                    st.warning(aviso)
                 if "disjuntor_manual" not in st.session_state:
                     st.session_state["disjuntor_manual"] = False
                 disjuntor_resumo_atual = st.session_state.get("disjuntor_resumo", "")
@@ -1268,31 +1439,17 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     st.session_state["disjuntor_manual"] = False
                 if not st.session_state["disjuntor_manual"]:
                     st.session_state["disjuntor_resumo"] = disjuntor_val or ""
-                idr_val = dimensionar_idr(
-                    st.session_state.get("instalacao_sistema", ""),
-                    st.session_state.get("bitola_sugerida", ""),
-                )
-                st.session_state["idr_recomendado"] = idr_val
+                idr_val = GRAFO.obter("idr_recomendado")
                 if "idr_manual" not in st.session_state:
                     st.session_state["idr_manual"] = False
                 if not st.session_state["idr_manual"]:
                     st.session_state["idr_resumo"] = idr_val or ""
-                dps_val = dimensionar_dps(
-                    st.session_state.get("instalacao_sistema", ""),
-                    st.session_state.get("bitola_sugerida", ""),
-                    st.session_state.get("quantidade_carregadores", 1),
-                )
-                st.session_state["dps_recomendado"] = dps_val
+                dps_val = GRAFO.obter("dps_recomendado")
                 if "dps_manual" not in st.session_state:
                     st.session_state["dps_manual"] = False
                 if not st.session_state["dps_manual"]:
                     st.session_state["dps_resumo"] = dps_val or ""
-                barra_pente_map = {
-                    "Monofásico": "Barra Pente Monopolar",
-                    "Bifásico": "Barra Pente Bipolar",
-                    "Trifásico": "Barra Pente Tripolar",
-                }
-                barra_pente_val = barra_pente_map.get(
+                barra_pente_val = BARRA_PENTE_POR_SISTEMA.get(
                     st.session_state.get("instalacao_sistema", ""), ""
                 )
                 st.session_state["barra_pente_recomendado"] = barra_pente_val
@@ -1315,9 +1472,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     "<p style='font-size:24px; font-weight:bold;'>Disjuntor</p>",
                     unsafe_allow_html=True,
                 )
-                opcoes_disjuntor = _obter_opcoes_material(
-                    "valores_disjuntores_din_df", "valores_disjuntor_din.csv"
-                )
+                opcoes_disjuntor = _obter_opcoes_material("valores_disjuntor_din.csv")
                 _render_selectbox_material(
                     "Disjuntor",
                     "disjuntor_resumo",
@@ -1334,7 +1489,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     "<p style='font-size:24px; font-weight:bold;'>IDR (Interruptor Diferencial Residual)</p>",
                     unsafe_allow_html=True,
                 )
-                opcoes_idr = _obter_opcoes_material("valores_idr_df", "valores_idr.csv")
+                opcoes_idr = _obter_opcoes_material("valores_idr.csv")
                 _render_selectbox_material(
                     "IDR (Interruptor Diferencial Residual)",
                     "idr_resumo",
@@ -1350,7 +1505,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     "<p style='font-size:24px; font-weight:bold;'>DPS (Dispositivo de Proteção contra Surtos)</p>",
                     unsafe_allow_html=True,
                 )
-                opcoes_dps = _obter_opcoes_material("valores_dps_df", "valores_dps.csv")
+                opcoes_dps = _obter_opcoes_material("valores_dps.csv")
                 _render_selectbox_material(
                     "DPS (Dispositivo de Proteção contra Surtos)",
                     "dps_resumo",
@@ -1366,9 +1521,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     "<p style='font-size:24px; font-weight:bold;'>Barra Pente</p>",
                     unsafe_allow_html=True,
                 )
-                opcoes_barra = _obter_opcoes_material(
-                    "valores_barra_pente_df", "valores_barra_pente.csv"
-                )
+                opcoes_barra = _obter_opcoes_material("valores_barra_pente.csv")
                 _render_selectbox_material(
                     "Barra Pente",
                     "barra_pente_resumo",
@@ -1392,12 +1545,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     label_visibility="collapsed",
                 )
                 if tipo_quadro == "PVC":
-                    quadro_pvc_map = {
-                        "Monofásico": "Quadro PVC de 8 Posições",
-                        "Bifásico": "Quadro PVC de 8 Posições",
-                        "Trifásico": "Quadro PVC de 12 Posições",
-                    }
-                    quadro_pvc_val = quadro_pvc_map.get(
+                    quadro_pvc_val = QUADRO_PVC_POR_SISTEMA.get(
                         st.session_state.get("instalacao_sistema", ""), ""
                     )
                     st.session_state["quadro_pvc_recomendado"] = quadro_pvc_val
@@ -1419,9 +1567,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                         "<p style='font-size:24px; font-weight:bold;'>Quadro PVC</p>",
                         unsafe_allow_html=True,
                     )
-                    opcoes_quadros = _obter_opcoes_material(
-                        "valores_paineis_quadros_df", "valores_paineis_quadros.csv"
-                    )
+                    opcoes_quadros = _obter_opcoes_material("valores_paineis_quadros.csv")
                     opcoes_pvc = [
                         opt
                         for opt in opcoes_quadros
@@ -1442,12 +1588,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     if quadro_pvc_val:
                         st.caption(f"Sugestão automática: {quadro_pvc_val}")
                 elif tipo_quadro == "Metálico":
-                    quadro_metalico_map = {
-                        "Monofásico": "Quadro 20x20x14",
-                        "Bifásico": "Quadro 20x20x14",
-                        "Trifásico": "Quadro 30x30x20",
-                    }
-                    quadro_metalico_val = quadro_metalico_map.get(
+                    quadro_metalico_val = QUADRO_METALICO_POR_SISTEMA.get(
                         st.session_state.get("instalacao_sistema", ""), ""
                     )
                     st.session_state["quadro_metalico_recomendado"] = quadro_metalico_val
@@ -1471,9 +1612,7 @@ def render_dimensionamento_tab(tab_dimensionamento):
                         "<p style='font-size:24px; font-weight:bold;'>Quadro Metálico</p>",
                         unsafe_allow_html=True,
                     )
-                    opcoes_quadros = _obter_opcoes_material(
-                        "valores_paineis_quadros_df", "valores_paineis_quadros.csv"
-                    )
+                    opcoes_quadros = _obter_opcoes_material("valores_paineis_quadros.csv")
                     opcoes_metal = [
                         opt
                         for opt in opcoes_quadros
@@ -1499,8 +1638,8 @@ def render_dimensionamento_tab(tab_dimensionamento):
 
             with st.expander("\U0001F4E6 Material Adicional", expanded=False):
                 if st.session_state.get("disjuntor_caixa_moldada") == "Sim":
-                    df_dj = pd.read_csv(
-                        "valores_disjuntor_caixa_moldada.csv", sep=";"
+                    df_dj = tabela_catalogo(
+                        "valores_disjuntor_caixa_moldada.csv", converter_precos=False
                     )
                     modelos_dj = [""] + df_dj["Modelo"].dropna().tolist()
                     modelo_key = "dimensionamento_modelo_disjuntor_caixa_moldada"
@@ -1562,18 +1701,25 @@ def render_dimensionamento_tab(tab_dimensionamento):
                         not in opcoes_transformadores
                     ):
                         st.session_state["transformador_produto"] = ""
+                    transformador_sugerido = sugerir_transformador(
+                        GRAFO.obter("potencia_kw"),
+                        produtos_transformadores,
+                        float(st.session_state.get("painel_fator_potencia", 1.0) or 1.0),
+                    )
                     st.selectbox(
                         "Transformador",
                         opcoes_transformadores,
                         key="transformador_produto",
                     )
+                    if transformador_sugerido:
+                        st.caption(f"Sugestão pela demanda: {transformador_sugerido}")
                 else:
                     st.session_state["transformador_produto"] = ""
 
                 if st.session_state.get("barra_roscada") == "Sim":
                     try:
-                        df_barra_roscada = pd.read_csv(
-                            "valores_barra_roscada.csv", sep=";"
+                        df_barra_roscada = tabela_catalogo(
+                            "valores_barra_roscada.csv", converter_precos=False
                         )
                     except FileNotFoundError:
                         df_barra_roscada = pd.DataFrame(
@@ -1652,24 +1798,9 @@ def render_dimensionamento_tab(tab_dimensionamento):
                 else:
                     st.session_state["dimensoes_eletrocalha"] = ""
 
+            ordem_venda = st.session_state.get("ordem_venda", "")
+            base_name = "Dados de Dimensionamento"
             if st.button("Salvar Dados de Dimensionamento"):
-                try:
-                    from openpyxl import load_workbook
-                except ImportError:
-                    load_workbook = None
-
-                docs_dir = Path(__file__).with_name("Docs Salvos")
-                docs_dir.mkdir(exist_ok=True)
-
-                ordem_venda = st.session_state.get("ordem_venda", "")
-                base_name = "Dados de Dimensionamento"
-                filename = (
-                    f"{base_name} {ordem_venda}.xlsx"
-                    if ordem_venda
-                    else f"{base_name}.xlsx"
-                )
-                filepath = docs_dir / filename
-
                 dados_dimensionamento = {
                     "Ordem de Venda": ordem_venda,
                     "Cliente": st.session_state.get("cliente", ""),
@@ -1759,31 +1890,30 @@ def render_dimensionamento_tab(tab_dimensionamento):
                     ),
                 }
 
-                df_dimensionamento = pd.DataFrame([dados_dimensionamento])
+                try:
+                    registrar(
+                        "dimensionamento",
+                        dados_dimensionamento,
+                        ordem_venda,
+                        planilha_legada=caminho_planilha(base_name, ordem_venda),
+                    )
+                except (sqlite3.Error, ErroPlanilhaLegada) as exc:
+                    st.error(f"Não foi possível salvar os dados de dimensionamento: {exc}")
+                else:
+                    st.success(f"Dados salvos em {ARQUIVO_REGISTRO}")
 
-                if filepath.exists():
-                    if load_workbook is None:
-                        st.error(
-                            "Não foi possível atualizar o arquivo Excel porque a biblioteca "
-                            "'openpyxl' não está instalada. Execute `pip install openpyxl` e tente novamente."
-                        )
-                    else:
-                        book = load_workbook(filepath)
-                        with pd.ExcelWriter(filepath, engine="openpyxl") as writer:
-                            writer.book = book
-                            writer.sheets = {ws.title: ws for ws in book.worksheets}
-                            startrow = book.active.max_row
-                            df_dimensionamento.to_excel(
-                                writer, index=False, header=False, startrow=startrow
-                            )
-                        st.success(f"Dados salvos em {filepath}")
+            if st.button("Exportar Dados de Dimensionamento para Excel"):
+                filepath = caminho_planilha(base_name, ordem_venda)
+                try:
+                    total_linhas = exportar_xlsx(
+                        "dimensionamento", filepath, ordem_venda=ordem_venda
+                    )
+                except ImportError:
+                    st.error(
+                        "Não foi possível criar o arquivo Excel porque a biblioteca "
+                        "'openpyxl' não está instalada. Execute `pip install openpyxl` e tente novamente."
+                    )
+                except (sqlite3.Error, ErroPlanilhaLegada, OSError) as exc:
+                    st.error(f"Não foi possível exportar a planilha: {exc}")
                 else:
-                    try:
-                        df_dimensionamento.to_excel(filepath, index=False)
-                    except ImportError:
-                        st.error(
-                            "Não foi possível criar o arquivo Excel porque a biblioteca "
-                            "'openpyxl' não está instalada. Execute `pip install openpyxl` e tente novamente."
-                        )
-                    else:
-                        st.success(f"Dados salvos em {filepath}")
+                    st.success(f"{total_linhas} registro(s) exportado(s) para {filepath}")
@@ -0,0 +1,476 @@
+"""Execução das abas como ``st.fragment`` com dependências explícitas.
+
+Cada aba (e cada sub-aba de Custos) é executada em um fragmento próprio: a
+interação com um widget reexecuta apenas o fragmento que o contém, em vez do
+script inteiro. Como as abas compartilham dados pelo ``st.session_state``,
+cada fragmento declara em ``DEPENDENCIAS`` as chaves escritas por outras abas
+que ele lê. Ao fim de uma execução parcial, se alguma dessas chaves mudou
+desde a última execução de um fragmento dependente, o aplicativo inteiro é
+reexecutado para que nenhuma aba fique desatualizada.
+
+Chaves terminadas em ``*`` representam um prefixo (``potencia_carregador_*``).
+As tabelas de preço não ficam na sessão: os fragmentos que as leem dependem
+de ``catalogo_versao``, a versão do catálogo compartilhado entre as sessões
+(``catalogo_compartilhado``).
+
+Com o diagnóstico ativo (``ALFERIONPLUS_DIAGNOSTICO``) o ``st.session_state``
+é envolvido por um objeto que anota as chaves lidas e gravadas (inclusive
+pelos widgets) por cada fragmento. Uma execução parcial que altere uma chave
+lida por outro fragmento sem constar em ``DEPENDENCIAS`` gera um aviso no
+log e na aba de diagnóstico; :func:`dependencias_nao_declaradas` compara as
+leituras registradas com a lista, o que os testes usam para que ela não
+fique desatualizada em silêncio.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from catalogo_compartilhado import sincronizar_versao
+from diagnostico import (
+    ATIVO,
+    finalizar_execucao,
+    iniciar_execucao,
+    medir,
+    registrar_aviso,
+)
+from grafo_derivados import assinatura
+
+# Chaves de outras abas lidas por cada fragmento durante a renderização
+DEPENDENCIAS = {
+    "visita": (
+        "barra_roscada_material",
+        "corrente_calculada",
+        "custo_*",
+        "desloc_config",
+        "dimensoes_eletrocalha",
+        "medidor",
+        "modelo_disjuntor_caixa_moldada",
+        "tomada_industrial",
+        "total_custo_deslocamento",
+    ),
+    "dimensionamento": (
+        "alimentacao",
+        "barra_neutro_terra",
+        "barra_roscada",
+        "bitola_cabos",
+        "catalogo_versao",
+        "cliente",
+        "corrente_disjuntor",
+        "corrente_r",
+        "corrente_s",
+        "corrente_t",
+        "curva_simultaneidade",
+        "derivacoes_carregadores",
+        "dimensoes_eletrocalha",
+        "disjuntor_caixa_moldada",
+        "dj_disjuntor",
+        "dj_fusivel",
+        "dj_outro",
+        "eletrocalha",
+        "espaco_dj_saida",
+        "fator_simultaneidade_informado",
+        "grupos_carregadores",
+        "limite_gestao_carga_kw",
+        "marca_carregadores",
+        "medidor",
+        "metros_eletrocalha",
+        "modelo_disjuntor_caixa_moldada",
+        "observacoes",
+        "ordem_venda",
+        "percursos",
+        "percursos_quadro",
+        "possui_carregador",
+        "pot_outro_valor_*",
+        "potencia_carregador_*",
+        "quadro_distribuicao",
+        "quantidade_carregadores",
+        "sistema_aterramento",
+        "tem_medidor",
+        "tem_tomada_industrial",
+        "tensao_n_t",
+        "tensao_rn",
+        "tensao_rs",
+        "tensao_rt",
+        "tensao_rtt",
+        "tensao_sn",
+        "tensao_st",
+        "tensao_stt",
+        "tensao_tn",
+        "tensao_ttt",
+        "tipo_conectividade",
+        "tipo_local",
+        "tipo_servico",
+        "tomada_industrial",
+        "transformador",
+        "transformador_produto",
+        "transformadores_produtos",
+    ),
+    "custos_materiais": (
+        "barra_pente_recomendado",
+        "barra_roscada",
+        "barra_roscada_material",
+        "bitola_*",
+        "catalogo_versao",
+        "custo_*",
+        "derivacoes_carregadores",
+        "desloc_config",
+        "deslocamento_necessario",
+        "dimensoes_eletrocalha",
+        "disjuntor_caixa_moldada",
+        "disjuntor_recomendado",
+        "distancia_km",
+        "dps_recomendado",
+        "eletrocalha",
+        "grupos_carregadores",
+        "idr_recomendado",
+        "instalacao_sistema",
+        "medidor",
+        "metros_eletrocalha",
+        "modelo_disjuntor_caixa_moldada",
+        "percursos",
+        "percursos_quadro",
+        "possui_carregador",
+        "pot_outro_valor_*",
+        "potencia_carregador_*",
+        "quadro_distribuicao",
+        "quadro_metalico_recomendado",
+        "quadro_pvc_recomendado",
+        "quantidade_carregadores",
+        "tamanho_eletroduto",
+        "tem_medidor",
+        "tem_tomada_industrial",
+        "tempo_viagem",
+        "tensao_rs",
+        "tensao_rt",
+        "tensao_st",
+        "tipo_cabos",
+        "tipo_servico",
+        "tipo_servico_orcamento",
+        "tomada_industrial",
+        "total_custo_deslocamento",
+        "totem",
+        "transformador",
+        "transformador_produto",
+        "transformadores_produtos",
+    ),
+    "custos_servico": (
+        "andaime",
+        "caminhao_munk",
+        "catalogo_versao",
+        "custo_*",
+        "infra_rede",
+        "obra_civil",
+        "pintura_eletrodutos",
+        "pintura_vaga",
+        "total_servicos_adicionais",
+    ),
+    "deslocamento": (
+        "custo_pedagios",
+        "desloc_config",
+        "deslocamento_necessario",
+        "distancia_km",
+        "tempo_viagem",
+    ),
+    "atualizacoes": (),
+    "calculo_servico": (
+        "andaime",
+        "caminhao_munk",
+        "carregador_ce_dados",
+        "catalogo_versao",
+        "custo_*",
+        "custos_preco_transformador",
+        "custos_quantidade_transformador",
+        "grupos_carregadores",
+        "infra_rede",
+        "instalacao_sistema",
+        "obra_civil",
+        "ordem_venda",
+        "percursos",
+        "pintura_eletrodutos",
+        "pintura_vaga",
+        "possui_carregador",
+        "pot_outro_valor_*",
+        "potencia_carregador_*",
+        "preco_carregador_orcamento",
+        "quantidade_carregadores",
+        "tensao_rs",
+        "tensao_rt",
+        "tensao_st",
+        "tipo_cabos",
+        "tipo_quadro_resumo",
+        "tipo_servico",
+        "tipo_servico_orcamento",
+        "total_cabos",
+        "total_custo_deslocamento",
+        "total_custo_mao_obra",
+        "total_custos_materiais",
+        "total_infra_seca",
+        "total_instalacao",
+        "total_material_adicional",
+        "total_quadro_protecao",
+        "total_servicos_adicionais",
+        "totem",
+        "transformador",
+        "transformador_material_custos",
+        "transformador_produto",
+    ),
+    # A aba Orçamento lê as demais chaves apenas ao gerar os documentos, o que
+    # já acontece em uma execução do próprio fragmento.
+    "orcamento": (
+        "cliente",
+        "ordem_venda",
+        "percursos",
+        "pot_outro_valor",
+        "potencia_carregador",
+        "potencia_carregador_orcamento",
+        "soma_parcial_custos",
+        "tensao_carregador_orcamento",
+        "tipo_servico",
+        "total_calculo_servico",
+        "total_carregadores",
+        "total_custo_deslocamento",
+        "total_custo_mao_obra",
+        "total_custos_materiais",
+        "total_instalacao_calculo_servico",
+    ),
+}
+
+_ASSINATURAS = "_fragmentos_assinaturas"
+# Assinatura de cada chave lida na última execução de cada fragmento
+_LEITURAS = "_fragmentos_leituras"
+# Chaves gravadas (diretamente ou por widgets) na última execução de cada um
+_ESCRITAS = "_fragmentos_escritas"
+
+_LOG = logging.getLogger(__name__)
+
+# Chaves lidas e gravadas pelo fragmento em execução na thread do script
+_LOCAL = threading.local()
+
+
+class _SessaoRegistrada:
+    """``st.session_state`` que anota as chaves lidas e gravadas.
+
+    Delega tudo à sessão original e só anota enquanto um fragmento está em
+    execução na thread do script; chaves internas (``_``) são ignoradas.
+    """
+
+    def __init__(self, sessao):
+        object.__setattr__(self, "_sessao", sessao)
+
+    @staticmethod
+    def _anotar(tipo: str, chave) -> None:
+        registro = getattr(_LOCAL, "registro", None)
+        if registro is not None and not str(chave).startswith("_"):
+            registro[tipo].add(chave)
+
+    def __getitem__(self, chave):
+        self._anotar("lidas", chave)
+        return self._sessao[chave]
+
+    def get(self, chave, padrao=None):
+        self._anotar("lidas", chave)
+        return self._sessao.get(chave, padrao)
+
+    def __getattr__(self, nome):
+        if not hasattr(type(self._sessao), nome):
+            self._anotar("lidas", nome)
+        return getattr(self._sessao, nome)
+
+    def __setitem__(self, chave, valor) -> None:
+        self._anotar("escritas", chave)
+        self._sessao[chave] = valor
+
+    def __setattr__(self, nome, valor) -> None:
+        self._anotar("escritas", nome)
+        setattr(self._sessao, nome, valor)
+
+    def __delitem__(self, chave) -> None:
+        self._anotar("escritas", chave)
+        del self._sessao[chave]
+
+    def __delattr__(self, nome) -> None:
+        self._anotar("escritas", nome)
+        delattr(self._sessao, nome)
+
+    def setdefault(self, chave, padrao=None):
+        if chave not in self._sessao:
+            self._anotar("escritas", chave)
+        self._anotar("lidas", chave)
+        return self._sessao.setdefault(chave, padrao)
+
+    def pop(self, chave, *padrao):
+        self._anotar("escritas", chave)
+        return self._sessao.pop(chave, *padrao)
+
+    def update(self, *args, **kwargs) -> None:
+        valores = dict(*args, **kwargs)
+        for chave in valores:
+            self._anotar("escritas", chave)
+        self._sessao.update(valores)
+
+    def __contains__(self, chave) -> bool:
+        return chave in self._sessao
+
+    def __iter__(self):
+        return iter(self._sessao)
+
+    def __len__(self) -> int:
+        return len(self._sessao)
+
+    def __repr__(self) -> str:
+        return repr(self._sessao)
+
+
+if ATIVO and not isinstance(st.session_state, _SessaoRegistrada):
+    st.session_state = _SessaoRegistrada(st.session_state)
+
+
+def _valores(chaves) -> list:
+    """Valores atuais das ``chaves`` (expandindo os prefixos) na sessão."""
+    estado = st.session_state
+    valores = []
+    for chave in chaves:
+        if chave.endswith("*"):
+            prefixo = chave[:-1]
+            valores.extend(
+                sorted(
+                    ((k, estado[k]) for k in estado.keys() if str(k).startswith(prefixo)),
+                    key=lambda item: str(item[0]),
+                )
+            )
+        else:
+            valores.append((chave, estado.get(chave)))
+    return valores
+
+
+def _assinatura(chaves) -> bytes:
+    """Resumo dos valores das ``chaves``, usado para detectar alterações."""
+    return assinatura([item for par in _valores(chaves) for item in par])
+
+
+def _coberta(chave, chaves) -> bool:
+    """Indica se ``chave`` consta em ``chaves`` (diretamente ou por prefixo)."""
+    chave = str(chave)
+    return any(
+        chave == item or (item.endswith("*") and chave.startswith(item[:-1]))
+        for item in chaves
+    )
+
+
+def _assinatura_chave(chave) -> bytes:
+    return assinatura([st.session_state.get(chave)])
+
+
+def _avisar(mensagem: str) -> None:
+    _LOG.warning(mensagem)
+    registrar_aviso(mensagem)
+
+
+def _verificar_dependencias(nome: str) -> None:
+    """Avisa se a execução de ``nome`` alterou chaves não declaradas por outros."""
+    for outro, lidas in st.session_state.get(_LEITURAS, {}).items():
+        if outro == nome:
+            continue
+        declaradas = DEPENDENCIAS.get(outro, ())
+        faltando = sorted(
+            str(chave)
+            for chave, valor in lidas.items()
+            if not _coberta(chave, declaradas) and _assinatura_chave(chave) != valor
+        )
+        if faltando:
+            _avisar(
+                f"O fragmento {outro!r} lê {faltando}, alterado(s) pelo fragmento "
+                f"{nome!r}; inclua essas chaves em fragmentos.DEPENDENCIAS[{outro!r}]"
+            )
+
+
+def dependencias_nao_declaradas(estado=None) -> dict[str, list[str]]:
+    """Chaves lidas por cada fragmento e gravadas por outro fora de ``DEPENDENCIAS``.
+
+    Compara as leituras e gravações registradas (diagnóstico ativo) na
+    última execução de cada fragmento de ``estado`` (por padrão, a sessão
+    atual). Só cobre os caminhos percorridos nessas execuções.
+    """
+    estado = st.session_state if estado is None else estado
+    leituras = estado[_LEITURAS] if _LEITURAS in estado else {}
+    escritas = estado[_ESCRITAS] if _ESCRITAS in estado else {}
+    faltando = {}
+    for nome, lidas in leituras.items():
+        de_outros = set()
+        for outro, chaves in escritas.items():
+            if outro != nome:
+                de_outros |= chaves
+        declaradas = DEPENDENCIAS.get(nome, ())
+        chaves = sorted(
+            str(chave)
+            for chave in lidas
+            if chave in de_outros and not _coberta(chave, declaradas)
+        )
+        if chaves:
+            faltando[nome] = chaves
+    return faltando
+
+
+def _execucao_parcial() -> bool:
+    """Indica se a execução atual é apenas de fragmentos (não do app inteiro)."""
+    ctx = get_script_run_ctx()
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+@st.fragment
+def _executar_fragmento(nome: str, render, args: tuple) -> None:
+    parcial = _execucao_parcial()
+    if parcial:
+        iniciar_execucao(f"fragmento {nome}")
+    # Um catálogo salvo por outra sessão também conta como alteração
+    sincronizar_versao()
+    anteriores = getattr(_LOCAL, "registro", None)
+    _LOCAL.registro = {"lidas": set(), "escritas": set()} if ATIVO else None
+    ctx = get_script_run_ctx()
+    widgets = set(ctx.widget_user_keys_this_run) if ATIVO and ctx else set()
+    try:
+        with medir(nome):
+            render(st.container(), *args)
+    finally:
+        registro, _LOCAL.registro = _LOCAL.registro, anteriores
+    if registro is not None:
+        if ctx is not None:
+            registro["escritas"] |= {
+                chave
+                for chave in ctx.widget_user_keys_this_run - widgets
+                if not str(chave).startswith("_")
+            }
+        st.session_state.setdefault(_LEITURAS, {})[nome] = {
+            chave: _assinatura_chave(chave) for chave in registro["lidas"]
+        }
+        st.session_state.setdefault(_ESCRITAS, {})[nome] = registro["escritas"]
+
+    assinaturas = st.session_state.setdefault(_ASSINATURAS, {})
+    assinaturas[nome] = _assinatura(DEPENDENCIAS.get(nome, ()))
+    if not parcial:
+        return
+    finalizar_execucao()
+    if ATIVO:
+        _verificar_dependencias(nome)
+    for outro, chaves in DEPENDENCIAS.items():
+        if outro == nome or outro not in assinaturas:
+            continue
+        if assinaturas[outro] != _assinatura(chaves):
+            st.rerun()
+
+
+def renderizar_fragmento(nome: str, destino, render, *args) -> None:
+    """Renderiza ``render(container, *args)`` em ``destino`` como fragmento.
+
+    ``render`` segue a assinatura das funções ``render_*_tab`` do aplicativo,
+    recebendo o container onde deve desenhar como primeiro argumento.
+    """
+    with destino:
+        _executar_fragmento(nome, render, args)
+
+
+__all__ = ["DEPENDENCIAS", "dependencias_nao_declaradas", "renderizar_fragmento"]
@@ -0,0 +1,191 @@
+"""Grafo de valores derivados da sessão com recálculo incremental.
+
+Cada valor derivado (corrente calculada, eletroduto sugerido, disjuntor
+recomendado, totais...) é registrado com as chaves de que depende::
+
+    @GRAFO.registrar("tamanho_eletroduto_sugerido", ("area_total_ocupada",))
+    def _eletroduto(area):
+        return selecionar_eletroduto(area)
+
+``GRAFO.obter(chave)`` lê as entradas (calculando antes as que também são
+derivadas), compara a assinatura delas com a do último cálculo guardado na
+sessão e só chama a função quando alguma entrada mudou. O resultado é
+publicado em ``st.session_state[chave]`` a cada chamada, como o código das
+abas fazia antes.
+
+Uma entrada pode ser ``(chave, padrao)`` para usar ``padrao`` quando a chave
+não existe na sessão. Entradas terminadas em ``*`` representam um prefixo
+(``potencia_carregador_*``) e recebem os pares ``(chave, valor)`` das chaves
+da sessão que começam com ele, em ordem de chave. Nós com ``ajuste=(chave_valor, chave_manual)`` mantêm a
+regra de ajuste manual das bitolas: o valor calculado é a sugestão, e
+``chave_valor`` só acompanha a sugestão enquanto não tiver sido alterado pelo
+usuário (ou estiver vazio).
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import pickle
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import pandas as pd
+import streamlit as st
+
+# Chave da sessão com (assinatura das entradas, valor) de cada nó
+_CACHE = "_derivados_cache"
+
+_AUSENTE = object()
+
+
+def _conteudo(valor):
+    """Representação estável de ``valor`` para compor a assinatura.
+
+    Tabelas editadas pelo ``st.data_editor`` voltam com tipos de coluna
+    diferentes a cada execução; por isso DataFrames são comparados pelo
+    conteúdo textual e não pelo objeto serializado.
+    """
+    if isinstance(valor, pd.DataFrame):
+        return (
+            tuple(map(str, valor.columns)),
+            pd.util.hash_pandas_object(valor.astype(str), index=True).to_numpy().tobytes(),
+        )
+    return valor
+
+
+def assinatura(valores) -> bytes:
+    """Resumo de uma sequência de valores, usado para detectar alterações."""
+    valores = [_conteudo(valor) for valor in valores]
+    buffer = io.BytesIO()
+    serializador = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    # Sem memo: o resultado não depende de objetos iguais serem compartilhados
+    serializador.fast = True
+    try:
+        serializador.dump(valores)
+        dados = buffer.getvalue()
+    except Exception:
+        dados = repr(valores).encode("utf-8", "replace")
+    return hashlib.blake2b(dados, digest_size=16).digest()
+
+
+@dataclass(frozen=True)
+class Derivado:
+    """Nó do grafo: ``funcao(*entradas)`` publicado em ``chave``."""
+
+    chave: str
+    entradas: tuple
+    funcao: Callable[..., Any]
+    publicar: bool = True
+    ajuste: tuple[str, str] | None = None
+
+
+def _aplicar_ajuste(estado, chave_sugestao: str, ajuste, valor) -> None:
+    """Publica a sugestão calculada respeitando ajustes manuais existentes."""
+    chave_valor, chave_manual = ajuste
+    valor_normalizado = valor or ""
+    sugestao_anterior = estado.get(chave_sugestao, valor_normalizado)
+    manual_atual = estado.get(chave_manual, False)
+
+    if (
+        not manual_atual
+        and chave_valor in estado
+        and estado.get(chave_valor) != sugestao_anterior
+    ):
+        manual_atual = True
+        estado[chave_manual] = True
+
+    if chave_manual not in estado:
+        estado[chave_manual] = manual_atual
+    if chave_valor not in estado:
+        estado[chave_valor] = valor_normalizado
+
+    estado[chave_sugestao] = valor_normalizado
+
+    if not estado.get(chave_manual, False) or not estado.get(chave_valor):
+        estado[chave_valor] = valor_normalizado
+
+
+class GrafoDerivados:
+    """Registro dos valores derivados e de suas dependências."""
+
+    def __init__(self):
+        self._nos: dict[str, Derivado] = {}
+
+    def registrar(
+        self,
+        chave: str,
+        entradas=(),
+        publicar: bool = True,
+        ajuste: tuple[str, str] | None = None,
+    ):
+        """Decorador que registra a função como cálculo de ``chave``."""
+
+        def decorador(funcao):
+            self._nos[chave] = Derivado(
+                chave, tuple(entradas), funcao, publicar, ajuste
+            )
+            return funcao
+
+        return decorador
+
+    def dependencias(self, chave: str) -> tuple[str, ...]:
+        """Chaves da sessão (não derivadas) das quais ``chave`` depende."""
+        resultado = {}
+        for entrada in self._nos[chave].entradas:
+            nome = entrada[0] if isinstance(entrada, tuple) else entrada
+            if nome in self._nos:
+                resultado.update(dict.fromkeys(self.dependencias(nome)))
+            else:
+                resultado[nome] = None
+        return tuple(resultado)
+
+    def _entrada(self, entrada, estado, vistos):
+        if isinstance(entrada, tuple):
+            nome, padrao = entrada
+        else:
+            nome, padrao = entrada, None
+        if nome in self._nos:
+            return self._calcular(nome, estado, vistos)
+        if nome.endswith("*"):
+            prefixo = nome[:-1]
+            return tuple(
+                sorted(
+                    ((k, estado[k]) for k in list(estado.keys()) if str(k).startswith(prefixo)),
+                    key=lambda item: str(item[0]),
+                )
+            )
+        valor = estado.get(nome, _AUSENTE)
+        return padrao if valor is _AUSENTE else valor
+
+    def _calcular(self, chave: str, estado, vistos):
+        if chave in vistos:
+            return vistos[chave]
+        no = self._nos[chave]
+        valores = [self._entrada(entrada, estado, vistos) for entrada in no.entradas]
+        resumo = assinatura(valores)
+        cache = estado.setdefault(_CACHE, {})
+        anterior = cache.get(chave)
+        if anterior is not None and anterior[0] == resumo:
+            valor = anterior[1]
+        else:
+            valor = no.funcao(*valores)
+            cache[chave] = (resumo, valor)
+        vistos[chave] = valor
+        return valor
+
+    def obter(self, chave: str, estado=None):
+        """Valor atual de ``chave``, recalculado apenas se as entradas mudaram."""
+        estado = st.session_state if estado is None else estado
+        valor = self._calcular(chave, estado, {})
+        no = self._nos[chave]
+        if no.ajuste is not None:
+            _aplicar_ajuste(estado, chave, no.ajuste, valor)
+        elif no.publicar:
+            estado[chave] = valor
+        return valor
+
+
+# Grafo único do aplicativo; os nós são registrados pelos módulos das abas
+GRAFO = GrafoDerivados()
+
+__all__ = ["GRAFO", "Derivado", "GrafoDerivados", "assinatura"]
@@ -0,0 +1,274 @@
+"""Comparação de variantes de instalação pelo mesmo cálculo de custos.
+
+Uma :class:`EntradaCenario` reúne o que o orçamento precisa (dados do
+dimensionamento, percurso, transformador e os valores da aba Cálculo de
+serviço). Cada cenário é um dicionário de ajustes sobre essa entrada
+(``{"tipo_cabos": "Cabo HEPR"}``, ``{"tipo_quadro": "Metálico"}``,
+``{"transformador": ""}``...) e :func:`comparar_cenarios` avalia todos de uma
+vez pelo mesmo caminho do orçamento em lote: ``dimensionar``,
+``calcular_custos_materiais`` e ``calcular_totais_servico``.
+
+Os cenários compartilham as tabelas de preço e as buscas já feitas nelas
+(:meth:`motor_custos.TabelasMateriais.buscar`), e variantes com o mesmo
+dimensionamento o calculam uma única vez.
+
+Com ``materiais_atual``, o custo de material de cada cenário é o total da
+aba de Custos com Materiais mais a diferença calculada entre o cenário e a
+entrada original, de modo que os ajustes manuais da aba continuam valendo
+em todas as variantes.
+"""
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field, fields, replace
+from typing import Mapping, Optional
+
+import pandas as pd
+
+from dados_transformadores import obter_transformadores_padrao
+from motor_custos import (
+    TabelasMateriais,
+    calcular_custos_materiais,
+    calcular_totais_servico,
+    carregar_tabelas_materiais,
+)
+from motor_dimensionamento import DimensionamentoInput, DimensionamentoResult, dimensionar
+from motor_percursos import analisar_infra
+
+NOME_CENARIO_ATUAL = "Atual"
+
+# Grupos de opções oferecidos na comparação; cada grupo tem ajustes
+# alternativos e a combinação de grupos gera os cenários.
+OPCOES_CENARIOS = {
+    "Cabo": {
+        "Cabo PVC": {"tipo_cabos": "Cabo PVC"},
+        "Cabo HEPR": {"tipo_cabos": "Cabo HEPR"},
+    },
+    "Quadro": {
+        "Quadro PVC": {"tipo_quadro": "PVC"},
+        "Quadro metálico": {"tipo_quadro": "Metálico"},
+    },
+    "Transformador": {
+        "Sem transformador": {"transformador": ""},
+        "Com transformador": {},
+    },
+}
+
+_CAMPOS_DIMENSIONAMENTO = {campo.name for campo in fields(DimensionamentoInput)}
+
+
+@dataclass(frozen=True)
+class EntradaCenario:
+    """Dados de um orçamento usados para comparar variantes."""
+
+    dimensionamento: DimensionamentoInput
+    percursos: tuple = ()
+    tipo_servico: str = ""
+    transformador: str = ""
+    preco_transformador: float = 0.0
+    material_adicional: float = 0.0
+    total_mao_obra: float = 0.0
+    custo_deslocamento: float = 0.0
+    custo_adicional: float = 0.0
+    servicos_adicionais: float = 0.0
+    custo_emissao_trt: float = 80.0
+    custo_projeto_unifilar: float = 500.0
+    lucro_percentual: float = 35.0
+    imposto_percentual: float = 11.0
+    total_carregadores: float = 0.0
+
+
+@dataclass
+class ResultadoCenario:
+    """Dimensionamento, custos e totais de serviço de um cenário."""
+
+    nome: str
+    entrada: EntradaCenario
+    resultado: DimensionamentoResult
+    total_cabos: float = 0.0
+    total_infra_seca: float = 0.0
+    total_quadro_protecao: float = 0.0
+    total_transformador: float = 0.0
+    total_materiais: float = 0.0
+    totais: dict = field(default_factory=dict)
+
+
+def preco_transformador_padrao(produto: str) -> float:
+    """Preço da lista padrão de transformadores, ou 0."""
+    for item in obter_transformadores_padrao():
+        if item.get("Produto") == produto:
+            return float(item.get("Preço", 0.0) or 0.0)
+    return 0.0
+
+
+def aplicar_ajustes(base: EntradaCenario, ajustes: Mapping) -> EntradaCenario:
+    """Entrada do cenário: ``base`` com os campos de ``ajustes`` trocados.
+
+    Os campos de :class:`DimensionamentoInput` são aplicados ao
+    dimensionamento. Um transformador diferente do original sem preço
+    informado usa o preço da lista padrão.
+    """
+    ajustes = dict(ajustes)
+    do_dimensionamento = {
+        campo: ajustes.pop(campo)
+        for campo in list(ajustes)
+        if campo in _CAMPOS_DIMENSIONAMENTO
+    }
+    desconhecidos = set(ajustes) - {campo.name for campo in fields(EntradaCenario)}
+    if desconhecidos:
+        raise ValueError(f"Ajustes desconhecidos: {', '.join(sorted(desconhecidos))}")
+    if (
+        "transformador" in ajustes
+        and "preco_transformador" not in ajustes
+        and ajustes["transformador"] != base.transformador
+    ):
+        ajustes["preco_transformador"] = preco_transformador_padrao(
+            ajustes["transformador"]
+        )
+    if do_dimensionamento:
+        ajustes["dimensionamento"] = replace(base.dimensionamento, **do_dimensionamento)
+    return replace(base, **ajustes)
+
+
+def combinar_cenarios(grupos: Mapping[str, Mapping[str, Mapping]]) -> dict[str, dict]:
+    """Todos os cenários formados por uma opção de cada grupo.
+
+    ``grupos`` segue o formato de ``OPCOES_CENARIOS``; o nome de cada cenário
+    junta os nomes das opções escolhidas.
+    """
+    opcoes = [list(grupo.items()) for grupo in grupos.values() if grupo]
+    cenarios = {}
+    for combinacao in itertools.product(*opcoes):
+        nome = " · ".join(nome for nome, _ in combinacao)
+        ajustes: dict = {}
+        for _, ajuste in combinacao:
+            ajustes.update(ajuste)
+        cenarios[nome] = ajustes
+    return cenarios
+
+
+def avaliar_entrada(
+    nome: str,
+    entrada: EntradaCenario,
+    tabelas: TabelasMateriais,
+    dimensionamentos: dict,
+) -> ResultadoCenario:
+    """Dimensionamento e custo de material de ``entrada`` (sem os totais).
+
+    ``dimensionamentos`` guarda os dimensionamentos já calculados e pode ser
+    compartilhado entre chamadas.
+    """
+    if entrada.dimensionamento not in dimensionamentos:
+        dimensionamentos[entrada.dimensionamento] = dimensionar(entrada.dimensionamento)
+    resultado = dimensionamentos[entrada.dimensionamento]
+    # As direções só valem enquanto a distância for a do próprio percurso
+    distancia = entrada.dimensionamento.distancia_m
+    quantidades_infra = None
+    if entrada.percursos and sum(m for _, m in entrada.percursos) == distancia:
+        quantidades_infra = analisar_infra(entrada.percursos)
+    custos = calcular_custos_materiais(
+        resultado,
+        distancia,
+        entrada.dimensionamento.tipo_cabos,
+        tabelas,
+        tipo_servico=entrada.tipo_servico,
+        material_adicional=entrada.material_adicional,
+        quantidades_infra=quantidades_infra,
+    )
+    transformador = entrada.preco_transformador if entrada.transformador else 0.0
+    return ResultadoCenario(
+        nome=nome,
+        entrada=entrada,
+        resultado=resultado,
+        total_cabos=custos.total_cabos,
+        total_infra_seca=custos.total_infra_seca,
+        total_quadro_protecao=custos.total_quadro_protecao,
+        total_transformador=transformador,
+        total_materiais=custos.total + transformador,
+    )
+
+
+def totais_entrada(entrada: EntradaCenario, total_materiais: float) -> dict[str, float]:
+    """Totais do serviço de ``entrada`` com o custo de material informado."""
+    return calcular_totais_servico(
+        total_materiais,
+        entrada.total_mao_obra,
+        custo_deslocamento=entrada.custo_deslocamento,
+        custo_adicional=entrada.custo_adicional,
+        servicos_adicionais=entrada.servicos_adicionais,
+        custo_emissao_trt=entrada.custo_emissao_trt,
+        custo_projeto_unifilar=entrada.custo_projeto_unifilar,
+        lucro_percentual=entrada.lucro_percentual,
+        imposto_percentual=entrada.imposto_percentual,
+        total_carregadores=entrada.total_carregadores,
+    )
+
+
+def avaliar_cenarios(
+    base: EntradaCenario,
+    cenarios: Mapping[str, Mapping],
+    tabelas: Optional[TabelasMateriais] = None,
+    materiais_atual: Optional[float] = None,
+) -> list[ResultadoCenario]:
+    """Avalia a entrada original (``NOME_CENARIO_ATUAL``) e cada cenário."""
+    tabelas = tabelas if tabelas is not None else carregar_tabelas_materiais()
+    dimensionamentos: dict = {}
+    resultados = [avaliar_entrada(NOME_CENARIO_ATUAL, base, tabelas, dimensionamentos)]
+    for nome, ajustes in cenarios.items():
+        entrada = aplicar_ajustes(base, ajustes)
+        resultados.append(avaliar_entrada(nome, entrada, tabelas, dimensionamentos))
+
+    referencia = resultados[0].total_materiais
+    for cenario in resultados:
+        if materiais_atual is not None:
+            cenario.total_materiais = max(
+                materiais_atual + cenario.total_materiais - referencia, 0.0
+            )
+        cenario.totais = totais_entrada(cenario.entrada, cenario.total_materiais)
+    return resultados
+
+
+def comparar_cenarios(
+    base: EntradaCenario,
+    cenarios: Mapping[str, Mapping],
+    tabelas: Optional[TabelasMateriais] = None,
+    materiais_atual: Optional[float] = None,
+) -> pd.DataFrame:
+    """Tabela lado a lado dos cenários, com a diferença para o atual."""
+    resultados = avaliar_cenarios(base, cenarios, tabelas, materiais_atual)
+    tabela = pd.DataFrame(
+        [
+            {
+                "Cenário": cenario.nome,
+                "Cabo": cenario.entrada.dimensionamento.tipo_cabos,
+                "Quadro": cenario.entrada.dimensionamento.tipo_quadro,
+                "Transformador": cenario.entrada.transformador or "Sem",
+                "Bitola Fase": cenario.resultado.bitola_fase,
+                "Eletroduto": cenario.resultado.tamanho_eletroduto,
+                "Cabos": cenario.total_cabos,
+                "Infra-seca": cenario.total_infra_seca,
+                "Quadro de Proteção": cenario.total_quadro_protecao,
+                "Transformador (R$)": cenario.total_transformador,
+                "Materiais": cenario.total_materiais,
+                "Total do Serviço": cenario.totais["total_servico"],
+            }
+            for cenario in resultados
+        ]
+    )
+    tabela["Diferença"] = tabela["Total do Serviço"] - tabela["Total do Serviço"].iloc[0]
+    return tabela
+
+
+__all__ = [
+    "EntradaCenario",
+    "NOME_CENARIO_ATUAL",
+    "OPCOES_CENARIOS",
+    "ResultadoCenario",
+    "aplicar_ajustes",
+    "avaliar_cenarios",
+    "avaliar_entrada",
+    "combinar_cenarios",
+    "comparar_cenarios",
+    "preco_transformador_padrao",
+    "totais_entrada",
+]
@@ -0,0 +1,1193 @@
+"""Regras de custo de materiais independentes da interface.
+
+Reúne a preparação das tabelas de preço (cabos, eletrodutos, quadro de
+proteção) e as buscas de preço usadas pela aba de Custos com Materiais. Não
+depende do Streamlit, de modo que o mesmo cálculo pode ser usado em lotes e
+scripts a partir de um ``DimensionamentoResult``.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import unicodedata
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import pandas as pd
+
+from catalogo_precos import converter_coluna_moeda, obter_tabela_precos
+
+# Sealtubo usado quando a tabela de eletrodutos não tem as linhas de sealtubo
+SEALTUBO_PADRAO = {
+    "Categoria": [
+        f"Eletroduto de {t}" for t in ["¾", "1", "1 ¼", "1 ½", "2"]
+    ],
+    "Sealtubo": [
+        f"Sealtubo com capa {t}\"" for t in ["3/4", "1", "1 1/4", "1 1/2", "2"]
+    ],
+    "Preco": [8.70, 10.69, 17.28, 19.65, 26.31],
+}
+
+# Descrição das linhas de sealtubo na tabela de eletrodutos
+MATERIAL_SEALTUBO = "Flexivel Sealtubo c/capa"
+
+# Acessórios de infra-seca: padrões buscados na coluna "Material" da tabela
+# de eletrodutos e rótulo fixo (ou ``None`` para usar o próprio material)
+ACESSORIOS_INFRA = {
+    "eletroduto": (("Eletroduto Galv Pre-Zinc",), None),
+    "condulete": (
+        ("Condulete s/rosca", r"(?:C|LL|LR|X)$"),
+        "Condulete s/rosca {tamanho} C/LL/LR/X",
+    ),
+    "condulete_t": (("Condulete s/rosca", r"T$"), "Condulete s/rosca {tamanho} T"),
+    "unidut_reto": (("Unidut Reto comum",), None),
+    "unidut_conico": (("Unidut Conico comum",), None),
+    "unilet": (("Unilet comum 90º",), None),
+    "curva_galv_eletro_90": ((r"Curva Galv Eletro\s*90º",), None),
+    "abracadeira": (("Abraçadeira D e cunha",), None),
+}
+
+SERVICOS_SEM_QUADRO = {"Análise de Energia", "Manutenção Corretiva"}
+
+
+def normalizar_texto(valor) -> str:
+    """Remove acentos e pontuação, deixando apenas palavras em minúsculas."""
+    if valor is None:
+        valor = ""
+    valor = unicodedata.normalize("NFKD", str(valor))
+    valor = "".join(ch for ch in valor if not unicodedata.combining(ch))
+    valor = valor.lower()
+    valor = re.sub(r"[^a-z0-9]+", " ", valor)
+    return valor.strip()
+
+
+def extrair_bitola(valor) -> float:
+    """Extrai o valor numérico de uma bitola, retornando 0 se inválido."""
+    match = re.search(r"(\d+(?:[.,]\d+)?)", str(valor))
+    return float(match.group(1).replace(",", ".")) if match else 0.0
+
+
+def _limpar_polegadas(valor) -> str:
+    """Remove aspas retas e tipográficas de uma medida em polegadas."""
+    return re.sub(r'["”]', "", str(valor)).strip()
+
+
+# Frações de polegada como escritas nas categorias "Eletroduto de <tamanho>"
+_FRACOES_POLEGADA = {"1/4": "¼", "1/2": "½", "3/4": "¾"}
+
+
+def _tamanho_polegadas(descricao) -> str:
+    """Tamanho em polegadas no fim da descrição, com frações em um caractere.
+
+    ``"Sealtubo com capa 1 1/2\""`` -> ``"1 ½"``; ``""`` se não houver.
+    """
+    match = re.search(r"(\d+(?:\s+\d/\d)?|\d/\d)\s*$", _limpar_polegadas(descricao))
+    if not match:
+        return ""
+    partes = [_FRACOES_POLEGADA.get(parte, parte) for parte in match.group(1).split()]
+    return " ".join(partes)
+
+
+def _coluna_preco_numerica(df: pd.DataFrame) -> pd.Series:
+    """Retorna a coluna "Preco" em float64 (ou zeros se ausente)."""
+    if "Preco" in df.columns:
+        return converter_coluna_moeda(df["Preco"])
+    return pd.Series(0.0, index=df.index)
+
+
+def _coluna_material(df: pd.DataFrame) -> pd.Series:
+    """Retorna a coluna "Material" como texto (ou vazia se ausente)."""
+    if "Material" in df.columns:
+        return df["Material"].astype(str)
+    return pd.Series("", index=df.index, dtype=object)
+
+
+# --- Cabos -----------------------------------------------------------------
+
+
+def colunas_cabo(tipo_cabos: str) -> tuple[str, str, str]:
+    """Retorna (rótulo, coluna do cabo, coluna de preço) para o tipo de cabo."""
+    if "HEPR" in str(tipo_cabos).upper():
+        return "HEPR", "Cabo 1kV", "Preco 1kV"
+    return "PVC", "Cabo 750V", "Preco 750V"
+
+
+def preparar_precos_cabos(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Converte os preços e extrai a bitola (mm²) das colunas de cabo."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    for col_cabo, col_preco in (
+        ("Cabo 750V", "Preco 750V"),
+        ("Cabo 1kV", "Preco 1kV"),
+    ):
+        df[col_preco] = converter_coluna_moeda(df[col_preco])
+        df[f"_Bitola {col_cabo}"] = (
+            df[col_cabo]
+            .astype(str)
+            .str.extract(r"(\d+(?:[.,]\d+)?)\s*mm")[0]
+            .str.replace(",", ".")
+            .astype(float)
+        )
+    return df
+
+
+def obter_preco_cabo(df_cabos: pd.DataFrame, bitola: float, tipo_cabos: str) -> float:
+    """Retorna o preço por metro do cabo da bitola e tipo informados."""
+    if bitola <= 0 or df_cabos.empty:
+        return 0.0
+    _, col_cabo, col_preco = colunas_cabo(tipo_cabos)
+    preco_match = df_cabos.loc[df_cabos[f"_Bitola {col_cabo}"] == bitola, col_preco]
+    if preco_match.empty:
+        return 0.0
+    return float(preco_match.iloc[0])
+
+
+def quantidade_condutores(
+    instalacao: str, bitola_fase: float, bitola_neutro: float, bitola_terra: float
+) -> tuple[int, int, int]:
+    """Quantidade de condutores (preto, azul, verde) lançados por percurso."""
+    if bitola_fase > 0:
+        preto = {"Monofásico": 1, "Bifásico": 2, "Trifásico": 3}.get(instalacao, 1)
+    else:
+        preto = 0
+    azul = 1 if bitola_neutro > 0 and instalacao != "Bifásico" else 0
+    verde = 1 if bitola_terra > 0 else 0
+    return preto, azul, verde
+
+
+# --- Infra-seca ------------------------------------------------------------
+
+
+def preparar_precos_eletrodutos(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Normaliza a categoria (sem aspas) e converte os preços dos eletrodutos."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.copy()
+    df["Categoria"] = (
+        df["Categoria"]
+        .astype(str)
+        .str.replace("”", "", regex=False)
+        .str.replace('"', "", regex=False)
+        .str.strip()
+    )
+    df["Preco"] = converter_coluna_moeda(df["Preco"])
+    return df
+
+
+def preparar_precos_sealtubo(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Normaliza categoria e descrição (sem aspas) e converte os preços de sealtubo."""
+    if df is None:
+        df = pd.DataFrame(SEALTUBO_PADRAO)
+    if df.empty:
+        return df
+    df = df.copy()
+    for coluna in ("Categoria", "Sealtubo"):
+        if coluna not in df.columns:
+            continue
+        df[coluna] = (
+            df[coluna]
+            .astype(str)
+            .str.replace("”", "", regex=False)
+            .str.replace('"', "", regex=False)
+            .str.strip()
+        )
+    df["Preco"] = converter_coluna_moeda(df["Preco"])
+    return df
+
+
+class _IndiceInfra:
+    """Acessórios de infra-seca por tamanho de eletroduto.
+
+    Monta, uma vez por versão do catálogo, o dicionário
+    ``{tamanho: {tipo: (material, preço)}}`` com a primeira linha de cada
+    categoria "Eletroduto de <tamanho>" que atende aos padrões de cada tipo
+    de ``ACESSORIOS_INFRA``.
+    """
+
+    def __init__(self, df_eletrodutos: pd.DataFrame):
+        padroes = {
+            tipo: [re.compile(padrao, re.IGNORECASE) for padrao in padroes_tipo]
+            for tipo, (padroes_tipo, _) in ACESSORIOS_INFRA.items()
+        }
+        self.por_categoria: dict[str, dict[str, tuple[str, float]]] = {}
+        for categoria, material, preco in zip(
+            df_eletrodutos["Categoria"].tolist(),
+            df_eletrodutos["Material"].tolist(),
+            df_eletrodutos["Preco"].tolist(),
+        ):
+            acessorios = self.por_categoria.setdefault(str(categoria), {})
+            material = str(material)
+            for tipo, compilados in padroes.items():
+                if tipo in acessorios:
+                    continue
+                if all(padrao.search(material) for padrao in compilados):
+                    acessorios[tipo] = (material, float(preco))
+
+
+def sealtubo_de_eletrodutos(df: pd.DataFrame | None) -> pd.DataFrame | None:
+    """Tabela de sealtubo (``Categoria``, ``Sealtubo``, ``Preco``) tirada da
+    de eletrodutos.
+
+    O sealtubo é editado e gravado como parte de ``valores_eletrodutos.csv``;
+    a ``Categoria`` ("Eletroduto de <tamanho>") é mantida para a busca pelo
+    tamanho do eletroduto. Retorna ``None`` se a tabela não tiver essas
+    linhas.
+    """
+    if df is None or "Material" not in df.columns:
+        return None
+    linhas = df[
+        df["Material"].astype(str).str.contains(MATERIAL_SEALTUBO, case=False, regex=False)
+    ]
+    if linhas.empty:
+        return None
+    colunas = [c for c in ("Categoria", "Material", "Preco") if c in linhas.columns]
+    return (
+        linhas[colunas]
+        .rename(columns={"Material": "Sealtubo"})
+        .reset_index(drop=True)
+    )
+
+
+class _IndiceSealtubo:
+    """Sealtubo de cada tamanho de eletroduto.
+
+    Monta, uma vez por versão do catálogo, o dicionário
+    ``{categoria: (material, preço)}`` com a primeira linha de cada categoria
+    "Eletroduto de <tamanho>", assim como ``_IndiceInfra``. Tabelas sem a
+    coluna ``Categoria`` (um ``valores_sealtubo.csv`` próprio) usam o tamanho
+    no fim da descrição.
+    """
+
+    def __init__(self, df_sealtubo: pd.DataFrame):
+        descricoes = df_sealtubo["Sealtubo"].astype(str).tolist()
+        if "Categoria" in df_sealtubo.columns:
+            categorias = df_sealtubo["Categoria"].astype(str).tolist()
+        else:
+            categorias = [""] * len(descricoes)
+        self.por_categoria: dict[str, tuple[str, float]] = {}
+        for categoria, descricao, preco in zip(
+            categorias, descricoes, df_sealtubo["Preco"].tolist()
+        ):
+            if not categoria.strip() or categoria == "nan":
+                tamanho = _tamanho_polegadas(descricao)
+                if not tamanho:
+                    continue
+                categoria = f"Eletroduto de {tamanho}"
+            self.por_categoria.setdefault(
+                categoria, (_limpar_polegadas(descricao), float(preco))
+            )
+
+
+def obter_acessorios_infra(
+    df_eletrodutos: pd.DataFrame, tamanho: str, df_sealtubo: pd.DataFrame | None = None
+) -> dict[str, tuple[str, float]]:
+    """Retorna ``{tipo: (material, preço)}`` de todos os acessórios do eletroduto.
+
+    Inclui todos os tipos de ``ACESSORIOS_INFRA`` (("", 0.0) quando o
+    catálogo não tem o item) e, se ``df_sealtubo`` for informado, o
+    ``"sealtubo"``.
+    """
+    tamanho = _limpar_polegadas(tamanho)
+    acessorios = dict.fromkeys(ACESSORIOS_INFRA, ("", 0.0))
+    if df_sealtubo is not None:
+        acessorios["sealtubo"] = obter_sealtubo(df_sealtubo, tamanho)
+    if not tamanho or df_eletrodutos.empty:
+        return acessorios
+    indice = _indice_catalogo(
+        df_eletrodutos, _IndiceInfra, ["Categoria", "Material", "Preco"]
+    )
+    for tipo, (material, preco) in indice.por_categoria.get(
+        f"Eletroduto de {tamanho}", {}
+    ).items():
+        rotulo = ACESSORIOS_INFRA[tipo][1]
+        if rotulo is None:
+            material = _limpar_polegadas(material)
+        else:
+            material = rotulo.format(tamanho=tamanho)
+        acessorios[tipo] = (material, preco)
+    return acessorios
+
+
+def obter_acessorio_infra(
+    df_eletrodutos: pd.DataFrame, tamanho: str, tipo: str
+) -> tuple[str, float]:
+    """Retorna (material, preço) do acessório ``tipo`` para o eletroduto."""
+    return obter_acessorios_infra(df_eletrodutos, tamanho)[tipo]
+
+
+def obter_sealtubo(df_sealtubo: pd.DataFrame, tamanho: str) -> tuple[str, float]:
+    """Retorna (material, preço) do sealtubo compatível com o eletroduto."""
+    tamanho = _limpar_polegadas(tamanho)
+    if not tamanho or df_sealtubo.empty:
+        return "", 0.0
+    colunas = [c for c in ("Categoria", "Sealtubo", "Preco") if c in df_sealtubo.columns]
+    indice = _indice_catalogo(df_sealtubo, _IndiceSealtubo, colunas)
+    return indice.por_categoria.get(f"Eletroduto de {tamanho}", ("", 0.0))
+
+
+def sugerir_quantidades_infra(soma_distancias: float) -> dict[str, float]:
+    """Quantidades sugeridas de cada item de infra-seca para o percurso total."""
+    barras = soma_distancias / 3
+    return {
+        "eletroduto": math.ceil(barras) if soma_distancias else 0,
+        "condulete": math.ceil(barras * 1.5) if soma_distancias else 0,
+        "condulete_t": 1,
+        "unidut_reto": math.ceil(barras * 1.5) if soma_distancias else 0,
+        "unidut_conico": 3,
+        "curva_galv_eletro_90": math.ceil(barras * 1.2) if soma_distancias else 0,
+        "unilet": 0,
+        "abracadeira": soma_distancias,
+        "sealtubo": round(soma_distancias / 20, 2) if soma_distancias else 0.0,
+    }
+
+
+# --- Quadro de proteção ----------------------------------------------------
+
+
+# Padrões dos atributos de disjuntores, IDR e DPS na descrição do material
+_PADRAO_POLOS = re.compile(r"\b(1\s*P\s*\+\s*N|[1-4]\s*P)\b", re.IGNORECASE)
+_PADRAO_POLOS_NOME = re.compile(r"\b(mono|bi|tri|tetra)polar\b", re.IGNORECASE)
+_PADRAO_CORRENTE = re.compile(r"(\d+(?:[.,]\d+)?)\s*A(?:mp\w*)?\b", re.IGNORECASE)
+_PADRAO_KA = re.compile(r"(\d+(?:[.,]\d+)?)\s*kA\b", re.IGNORECASE)
+_PADRAO_SENSIBILIDADE = re.compile(r"(\d+)\s*mA\b", re.IGNORECASE)
+_PADRAO_CURVA = re.compile(r"\bcurva\s*([BCD])\b", re.IGNORECASE)
+_PADRAO_TIPO = re.compile(
+    r"\b(?:tipo|classe)\s*(III|II|I|[1-3]|AC|A|B|F)\b", re.IGNORECASE
+)
+_POLOS_POR_NOME = {"mono": "1P", "bi": "2P", "tri": "3P", "tetra": "4P"}
+_TIPOS_ROMANOS = {"I": "1", "II": "2", "III": "3"}
+
+# Colunas estruturadas dos catálogos de dispositivos de proteção
+COLUNAS_DISPOSITIVO = ("_Polos", "_Corrente", "_Ka", "_Sensibilidade", "_Curva", "_Tipo")
+
+
+@dataclass(frozen=True)
+class AtributosDispositivo:
+    """Atributos de um disjuntor, IDR ou DPS lidos da descrição."""
+
+    polos: str | None = None
+    corrente: float | None = None
+    ka: float | None = None
+    sensibilidade: float | None = None
+    curva: str | None = None
+    tipo: str | None = None
+
+
+def _numero_decimal(texto: str) -> float:
+    return float(texto.replace(",", "."))
+
+
+@lru_cache(maxsize=4096)
+def atributos_dispositivo(descricao) -> AtributosDispositivo:
+    """Lê polos, corrente, kA, sensibilidade, curva e tipo da descrição.
+
+    "1P+N" conta como 2P, e "bipolar"/"tripolar" etc. equivalem a 2P/3P. A
+    corrente nominal ignora valores em kA e mA.
+    """
+    texto = str(descricao or "")
+    polos = None
+    match = _PADRAO_POLOS.search(texto)
+    if match:
+        polos = re.sub(r"\s+", "", match.group(1)).upper()
+        if polos == "1P+N":
+            polos = "2P"
+    else:
+        match = _PADRAO_POLOS_NOME.search(texto)
+        if match:
+            polos = _POLOS_POR_NOME[match.group(1).lower()]
+
+    match = _PADRAO_CORRENTE.search(texto)
+    corrente = _numero_decimal(match.group(1)) if match else None
+    match = _PADRAO_KA.search(texto)
+    ka = _numero_decimal(match.group(1)) if match else None
+    match = _PADRAO_SENSIBILIDADE.search(texto)
+    sensibilidade = float(match.group(1)) if match else None
+    match = _PADRAO_CURVA.search(texto)
+    curva = match.group(1).upper() if match else None
+    match = _PADRAO_TIPO.search(texto)
+    tipo = None
+    if match:
+        tipo = match.group(1).upper()
+        tipo = _TIPOS_ROMANOS.get(tipo, tipo)
+    return AtributosDispositivo(polos, corrente, ka, sensibilidade, curva, tipo)
+
+
+def _preparar_precos_dispositivos(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Prepara um catálogo de dispositivos com os atributos em colunas."""
+    if df is None or df.empty:
+        return pd.DataFrame(
+            columns=["Material", "Preco", "_PrecoNumerico", *COLUNAS_DISPOSITIVO]
+        )
+    df = df.copy()
+    df["Material"] = _coluna_material(df)
+    df["_PrecoNumerico"] = _coluna_preco_numerica(df)
+    atributos = [atributos_dispositivo(material) for material in df["Material"]]
+    df["_Polos"] = [a.polos or "" for a in atributos]
+    df["_Curva"] = [a.curva or "" for a in atributos]
+    df["_Tipo"] = [a.tipo or "" for a in atributos]
+    for coluna, campo in (
+        ("_Corrente", "corrente"),
+        ("_Ka", "ka"),
+        ("_Sensibilidade", "sensibilidade"),
+    ):
+        df[coluna] = pd.to_numeric(
+            [getattr(a, campo) for a in atributos], errors="coerce"
+        ).astype(float)
+    return df
+
+
+def preparar_precos_disjuntores(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Prepara a tabela de disjuntores DIN com preço, polos, corrente e curva."""
+    return _preparar_precos_dispositivos(df)
+
+
+def preparar_precos_idr(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Prepara a tabela de IDR extraindo polos, corrente e sensibilidade."""
+    return _preparar_precos_dispositivos(df)
+
+
+def preparar_precos_dps(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Prepara a tabela de DPS extraindo corrente (kA) e tipo."""
+    return _preparar_precos_dispositivos(df)
+
+
+def _preparar_precos_normalizados(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Prepara tabelas buscadas pelo texto normalizado do material."""
+    if df is None or df.empty:
+        return pd.DataFrame(
+            columns=["Material", "Preco", "_PrecoNumerico", "_MaterialNormalizado"]
+        )
+    df = df.copy()
+    df["Material"] = _coluna_material(df).str.replace("×", "x", regex=False)
+    df["_PrecoNumerico"] = _coluna_preco_numerica(df)
+    df["_MaterialNormalizado"] = df["Material"].apply(normalizar_texto)
+    return df
+
+
+def preparar_precos_barra_pente(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Prepara a tabela de barras pente com o material normalizado."""
+    return _preparar_precos_normalizados(df)
+
+
+def preparar_precos_paineis(df: pd.DataFrame | None) -> pd.DataFrame:
+    """Prepara a tabela de painéis e quadros com o material normalizado."""
+    return _preparar_precos_normalizados(df)
+
+
+def sugerir_quantidade_componente(descricao: str) -> float:
+    """Lê a quantidade indicada no início da descrição ("2x ..."), ou 1."""
+    if not descricao:
+        return 1.0
+    match = re.match(r"\s*(\d+(?:[.,]\d+)?)\s*[xX]", descricao)
+    if match:
+        try:
+            return float(match.group(1).replace(",", "."))
+        except ValueError:
+            return 1.0
+    return 1.0
+
+
+# --- Índices dos catálogos ---------------------------------------------------
+
+# Índices mantidos em memória (um por tipo de índice e versão do catálogo)
+_MAXIMO_INDICES = 16
+_INDICES: OrderedDict[tuple, object] = OrderedDict()
+_ULTIMOS_INDICES: dict[type, tuple] = {}
+
+
+def _indice_catalogo(df: pd.DataFrame, tipo_indice: type, colunas: list[str]):
+    """Índice ``tipo_indice(df)``, reconstruído apenas quando o conteúdo muda.
+
+    A versão é o resumo das ``colunas``; o mesmo DataFrame (tabelas
+    preparadas não são alteradas depois) reaproveita o índice sem recalcular
+    o resumo.
+    """
+    ultimo = _ULTIMOS_INDICES.get(tipo_indice)
+    if ultimo is not None and ultimo[0]() is df:
+        return ultimo[1]
+    versao = hashlib.blake2b(
+        pd.util.hash_pandas_object(df[colunas], index=False).to_numpy().tobytes(),
+        digest_size=16,
+    ).digest()
+    chave = (tipo_indice, versao)
+    indice = _INDICES.get(chave)
+    if indice is None:
+        indice = _INDICES[chave] = tipo_indice(df)
+        if len(_INDICES) > _MAXIMO_INDICES:
+            _INDICES.popitem(last=False)
+    else:
+        _INDICES.move_to_end(chave)
+    _ULTIMOS_INDICES[tipo_indice] = (weakref.ref(df), indice)
+    return indice
+
+
+class _IndiceDispositivos:
+    """Índice de preços de um catálogo de dispositivos de proteção.
+
+    ``NIVEIS`` lista as combinações de atributos usadas na busca, da mais
+    específica para a mais genérica; o último atributo de cada nível é a
+    especificação nominal (corrente ou kA). Para cada nível há um dicionário
+    atributos -> preço (primeira linha do catálogo com preço) e, por grupo
+    dos demais atributos, as especificações disponíveis para a busca da
+    próxima acima.
+    """
+
+    NIVEIS: tuple[tuple[str, ...], ...] = ()
+
+    def __init__(self, df: pd.DataFrame):
+        if not set(COLUNAS_DISPOSITIVO) <= set(df.columns):
+            df = _preparar_precos_dispositivos(df)
+        linhas = [
+            (
+                AtributosDispositivo(
+                    polos or None,
+                    None if pd.isna(corrente) else float(corrente),
+                    None if pd.isna(ka) else float(ka),
+                    None if pd.isna(sensibilidade) else float(sensibilidade),
+                    curva or None,
+                    tipo or None,
+                ),
+                float(preco),
+            )
+            for polos, corrente, ka, sensibilidade, curva, tipo, preco in zip(
+                *(df[coluna].tolist() for coluna in COLUNAS_DISPOSITIVO),
+                df["_PrecoNumerico"].tolist(),
+            )
+            if not pd.isna(preco)
+        ]
+        self._exatos: list[dict[tuple, float]] = []
+        self._grupos: list[dict[tuple, dict[float, float]]] = []
+        for campos in self.NIVEIS:
+            exatos: dict[tuple, float] = {}
+            grupos: dict[tuple, dict[float, float]] = {}
+            for atributos, preco in linhas:
+                chave = tuple(getattr(atributos, campo) for campo in campos)
+                if None in chave:
+                    continue
+                exatos.setdefault(chave, preco)
+                grupos.setdefault(chave[:-1], {}).setdefault(chave[-1], preco)
+            self._exatos.append(exatos)
+            self._grupos.append(grupos)
+
+    def preco(self, atributos: AtributosDispositivo) -> float:
+        """Preço exato ou, sem ele, o da menor especificação nominal acima.
+
+        Um dispositivo menor que o pedido não o substitui: sem especificação
+        igual ou maior no catálogo retorna 0.0, para o chamador sinalizar o
+        item sem preço.
+        """
+        chaves = [
+            tuple(getattr(atributos, campo) for campo in campos)
+            for campos in self.NIVEIS
+        ]
+        for chave, exatos in zip(chaves, self._exatos):
+            if None not in chave and chave in exatos:
+                return exatos[chave]
+        for chave, grupos in zip(chaves, self._grupos):
+            if None in chave[:-1]:
+                continue
+            disponiveis = grupos.get(chave[:-1])
+            if not disponiveis:
+                continue
+            pedido = chave[-1]
+            if pedido is None:
+                return next(iter(disponiveis.values()))
+            acima = [valor for valor in disponiveis if valor >= pedido]
+            if acima:
+                return disponiveis[min(acima)]
+        return 0.0
+
+
+class _IndiceDisjuntores(_IndiceDispositivos):
+    NIVEIS = (("polos", "curva", "corrente"), ("polos", "corrente"))
+
+
+class _IndiceIdr(_IndiceDispositivos):
+    NIVEIS = (
+        ("polos", "sensibilidade", "tipo", "corrente"),
+        ("polos", "sensibilidade", "corrente"),
+        ("polos", "corrente"),
+    )
+
+
+class _IndiceDps(_IndiceDispositivos):
+    NIVEIS = (("tipo", "ka"), ("ka",))
+
+
+def _preco_dispositivo(df: pd.DataFrame, descricao: str, tipo_indice: type) -> float:
+    if not descricao or df.empty:
+        return 0.0
+    indice = _indice_catalogo(df, tipo_indice, ["Material", "_PrecoNumerico"])
+    return indice.preco(atributos_dispositivo(descricao))
+
+
+def obter_preco_disjuntor(df_disjuntores: pd.DataFrame, descricao: str) -> float:
+    """Retorna o preço do disjuntor com base na tabela de atualização.
+
+    Busca por polos, curva e corrente nominal; sem a corrente exata no
+    catálogo, usa a próxima corrente acima com os mesmos polos.
+    """
+    atributos = atributos_dispositivo(descricao)
+    if atributos.polos is None or atributos.corrente is None:
+        return 0.0
+    return _preco_dispositivo(df_disjuntores, descricao, _IndiceDisjuntores)
+
+
+def obter_preco_idr(df_idr: pd.DataFrame, descricao: str) -> float:
+    """Retorna o preço do IDR correspondente à descrição informada.
+
+    Busca por polos, sensibilidade, tipo e corrente; sem a corrente exata,
+    usa a próxima corrente acima com os mesmos polos.
+    """
+    atributos = atributos_dispositivo(descricao)
+    if atributos.polos is None or atributos.corrente is None:
+        return 0.0
+    return _preco_dispositivo(df_idr, descricao, _IndiceIdr)
+
+
+def obter_preco_dps(df_dps: pd.DataFrame, descricao: str) -> float:
+    """Retorna o preço do DPS correspondente à descrição informada.
+
+    Busca por tipo e corrente de descarga (kA); sem o kA exato, usa o
+    próximo kA acima do mesmo tipo.
+    """
+    atributos = atributos_dispositivo(descricao)
+    if atributos.ka is None and atributos.tipo is None:
+        return 0.0
+    return _preco_dispositivo(df_dps, descricao, _IndiceDps)
+
+
+# Palavras da descrição ignoradas na busca aproximada de quadros
+_PALAVRAS_IGNORADAS_QUADRO = frozenset({"quadro", "de", "posicoes", "posicao"})
+
+
+class _IndicePaineis:
+    """Índice invertido do catálogo de painéis e quadros.
+
+    Cada palavra do material normalizado aponta para as linhas (posições) em
+    que aparece. As buscas da descrição são por trecho ("12" encontra
+    "120x80"), como no ``str.contains`` original: o trecho é procurado uma
+    única vez no vocabulário, bem menor que o catálogo, e o conjunto de
+    linhas resultante fica memorizado.
+    """
+
+    def __init__(self, df_paineis: pd.DataFrame):
+        materiais = df_paineis["_MaterialNormalizado"].tolist()
+        self.precos = df_paineis["_PrecoNumerico"].tolist()
+        self.todas = frozenset(range(len(materiais)))
+        self._palavras: dict[str, set[int]] = {}
+        for posicao, material in enumerate(materiais):
+            if not isinstance(material, str):
+                continue
+            for palavra in material.split():
+                self._palavras.setdefault(palavra, set()).add(posicao)
+        self._trechos: dict[str, frozenset[int]] = {}
+
+    def linhas_com(self, trecho: str) -> frozenset[int]:
+        """Linhas cujo material normalizado contém ``trecho``."""
+        try:
+            return self._trechos[trecho]
+        except KeyError:
+            linhas = set()
+            for palavra, posicoes in self._palavras.items():
+                if trecho in palavra:
+                    linhas.update(posicoes)
+            resultado = self._trechos[trecho] = frozenset(linhas)
+            return resultado
+
+    def preco(self, posicao: int) -> float:
+        preco = self.precos[posicao]
+        return 0.0 if pd.isna(preco) else float(preco)
+
+
+def _indice_paineis(df_paineis: pd.DataFrame) -> _IndicePaineis:
+    return _indice_catalogo(
+        df_paineis, _IndicePaineis, ["_MaterialNormalizado", "_PrecoNumerico"]
+    )
+
+
+def obter_preco_quadro(
+    df_paineis: pd.DataFrame, descricao: str, titulo_componente: str
+) -> float:
+    """Retorna o preço do quadro ou painel informado.
+
+    Os candidatos são filtrados pelo tipo (PVC/metálico) e por cada número da
+    descrição, ficando com o primeiro do catálogo. Sem candidatos, vale a
+    linha com mais palavras da descrição em comum (a primeira, no empate).
+    """
+    if not descricao or df_paineis.empty:
+        return 0.0
+
+    descricao = str(descricao).replace("×", "x")
+    desc_norm = normalizar_texto(descricao)
+    if not desc_norm:
+        return 0.0
+
+    indice = _indice_paineis(df_paineis)
+    titulo_norm = normalizar_texto(titulo_componente)
+
+    if "pvc" in titulo_norm:
+        candidatos = indice.linhas_com("pvc")
+    elif "metal" in titulo_norm:
+        candidatos = indice.linhas_com("metal")
+    else:
+        candidatos = indice.todas
+
+    for numero in re.findall(r"\d+", desc_norm):
+        if not candidatos:
+            break
+        candidatos = candidatos & indice.linhas_com(numero)
+
+    if candidatos:
+        return indice.preco(min(candidatos))
+
+    pontuacao: dict[int, int] = {}
+    for token in desc_norm.split():
+        if token in _PALAVRAS_IGNORADAS_QUADRO:
+            continue
+        for posicao in indice.linhas_com(token):
+            pontuacao[posicao] = pontuacao.get(posicao, 0) + 1
+    validas = [
+        (pontos, -posicao)
+        for posicao, pontos in pontuacao.items()
+        if not pd.isna(indice.precos[posicao])
+    ]
+    if not validas:
+        return 0.0
+    _, posicao = max(validas)
+    return indice.preco(-posicao)
+
+
+def obter_preco_barra_pente(
+    df_barra_pente: pd.DataFrame,
+    descricao: str,
+    dps_descricao: str,
+    instalacao: str = "",
+) -> float:
+    """Retorna o preço da barra pente associado ao DPS informado."""
+    if df_barra_pente.empty:
+        return 0.0
+
+    descricao_norm = normalizar_texto(descricao)
+    dps_norm = normalizar_texto(dps_descricao)
+    instalacao_norm = normalizar_texto(instalacao)
+
+    chaves_busca = []
+    if re.search(r"\btri", descricao_norm) or "tripolar" in descricao_norm:
+        chaves_busca.append("tri")
+    if re.search(r"\bbip?", descricao_norm) or "bipolar" in descricao_norm:
+        chaves_busca.append("bif")
+    if "monopolar" in descricao_norm or "mono" in descricao_norm:
+        chaves_busca.append("mono")
+
+    if not chaves_busca and dps_norm:
+        quantidade_match = re.search(r"(\d+)x", dps_norm)
+        if quantidade_match:
+            try:
+                quantidade = int(quantidade_match.group(1))
+                if quantidade >= 3:
+                    chaves_busca.append("tri")
+                else:
+                    chaves_busca.append("bif")
+            except ValueError:
+                pass
+
+    if not chaves_busca and instalacao_norm:
+        if "tri" in instalacao_norm:
+            chaves_busca.append("tri")
+        elif "bi" in instalacao_norm or "bif" in instalacao_norm:
+            chaves_busca.append("bif")
+        elif "mono" in instalacao_norm:
+            chaves_busca.append("mono")
+
+    if not chaves_busca:
+        chaves_busca = ["bif", "tri", "mono"]
+
+    chaves_busca = list(dict.fromkeys(chaves_busca))
+
+    for chave in chaves_busca:
+        mask = df_barra_pente["_MaterialNormalizado"].str.contains(chave, na=False)
+        linha_correspondente = df_barra_pente.loc[mask]
+        if not linha_correspondente.empty:
+            preco = linha_correspondente.iloc[0].get("_PrecoNumerico")
+            if not pd.isna(preco):
+                return float(preco)
+
+    preco_fallback = df_barra_pente.iloc[0].get("_PrecoNumerico")
+    if pd.isna(preco_fallback):
+        return 0.0
+    return float(preco_fallback)
+
+
+# --- Custo completo --------------------------------------------------------
+
+
+@dataclass
+class TabelasMateriais:
+    """Tabelas de preço já preparadas para as buscas de material."""
+
+    cabos: pd.DataFrame
+    eletrodutos: pd.DataFrame
+    sealtubo: pd.DataFrame
+    disjuntores: pd.DataFrame
+    idr: pd.DataFrame
+    dps: pd.DataFrame
+    barra_pente: pd.DataFrame
+    paineis: pd.DataFrame
+    _buscas: dict = field(default_factory=dict, repr=False)
+
+    def buscar(self, funcao, tabela: pd.DataFrame, *args):
+        """Executa ``funcao(tabela, *args)`` memorizando o resultado.
+
+        As tabelas não mudam depois de carregadas, então cada combinação de
+        argumentos é buscada nos DataFrames uma única vez.
+        """
+        chave = (funcao.__name__, *args)
+        try:
+            return self._buscas[chave]
+        except KeyError:
+            resultado = self._buscas[chave] = funcao(tabela, *args)
+            return resultado
+
+
+@dataclass
+class CustosMateriais:
+    """Totais de material de um orçamento, por bloco da aba de Custos."""
+
+    total_cabos: float = 0.0
+    total_infra_seca: float = 0.0
+    total_quadro_protecao: float = 0.0
+    total_material_adicional: float = 0.0
+    itens: list[dict] = field(default_factory=list)
+    avisos: list[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        return (
+            self.total_cabos
+            + self.total_infra_seca
+            + self.total_quadro_protecao
+            + self.total_material_adicional
+        )
+
+
+def _ler_catalogo(caminho: str) -> pd.DataFrame | None:
+    """Lê uma tabela ``valores_*.csv`` do catálogo, ou ``None`` se ausente."""
+    try:
+        return obter_tabela_precos(caminho, sep=";", converter_precos=True)
+    except FileNotFoundError:
+        return None
+
+
+def carregar_tabelas_materiais(
+    tabelas: Mapping[str, pd.DataFrame | None] | None = None,
+) -> TabelasMateriais:
+    """Carrega e prepara as tabelas de preço a partir dos CSVs do catálogo.
+
+    ``tabelas`` pode trazer, pelo nome do CSV, tabelas já carregadas (as
+    do catálogo compartilhado, por exemplo); as demais são lidas do disco.
+    Sem ``valores_sealtubo.csv`` o sealtubo vem das linhas da tabela de
+    eletrodutos.
+    """
+    tabelas = tabelas or {}
+
+    def _tabela(caminho: str) -> pd.DataFrame | None:
+        tabela = tabelas.get(caminho)
+        return _ler_catalogo(caminho) if tabela is None else tabela
+
+    eletrodutos = _tabela("valores_eletrodutos.csv")
+    sealtubo = tabelas.get("valores_sealtubo.csv")
+    if sealtubo is None:
+        sealtubo = sealtubo_de_eletrodutos(eletrodutos)
+    return TabelasMateriais(
+        cabos=preparar_precos_cabos(_tabela("valores_cabos.csv")),
+        eletrodutos=preparar_precos_eletrodutos(eletrodutos),
+        sealtubo=preparar_precos_sealtubo(sealtubo),
+        disjuntores=preparar_precos_disjuntores(_tabela("valores_disjuntor_din.csv")),
+        idr=preparar_precos_idr(_tabela("valores_idr.csv")),
+        dps=preparar_precos_dps(_tabela("valores_dps.csv")),
+        barra_pente=preparar_precos_barra_pente(_tabela("valores_barra_pente.csv")),
+        paineis=preparar_precos_paineis(_tabela("valores_paineis_quadros.csv")),
+    )
+
+
+def avisos_materiais(
+    bitola_fase: str, disjuntor: str, idr: str, soma_distancias: float
+) -> list[str]:
+    """Itens sem dimensionamento que ficariam fora do custo de material.
+
+    Sem bitola de fase, disjuntor ou IDR os totais somariam zero para esses
+    itens; os avisos deixam a ausência explícita no orçamento.
+    """
+    if soma_distancias <= 0:
+        return []
+    avisos = []
+    if extrair_bitola(bitola_fase) <= 0:
+        avisos.append(
+            "Sem bitola de fase dimensionada: o custo dos cabos não está no total."
+        )
+    for titulo, descricao in (("disjuntor", disjuntor), ("IDR", idr)):
+        if not descricao:
+            avisos.append(
+                f"Sem {titulo} dimensionado: o custo do {titulo} não está no total."
+            )
+    return avisos
+
+
+def calcular_custos_materiais(
+    resultado,
+    soma_distancias: float,
+    tipo_cabos: str,
+    tabelas: TabelasMateriais,
+    tipo_servico: str = "",
+    material_adicional: float = 0.0,
+    quantidades_infra: Mapping[str, float] | None = None,
+) -> CustosMateriais:
+    """Calcula o custo de material de um ``DimensionamentoResult``.
+
+    Usa as mesmas quantidades sugeridas pela aba de Custos com Materiais:
+    cabos pelo percurso total, infra-seca por ``quantidades_infra`` (as
+    derivadas das direções do percurso) ou, sem elas, pelas sugestões de
+    :func:`sugerir_quantidades_infra` e o quadro de proteção pelos
+    componentes recomendados no dimensionamento.
+    """
+    custos = CustosMateriais(
+        total_material_adicional=float(material_adicional),
+        avisos=avisos_materiais(
+            resultado.bitola_fase, resultado.disjuntor, resultado.idr, soma_distancias
+        ),
+    )
+
+    fase = extrair_bitola(resultado.bitola_fase)
+    neutro = extrair_bitola(resultado.bitola_neutro)
+    terra = extrair_bitola(resultado.bitola_terra)
+    condutores = quantidade_condutores(
+        resultado.instalacao_sistema, fase, neutro, terra
+    )
+    for cor, bitola, quantidade in zip(
+        ("Preto", "Azul", "Verde"), (fase, neutro, terra), condutores
+    ):
+        if quantidade > 0:
+            preco = tabelas.buscar(obter_preco_cabo, tabelas.cabos, bitola, tipo_cabos)
+            total = preco * soma_distancias * quantidade
+            custos.total_cabos += total
+            custos.itens.append({"Item": f"Cabo {cor}", "Total": total})
+
+    acessorios = obter_acessorios_infra(
+        tabelas.eletrodutos, resultado.tamanho_eletroduto, tabelas.sealtubo
+    )
+    sugestoes = quantidades_infra
+    if sugestoes is None:
+        sugestoes = sugerir_quantidades_infra(soma_distancias)
+    for tipo, quantidade in sugestoes.items():
+        material, preco = acessorios.get(tipo, ("", 0.0))
+        total = preco * float(quantidade)
+        if total > 0:
+            custos.total_infra_seca += total
+            custos.itens.append({"Item": material, "Total": total})
+
+    componentes = [
+        ("Disjuntor", resultado.disjuntor),
+        ("IDR (Interruptor Diferencial Residual)", resultado.idr),
+        ("DPS (Dispositivo de Proteção contra Surtos)", resultado.dps),
+        ("Barra Pente", resultado.barra_pente),
+    ]
+    if resultado.quadro_pvc:
+        componentes.append(("Quadro PVC", resultado.quadro_pvc))
+    elif resultado.quadro_metalico:
+        componentes.append(("Quadro Metálico", resultado.quadro_metalico))
+    for titulo, descricao in componentes:
+        if not descricao:
+            continue
+        quantidade = sugerir_quantidade_componente(descricao)
+        if titulo == "Disjuntor":
+            quantidade = 2.0
+            preco = tabelas.buscar(
+                obter_preco_disjuntor, tabelas.disjuntores, descricao
+            )
+        elif titulo.startswith("IDR"):
+            preco = tabelas.buscar(obter_preco_idr, tabelas.idr, descricao)
+        elif titulo.startswith("DPS"):
+            preco = tabelas.buscar(obter_preco_dps, tabelas.dps, descricao)
+        elif titulo == "Barra Pente":
+            preco = tabelas.buscar(
+                obter_preco_barra_pente,
+                tabelas.barra_pente,
+                descricao,
+                resultado.dps,
+                resultado.instalacao_sistema,
+            )
+        else:
+            preco = tabelas.buscar(
+                obter_preco_quadro, tabelas.paineis, descricao, titulo
+            )
+        if tipo_servico in SERVICOS_SEM_QUADRO and titulo in {
+            "Barra Pente",
+            "Quadro PVC",
+        }:
+            quantidade = 0.0
+        total = preco * quantidade
+        if preco <= 0 and quantidade > 0:
+            custos.avisos.append(
+                f"Sem preço no catálogo para {descricao}: o item não está no total."
+            )
+        if total > 0:
+            custos.total_quadro_protecao += total
+            custos.itens.append({"Item": descricao, "Total": total})
+
+    return custos
+
+
+# --- Mão de obra ------------------------------------------------------------
+
+# Valor de cada refeição da equipe e horas de trabalho cobertas por refeição
+VALOR_REFEICAO = 40.0
+HORAS_POR_REFEICAO = 8
+
+
+@dataclass
+class CustoMaoObra:
+    """Custo dos técnicos e da alimentação da equipe de instalação."""
+
+    total_tecnicos: float = 0.0
+    total_alimentacao: float = 0.0
+    refeicoes: int = 0
+    # Um item por técnico: "Técnico", "Horas", "Valor Hora" e "Total"
+    itens: list[dict] = field(default_factory=list)
+
+    @property
+    def total(self) -> float:
+        return self.total_tecnicos + self.total_alimentacao
+
+
+def valores_hora_profissionais(
+    df_profissionais: pd.DataFrame | None,
+) -> dict[str, float]:
+    """Valor hora de cada profissional (primeira linha do catálogo)."""
+    if df_profissionais is None or df_profissionais.empty:
+        return {}
+    valores: dict[str, float] = {}
+    for profissional, valor in zip(
+        df_profissionais["Profissional"].astype(str).tolist(),
+        converter_coluna_moeda(df_profissionais["Valor Hora"]).tolist(),
+    ):
+        valores.setdefault(profissional, float(valor))
+    return valores
+
+
+def calcular_custo_mao_obra(
+    horas_tecnicos: Iterable[tuple[str, float]], valores_hora: Mapping[str, float]
+) -> CustoMaoObra:
+    """Aplica as regras da aba 'Custo Mão de Obra' sem depender da sessão.
+
+    Cada técnico custa as horas pelo seu valor hora e tem uma refeição a
+    cada ``HORAS_POR_REFEICAO`` horas (ao menos uma) de ``VALOR_REFEICAO``.
+    """
+    custo = CustoMaoObra()
+    for tecnico, horas in horas_tecnicos:
+        valor_hora = valores_hora.get(tecnico, 0.0)
+        total = horas * valor_hora
+        custo.total_tecnicos += total
+        custo.refeicoes += max(1, math.ceil(horas / HORAS_POR_REFEICAO))
+        custo.itens.append(
+            {"Técnico": tecnico, "Horas": horas, "Valor Hora": valor_hora, "Total": total}
+        )
+    custo.total_alimentacao = custo.refeicoes * VALOR_REFEICAO
+    return custo
+
+
+def calcular_totais_servico(
+    total_materiais: float,
+    total_mao_obra: float,
+    custo_deslocamento: float = 0.0,
+    custo_adicional: float = 0.0,
+    servicos_adicionais: float = 0.0,
+    custo_emissao_trt: float = 80.0,
+    custo_projeto_unifilar: float = 500.0,
+    lucro_percentual: float = 35.0,
+    imposto_percentual: float = 11.0,
+    total_carregadores: float = 0.0,
+) -> dict[str, float]:
+    """Aplica as regras da aba 'Cálculo de serviço' sem depender da sessão.
+
+    Depreciação de 5% sobre a base sem carregador, lucro sobre a base com
+    depreciação e imposto sobre a base com depreciação e lucro.
+    """
+
+    base_sem_carregador = (
+        total_materiais
+        + total_mao_obra
+        + custo_deslocamento
+        + custo_adicional
+        + servicos_adicionais
+        + custo_emissao_trt
+        + custo_projeto_unifilar
+    )
+    depreciacao = 0.05 * base_sem_carregador
+    total_base = base_sem_carregador + depreciacao
+    lucro = (lucro_percentual / 100) * total_base
+    imposto = (imposto_percentual / 100) * (total_base + lucro)
+    total_servico = (
+        base_sem_carregador + total_carregadores + depreciacao + lucro + imposto
+    )
+    total_instalacao = (
+        total_servico - (custo_emissao_trt + custo_projeto_unifilar) - total_carregadores
+    )
+    return {
+        "base_sem_carregador": base_sem_carregador,
+        "depreciacao": depreciacao,
+        "lucro": lucro,
+        "imposto": imposto,
+        "total_instalacao": total_instalacao,
+        "total_servico": total_servico,
+    }
+
+
+__all__ = [
+    "ACESSORIOS_INFRA",
+    "COLUNAS_DISPOSITIVO",
+    "AtributosDispositivo",
+    "atributos_dispositivo",
+    "MATERIAL_SEALTUBO",
+    "SEALTUBO_PADRAO",
+    "TabelasMateriais",
+    "CustosMateriais",
+    "CustoMaoObra",
+    "HORAS_POR_REFEICAO",
+    "VALOR_REFEICAO",
+    "calcular_custo_mao_obra",
+    "calcular_totais_servico",
+    "valores_hora_profissionais",
+    "normalizar_texto",
+    "extrair_bitola",
+    "colunas_cabo",
+    "preparar_precos_cabos",
+    "obter_preco_cabo",
+    "quantidade_condutores",
+    "preparar_precos_eletrodutos",
+    "preparar_precos_sealtubo",
+    "sealtubo_de_eletrodutos",
+    "obter_acessorio_infra",
+    "obter_acessorios_infra",
+    "obter_sealtubo",
+    "sugerir_quantidades_infra",
+    "preparar_precos_disjuntores",
+    "preparar_precos_idr",
+    "preparar_precos_dps",
+    "preparar_precos_barra_pente",
+    "preparar_precos_paineis",
+    "sugerir_quantidade_componente",
+    "obter_preco_disjuntor",
+    "obter_preco_idr",
+    "obter_preco_dps",
+    "obter_preco_quadro",
+    "obter_preco_barra_pente",
+    "carregar_tabelas_materiais",
+    "avisos_materiais",
+    "calcular_custos_materiais",
+]
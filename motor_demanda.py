@@ -0,0 +1,195 @@
+"""Demanda de projeto de vários carregadores no mesmo alimentador.
+
+Somar a potência nominal de todos os carregadores dimensiona um condomínio
+de 40 vagas como se todos carregassem ao mesmo tempo na potência máxima.
+Aqui a potência instalada é multiplicada por um fator de simultaneidade que
+depende da quantidade de carregadores (``CURVAS_SIMULTANEIDADE``) e, quando
+o local tem gestão dinâmica de carga, limitada à potência configurada no
+controlador. O resultado é a potência usada no dimensionamento de cabos,
+proteção e transformador.
+
+As funções recebem arrays de potências (um por carregador, ou um por grupo
+com ``quantidades``) e não percorrem os carregadores em Python, então locais
+com centenas de carregadores custam o mesmo que um local pequeno.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+# Fator de simultaneidade por quantidade de carregadores: pontos
+# (quantidade, fator) interpolados linearmente; acima do último ponto vale o
+# último fator. Valores de referência ajustáveis conforme a concessionária.
+CURVAS_SIMULTANEIDADE = {
+    "Sem diversidade": ((1, 1.0),),
+    "Residencial": (
+        (1, 1.0),
+        (2, 1.0),
+        (5, 0.8),
+        (10, 0.6),
+        (20, 0.5),
+        (40, 0.4),
+        (100, 0.35),
+    ),
+    "Comercial": (
+        (1, 1.0),
+        (2, 1.0),
+        (5, 0.9),
+        (10, 0.8),
+        (20, 0.7),
+        (50, 0.6),
+        (100, 0.55),
+    ),
+}
+
+# As curvas reduzem a corrente de projeto (e os cabos e a proteção): são
+# escolhidas explicitamente na aba Visita, e orçamentos sem curva seguem
+# somando a potência de todos os carregadores
+CURVA_PADRAO = "Sem diversidade"
+
+# Opção da aba Visita em que o fator de simultaneidade é digitado
+OPCAO_FATOR_INFORMADO = "Fator informado"
+
+# Acima desta quantidade a aba Visita pede as potências por grupo
+LIMITE_CARREGADORES_INDIVIDUAIS = 10
+
+Curva = Union[str, float, Sequence[tuple]]
+
+
+@dataclass(frozen=True)
+class DemandaCarregadores:
+    """Potência instalada e demanda de projeto de um conjunto de carregadores."""
+
+    quantidade: int = 0
+    potencia_instalada_kw: float = 0.0
+    maior_carregador_kw: float = 0.0
+    fator_simultaneidade: float = 1.0
+    potencia_diversificada_kw: float = 0.0
+    limite_gestao_kw: float = 0.0
+    potencia_kw: float = 0.0
+
+    @property
+    def limitada_pela_gestao(self) -> bool:
+        return 0 < self.limite_gestao_kw < self.potencia_diversificada_kw
+
+
+def _pontos_curva(curva: Curva) -> tuple[np.ndarray, np.ndarray]:
+    if isinstance(curva, str):
+        curva = CURVAS_SIMULTANEIDADE.get(curva, CURVAS_SIMULTANEIDADE[CURVA_PADRAO])
+    if isinstance(curva, (int, float)):
+        return np.array([1.0]), np.array([float(curva)])
+    pontos = sorted((float(n), float(f)) for n, f in curva)
+    return np.array([n for n, _ in pontos]), np.array([f for _, f in pontos])
+
+
+def fator_simultaneidade(quantidades, curva: Curva = CURVA_PADRAO) -> np.ndarray:
+    """Fator de simultaneidade de cada quantidade de carregadores.
+
+    ``curva`` é o nome de uma curva de ``CURVAS_SIMULTANEIDADE``, um fator
+    fixo ou uma sequência de pontos ``(quantidade, fator)``.
+    """
+    eixo, fatores = _pontos_curva(curva)
+    fator = np.interp(np.asarray(quantidades, dtype=float), eixo, fatores)
+    return np.clip(fator, 0.0, 1.0)
+
+
+def calcular_demanda_lote(
+    potencias_instaladas_kw,
+    quantidades,
+    maiores_carregadores_kw,
+    curva: Curva = CURVA_PADRAO,
+    limites_gestao_kw=0.0,
+) -> np.ndarray:
+    """Demanda de projeto (kW) de vários locais de uma vez.
+
+    A potência diversificada nunca fica abaixo do maior carregador do local,
+    e o limite da gestão de carga só se aplica quando é positivo.
+    """
+    instaladas = np.asarray(potencias_instaladas_kw, dtype=float)
+    maiores = np.asarray(maiores_carregadores_kw, dtype=float)
+    limites = np.asarray(limites_gestao_kw, dtype=float)
+    diversificada = np.maximum(
+        instaladas * fator_simultaneidade(quantidades, curva), maiores
+    )
+    diversificada = np.minimum(diversificada, instaladas)
+    return np.where(limites > 0, np.minimum(diversificada, limites), diversificada)
+
+
+def calcular_demanda(
+    potencias_kw: Iterable[float],
+    quantidades: Optional[Iterable[int]] = None,
+    curva: Curva = CURVA_PADRAO,
+    limite_gestao_kw: float = 0.0,
+) -> DemandaCarregadores:
+    """Demanda de projeto de um local.
+
+    ``potencias_kw`` traz a potência de cada carregador ou, com
+    ``quantidades``, a potência de cada grupo de carregadores iguais.
+    """
+    potencias = np.asarray(list(potencias_kw), dtype=float)
+    if quantidades is None:
+        contagens = np.ones_like(potencias)
+    else:
+        contagens = np.asarray(list(quantidades), dtype=float)
+    validos = (potencias > 0) & (contagens > 0)
+    potencias, contagens = potencias[validos], contagens[validos]
+    if not len(potencias):
+        return DemandaCarregadores()
+
+    quantidade = int(contagens.sum())
+    instalada = float(potencias @ contagens)
+    maior = float(potencias.max())
+    fator = float(fator_simultaneidade(quantidade, curva))
+    diversificada = float(calcular_demanda_lote(instalada, quantidade, maior, curva))
+    limite = float(limite_gestao_kw or 0.0)
+    return DemandaCarregadores(
+        quantidade=quantidade,
+        potencia_instalada_kw=instalada,
+        maior_carregador_kw=maior,
+        fator_simultaneidade=fator,
+        potencia_diversificada_kw=diversificada,
+        limite_gestao_kw=limite,
+        potencia_kw=min(diversificada, limite) if limite > 0 else diversificada,
+    )
+
+
+def potencia_produto_kva(produto: str) -> Optional[float]:
+    """Potência (kVA) indicada no nome de um transformador, ou ``None``."""
+    match = re.search(r"(\d+(?:[.,]\d+)?)\s*kva", str(produto), re.IGNORECASE)
+    if not match:
+        return None
+    return float(match.group(1).replace(",", "."))
+
+
+def sugerir_transformador(
+    potencia_kw: float, produtos: Iterable[str], fator_potencia: float = 1.0
+) -> str:
+    """Primeiro produto de menor potência (kVA) que atende à demanda."""
+    if potencia_kw <= 0:
+        return ""
+    necessaria = potencia_kw / (fator_potencia if fator_potencia > 0 else 1.0)
+    escolhido, escolhido_kva = "", None
+    for produto in produtos:
+        kva = potencia_produto_kva(produto)
+        if kva is None or kva < necessaria:
+            continue
+        if escolhido_kva is None or kva < escolhido_kva:
+            escolhido, escolhido_kva = produto, kva
+    return escolhido
+
+
+__all__ = [
+    "CURVAS_SIMULTANEIDADE",
+    "CURVA_PADRAO",
+    "DemandaCarregadores",
+    "LIMITE_CARREGADORES_INDIVIDUAIS",
+    "OPCAO_FATOR_INFORMADO",
+    "calcular_demanda",
+    "calcular_demanda_lote",
+    "fator_simultaneidade",
+    "potencia_produto_kva",
+    "sugerir_transformador",
+]
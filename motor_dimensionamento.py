@@ -0,0 +1,552 @@
+"""Regras de dimensionamento elétrico independentes da interface.
+
+Este módulo não depende do Streamlit: recebe os dados da visita em um
+``DimensionamentoInput`` e devolve um ``DimensionamentoResult`` com corrente,
+sistema de instalação, bitolas, eletroduto e dispositivos de proteção. A aba
+de Dimensionamento apenas chama estas funções, e o mesmo cálculo pode ser
+usado em lotes, scripts ou testes.
+"""
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from motor_queda_tensao import avaliar_bitolas_lote, tensao_circuito
+from tabelas_eletricas import (
+    TABELA_BITOLAS,
+    TABELA_NEUTRO_TERRA,
+    TABELA_CABO_ISOLADO_PVC,
+    TABELA_CABO_UNIPOLAR_HEPR,
+    TABELA_ELETRODUTOS,
+)
+
+# Coluna da tabela de bitolas correspondente a cada potência de referência
+COLUNAS_POTENCIA = {
+    1.9: "1,9kW",
+    3.7: "3,7kW",
+    7.4: "7,4kW",
+    14.8: "2x7,4",
+    11.0: "11,0kW",
+    22.0: "22,0kW",
+    44.0: "44,0kW",
+}
+
+# Correntes nominais padronizadas de disjuntores e IDR (A)
+CORRENTES_NOMINAIS = (
+    16, 20, 25, 32, 40, 50, 63, 80, 100, 125, 160, 200, 225, 250, 320, 400, 500, 630
+)
+
+# Maior corrente nominal (A) da proteção admitida por cada bitola de fase (mm²)
+CORRENTE_POR_BITOLA = {
+    1.5: 16,
+    2.5: 20,
+    4.0: 25,
+    6.0: 32,
+    10.0: 40,
+    16.0: 63,
+    25.0: 80,
+    35.0: 100,
+    50.0: 125,
+    70.0: 160,
+    95.0: 200,
+    120.0: 225,
+    150.0: 250,
+    185.0: 250,
+    240.0: 320,
+    300.0: 320,
+}
+
+QUANTIDADE_FASES = {"Monofásico": 1, "Bifásico": 2, "Trifásico": 3}
+
+BARRA_PENTE_POR_SISTEMA = {
+    "Monofásico": "Barra Pente Monopolar",
+    "Bifásico": "Barra Pente Bipolar",
+    "Trifásico": "Barra Pente Tripolar",
+}
+
+QUADRO_PVC_POR_SISTEMA = {
+    "Monofásico": "Quadro PVC de 8 Posições",
+    "Bifásico": "Quadro PVC de 8 Posições",
+    "Trifásico": "Quadro PVC de 12 Posições",
+}
+
+QUADRO_METALICO_POR_SISTEMA = {
+    "Monofásico": "Quadro 20x20x14",
+    "Bifásico": "Quadro 20x20x14",
+    "Trifásico": "Quadro 30x30x20",
+}
+
+
+@dataclass(frozen=True)
+class DimensionamentoInput:
+    """Dados de entrada do dimensionamento de um carregador."""
+
+    potencia_kw: float
+    distancia_m: float
+    tensoes_ff: tuple = ()
+    instalacao_atual: str = "Monofásico"
+    tipo_cabos: str = "Cabo PVC"
+    quantidade_carregadores: int = 1
+    tipo_quadro: str = "PVC"
+    # Ajustes manuais: quando informados substituem a sugestão automática
+    instalacao: Optional[str] = None
+    bitola_fase: Optional[str] = None
+    bitola_neutro: Optional[str] = None
+    bitola_terra: Optional[str] = None
+
+
+@dataclass
+class DimensionamentoResult:
+    """Resultado do dimensionamento."""
+
+    corrente_calculada: str = ""
+    instalacao_sistema: str = ""
+    bitola_fase_calculada: str = ""
+    bitola_neutro_terra_calculada: str = ""
+    bitola_fase: str = ""
+    bitola_neutro: str = ""
+    bitola_terra: str = ""
+    quantidades_cabos: dict = field(default_factory=dict)
+    area_total_ocupada: float = 0.0
+    tamanho_eletroduto: str = ""
+    disjuntor: str = ""
+    idr: str = ""
+    dps: str = ""
+    barra_pente: str = ""
+    quadro_pvc: str = ""
+    quadro_metalico: str = ""
+    avisos: list = field(default_factory=list)
+
+
+def _extrair_bitola(valor) -> Optional[float]:
+    """Extrai o valor numérico de uma bitola, retornando ``None`` se inválido."""
+    match = re.search(r"(\d+(?:[.,]\d+)?)", str(valor))
+    if not match:
+        return None
+    return float(match.group(1).replace(",", "."))
+
+
+def _converter_tensoes(tensoes: Iterable) -> list[float]:
+    """Converte as tensões informadas em float, ignorando valores inválidos."""
+    valores = []
+    for val in tensoes:
+        try:
+            valores.append(float(str(val).replace(",", ".")))
+        except (ValueError, TypeError):
+            pass
+    return valores
+
+
+def _compilar_tabela_bitolas(tabela: pd.DataFrame) -> tuple:
+    """Converte uma tabela de bitolas em arrays para busca binária.
+
+    Retorna as distâncias ordenadas e uma matriz de bitolas com uma coluna
+    por potência de referência, na ordem de ``COLUNAS_POTENCIA``.
+    """
+    ordenada = tabela.sort_values("Distância (m)", kind="stable")
+    distancias = ordenada["Distância (m)"].to_numpy(dtype=float)
+    bitolas = ordenada[list(COLUNAS_POTENCIA.values())].to_numpy(dtype=float)
+    return distancias, bitolas
+
+
+_POTENCIAS_REFERENCIA = np.array(list(COLUNAS_POTENCIA.keys()), dtype=float)
+_TABELAS_COMPILADAS = {
+    id(TABELA_BITOLAS): (TABELA_BITOLAS, _compilar_tabela_bitolas(TABELA_BITOLAS)),
+    id(TABELA_NEUTRO_TERRA): (
+        TABELA_NEUTRO_TERRA,
+        _compilar_tabela_bitolas(TABELA_NEUTRO_TERRA),
+    ),
+}
+
+
+def _obter_tabela_compilada(tabela: pd.DataFrame) -> tuple:
+    """Retorna os arrays da tabela, compilando tabelas não conhecidas."""
+    entrada = _TABELAS_COMPILADAS.get(id(tabela))
+    if entrada is not None and entrada[0] is tabela:
+        return entrada[1]
+    return _compilar_tabela_bitolas(tabela)
+
+
+def obter_bitolas_cabo_lote(
+    distancias, potencias_kw, tabela=TABELA_BITOLAS
+) -> np.ndarray:
+    """Versão em lote de ``obter_bitola_cabo``.
+
+    Recebe arrays (ou escalares) de distâncias e potências e devolve um array
+    float com a bitola (mm²) de cada par, ou ``NaN`` quando a potência não é
+    positiva ou a distância excede a tabela.
+    """
+    tabela_distancias, tabela_bitolas = _obter_tabela_compilada(tabela)
+    distancias, potencias = np.broadcast_arrays(
+        np.asarray(distancias, dtype=float), np.asarray(potencias_kw, dtype=float)
+    )
+    # argmin devolve o primeiro mínimo, mantendo o desempate de ``min``
+    colunas = np.abs(potencias[..., None] - _POTENCIAS_REFERENCIA).argmin(axis=-1)
+    linhas = np.searchsorted(tabela_distancias, distancias, side="left")
+    validos = (potencias > 0) & (linhas < len(tabela_distancias))
+    resultado = np.full(distancias.shape, np.nan)
+    resultado[validos] = tabela_bitolas[linhas[validos], colunas[validos]]
+    return resultado
+
+
+def obter_bitola_cabo(
+    distancia: float, potencia_kw: float, tabela=TABELA_BITOLAS
+) -> str:
+    """Retorna a bitola recomendada usando a tabela informada."""
+    if potencia_kw <= 0:
+        return ""
+    bitola = obter_bitolas_cabo_lote(distancia, potencia_kw, tabela)
+    if np.isnan(bitola):
+        return ""
+    return f"{bitola:g} mm²"
+
+
+def obter_bitola_cabo_estendida(
+    distancia: float,
+    potencia_kw: float,
+    instalacao: str,
+    tensoes_ff: Iterable = (),
+    tipo_cabos: str = "Cabo PVC",
+    tabela=TABELA_BITOLAS,
+) -> str:
+    """Bitola da tabela ou, fora do alcance dela, por queda de tensão.
+
+    Acima da maior distância ou da maior potência de referência da tabela a
+    bitola vem de ``motor_queda_tensao`` (com a média das tensões entre
+    fases) e nunca é menor que a indicada pela tabela.
+    """
+    bitola = obter_bitola_cabo(distancia, potencia_kw, tabela)
+    if potencia_kw <= 0 or distancia <= 0:
+        return bitola
+    if bitola and potencia_kw <= _POTENCIAS_REFERENCIA.max():
+        return bitola
+    tensoes = _converter_tensoes(tensoes_ff)
+    tensao = tensao_circuito(
+        instalacao, sum(tensoes) / len(tensoes) if tensoes else None
+    )
+    calculada = avaliar_bitolas_lote(
+        potencia_kw, distancia, tensao, instalacao, tipo_cabos
+    ).bitola
+    if np.isnan(calculada):
+        return ""
+    tabela_distancias, _ = _obter_tabela_compilada(tabela)
+    minima = obter_bitolas_cabo_lote(
+        min(distancia, tabela_distancias[-1]), potencia_kw, tabela
+    )
+    return f"{max(float(calculada), float(minima)):g} mm²"
+
+
+def _corrente_projeto(corrente) -> Optional[float]:
+    """Corrente de projeto (A) informada como número ou texto, se positiva."""
+    try:
+        valor = float(str(corrente).replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+    return valor if valor > 0 else None
+
+
+def corrente_nominal_protecao(bitola_fase: str, corrente=None) -> Optional[int]:
+    """Corrente nominal (A) do disjuntor e do IDR do circuito.
+
+    É a menor corrente de ``CORRENTES_NOMINAIS`` não inferior à corrente de
+    projeto e não superior à admitida pela bitola de fase
+    (``CORRENTE_POR_BITOLA``); sem corrente de projeto vale o limite da
+    bitola. Retorna ``None`` quando a bitola não está na tabela ou não
+    comporta a corrente de projeto (ver :func:`aviso_protecao`).
+    """
+    limite = CORRENTE_POR_BITOLA.get(_extrair_bitola(bitola_fase))
+    if limite is None:
+        return None
+    projeto = _corrente_projeto(corrente)
+    if projeto is None:
+        return limite
+    for nominal in CORRENTES_NOMINAIS:
+        if nominal >= projeto:
+            return nominal if nominal <= limite else None
+    return None
+
+
+def aviso_protecao(bitola_fase: str, corrente=None) -> str:
+    """Motivo de não haver proteção sugerida para o circuito, ou ``""``."""
+    bitola = _extrair_bitola(bitola_fase)
+    if bitola is None or corrente_nominal_protecao(bitola_fase, corrente) is not None:
+        return ""
+    limite = CORRENTE_POR_BITOLA.get(bitola)
+    if limite is None:
+        return (
+            f"Não há proteção tabelada para a bitola de fase de {bitola:g} mm²; "
+            "escolha o disjuntor e o IDR manualmente."
+        )
+    return (
+        f"A corrente de projeto de {_corrente_projeto(corrente):.1f} A excede a "
+        f"proteção admitida pela bitola de fase de {bitola:g} mm² ({limite} A); "
+        "aumente a bitola ou divida o circuito."
+    )
+
+
+def aviso_bitola(corrente, distancia_m: float, bitola_fase: str) -> str:
+    """Motivo de não haver bitola de fase para o circuito, ou ``""``."""
+    projeto = _corrente_projeto(corrente)
+    if bitola_fase or distancia_m <= 0 or projeto is None:
+        return ""
+    return (
+        f"Nenhuma bitola atende à corrente de projeto de {projeto:.1f} A em "
+        f"{distancia_m:g} m; divida a carga em mais circuitos ou reduza a "
+        "demanda (fator de simultaneidade ou gestão de carga)."
+    )
+
+
+def dimensionar_disjuntor(instalacao: str, bitola_fase: str, corrente=None) -> str:
+    """Sugere um disjuntor para a instalação, a bitola e a corrente de projeto."""
+    corrente = corrente_nominal_protecao(bitola_fase, corrente)
+    if corrente is None:
+        return ""
+    polos = {
+        "Monofásico": "1P+N",
+        "Bifásico": "2P",
+        "Trifásico": "3P",
+    }.get(instalacao, "")
+    return f"{polos} {corrente} A - DIN Curva C"
+
+
+def dimensionar_idr(instalacao: str, bitola_fase: str, corrente=None) -> str:
+    """Sugere um IDR de classe A para a instalação, a bitola e a corrente de projeto."""
+    corrente = corrente_nominal_protecao(bitola_fase, corrente)
+    if corrente is None:
+        return ""
+    polos = {
+        "Monofásico": "2P",
+        "Bifásico": "2P",
+        "Trifásico": "4P",
+    }.get(instalacao, "")
+    return f"{polos} {corrente} A - IDR Classe A 30 mA"
+
+
+def dimensionar_dps(
+    instalacao: str, bitola_fase: str, quantidade_carregadores: int, corrente=None
+) -> str:
+    """Sugere um DPS Tipo 2 de 1 polo a partir da instalação, bitola e quantidade."""
+    corrente = corrente_nominal_protecao(bitola_fase, corrente)
+    if corrente is None:
+        return ""
+    if corrente <= 63:
+        ka = 20
+    elif corrente <= 125:
+        ka = 40
+    else:
+        ka = 65
+    condutores = {
+        "Monofásico": 2,
+        "Bifásico": 2,
+        "Trifásico": 4,
+    }.get(instalacao)
+    if not condutores:
+        return ""
+    quantidade = condutores * max(1, quantidade_carregadores)
+    return f"{quantidade}x 1P {ka} kA - DPS Tipo 2"
+
+
+def calcular_corrente(potencia_kw: float, tensoes_ff: Iterable) -> str:
+    """Calcula a corrente (A) a partir da potência e da média das tensões entre fases."""
+    tensoes = _converter_tensoes(tensoes_ff)
+    media_tensao = sum(tensoes) / len(tensoes) if tensoes else 0.0
+    if potencia_kw <= 0 or media_tensao <= 0:
+        return ""
+    if potencia_kw >= 11.0:
+        corrente_val = (potencia_kw * 1000) / (media_tensao * math.sqrt(3))
+    else:
+        corrente_val = (potencia_kw * 1000) / media_tensao
+    return f"{corrente_val:.2f}"
+
+
+def sugerir_instalacao(
+    potencia_kw: float, tensoes_ff: Iterable, instalacao_atual: str = "Monofásico"
+) -> str:
+    """Sugere o sistema de instalação a partir da potência e das tensões medidas."""
+    tensoes = _converter_tensoes(tensoes_ff)
+    if potencia_kw >= 11:
+        return "Trifásico"
+    if potencia_kw <= 7.4 and len(tensoes) == 3:
+        if all(t > 360 for t in tensoes):
+            return "Monofásico"
+        if all(210 <= t <= 240 for t in tensoes):
+            return "Bifásico"
+    return instalacao_atual
+
+
+# Área (mm²) de cada condutor e área útil de cada eletroduto, pré-calculadas
+_AREA_CONDUTOR_POR_TIPO = {
+    tipo: dict(
+        zip(
+            tabela["Cabo (mm²)"].astype(float),
+            math.pi * (tabela["Diâmetro Externo (mm)"].astype(float) / 2) ** 2,
+        )
+    )
+    for tipo, tabela in (
+        ("Cabo PVC", TABELA_CABO_ISOLADO_PVC),
+        ("Cabo HEPR", TABELA_CABO_UNIPOLAR_HEPR),
+    )
+}
+_ELETRODUTOS_AREA_UTIL = list(
+    zip(
+        TABELA_ELETRODUTOS["Área Ocupável 40% (mm²)"].astype(float),
+        TABELA_ELETRODUTOS["Eletroduto (Pol)"],
+    )
+)
+
+
+def obter_tabela_cabos(tipo_cabos: str) -> pd.DataFrame:
+    """Retorna a tabela de diâmetros de cabos para o tipo selecionado."""
+    if tipo_cabos == "Cabo PVC":
+        return TABELA_CABO_ISOLADO_PVC
+    return TABELA_CABO_UNIPOLAR_HEPR
+
+
+def contar_cabos(
+    instalacao: str, bitola_fase, bitola_neutro, bitola_terra
+) -> dict[float, int]:
+    """Conta quantos condutores de cada bitola (mm²) passam pelo eletroduto."""
+    fase = _extrair_bitola(bitola_fase)
+    neutro = _extrair_bitola(bitola_neutro)
+    terra = _extrair_bitola(bitola_terra)
+    quantidades: dict[float, int] = {}
+    if fase is not None:
+        quantidades[fase] = quantidades.get(fase, 0) + QUANTIDADE_FASES.get(
+            instalacao, 0
+        )
+    if neutro is not None and instalacao != "Bifásico":
+        quantidades[neutro] = quantidades.get(neutro, 0) + 1
+    if terra is not None:
+        quantidades[terra] = quantidades.get(terra, 0) + 1
+    return quantidades
+
+
+def calcular_area_ocupada(tabela_cabos, quantidades: dict) -> float:
+    """Soma a área (mm²) ocupada pelos condutores informados.
+
+    ``tabela_cabos`` pode ser o tipo de cabo ("Cabo PVC"/"Cabo HEPR"), que usa
+    as áreas pré-calculadas, ou uma tabela de cabos já editada.
+    """
+    if not quantidades:
+        return 0.0
+    if isinstance(tabela_cabos, str):
+        areas = _AREA_CONDUTOR_POR_TIPO.get(
+            tabela_cabos, _AREA_CONDUTOR_POR_TIPO["Cabo HEPR"]
+        )
+        return float(
+            sum(areas.get(bitola, 0.0) * qtd for bitola, qtd in quantidades.items())
+        )
+    qtd = tabela_cabos["Cabo (mm²)"].map(quantidades).fillna(0)
+    areas = math.pi * (tabela_cabos["Diâmetro Externo (mm)"] / 2) ** 2
+    return float((areas * qtd).sum())
+
+
+def selecionar_eletroduto(area_total_ocupada: float) -> str:
+    """Retorna o menor eletroduto cuja área útil (40%) comporta os condutores."""
+    if area_total_ocupada <= 0:
+        return ""
+    for area_util, tamanho in _ELETRODUTOS_AREA_UTIL:
+        if area_util >= area_total_ocupada:
+            return tamanho
+    return ""
+
+
+def dimensionar(entrada: DimensionamentoInput) -> DimensionamentoResult:
+    """Executa o dimensionamento completo de um carregador."""
+    resultado = DimensionamentoResult()
+    resultado.corrente_calculada = calcular_corrente(
+        entrada.potencia_kw, entrada.tensoes_ff
+    )
+    instalacao = entrada.instalacao or sugerir_instalacao(
+        entrada.potencia_kw, entrada.tensoes_ff, entrada.instalacao_atual
+    )
+    resultado.instalacao_sistema = instalacao
+
+    if entrada.distancia_m > 0 and entrada.potencia_kw > 0:
+        resultado.bitola_fase_calculada = obter_bitola_cabo_estendida(
+            entrada.distancia_m,
+            entrada.potencia_kw,
+            instalacao,
+            entrada.tensoes_ff,
+            entrada.tipo_cabos,
+        )
+        resultado.bitola_neutro_terra_calculada = obter_bitola_cabo_estendida(
+            entrada.distancia_m,
+            entrada.potencia_kw,
+            instalacao,
+            entrada.tensoes_ff,
+            entrada.tipo_cabos,
+            TABELA_NEUTRO_TERRA,
+        )
+    resultado.bitola_fase = entrada.bitola_fase or resultado.bitola_fase_calculada
+    resultado.bitola_terra = (
+        entrada.bitola_terra or resultado.bitola_neutro_terra_calculada
+    )
+    if instalacao != "Bifásico":
+        resultado.bitola_neutro = (
+            entrada.bitola_neutro or resultado.bitola_neutro_terra_calculada
+        )
+
+    resultado.quantidades_cabos = contar_cabos(
+        instalacao,
+        resultado.bitola_fase,
+        resultado.bitola_neutro,
+        resultado.bitola_terra,
+    )
+    resultado.area_total_ocupada = calcular_area_ocupada(
+        "Cabo PVC" if entrada.tipo_cabos == "Cabo PVC" else "Cabo HEPR",
+        resultado.quantidades_cabos,
+    )
+    resultado.tamanho_eletroduto = selecionar_eletroduto(
+        resultado.area_total_ocupada
+    )
+
+    corrente = resultado.corrente_calculada
+    aviso = aviso_bitola(corrente, entrada.distancia_m, resultado.bitola_fase)
+    if aviso:
+        resultado.avisos.append(aviso)
+    resultado.disjuntor = dimensionar_disjuntor(
+        instalacao, resultado.bitola_fase, corrente
+    )
+    resultado.idr = dimensionar_idr(instalacao, resultado.bitola_fase, corrente)
+    resultado.dps = dimensionar_dps(
+        instalacao, resultado.bitola_fase, entrada.quantidade_carregadores, corrente
+    )
+    aviso = aviso_protecao(resultado.bitola_fase, corrente)
+    if aviso:
+        resultado.avisos.append(aviso)
+    resultado.barra_pente = BARRA_PENTE_POR_SISTEMA.get(instalacao, "")
+    if entrada.tipo_quadro == "PVC":
+        resultado.quadro_pvc = QUADRO_PVC_POR_SISTEMA.get(instalacao, "")
+    elif entrada.tipo_quadro == "Metálico":
+        resultado.quadro_metalico = QUADRO_METALICO_POR_SISTEMA.get(instalacao, "")
+    return resultado
+
+
+__all__ = [
+    "DimensionamentoInput",
+    "DimensionamentoResult",
+    "CORRENTES_NOMINAIS",
+    "CORRENTE_POR_BITOLA",
+    "obter_bitola_cabo",
+    "obter_bitola_cabo_estendida",
+    "obter_bitolas_cabo_lote",
+    "dimensionar_disjuntor",
+    "dimensionar_idr",
+    "dimensionar_dps",
+    "corrente_nominal_protecao",
+    "aviso_bitola",
+    "aviso_protecao",
+    "calcular_corrente",
+    "sugerir_instalacao",
+    "obter_tabela_cabos",
+    "contar_cabos",
+    "calcular_area_ocupada",
+    "selecionar_eletroduto",
+    "dimensionar",
+]
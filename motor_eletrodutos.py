@@ -0,0 +1,253 @@
+"""Ocupação de eletrodutos por vários circuitos e escolha do eletroduto.
+
+Cada trecho de eletroduto pode levar vários circuitos (os alimentadores de
+vários carregadores compartilhando o tronco, por exemplo), com bitolas e
+tipos de cabo diferentes. As áreas dos condutores ficam pré-calculadas em
+arrays por tipo de cabo; a área e a quantidade de condutores de cada trecho
+saem de um produto matricial entre a matriz trechos × circuitos e os vetores
+dos circuitos, e a escolha do eletroduto compara de uma vez as áreas de
+todos os trechos com as áreas úteis de ``TABELA_ELETRODUTOS``.
+
+A taxa máxima de ocupação segue a NBR 5410: 53% com um condutor, 31% com
+dois e 40% com três ou mais. Além do menor eletroduto, ``dimensionar_trechos``
+indica a combinação mais barata de tamanho e quantidade de eletrodutos em
+paralelo, somando eletroduto e acessórios com os preços do catálogo.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from motor_custos import obter_acessorios_infra, sugerir_quantidades_infra
+from tabelas_eletricas import (
+    TABELA_CABO_ISOLADO_PVC,
+    TABELA_CABO_UNIPOLAR_HEPR,
+    TABELA_ELETRODUTOS,
+)
+
+TAXA_OCUPACAO = {1: 0.53, 2: 0.31}
+TAXA_OCUPACAO_PADRAO = 0.40
+
+# Maior número de eletrodutos em paralelo considerado na opção econômica
+MAXIMO_PARALELOS = 4
+
+FASES_POR_SISTEMA = {"Monofásico": 1, "Bifásico": 2, "Trifásico": 3}
+
+TAMANHOS_ELETRODUTO = TABELA_ELETRODUTOS["Eletroduto (Pol)"].astype(str).to_numpy()
+# Área útil com 40% de ocupação, como tabelada; as outras taxas são proporcionais
+_AREA_UTIL_40 = TABELA_ELETRODUTOS["Área Ocupável 40% (mm²)"].astype(float).to_numpy()
+
+
+def _areas_condutores(tabela: pd.DataFrame) -> dict[float, float]:
+    bitolas = tabela["Cabo (mm²)"].astype(float).to_numpy()
+    areas = math.pi * (tabela["Diâmetro Externo (mm)"].astype(float).to_numpy() / 2) ** 2
+    return dict(zip(bitolas, areas))
+
+
+_AREA_CONDUTOR = {
+    "Cabo PVC": _areas_condutores(TABELA_CABO_ISOLADO_PVC),
+    "Cabo HEPR": _areas_condutores(TABELA_CABO_UNIPOLAR_HEPR),
+}
+
+
+@dataclass(frozen=True)
+class Circuito:
+    """Condutores de um circuito lançados no mesmo eletroduto."""
+
+    instalacao: str
+    bitola_fase: float
+    bitola_neutro: float = 0.0
+    bitola_terra: float = 0.0
+    tipo_cabos: str = "Cabo PVC"
+
+    def condutores(self) -> dict[float, int]:
+        """Quantidade de condutores de cada bitola (mm²)."""
+        quantidades: dict[float, int] = {}
+        if self.bitola_fase > 0:
+            fases = FASES_POR_SISTEMA.get(self.instalacao, 0)
+            quantidades[self.bitola_fase] = fases
+        if self.bitola_neutro > 0 and self.instalacao != "Bifásico":
+            quantidades[self.bitola_neutro] = quantidades.get(self.bitola_neutro, 0) + 1
+        if self.bitola_terra > 0:
+            quantidades[self.bitola_terra] = quantidades.get(self.bitola_terra, 0) + 1
+        return quantidades
+
+
+@lru_cache(maxsize=256)
+def _area_circuito(circuito: Circuito) -> tuple[float, int]:
+    tabela = _AREA_CONDUTOR.get(circuito.tipo_cabos, _AREA_CONDUTOR["Cabo HEPR"])
+    quantidades = circuito.condutores()
+    area = sum(tabela.get(bitola, 0.0) * qtd for bitola, qtd in quantidades.items())
+    return float(area), sum(quantidades.values())
+
+
+def areas_circuitos(circuitos: Sequence[Circuito]) -> tuple[np.ndarray, np.ndarray]:
+    """Área ocupada (mm²) e quantidade de condutores de cada circuito.
+
+    Circuitos iguais (os de carregadores de mesma potência) são calculados
+    uma única vez.
+    """
+    valores = [_area_circuito(circuito) for circuito in circuitos]
+    areas = np.array([area for area, _ in valores], dtype=float)
+    condutores = np.array([qtd for _, qtd in valores], dtype=int)
+    return areas, condutores
+
+
+def taxa_ocupacao(condutores) -> np.ndarray:
+    """Taxa máxima de ocupação do eletroduto pela quantidade de condutores."""
+    condutores = np.asarray(condutores)
+    taxa = np.full(condutores.shape, TAXA_OCUPACAO_PADRAO)
+    for quantidade, valor in TAXA_OCUPACAO.items():
+        taxa = np.where(condutores == quantidade, valor, taxa)
+    return taxa
+
+
+def _capacidade(condutores) -> np.ndarray:
+    """Área útil (mm²) de cada eletroduto para cada quantidade de condutores."""
+    taxa = np.asarray(taxa_ocupacao(condutores))[..., None]
+    return taxa / TAXA_OCUPACAO_PADRAO * _AREA_UTIL_40
+
+
+def eletroduto_minimo_lote(areas, condutores) -> np.ndarray:
+    """Índice do menor eletroduto que comporta cada área, ou -1.
+
+    As áreas úteis crescem com o tamanho, então basta contar quantos
+    eletrodutos ficam abaixo da área ocupada.
+    """
+    areas = np.asarray(areas, dtype=float)
+    indices = (_capacidade(condutores) < areas[..., None]).sum(axis=-1)
+    indices = np.where(areas > 0, indices, -1)
+    return np.where(indices < len(_AREA_UTIL_40), indices, -1)
+
+
+def selecionar_eletroduto_circuitos(circuitos: Sequence[Circuito]) -> str:
+    """Menor eletroduto para todos os ``circuitos`` juntos, ou ``""``."""
+    areas, condutores = areas_circuitos(circuitos)
+    indice = int(eletroduto_minimo_lote(areas.sum(), condutores.sum()))
+    return TAMANHOS_ELETRODUTO[indice] if indice >= 0 else ""
+
+
+def custo_infra_por_tamanho(
+    df_eletrodutos: pd.DataFrame,
+    comprimentos,
+    df_sealtubo: Optional[pd.DataFrame] = None,
+    quantidades: Optional[Sequence[dict]] = None,
+) -> np.ndarray:
+    """Custo de eletroduto e acessórios de cada trecho em cada tamanho.
+
+    Usa as ``quantidades`` de cada trecho ou, sem elas, as de
+    :func:`sugerir_quantidades_infra` para o comprimento do trecho, com os
+    preços de :func:`obter_acessorios_infra`. Retorna uma matriz trechos ×
+    tamanhos de ``TAMANHOS_ELETRODUTO``.
+    """
+    comprimentos = np.atleast_1d(np.asarray(comprimentos, dtype=float))
+    if quantidades is None:
+        quantidades = [sugerir_quantidades_infra(float(c)) for c in comprimentos]
+    tipos = list(quantidades[0]) if quantidades else []
+    matriz_quantidades = np.array(
+        [[float(q[tipo]) for tipo in tipos] for q in quantidades]
+    ).reshape(len(comprimentos), len(tipos))
+    precos = np.zeros((len(tipos), len(TAMANHOS_ELETRODUTO)))
+    for j, tamanho in enumerate(TAMANHOS_ELETRODUTO):
+        acessorios = obter_acessorios_infra(df_eletrodutos, tamanho, df_sealtubo)
+        for i, tipo in enumerate(tipos):
+            precos[i, j] = acessorios.get(tipo, ("", 0.0))[1]
+    # Tamanhos sem eletroduto no catálogo não podem ser orçados
+    sem_preco = precos[tipos.index("eletroduto")] <= 0 if "eletroduto" in tipos else []
+    custos = matriz_quantidades @ precos
+    custos[:, sem_preco] = np.inf
+    return custos
+
+
+def dimensionar_trechos(
+    circuitos: Sequence[Circuito],
+    trechos: Iterable[Iterable[int]],
+    comprimentos: Sequence[float],
+    df_eletrodutos: Optional[pd.DataFrame] = None,
+    df_sealtubo: Optional[pd.DataFrame] = None,
+    maximo_paralelos: int = MAXIMO_PARALELOS,
+    quantidades_infra: Optional[Sequence[dict]] = None,
+) -> pd.DataFrame:
+    """Eletroduto mínimo e opção mais barata de cada trecho.
+
+    ``trechos`` lista, para cada trecho, os índices dos ``circuitos`` que
+    passam por ele. Com eletrodutos em paralelo cada circuito fica inteiro em
+    um deles, distribuídos alternadamente: a ocupação de cada eletroduto é
+    estimada por ``ceil(circuitos / paralelos)`` vezes o maior circuito.
+    Sem ``df_eletrodutos`` a opção econômica não é calculada; custos ``NaN``
+    indicam tamanhos sem preço no catálogo. ``quantidades_infra`` traz as
+    quantidades de acessórios de cada trecho (ver
+    :func:`custo_infra_por_tamanho`).
+    """
+    areas, condutores = areas_circuitos(circuitos)
+    trechos = [list(trecho) for trecho in trechos]
+    membros = np.zeros((len(trechos), len(circuitos)))
+    for i, trecho in enumerate(trechos):
+        membros[i, trecho] = 1.0
+    area_trecho = membros @ areas
+    condutores_trecho = (membros @ condutores).astype(int)
+    circuitos_trecho = membros.sum(axis=1).astype(int)
+    maior_circuito = (membros * areas).max(axis=1, initial=0.0)
+
+    minimo = eletroduto_minimo_lote(area_trecho, condutores_trecho)
+    resultado = pd.DataFrame(
+        {
+            "Circuitos": circuitos_trecho,
+            "Condutores": condutores_trecho,
+            "Área Ocupada (mm²)": area_trecho,
+            "Eletroduto Mínimo": np.where(
+                minimo >= 0, TAMANHOS_ELETRODUTO[minimo], ""
+            ),
+        }
+    )
+    if df_eletrodutos is None or df_eletrodutos.empty or not len(trechos):
+        return resultado
+
+    custo_tamanho = custo_infra_por_tamanho(
+        df_eletrodutos, comprimentos, df_sealtubo, quantidades_infra
+    )
+    paralelos = np.arange(1, maximo_paralelos + 1)
+    # Ocupação máxima por eletroduto e condutores por eletroduto (trechos × n)
+    por_eletroduto = np.ceil(circuitos_trecho[:, None] / paralelos)
+    ocupacao = np.minimum(area_trecho[:, None], por_eletroduto * maior_circuito[:, None])
+    condutores_por = np.ceil(condutores_trecho[:, None] / paralelos)
+    cabe = ocupacao[..., None] <= _capacidade(condutores_por)
+    cabe &= (paralelos <= np.maximum(circuitos_trecho, 1)[:, None])[..., None]
+    custos = np.where(cabe, paralelos[None, :, None] * custo_tamanho[:, None, :], np.inf)
+
+    planos = custos.reshape(len(trechos), -1)
+    melhor = planos.argmin(axis=1)
+    viavel = np.isfinite(planos[np.arange(len(trechos)), melhor]) & (area_trecho > 0)
+    n_escolhido, tamanho_escolhido = np.divmod(melhor, len(TAMANHOS_ELETRODUTO))
+    resultado["Eletroduto Econômico"] = np.where(
+        viavel, TAMANHOS_ELETRODUTO[tamanho_escolhido], ""
+    )
+    resultado["Paralelos"] = np.where(viavel, paralelos[n_escolhido], 0)
+    resultado["Custo Econômico"] = np.where(
+        viavel, planos[np.arange(len(trechos)), melhor], np.nan
+    )
+    custo_minimo = custo_tamanho[np.arange(len(trechos)), np.maximum(minimo, 0)]
+    resultado["Custo Mínimo"] = np.where(
+        (minimo >= 0) & np.isfinite(custo_minimo), custo_minimo, np.nan
+    )
+    return resultado
+
+
+__all__ = [
+    "Circuito",
+    "MAXIMO_PARALELOS",
+    "TAMANHOS_ELETRODUTO",
+    "TAXA_OCUPACAO",
+    "TAXA_OCUPACAO_PADRAO",
+    "areas_circuitos",
+    "custo_infra_por_tamanho",
+    "dimensionar_trechos",
+    "eletroduto_minimo_lote",
+    "selecionar_eletroduto_circuitos",
+    "taxa_ocupacao",
+]
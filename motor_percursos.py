@@ -0,0 +1,430 @@
+"""Percursos em árvore: quadro geral → quadro de distribuição → carregadores.
+
+Os percursos da aba Visita são listas de ``(direção, metros)``. Aqui cada
+lista vira um :class:`Trecho` de uma árvore com raiz no quadro geral, e cada
+trecho sabe quais circuitos passam por ele. Um circuito passa pelo trecho
+onde termina e por todos os trechos a montante até chegar ao quadro de onde
+sai: o alimentador do quadro de distribuição percorre só o tronco, enquanto
+os circuitos dos carregadores saem do quadro de distribuição, compartilham
+o ramal até a derivação de cada grupo de vagas e seguem por ela.
+
+A matriz trechos × circuitos é montada em uma única passada (dos trechos
+mais distantes para a raiz) e dela saem, por produtos matriciais, a
+metragem de cada cabo, a ocupação dos eletrodutos de cada trecho
+(:func:`motor_eletrodutos.dimensionar_trechos`) e o comprimento percorrido
+por cada circuito. As curvas, conduletes, abraçadeiras e o sealtubo de cada
+trecho saem das setas de direção (:func:`analisar_infra`) e alimentam o
+orçamento da infra-seca.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from motor_custos import quantidade_condutores
+from motor_eletrodutos import Circuito, dimensionar_trechos
+
+DIRECOES = ("↑", "↓", "→", "←", "↷", "↶")
+
+# Segmentos curvos, lançados em eletroduto flexível (sealtubo)
+DIRECOES_FLEXIVEIS = ("↷", "↶")
+
+_OPOSTAS = {"↑": "↓", "↓": "↑", "→": "←", "←": "→"}
+
+COMPRIMENTO_BARRA_M = 3.0
+ESPACAMENTO_ABRACADEIRA_M = 1.0
+SEALTUBO_POR_CONEXAO_M = 1.0
+
+CORES_CONDUTORES = ("Preto", "Azul", "Verde")
+
+TRECHO_TRONCO = "Quadro geral → Quadro de distribuição"
+TRECHO_RAMAL = "Quadro de distribuição → Carregadores"
+TRECHO_UNICO = "Quadro geral → Carregador"
+
+# Colunas da tabela de derivações dos carregadores na aba Visita
+COLUNAS_DERIVACOES = ("Carregadores", "Posição no ramal (m)", "Direção", "Derivação (m)")
+
+
+@dataclass(frozen=True)
+class Trecho:
+    """Trecho do percurso entre dois pontos da instalação.
+
+    ``pai`` é o índice do trecho a montante (``-1`` para o quadro geral) e
+    deve ser menor que o índice do próprio trecho. ``circuitos`` são os
+    índices dos circuitos que terminam no fim do trecho. Com ``quadro`` o fim
+    do trecho é um quadro de distribuição: os circuitos dos trechos a
+    jusante nascem nele e não seguem para o tronco.
+    """
+
+    nome: str
+    segmentos: tuple[tuple[str, float], ...] = ()
+    pai: int = -1
+    circuitos: tuple[int, ...] = ()
+    quadro: bool = False
+
+    @property
+    def comprimento(self) -> float:
+        return float(sum(metros for _, metros in self.segmentos))
+
+
+def _segmentos(percursos) -> tuple[tuple[str, float], ...]:
+    return tuple((str(direcao), float(metros or 0.0)) for direcao, metros in percursos or ())
+
+
+def _curvas_mudanca(anterior: Optional[str], direcao: str) -> int:
+    """Curvas de 90° para passar de ``anterior`` para ``direcao``."""
+    if anterior is None or direcao == anterior:
+        return 0
+    return 2 if _OPOSTAS.get(direcao) == anterior else 1
+
+
+def analisar_infra(
+    segmentos, direcao_anterior: Optional[str] = None, conexoes: int = 1
+) -> dict[str, float]:
+    """Quantidades de infra-seca de um trecho a partir das direções.
+
+    Percorre os segmentos uma única vez. Segmentos seguidos na mesma direção
+    formam um lance reto, montado com barras de ``COMPRIMENTO_BARRA_M``
+    unidas por conduletes (com um unidut reto de cada lado). Cada mudança
+    entre direções retas é uma curva de 90° (duas na inversão de sentido);
+    os segmentos curvos (``↷``/``↶``) são lançados em sealtubo e fazem a
+    própria curva. Abraçadeiras vão a cada ``ESPACAMENTO_ABRACADEIRA_M`` e
+    cada um dos ``conexoes`` equipamentos no fim do trecho recebe
+    ``SEALTUBO_POR_CONEXAO_M`` de sealtubo. As chaves são as de
+    :func:`motor_custos.sugerir_quantidades_infra`.
+    """
+    barras = conduletes = curvas = abracadeiras = 0
+    flexivel = lance = 0.0
+    anterior = direcao_anterior
+
+    def _fechar_lance(lance: float) -> tuple[int, int]:
+        if lance <= 0:
+            return 0, 0
+        quantidade = math.ceil(lance / COMPRIMENTO_BARRA_M)
+        return quantidade, quantidade - 1
+
+    for direcao, metros in segmentos:
+        if metros <= 0:
+            continue
+        abracadeiras += math.ceil(metros / ESPACAMENTO_ABRACADEIRA_M)
+        if direcao == anterior:
+            lance += metros
+            continue
+        novas_barras, juntas = _fechar_lance(lance)
+        barras += novas_barras
+        conduletes += juntas
+        if direcao in DIRECOES_FLEXIVEIS:
+            flexivel += metros
+            anterior, lance = None, 0.0
+            continue
+        curvas += _curvas_mudanca(anterior, direcao)
+        anterior, lance = direcao, metros
+    novas_barras, juntas = _fechar_lance(lance)
+    barras += novas_barras
+    conduletes += juntas
+    return {
+        "eletroduto": barras,
+        "condulete": conduletes,
+        "condulete_t": 0,
+        "unidut_reto": 2 * conduletes,
+        "unidut_conico": 2 if barras else 0,
+        "curva_galv_eletro_90": curvas,
+        "unilet": 0,
+        "abracadeira": abracadeiras,
+        "sealtubo": round(flexivel + SEALTUBO_POR_CONEXAO_M * conexoes, 2)
+        if barras or flexivel
+        else 0.0,
+    }
+
+
+def contar_curvas(segmentos, direcao_anterior: Optional[str] = None) -> int:
+    """Curvas de 90° do trecho, como em :func:`analisar_infra`."""
+    return int(analisar_infra(segmentos, direcao_anterior)["curva_galv_eletro_90"])
+
+
+def _direcao_final(segmentos) -> Optional[str]:
+    for direcao, metros in reversed(segmentos):
+        if metros > 0:
+            return direcao
+    return None
+
+
+def matriz_membros(trechos: Sequence[Trecho], quantidade_circuitos: int) -> np.ndarray:
+    """Matriz trechos × circuitos com 1 onde o circuito passa pelo trecho."""
+    membros = np.zeros((len(trechos), quantidade_circuitos))
+    for i, trecho in enumerate(trechos):
+        membros[i, list(trecho.circuitos)] = 1.0
+    for i in range(len(trechos) - 1, -1, -1):
+        pai = trechos[i].pai
+        if pai < 0:
+            continue
+        if pai >= i:
+            raise ValueError(f"O trecho {i} deve vir depois do trecho a montante {pai}.")
+        if not trechos[pai].quadro:
+            membros[pai] = np.maximum(membros[pai], membros[i])
+    return membros
+
+
+def comprimentos_circuitos(trechos: Sequence[Trecho], quantidade_circuitos: int) -> np.ndarray:
+    """Comprimento (m) percorrido por cada circuito."""
+    comprimentos = np.array([trecho.comprimento for trecho in trechos], dtype=float)
+    return comprimentos @ matriz_membros(trechos, quantidade_circuitos)
+
+
+def metragem_cabos(trechos: Sequence[Trecho], circuitos: Sequence[Circuito]) -> pd.DataFrame:
+    """Metros de cabo por cor e bitola somando todos os circuitos.
+
+    Circuitos sem percurso continuam na tabela com 0 m, como na soma
+    simples dos percursos.
+    """
+    comprimentos = comprimentos_circuitos(trechos, len(circuitos))
+    linhas = []
+    for circuito, comprimento in zip(circuitos, comprimentos):
+        bitolas = (circuito.bitola_fase, circuito.bitola_neutro, circuito.bitola_terra)
+        quantidades = quantidade_condutores(circuito.instalacao, *bitolas)
+        for cor, bitola, quantidade in zip(CORES_CONDUTORES, bitolas, quantidades):
+            if quantidade > 0:
+                linhas.append((cor, float(bitola), quantidade * comprimento))
+    tabela = pd.DataFrame(linhas, columns=["Cor", "Bitola (mm²)", "Metros"])
+    if tabela.empty:
+        return tabela
+    tabela["Cor"] = pd.Categorical(tabela["Cor"], CORES_CONDUTORES, ordered=True)
+    tabela = tabela.groupby(["Cor", "Bitola (mm²)"], observed=True, as_index=False).sum()
+    return tabela.sort_values(["Cor", "Bitola (mm²)"], ignore_index=True)
+
+
+def quantidades_infra_trechos(trechos: Sequence[Trecho]) -> list[dict[str, float]]:
+    """Quantidades de :func:`analisar_infra` de cada trecho da árvore.
+
+    Um trecho continua na direção final do trecho a montante, exceto quando
+    este termina em um quadro. Cada derivação a mais no fim de um trecho
+    (mais de um trecho a jusante sem quadro) recebe um condulete T.
+    """
+    finais = [_direcao_final(trecho.segmentos) for trecho in trechos]
+    derivacoes = [0] * len(trechos)
+    quantidades = []
+    for trecho in trechos:
+        anterior = None
+        if trecho.pai >= 0 and not trechos[trecho.pai].quadro:
+            anterior = finais[trecho.pai]
+            derivacoes[trecho.pai] += 1
+        conexoes = 0 if trecho.quadro else len(trecho.circuitos)
+        quantidades.append(analisar_infra(trecho.segmentos, anterior, conexoes))
+    for quantidade, filhos in zip(quantidades, derivacoes):
+        quantidade["condulete_t"] = max(filhos - 1, 0)
+        quantidade["unidut_reto"] += 3 * quantidade["condulete_t"]
+    return quantidades
+
+
+def somar_quantidades_infra(quantidades: Iterable[dict[str, float]]) -> dict[str, float]:
+    """Soma item a item das quantidades de vários trechos."""
+    total: dict[str, float] = {}
+    for quantidade in quantidades:
+        for item, valor in quantidade.items():
+            total[item] = total.get(item, 0) + valor
+    if "sealtubo" in total:
+        total["sealtubo"] = round(total["sealtubo"], 2)
+    return total
+
+
+def analisar_rede(
+    trechos: Sequence[Trecho],
+    circuitos: Sequence[Circuito],
+    df_eletrodutos: Optional[pd.DataFrame] = None,
+    df_sealtubo: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Comprimento, curvas, condutores e eletroduto de cada trecho.
+
+    Os custos da opção econômica usam as quantidades derivadas das direções
+    de cada trecho (:func:`quantidades_infra_trechos`).
+    """
+    membros = matriz_membros(trechos, len(circuitos))
+    indices = [np.flatnonzero(linha).tolist() for linha in membros]
+    comprimentos = [trecho.comprimento for trecho in trechos]
+    quantidades = quantidades_infra_trechos(trechos)
+    eletrodutos = dimensionar_trechos(
+        circuitos,
+        indices,
+        comprimentos,
+        df_eletrodutos,
+        df_sealtubo,
+        quantidades_infra=quantidades,
+    )
+    resultado = pd.DataFrame(
+        {
+            "Trecho": [trecho.nome for trecho in trechos],
+            "Comprimento (m)": comprimentos,
+            "Curvas": [q["curva_galv_eletro_90"] for q in quantidades],
+            "Conduletes": [q["condulete"] for q in quantidades],
+        }
+    )
+    return pd.concat([resultado, eletrodutos], axis=1)
+
+
+def _cortar_segmentos(segmentos, inicio: float, fim: float) -> tuple[tuple[str, float], ...]:
+    """Parte dos ``segmentos`` entre ``inicio`` e ``fim`` metros do começo."""
+    cortados = []
+    posicao = 0.0
+    for direcao, metros in segmentos:
+        de, ate = max(posicao, inicio), min(posicao + metros, fim)
+        if ate > de:
+            cortados.append((direcao, round(ate - de, 6)))
+        posicao += metros
+    return tuple(cortados)
+
+
+def derivacoes_da_tabela(tabela: Optional[pd.DataFrame]) -> tuple:
+    """Grupos ``(posição, segmentos, quantidade)`` da tabela de derivações.
+
+    Cada linha de ``COLUNAS_DERIVACOES`` é um grupo de carregadores que deixa
+    o ramal comum na mesma posição e segue por uma derivação reta na
+    direção indicada. Linhas sem carregadores são ignoradas.
+    """
+    if not isinstance(tabela, pd.DataFrame) or tabela.empty:
+        return ()
+    quantidades, posicoes, direcoes, metros = (
+        tabela.reindex(columns=list(COLUNAS_DERIVACOES))[coluna]
+        for coluna in COLUNAS_DERIVACOES
+    )
+    quantidades = pd.to_numeric(quantidades, errors="coerce").fillna(0)
+    posicoes = pd.to_numeric(posicoes, errors="coerce").fillna(0.0)
+    metros = pd.to_numeric(metros, errors="coerce").fillna(0.0)
+    grupos = []
+    for quantidade, posicao, direcao, comprimento in zip(
+        quantidades, posicoes, direcoes, metros
+    ):
+        if quantidade <= 0:
+            continue
+        direcao = direcao if direcao in DIRECOES else DIRECOES[0]
+        segmentos = ((direcao, float(comprimento)),) if comprimento > 0 else ()
+        grupos.append((float(posicao), segmentos, int(quantidade)))
+    return tuple(grupos)
+
+
+def comprimentos_carregadores(
+    percursos: Iterable, quantidade: int, derivacoes: Iterable = ()
+) -> list[float]:
+    """Comprimento (m) do circuito de cada carregador saindo do quadro de distribuição.
+
+    É o ramal comum até a derivação do carregador mais a própria derivação,
+    como nos trechos de :func:`montar_rede`.
+    """
+    comprimento = float(sum(metros for _, metros in _segmentos(percursos)))
+    comprimentos: list[float] = []
+    for posicao, segmentos, grupo in derivacoes:
+        grupo = min(int(grupo or 0), quantidade - len(comprimentos))
+        if grupo <= 0:
+            continue
+        posicao = min(max(float(posicao or 0.0), 0.0), comprimento)
+        derivacao = float(sum(metros for _, metros in _segmentos(segmentos)))
+        comprimentos.extend([posicao + derivacao] * grupo)
+    comprimentos.extend([comprimento] * (quantidade - len(comprimentos)))
+    return comprimentos
+
+
+def montar_rede(
+    percursos: Iterable,
+    alimentador: Circuito,
+    percursos_quadro: Iterable = (),
+    circuitos_carregadores: Sequence[Circuito] = (),
+    derivacoes: Iterable = (),
+) -> tuple[list[Trecho], list[Circuito]]:
+    """Árvore de trechos e lista de circuitos a partir dos percursos da Visita.
+
+    Sem ``circuitos_carregadores`` há um único trecho (``percursos``) com o
+    ``alimentador``. Com eles, o alimentador vai do quadro geral ao quadro de
+    distribuição por ``percursos_quadro`` e cada carregador tem seu circuito,
+    saindo do quadro de distribuição pelo ramal comum ``percursos``.
+
+    ``derivacoes`` traz, na ordem dos carregadores, grupos
+    ``(posição no ramal em m, segmentos, quantidade)``: os carregadores do
+    grupo deixam o ramal na posição indicada e seguem pelos próprios
+    segmentos, de modo que cada circuito percorre só o ramal até a sua
+    derivação. O ramal é dividido nas posições de derivação, e cada parte
+    leva apenas os circuitos que seguem adiante. Carregadores sem grupo
+    ficam no fim do ramal.
+    """
+    circuitos = [alimentador, *circuitos_carregadores]
+    if not circuitos_carregadores:
+        return [Trecho(TRECHO_UNICO, _segmentos(percursos), circuitos=(0,))], circuitos
+    ramal = _segmentos(percursos)
+    comprimento = float(sum(metros for _, metros in ramal))
+
+    # (posição, segmentos da derivação, circuitos) de cada saída do ramal
+    saidas = []
+    proximo = 1
+    for posicao, segmentos, quantidade in derivacoes:
+        quantidade = min(int(quantidade or 0), len(circuitos) - proximo)
+        if quantidade <= 0:
+            continue
+        posicao = min(max(float(posicao or 0.0), 0.0), comprimento)
+        membros = tuple(range(proximo, proximo + quantidade))
+        saidas.append((posicao, _segmentos(segmentos), membros))
+        proximo += quantidade
+    if proximo < len(circuitos):
+        saidas.append((comprimento, (), tuple(range(proximo, len(circuitos)))))
+
+    trechos = [
+        Trecho(TRECHO_TRONCO, _segmentos(percursos_quadro), circuitos=(0,), quadro=True)
+    ]
+    posicoes = sorted({posicao for posicao, _, _ in saidas})
+    if posicoes == [comprimento] and all(not segmentos for _, segmentos, _ in saidas):
+        # Todos os carregadores no fim do ramal comum
+        membros = tuple(range(1, len(circuitos)))
+        trechos.append(Trecho(TRECHO_RAMAL, ramal, pai=0, circuitos=membros))
+        return trechos, circuitos
+
+    pai, inicio = 0, 0.0
+    for posicao in posicoes:
+        diretos = tuple(
+            i
+            for p, segmentos, membros in saidas
+            if p == posicao and not segmentos
+            for i in membros
+        )
+        if posicao > inicio or diretos:
+            trechos.append(
+                Trecho(
+                    f"{TRECHO_RAMAL} ({inicio:g}–{posicao:g} m)",
+                    _cortar_segmentos(ramal, inicio, posicao),
+                    pai=pai,
+                    circuitos=diretos,
+                )
+            )
+            pai, inicio = len(trechos) - 1, posicao
+        for p, segmentos, membros in saidas:
+            if p == posicao and segmentos:
+                trechos.append(
+                    Trecho(
+                        f"Derivação a {posicao:g} m → {len(membros)} carregador(es)",
+                        segmentos,
+                        pai=pai,
+                        circuitos=membros,
+                    )
+                )
+    return trechos, circuitos
+
+
+__all__ = [
+    "COLUNAS_DERIVACOES",
+    "CORES_CONDUTORES",
+    "DIRECOES",
+    "DIRECOES_FLEXIVEIS",
+    "ESPACAMENTO_ABRACADEIRA_M",
+    "Trecho",
+    "analisar_infra",
+    "analisar_rede",
+    "comprimentos_carregadores",
+    "comprimentos_circuitos",
+    "contar_curvas",
+    "derivacoes_da_tabela",
+    "matriz_membros",
+    "metragem_cabos",
+    "montar_rede",
+    "quantidades_infra_trechos",
+    "somar_quantidades_infra",
+]
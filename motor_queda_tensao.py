@@ -0,0 +1,268 @@
+"""Dimensionamento de cabos por queda de tensão e capacidade de corrente.
+
+As tabelas de bitolas (``TABELA_BITOLAS``/``TABELA_NEUTRO_TERRA``) cobrem até
+150 m e sete potências de referência. Este módulo calcula, para qualquer
+comprimento, potência, sistema e tipo de cabo, a queda de tensão e a
+capacidade de condução de todas as bitolas de uma vez (arrays NumPy) e
+escolhe a menor bitola que atende aos dois critérios. O cálculo é vetorizado
+também sobre os cenários, de modo que milhares de combinações são avaliadas
+em uma única chamada.
+
+Premissas (condutores de cobre, NBR 5410):
+
+* resistência em corrente contínua a 20 °C da IEC 60228 (classe 5),
+  corrigida para a temperatura máxima do condutor (70 °C no PVC, 90 °C no
+  HEPR) e reatância indutiva constante de ``REATANCIA_OHM_KM``;
+* capacidade de condução do método de referência B1 (condutores isolados em
+  eletroduto sobre parede), com 2 condutores carregados no monofásico e no
+  bifásico e 3 no trifásico;
+* queda de tensão ``k * I * L * (R cos φ + X sen φ)``, com ``k = 2`` para
+  circuitos de dois condutores e ``k = √3`` no trifásico, limitada a
+  ``QUEDA_MAXIMA_PADRAO`` por cento da tensão do circuito.
+
+Com essas premissas a 220 V (monofásico/bifásico) e 380 V (trifásico) o
+resultado reproduz as tabelas de bitolas até 150 m, exceto a poucos metros
+das mudanças de bitola e nas bitolas mínimas que as tabelas impõem a cada
+potência.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from tabelas_eletricas import TABELA_CABO_ISOLADO_PVC, TABELA_CABO_UNIPOLAR_HEPR
+
+# Resistência máxima do condutor de cobre classe 5 a 20 °C (Ω/km)
+RESISTENCIA_20C_OHM_KM = {
+    1.5: 13.3,
+    2.5: 7.98,
+    4.0: 4.95,
+    6.0: 3.30,
+    10.0: 1.91,
+    16.0: 1.21,
+    25.0: 0.780,
+    35.0: 0.554,
+    50.0: 0.386,
+    70.0: 0.272,
+    95.0: 0.206,
+    120.0: 0.161,
+    150.0: 0.129,
+    185.0: 0.106,
+    240.0: 0.0801,
+    300.0: 0.0641,
+}
+
+# Capacidade de condução (A), método B1: (2 condutores, 3 condutores carregados)
+CAPACIDADE_CORRENTE_B1 = {
+    "Cabo PVC": {
+        1.5: (17.5, 15.5),
+        2.5: (24, 21),
+        4.0: (32, 28),
+        6.0: (41, 36),
+        10.0: (57, 50),
+        16.0: (76, 68),
+        25.0: (101, 89),
+        35.0: (125, 110),
+        50.0: (151, 134),
+        70.0: (192, 171),
+        95.0: (232, 207),
+        120.0: (269, 239),
+        150.0: (300, 262),
+        185.0: (341, 296),
+        240.0: (400, 346),
+        300.0: (458, 394),
+    },
+    "Cabo HEPR": {
+        1.5: (23, 20),
+        2.5: (31, 28),
+        4.0: (42, 37),
+        6.0: (54, 48),
+        10.0: (75, 66),
+        16.0: (100, 88),
+        25.0: (133, 117),
+        35.0: (164, 144),
+        50.0: (198, 175),
+        70.0: (253, 222),
+        95.0: (306, 269),
+        120.0: (354, 312),
+        150.0: (393, 342),
+        185.0: (449, 384),
+        240.0: (528, 450),
+        300.0: (603, 514),
+    },
+}
+
+# Temperatura máxima do condutor em serviço contínuo (°C)
+TEMPERATURA_CONDUTOR = {"Cabo PVC": 70.0, "Cabo HEPR": 90.0}
+
+COEFICIENTE_TEMPERATURA_COBRE = 0.00393
+REATANCIA_OHM_KM = 0.08
+QUEDA_MAXIMA_PADRAO = 4.0
+
+# Tensão de referência do circuito quando não há medições
+TENSAO_PADRAO = {"Monofásico": 220.0, "Bifásico": 220.0, "Trifásico": 380.0}
+
+
+@dataclass(frozen=True)
+class _TabelaCondutores:
+    bitolas: np.ndarray
+    resistencia: np.ndarray
+    capacidade: np.ndarray  # colunas: 2 e 3 condutores carregados
+
+
+def _compilar_condutores(tipo_cabos: str, tabela: pd.DataFrame) -> _TabelaCondutores:
+    """Arrays das bitolas do catálogo que têm dados elétricos conhecidos."""
+    capacidades = CAPACIDADE_CORRENTE_B1[tipo_cabos]
+    bitolas = np.array(
+        sorted(
+            b
+            for b in tabela["Cabo (mm²)"].astype(float)
+            if b in capacidades and b in RESISTENCIA_20C_OHM_KM
+        )
+    )
+    correcao = 1 + COEFICIENTE_TEMPERATURA_COBRE * (TEMPERATURA_CONDUTOR[tipo_cabos] - 20)
+    resistencia = np.array([RESISTENCIA_20C_OHM_KM[b] for b in bitolas]) * correcao
+    capacidade = np.array([capacidades[b] for b in bitolas], dtype=float)
+    return _TabelaCondutores(bitolas, resistencia, capacidade)
+
+
+_CONDUTORES = {
+    "Cabo PVC": _compilar_condutores("Cabo PVC", TABELA_CABO_ISOLADO_PVC),
+    "Cabo HEPR": _compilar_condutores("Cabo HEPR", TABELA_CABO_UNIPOLAR_HEPR),
+}
+
+
+@dataclass
+class AvaliacaoCabos:
+    """Avaliação de todas as bitolas para um conjunto de cenários.
+
+    ``corrente`` e ``bitola`` têm um valor por cenário; ``queda_percentual``,
+    ``capacidade`` e ``atende`` têm uma linha por cenário e uma coluna por
+    bitola de ``bitolas``. ``bitola`` é ``NaN`` quando nenhuma atende.
+    """
+
+    bitolas: np.ndarray
+    corrente: np.ndarray
+    queda_percentual: np.ndarray
+    capacidade: np.ndarray
+    atende: np.ndarray
+    bitola: np.ndarray
+
+
+def tensao_circuito(instalacao: str, tensao_ff: float | None = None) -> float:
+    """Tensão (V) aplicada ao carregador a partir da tensão entre fases medida.
+
+    No monofásico em rede 380/220 V o carregador fica entre fase e neutro;
+    sem medição, usa ``TENSAO_PADRAO``.
+    """
+    if not tensao_ff or tensao_ff <= 0:
+        return TENSAO_PADRAO.get(instalacao, 220.0)
+    if instalacao == "Monofásico" and tensao_ff > 300:
+        return tensao_ff / math.sqrt(3)
+    return float(tensao_ff)
+
+
+def avaliar_bitolas_lote(
+    potencias_kw,
+    comprimentos_m,
+    tensoes_v,
+    instalacoes,
+    tipo_cabos: str = "Cabo PVC",
+    queda_maxima: float = QUEDA_MAXIMA_PADRAO,
+    fator_potencia: float = 1.0,
+) -> AvaliacaoCabos:
+    """Avalia queda de tensão e capacidade de todas as bitolas por cenário.
+
+    ``potencias_kw``, ``comprimentos_m``, ``tensoes_v`` e ``instalacoes``
+    podem ser escalares ou arrays (combinados por *broadcasting*).
+    """
+    condutores = _CONDUTORES.get(tipo_cabos, _CONDUTORES["Cabo HEPR"])
+    potencias, comprimentos, tensoes, instalacoes = np.broadcast_arrays(
+        np.asarray(potencias_kw, dtype=float),
+        np.asarray(comprimentos_m, dtype=float),
+        np.asarray(tensoes_v, dtype=float),
+        np.asarray(instalacoes, dtype=object),
+    )
+    trifasico = instalacoes == "Trifásico"
+    fator_sistema = np.where(trifasico, math.sqrt(3), 1.0)
+    fator_queda = np.where(trifasico, math.sqrt(3), 2.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corrente = potencias * 1000 / (fator_sistema * tensoes * fator_potencia)
+    corrente = np.where((potencias > 0) & (tensoes > 0), corrente, np.nan)
+
+    seno = math.sqrt(max(0.0, 1 - fator_potencia**2))
+    impedancia = condutores.resistencia * fator_potencia + REATANCIA_OHM_KM * seno
+    queda_v = (
+        (fator_queda * corrente * comprimentos / 1000)[..., None] * impedancia
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        queda_percentual = queda_v / tensoes[..., None] * 100
+    capacidade = np.where(
+        trifasico[..., None], condutores.capacidade[:, 1], condutores.capacidade[:, 0]
+    )
+    atende = (queda_percentual <= queda_maxima) & (capacidade >= corrente[..., None])
+
+    # As bitolas estão em ordem crescente: a primeira que atende é a menor
+    alguma = atende.any(axis=-1)
+    indices = atende.argmax(axis=-1)
+    bitola = np.where(alguma, condutores.bitolas[indices], np.nan)
+    return AvaliacaoCabos(
+        condutores.bitolas, corrente, queda_percentual, capacidade, atende, bitola
+    )
+
+
+def selecionar_bitola(
+    potencia_kw: float,
+    comprimento_m: float,
+    tensao_v: float,
+    instalacao: str,
+    tipo_cabos: str = "Cabo PVC",
+    queda_maxima: float = QUEDA_MAXIMA_PADRAO,
+) -> str:
+    """Menor bitola (``"x mm²"``) que atende ao cenário, ou ``""``."""
+    if potencia_kw <= 0 or comprimento_m <= 0:
+        return ""
+    bitola = avaliar_bitolas_lote(
+        potencia_kw, comprimento_m, tensao_v, instalacao, tipo_cabos, queda_maxima
+    ).bitola
+    if np.isnan(bitola):
+        return ""
+    return f"{float(bitola):g} mm²"
+
+
+def tabela_queda_tensao(
+    potencia_kw: float,
+    comprimento_m: float,
+    tensao_v: float,
+    instalacao: str,
+    tipo_cabos: str = "Cabo PVC",
+    queda_maxima: float = QUEDA_MAXIMA_PADRAO,
+) -> pd.DataFrame:
+    """Queda de tensão e capacidade de cada bitola para um único cenário."""
+    avaliacao = avaliar_bitolas_lote(
+        potencia_kw, comprimento_m, tensao_v, instalacao, tipo_cabos, queda_maxima
+    )
+    return pd.DataFrame(
+        {
+            "Cabo (mm²)": avaliacao.bitolas,
+            "Capacidade (A)": avaliacao.capacidade,
+            "Queda de Tensão (%)": avaliacao.queda_percentual.round(2),
+            "Atende": avaliacao.atende,
+        }
+    )
+
+
+__all__ = [
+    "AvaliacaoCabos",
+    "CAPACIDADE_CORRENTE_B1",
+    "QUEDA_MAXIMA_PADRAO",
+    "RESISTENCIA_20C_OHM_KM",
+    "avaliar_bitolas_lote",
+    "selecionar_bitola",
+    "tabela_queda_tensao",
+    "tensao_circuito",
+]
@@ -0,0 +1,304 @@
+"""Reprecificação das propostas já geradas.
+
+Ao gerar o orçamento, :func:`registrar_proposta` grava no registro
+(``registro_dados``, tipo ``"proposta"``) os totais cotados, a entrada do
+orçamento no formato de ``motor_cenarios`` e a referência de conteúdo do
+catálogo de preços usado (:func:`catalogo_banco.referencia_catalogo`, 32
+caracteres).
+
+:func:`reprecificar` recalcula uma proposta com as tabelas de outra
+referência, de uma data do histórico de preços ou do catálogo atual. O
+custo de material passa a ser o cotado mais a diferença calculada entre as
+tabelas novas e as da proposta, de modo que os ajustes manuais feitos na
+aba de Custos continuam valendo, e os totais seguem
+``calcular_totais_servico``. Reprecificar com a própria referência da
+proposta devolve exatamente os totais cotados.
+
+:func:`reprecificar_arquivo` faz isso para todas as propostas do registro e
+marca as desatualizadas. Cada conjunto de tabelas é carregado uma única vez,
+os dimensionamentos são compartilhados entre as propostas e as propostas
+cujas tabelas de material têm o mesmo conteúdo das de destino nem são
+recalculadas.
+
+Uso: ``python motor_reprecificacao.py [--data AAAA-MM-DD] [--limite 0.02]
+[-o propostas.csv]``
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import asdict, fields
+from typing import Mapping, Optional
+
+import pandas as pd
+
+from catalogo_banco import (
+    referencia_catalogo,
+    resumos_referencia,
+    tabela_na_data,
+    tabelas_referencia,
+)
+from motor_cenarios import EntradaCenario, avaliar_entrada, totais_entrada
+from motor_custos import TabelasMateriais, carregar_tabelas_materiais
+from motor_dimensionamento import DimensionamentoInput
+from registro_dados import ler_registros, registrar
+
+TIPO_PROPOSTA = "proposta"
+
+# Variação relativa do total do serviço a partir da qual a proposta é
+# considerada desatualizada
+LIMITE_DESATUALIZACAO = 0.02
+
+# CSVs usados no custo de material (``carregar_tabelas_materiais``)
+TABELAS_MATERIAIS = (
+    "valores_cabos.csv",
+    "valores_eletrodutos.csv",
+    "valores_disjuntor_din.csv",
+    "valores_idr.csv",
+    "valores_dps.csv",
+    "valores_barra_pente.csv",
+    "valores_paineis_quadros.csv",
+)
+
+# Conjuntos de tabelas preparados, por referência ou data
+_MAXIMO_TABELAS = 8
+_TABELAS: OrderedDict = OrderedDict()
+
+_CAMPOS_ENTRADA = {campo.name for campo in fields(EntradaCenario)}
+
+
+def entrada_para_dados(entrada: EntradaCenario) -> dict:
+    """Entrada do orçamento como dicionário serializável em JSON."""
+    return asdict(entrada)
+
+
+def entrada_de_dados(dados: Mapping) -> EntradaCenario:
+    """Reconstrói a :class:`EntradaCenario` gravada por :func:`entrada_para_dados`."""
+    campos = {chave: valor for chave, valor in dados.items() if chave in _CAMPOS_ENTRADA}
+    dimensionamento = dict(campos.get("dimensionamento") or {})
+    dimensionamento["tensoes_ff"] = tuple(dimensionamento.get("tensoes_ff") or ())
+    campos["dimensionamento"] = DimensionamentoInput(**dimensionamento)
+    campos["percursos"] = tuple(tuple(trecho) for trecho in campos.get("percursos") or ())
+    return EntradaCenario(**campos)
+
+
+def registrar_proposta(
+    entrada: EntradaCenario,
+    total_materiais: float,
+    total_servico: float,
+    ordem_venda: str = "",
+    cliente: str = "",
+    caminho=None,
+) -> dict:
+    """Grava a proposta gerada com a referência do catálogo atual."""
+    dados = {
+        "Gerada em": _dt.datetime.now().isoformat(timespec="seconds"),
+        "Ordem de Venda": str(ordem_venda or ""),
+        "Cliente": str(cliente or ""),
+        "Catálogo": referencia_catalogo(),
+        "Total Materiais": float(total_materiais),
+        "Total Serviço": float(total_servico),
+        "Entrada": entrada_para_dados(entrada),
+    }
+    registrar(TIPO_PROPOSTA, dados, ordem_venda, caminho=caminho)
+    return dados
+
+
+def tabelas_catalogo(
+    referencia: Optional[str] = None, data=None
+) -> tuple[Optional[str], TabelasMateriais]:
+    """Referência e tabelas de material de ``referencia``, de ``data`` ou atuais.
+
+    Sem ``referencia`` nem ``data`` usa o catálogo atual (e devolve a sua
+    referência); com ``data``, os preços vigentes naquela data segundo o
+    histórico de preços e referência ``None``.
+    """
+    if referencia is None and data is None:
+        referencia = referencia_catalogo()
+    chave = ("referencia", referencia) if referencia is not None else ("data", str(data))
+    if chave in _TABELAS:
+        _TABELAS.move_to_end(chave)
+        return referencia, _TABELAS[chave]
+
+    if referencia is not None:
+        brutas = tabelas_referencia(referencia)
+    else:
+        brutas = {}
+        for arquivo in TABELAS_MATERIAIS:
+            try:
+                brutas[arquivo] = tabela_na_data(arquivo, data)
+            except FileNotFoundError:
+                continue
+    tabelas = carregar_tabelas_materiais(
+        {arquivo: brutas.get(arquivo) for arquivo in TABELAS_MATERIAIS}
+    )
+    _TABELAS[chave] = tabelas
+    while len(_TABELAS) > _MAXIMO_TABELAS:
+        _TABELAS.popitem(last=False)
+    return referencia, tabelas
+
+
+def _valor(proposta: Mapping, chave: str) -> float:
+    return float(proposta.get(chave, 0.0) or 0.0)
+
+
+def _linha(proposta: Mapping, materiais: float, total: Optional[float] = None) -> dict:
+    cotado = _valor(proposta, "Total Serviço")
+    total = cotado if total is None else total
+    return {
+        "Gerada em": proposta.get("Gerada em", ""),
+        "Ordem de Venda": proposta.get("Ordem de Venda", ""),
+        "Cliente": proposta.get("Cliente", ""),
+        "Catálogo": proposta.get("Catálogo", ""),
+        "Total Materiais": _valor(proposta, "Total Materiais"),
+        "Total Serviço": cotado,
+        "Materiais Reprecificados": materiais,
+        "Serviço Reprecificado": total,
+        "Diferença": total - cotado,
+        "Variação": (total - cotado) / cotado if cotado else 0.0,
+    }
+
+
+def _materiais(
+    entrada: EntradaCenario, tabelas: TabelasMateriais, calculados: dict
+) -> float:
+    """Custo de material calculado de ``entrada``, memorizado em ``calculados``."""
+    chave = (id(tabelas), entrada)
+    if chave not in calculados:
+        dimensionamentos = calculados.setdefault("dimensionamentos", {})
+        calculados[chave] = avaliar_entrada(
+            "", entrada, tabelas, dimensionamentos
+        ).total_materiais
+    return calculados[chave]
+
+
+def _reprecificar(
+    proposta: Mapping,
+    origem: TabelasMateriais,
+    destino: TabelasMateriais,
+    calculados: dict,
+) -> dict:
+    entrada = entrada_de_dados(proposta["Entrada"])
+    cotado = _valor(proposta, "Total Materiais")
+    materiais = max(
+        cotado
+        + _materiais(entrada, destino, calculados)
+        - _materiais(entrada, origem, calculados),
+        0.0,
+    )
+    # Diferença sobre o total cotado: ajustes feitos depois do cálculo de
+    # serviço também são preservados
+    diferenca = (
+        totais_entrada(entrada, materiais)["total_servico"]
+        - totais_entrada(entrada, cotado)["total_servico"]
+    )
+    return _linha(proposta, materiais, _valor(proposta, "Total Serviço") + diferenca)
+
+
+def reprecificar(
+    proposta: Mapping, referencia: Optional[str] = None, data=None
+) -> dict:
+    """Totais cotados e recalculados da proposta com outros preços.
+
+    Sem ``referencia`` nem ``data`` usa os preços atuais do catálogo.
+    """
+    _, origem = tabelas_catalogo(proposta["Catálogo"])
+    _, destino = tabelas_catalogo(referencia, data)
+    return _reprecificar(proposta, origem, destino, {})
+
+
+def _mesmos_materiais(resumos: Mapping[str, str], destino: Mapping[str, str]) -> bool:
+    return all(
+        resumos.get(arquivo) == destino.get(arquivo) for arquivo in TABELAS_MATERIAIS
+    )
+
+
+def reprecificar_arquivo(
+    referencia: Optional[str] = None,
+    data=None,
+    limite: float = LIMITE_DESATUALIZACAO,
+    ordem_venda=None,
+    caminho=None,
+) -> pd.DataFrame:
+    """Reprecifica todas as propostas do registro (ou de uma ordem de venda).
+
+    A coluna ``Desatualizada`` marca as propostas cujo total do serviço
+    varia mais que ``limite`` (fração) com os preços de destino.
+    """
+    referencia, destino = tabelas_catalogo(referencia, data)
+    resumos_destino = None if referencia is None else resumos_referencia(referencia)
+    resumos: dict = {}
+    calculados: dict = {}
+    linhas = []
+    for proposta in ler_registros(TIPO_PROPOSTA, ordem_venda, caminho):
+        origem = proposta.get("Catálogo")
+        if not origem or "Entrada" not in proposta:
+            continue
+        if origem not in resumos:
+            try:
+                resumos[origem] = resumos_referencia(origem)
+            except KeyError:
+                resumos[origem] = None
+        if resumos[origem] is None:
+            continue
+        if resumos_destino is not None and _mesmos_materiais(
+            resumos[origem], resumos_destino
+        ):
+            linhas.append(_linha(proposta, _valor(proposta, "Total Materiais")))
+            continue
+        _, tabelas = tabelas_catalogo(origem)
+        linhas.append(_reprecificar(proposta, tabelas, destino, calculados))
+
+    resultado = pd.DataFrame(linhas, columns=list(_linha({}, 0.0)))
+    resultado["Desatualizada"] = resultado["Variação"].abs() > limite
+    return resultado
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Reprecifica as propostas geradas e marca as desatualizadas."
+    )
+    parser.add_argument("--referencia", default=None, help="referência do catálogo")
+    parser.add_argument(
+        "--data", default=None, help="preços vigentes na data (AAAA-MM-DD)"
+    )
+    parser.add_argument(
+        "--limite",
+        type=float,
+        default=LIMITE_DESATUALIZACAO,
+        help="variação (fração) a partir da qual a proposta está desatualizada",
+    )
+    parser.add_argument("-o", "--saida", default=None, help="CSV com o resultado")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultado = reprecificar_arquivo(args.referencia, args.data, args.limite)
+    if args.saida:
+        resultado.to_csv(args.saida, sep=";", index=False, decimal=",")
+    else:
+        print(resultado.to_string(index=False))
+    print(
+        f"{int(resultado['Desatualizada'].sum())} de {len(resultado)} propostas "
+        f"desatualizadas ({time.perf_counter() - inicio:.2f} s)",
+        file=sys.stderr,
+    )
+
+
+__all__ = [
+    "LIMITE_DESATUALIZACAO",
+    "TABELAS_MATERIAIS",
+    "TIPO_PROPOSTA",
+    "entrada_de_dados",
+    "entrada_para_dados",
+    "registrar_proposta",
+    "reprecificar",
+    "reprecificar_arquivo",
+    "tabelas_catalogo",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""Risco de variação de preço dos materiais de um orçamento.
+
+Os preços dos ``valores_*.csv`` guardam apenas a data da última
+atualização ("Atualizado"), mas o orçamento os trata como exatos. Aqui o
+custo de cada categoria de material (cabos, infra-seca, quadro de proteção
+e material adicional) é multiplicado por um fator lognormal sorteado: a
+deriva e a volatilidade anuais da categoria, aplicadas ao tempo desde a
+atualização dos preços. Quanto mais antigo o preço, mais largo o intervalo.
+
+A deriva e a volatilidade de cada categoria são estimadas por
+:func:`estimar_parametros` a partir do histórico de preços do catálogo
+(:func:`historico_categorias`, variações do mesmo material entre duas
+datas). Categorias sem variações suficientes no
+histórico usam ``DERIVA_ANUAL_PADRAO`` e ``VOLATILIDADE_ANUAL_PADRAO``.
+
+Todos os sorteios são feitos de uma vez em arrays NumPy (sorteios ×
+categorias) e os totais do serviço saem de ``calcular_totais_servico``
+aplicado aos arrays, então dezenas de milhares de sorteios levam poucos
+milissegundos.
+"""
+from __future__ import annotations
+
+import datetime as _dt
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from catalogo_banco import historico_precos
+from catalogo_precos import obter_tabela_precos
+from motor_custos import calcular_totais_servico
+
+# Categorias de material (blocos da aba de Custos) e os CSVs de cada uma
+CATEGORIAS_RISCO = {
+    "Cabos": ("valores_cabos.csv",),
+    "Infra-seca": ("valores_eletrodutos.csv", "valores_barra_roscada.csv"),
+    "Quadro de proteção": (
+        "valores_disjuntor_din.csv",
+        "valores_idr.csv",
+        "valores_dps.csv",
+        "valores_barra_pente.csv",
+        "valores_paineis_quadros.csv",
+        "valores_disjuntor_caixa_moldada.csv",
+    ),
+    "Material adicional": (),
+}
+
+# Valores de referência usados sem histórico suficiente (frações ao ano)
+DERIVA_ANUAL_PADRAO = 0.05
+VOLATILIDADE_ANUAL_PADRAO = {
+    "Cabos": 0.20,
+    "Infra-seca": 0.10,
+    "Quadro de proteção": 0.08,
+    "Material adicional": 0.10,
+}
+VOLATILIDADE_PADRAO = 0.10
+
+# Idade atribuída a preços sem data de atualização
+IDADE_SEM_DATA_ANOS = 1.0
+
+# Menor quantidade de variações do histórico para estimar uma categoria
+MINIMO_VARIACOES = 5
+
+SORTEIOS_PADRAO = 20_000
+
+FORMATO_DATA = "%d/%m/%Y"
+
+_DIAS_ANO = 365.25
+
+
+@dataclass(frozen=True)
+class ParametrosCategoria:
+    """Custo atual de uma categoria e a incerteza do seu preço."""
+
+    total: float
+    idade_anos: float = IDADE_SEM_DATA_ANOS
+    deriva_anual: float = DERIVA_ANUAL_PADRAO
+    volatilidade_anual: float = VOLATILIDADE_PADRAO
+    estimado: bool = False
+
+
+@dataclass
+class ResultadoRisco:
+    """Distribuição simulada do custo, do total e da margem de um orçamento.
+
+    ``custo_projeto`` é a base sem carregador (materiais, mão de obra,
+    deslocamento, adicionais e projeto). ``margem`` é o lucro que sobra
+    mantendo o preço cotado: o lucro cotado menos o aumento do custo.
+    """
+
+    categorias: dict
+    materiais: np.ndarray
+    custo_projeto: np.ndarray
+    total_servico: np.ndarray
+    margem: np.ndarray
+    custo_cotado: float
+    total_cotado: float
+    margem_cotada: float
+
+    def percentil(self, campo: str, p: float) -> float:
+        return float(np.percentile(getattr(self, campo), p))
+
+    @property
+    def probabilidade_prejuizo(self) -> float:
+        """Fração dos sorteios em que o aumento de custo consome o lucro."""
+        return float((self.margem < 0).mean())
+
+
+def datas_atualizacao(tabela: Optional[pd.DataFrame]) -> pd.Series:
+    """Datas das colunas "Atualizado*" da ``tabela``, uma por preço.
+
+    Preços sem data (ou com data inválida) ficam ``NaT``.
+    """
+    if tabela is None:
+        return pd.Series([], dtype="datetime64[ns]")
+    colunas = [c for c in tabela.columns if str(c).startswith("Atualizado")]
+    datas = [
+        pd.to_datetime(
+            tabela[coluna].astype("string").str.strip(),
+            format=FORMATO_DATA,
+            errors="coerce",
+        )
+        for coluna in colunas
+    ]
+    if not datas:
+        return pd.Series(pd.NaT, index=tabela.index, dtype="datetime64[ns]")
+    return pd.concat(datas, ignore_index=True)
+
+
+def idade_precos_anos(
+    datas: pd.Series,
+    referencia: Optional[_dt.date] = None,
+    sem_data: float = IDADE_SEM_DATA_ANOS,
+) -> float:
+    """Idade média (anos) dos preços; preços sem data contam ``sem_data``."""
+    if not len(datas):
+        return sem_data
+    referencia = pd.Timestamp(referencia or _dt.date.today())
+    idades = (referencia - datas).dt.days.to_numpy(dtype=float) / _DIAS_ANO
+    idades = np.where(np.isnan(idades), sem_data, np.maximum(idades, 0.0))
+    return float(idades.mean())
+
+
+def _ler_catalogo(caminho: str) -> Optional[pd.DataFrame]:
+    try:
+        return obter_tabela_precos(caminho, sep=";")
+    except FileNotFoundError:
+        return None
+
+
+def idades_categorias(
+    referencia: Optional[_dt.date] = None,
+    categorias: Mapping[str, Iterable[str]] = CATEGORIAS_RISCO,
+) -> dict[str, float]:
+    """Idade média dos preços de cada categoria, lida dos CSVs do catálogo."""
+    idades = {}
+    for categoria, arquivos in categorias.items():
+        datas = [datas_atualizacao(_ler_catalogo(arquivo)) for arquivo in arquivos]
+        datas = [serie for serie in datas if len(serie)]
+        if datas:
+            idades[categoria] = idade_precos_anos(
+                pd.concat(datas, ignore_index=True), referencia
+            )
+        else:
+            idades[categoria] = IDADE_SEM_DATA_ANOS
+    return idades
+
+
+def historico_categorias(
+    categorias: Mapping[str, Iterable[str]] = CATEGORIAS_RISCO,
+) -> pd.DataFrame:
+    """Histórico de preços do catálogo no formato de :func:`estimar_parametros`."""
+    partes = []
+    for categoria, arquivos in categorias.items():
+        for arquivo in arquivos:
+            historico = historico_precos(arquivo)
+            partes.append(
+                pd.DataFrame(
+                    {
+                        "Categoria": categoria,
+                        # Cada coluna de preço de cada CSV é uma série própria
+                        "Material": (
+                            arquivo + ":" + historico["Coluna"] + ":" + historico["Item"]
+                        ),
+                        "Data": historico["Data"],
+                        "Preco": historico["Preco"],
+                    }
+                )
+            )
+    if not partes:
+        return pd.DataFrame(columns=["Categoria", "Material", "Data", "Preco"])
+    return pd.concat(partes, ignore_index=True)
+
+
+def estimar_parametros(
+    historico: Optional[pd.DataFrame],
+    minimo: int = MINIMO_VARIACOES,
+) -> dict[str, tuple[float, float]]:
+    """Deriva e volatilidade anuais de cada categoria do ``historico``.
+
+    ``historico`` tem as colunas ``Categoria``, ``Material``, ``Data`` e
+    ``Preco``, uma linha por preço registrado. Cada par de registros
+    consecutivos do mesmo material é uma variação ``log(p1/p0)`` em ``dt``
+    anos: a deriva é a soma das variações dividida pelo tempo total e a
+    volatilidade é o desvio das variações normalizadas por ``sqrt(dt)``.
+    Categorias com menos de ``minimo`` variações não entram no resultado.
+    """
+    if historico is None or historico.empty:
+        return {}
+    dados = historico.loc[:, ["Categoria", "Material", "Data", "Preco"]].copy()
+    dados["Data"] = pd.to_datetime(dados["Data"], dayfirst=True, errors="coerce")
+    dados["Preco"] = pd.to_numeric(dados["Preco"], errors="coerce")
+    dados = dados[dados["Data"].notna() & (dados["Preco"] > 0)]
+    dados = dados.sort_values(["Categoria", "Material", "Data"])
+
+    grupos = dados.groupby(["Categoria", "Material"], sort=False)
+    dados["variacao"] = np.log(dados["Preco"]) - np.log(grupos["Preco"].shift())
+    dados["dt"] = (dados["Data"] - grupos["Data"].shift()).dt.days / _DIAS_ANO
+    dados = dados[dados["variacao"].notna() & (dados["dt"] > 0)]
+
+    parametros = {}
+    for categoria, variacoes in dados.groupby("Categoria", sort=False):
+        if len(variacoes) < minimo:
+            continue
+        r = variacoes["variacao"].to_numpy()
+        dt = variacoes["dt"].to_numpy()
+        deriva = r.sum() / dt.sum()
+        volatilidade = np.sqrt(np.mean((r - deriva * dt) ** 2 / dt))
+        parametros[categoria] = (float(deriva), float(volatilidade))
+    return parametros
+
+
+def parametros_categorias(
+    totais: Mapping[str, float],
+    idades: Optional[Mapping[str, float]] = None,
+    historico: Optional[pd.DataFrame] = None,
+) -> dict[str, ParametrosCategoria]:
+    """Parâmetros de simulação de cada categoria com custo em ``totais``."""
+    idades = idades if idades is not None else idades_categorias()
+    estimados = estimar_parametros(historico)
+    parametros = {}
+    for categoria, total in totais.items():
+        deriva, volatilidade = estimados.get(
+            categoria,
+            (
+                DERIVA_ANUAL_PADRAO,
+                VOLATILIDADE_ANUAL_PADRAO.get(categoria, VOLATILIDADE_PADRAO),
+            ),
+        )
+        parametros[categoria] = ParametrosCategoria(
+            total=float(total or 0.0),
+            idade_anos=float(idades.get(categoria, IDADE_SEM_DATA_ANOS)),
+            deriva_anual=deriva,
+            volatilidade_anual=volatilidade,
+            estimado=categoria in estimados,
+        )
+    return parametros
+
+
+def simular_fatores(
+    parametros: Iterable[ParametrosCategoria],
+    sorteios: int = SORTEIOS_PADRAO,
+    semente=None,
+) -> np.ndarray:
+    """Fatores de preço sorteados, uma coluna por categoria.
+
+    O fator de cada categoria é lognormal com média ``exp(deriva * idade)``
+    e desvio logarítmico ``volatilidade * sqrt(idade)``; os materiais de
+    uma mesma categoria variam juntos.
+    """
+    parametros = list(parametros)
+    idade = np.array([p.idade_anos for p in parametros], dtype=float)
+    deriva = np.array([p.deriva_anual for p in parametros], dtype=float)
+    sigma = np.array([p.volatilidade_anual for p in parametros], dtype=float)
+    sigma = sigma * np.sqrt(np.maximum(idade, 0.0))
+    normais = np.random.default_rng(semente).standard_normal((sorteios, len(parametros)))
+    return np.exp(deriva * idade - 0.5 * sigma**2 + sigma * normais)
+
+
+def simular_risco(
+    categorias: Mapping[str, ParametrosCategoria],
+    total_mao_obra: float,
+    sorteios: int = SORTEIOS_PADRAO,
+    semente=None,
+    **custos,
+) -> ResultadoRisco:
+    """Simula o custo e a margem de um orçamento com preços incertos.
+
+    ``custos`` são os demais argumentos de ``calcular_totais_servico``
+    (deslocamento, adicionais, projeto, lucro e imposto percentuais,
+    carregadores). Os materiais são a soma das ``categorias``.
+    """
+    totais = np.array([p.total for p in categorias.values()], dtype=float)
+    fatores = simular_fatores(categorias.values(), sorteios, semente)
+    materiais = fatores @ totais
+
+    cotado = calcular_totais_servico(float(totais.sum()), total_mao_obra, **custos)
+    simulado = calcular_totais_servico(materiais, total_mao_obra, **custos)
+    aumento = simulado["base_sem_carregador"] - cotado["base_sem_carregador"]
+    return ResultadoRisco(
+        categorias=dict(categorias),
+        materiais=materiais,
+        custo_projeto=simulado["base_sem_carregador"],
+        total_servico=simulado["total_servico"],
+        margem=cotado["lucro"] - aumento,
+        custo_cotado=cotado["base_sem_carregador"],
+        total_cotado=cotado["total_servico"],
+        margem_cotada=cotado["lucro"],
+    )
+
+
+def resumir_risco(resultado: ResultadoRisco) -> pd.DataFrame:
+    """Tabela P50/P90 do custo, do total recalculado e da margem.
+
+    Para a margem, o P90 é o valor garantido em 90% dos sorteios (o
+    percentil 10), já que o risco é ela diminuir.
+    """
+    linhas = [
+        ("Custo do projeto", "custo_projeto", resultado.custo_cotado, 90),
+        ("Total do serviço recalculado", "total_servico", resultado.total_cotado, 90),
+        ("Margem mantendo o preço cotado", "margem", resultado.margem_cotada, 10),
+    ]
+    return pd.DataFrame(
+        [
+            {
+                "Indicador": nome,
+                "Cotado": cotado,
+                "P50": resultado.percentil(campo, 50),
+                "P90": resultado.percentil(campo, p90),
+            }
+            for nome, campo, cotado, p90 in linhas
+        ]
+    )
+
+
+__all__ = [
+    "CATEGORIAS_RISCO",
+    "DERIVA_ANUAL_PADRAO",
+    "IDADE_SEM_DATA_ANOS",
+    "MINIMO_VARIACOES",
+    "ParametrosCategoria",
+    "ResultadoRisco",
+    "SORTEIOS_PADRAO",
+    "VOLATILIDADE_ANUAL_PADRAO",
+    "VOLATILIDADE_PADRAO",
+    "datas_atualizacao",
+    "estimar_parametros",
+    "historico_categorias",
+    "idade_precos_anos",
+    "idades_categorias",
+    "parametros_categorias",
+    "resumir_risco",
+    "simular_fatores",
+    "simular_risco",
+]
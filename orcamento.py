@@ -1,12 +1,16 @@
 import importlib.util
 import io
 import re
+import sqlite3
 from datetime import date, datetime
 from pathlib import Path
 
 import pandas as pd
 import streamlit as st
 
+from calculo_servico import entrada_cenario_atual
+from motor_reprecificacao import registrar_proposta
+
 DOCXTPL_MISSING_MESSAGE = (
     "O pacote 'docxtpl' é necessário para gerar o documento de orçamento. "
     "Instale-o com 'pip install docxtpl'."
@@ -21,7 +25,7 @@ else:
     _DOCXTPL_IMPORT_ERROR = ModuleNotFoundError("docxtpl")
 
 # Caminhos dos templates .docx utilizando o mesmo diretório deste arquivo
-_TEMPLATE_PATHS = {
+TEMPLATE_PATHS = {
     "default": Path(__file__).with_name(
         "Modelo Proposta Técnica e Comercial - CE ALFERION.docx"
     ),
@@ -223,7 +227,7 @@ def format_currency(value: float) -> str:
     return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
-def _parse_to_positive_float(value) -> float:
+def parse_to_positive_float(value) -> float:
     """Convert values to a positive float, returning ``0.0`` when parsing fails."""
 
     if isinstance(value, (int, float)):
@@ -246,20 +250,24 @@ def _parse_to_positive_float(value) -> float:
 
 def _get_orcamento_template_path(descricao_servicos_opcao: str) -> Path:
     """Seleciona o template conforme a descrição dos serviços."""
-    return _TEMPLATE_PATHS.get(descricao_servicos_opcao, _TEMPLATE_PATHS["default"])
-
-
-def gerar_documento_orcamento() -> io.BytesIO:
-    """Gera um documento de orçamento em formato .docx usando um template."""
-    total_materiais = st.session_state.get("total_custos_materiais", 0.0)
-    total_mao_obra = st.session_state.get("total_custo_mao_obra", 0.0)
-    custo_deslocamento = st.session_state.get("total_custo_deslocamento", 0.0)
-    total_servico = st.session_state.get("total_calculo_servico", 0.0)
-    custo_emissao_trt = st.session_state.get("custo_emissao_trt", 0.0)
-    custo_projeto_unifilar = st.session_state.get("custo_projeto_unifilar", 0.0)
-    cliente = st.session_state.get("cliente_orcamento", "")
-    pronome = st.session_state.get("pronome_orcamento", "")
-    descricao_servicos_opcao = st.session_state.get("descricao_servicos", "")
+    return TEMPLATE_PATHS.get(descricao_servicos_opcao, TEMPLATE_PATHS["default"])
+
+
+def montar_contexto_orcamento(dados) -> tuple[dict, Path]:
+    """Monta o contexto do template e escolhe o arquivo .docx a ser usado.
+
+    ``dados`` é qualquer mapeamento com as mesmas chaves do
+    ``st.session_state`` (a própria sessão ou uma linha de orçamento em lote).
+    """
+    total_materiais = dados.get("total_custos_materiais", 0.0)
+    total_mao_obra = dados.get("total_custo_mao_obra", 0.0)
+    custo_deslocamento = dados.get("total_custo_deslocamento", 0.0)
+    total_servico = dados.get("total_calculo_servico", 0.0)
+    custo_emissao_trt = dados.get("custo_emissao_trt", 0.0)
+    custo_projeto_unifilar = dados.get("custo_projeto_unifilar", 0.0)
+    cliente = dados.get("cliente_orcamento", "")
+    pronome = dados.get("pronome_orcamento", "")
+    descricao_servicos_opcao = dados.get("descricao_servicos", "")
     if descricao_servicos_opcao == "Análise de Energia":
         descricao_servicos = _build_analise_energia_richtext()
     else:
@@ -267,38 +275,36 @@ def gerar_documento_orcamento() -> io.BytesIO:
             descricao_servicos_opcao, ""
         )
     garantia = GARANTIA_SERVICOS_TEXT.get(descricao_servicos_opcao, "")
-    tipo_servico = st.session_state.get("tipo_servico_orcamento", "")
-    tempo_estimado = st.session_state.get("tempo_estimado_obra", 0)
-    condicoes_pagamento_opcao = st.session_state.get("condicoes_pagamento", "")
+    tipo_servico = dados.get("tipo_servico_orcamento", "")
+    tempo_estimado = dados.get("tempo_estimado_obra", 0)
+    condicoes_pagamento_opcao = dados.get("condicoes_pagamento", "")
     condicoes_pagamento = CONDICOES_PAGAMENTO_TEXT.get(
         condicoes_pagamento_opcao, ""
     )
     dias = f"{tempo_estimado} dia" if tempo_estimado == 1 else f"{tempo_estimado} dias"
 
-    distancia_total_infra = st.session_state.get("distancia_total_infra", "")
+    distancia_total_infra = dados.get("distancia_total_infra", "")
     distancia_total_infra_str = f"{distancia_total_infra}" if distancia_total_infra else ""
-    soma_parcial_custos = st.session_state.get("soma_parcial_custos")
-    total_instalacao = st.session_state.get("total_instalacao_calculo_servico")
+    soma_parcial_custos = dados.get("soma_parcial_custos")
+    total_instalacao = dados.get("total_instalacao_calculo_servico")
     if total_instalacao is None:
         if soma_parcial_custos is not None:
             total_instalacao = format_currency(soma_parcial_custos)
         else:
-            total_instalacao = st.session_state.get(
-                "total_instalacao", format_currency(total_servico)
-            )
+            total_instalacao = dados.get("total_instalacao", format_currency(total_servico))
 
     data_atual = datetime.now().strftime("%d/%m/%Y")
-    possui_carregador = st.session_state.get("possui_carregador", "")
+    possui_carregador = dados.get("possui_carregador", "")
     condicoes_pagamento_carregador = ""
     preco_unitario_carregador = float(
-        st.session_state.get("preco_unitario_carregador", 0.0) or 0.0
+        dados.get("preco_unitario_carregador", 0.0) or 0.0
     )
-    total_carregadores = _parse_to_positive_float(
-        st.session_state.get("total_carregadores", 0.0)
+    total_carregadores = parse_to_positive_float(
+        dados.get("total_carregadores", 0.0)
     )
     if total_carregadores == 0.0 and preco_unitario_carregador:
         total_carregadores = abs(preco_unitario_carregador)
-    dados_carregador = st.session_state.get("carregador_ce_dados", {}) or {}
+    dados_carregador = dados.get("carregador_ce_dados", {}) or {}
 
     if possui_carregador == "Não":
         condicoes_pagamento_carregador = (
@@ -306,12 +312,12 @@ def gerar_documento_orcamento() -> io.BytesIO:
         )
         marca_carregador = (
             dados_carregador.get("Fabricante")
-            or st.session_state.get("marca_carregadores", "")
+            or dados.get("marca_carregadores", "")
         )
         modelo_carregador = dados_carregador.get("Modelo", "")
         potencia_carregador = (
             dados_carregador.get("Potência")
-            or st.session_state.get("potencia_carregador_orcamento", "")
+            or dados.get("potencia_carregador_orcamento", "")
         )
 
         descricao_carregador_partes = [
@@ -350,8 +356,8 @@ def gerar_documento_orcamento() -> io.BytesIO:
         "tempo_estimado_para_conclusao_da_obra": dias,
         "dias": dias,
         "Tipo_de_Serviço": tipo_servico,
-        "potencia": st.session_state.get("potencia_carregador_orcamento", ""),
-        "tensao": st.session_state.get("tensao_carregador_orcamento", ""),
+        "potencia": dados.get("potencia_carregador_orcamento", ""),
+        "tensao": dados.get("tensao_carregador_orcamento", ""),
         "distancia": distancia_total_infra_str,
         "total_instalcao": total_instalacao,
         "condicoes_de_pagamento": condicoes_pagamento,
@@ -363,13 +369,19 @@ def gerar_documento_orcamento() -> io.BytesIO:
         "condicoes_de_pagamento_carregador": condicoes_pagamento_carregador,
     }
 
+    return contexto, _get_orcamento_template_path(descricao_servicos_opcao)
+
+
+def gerar_documento_orcamento() -> io.BytesIO:
+    """Gera um documento de orçamento em formato .docx usando um template."""
+    contexto, template_path = montar_contexto_orcamento(st.session_state)
+
     if DocxTemplate is None:
         raise ModuleNotFoundError(
             DOCXTPL_MISSING_MESSAGE
         ) from _DOCXTPL_IMPORT_ERROR
 
     # Carrega o template localizado no mesmo diretório deste arquivo
-    template_path = _get_orcamento_template_path(descricao_servicos_opcao)
     doc = DocxTemplate(template_path)
     doc.render(contexto)
 
@@ -584,25 +596,25 @@ def _collect_custo_mao_obra_row():
 def _collect_calculo_servico_row():
     """Collect the totals calculated in the "Cálculo de serviço" tab."""
 
-    total_materiais = _parse_to_positive_float(
+    total_materiais = parse_to_positive_float(
         st.session_state.get("total_custos_materiais", 0.0)
     )
-    total_mao_obra = _parse_to_positive_float(
+    total_mao_obra = parse_to_positive_float(
         st.session_state.get("total_custo_mao_obra", 0.0)
     )
-    custo_deslocamento = _parse_to_positive_float(
+    custo_deslocamento = parse_to_positive_float(
         st.session_state.get("total_custo_deslocamento", 0.0)
     )
-    custo_adicional = _parse_to_positive_float(
+    custo_adicional = parse_to_positive_float(
         st.session_state.get("custo_adicional", 0.0)
     )
-    servicos_adicionais = _parse_to_positive_float(
+    servicos_adicionais = parse_to_positive_float(
         st.session_state.get("total_servicos_adicionais", 0.0)
     )
-    custo_emissao_trt = _parse_to_positive_float(
+    custo_emissao_trt = parse_to_positive_float(
         st.session_state.get("custo_emissao_trt", 0.0)
     )
-    custo_projeto_unifilar = _parse_to_positive_float(
+    custo_projeto_unifilar = parse_to_positive_float(
         st.session_state.get("custo_projeto_unifilar", 0.0)
     )
 
@@ -620,14 +632,14 @@ def _collect_calculo_servico_row():
     if depreciacao is None:
         depreciacao = 0.05 * base_sem_carregador
 
-    lucro_percentual = _parse_to_positive_float(
+    lucro_percentual = parse_to_positive_float(
         st.session_state.get("lucro_percentual", 35.0)
     )
     lucro = st.session_state.get("lucro")
     if lucro is None:
         lucro = (lucro_percentual / 100) * (base_sem_carregador + depreciacao)
 
-    imposto_percentual = _parse_to_positive_float(
+    imposto_percentual = parse_to_positive_float(
         st.session_state.get("imposto_percentual", 11.0)
     )
     imposto = st.session_state.get("imposto")
@@ -636,11 +648,11 @@ def _collect_calculo_servico_row():
             base_sem_carregador + depreciacao + lucro
         )
 
-    total_carregadores = _parse_to_positive_float(
+    total_carregadores = parse_to_positive_float(
         st.session_state.get("total_carregadores", 0.0)
     )
 
-    total_servico = _parse_to_positive_float(
+    total_servico = parse_to_positive_float(
         st.session_state.get("total_calculo_servico", 0.0)
     )
     total_instalacao_valor = st.session_state.get("total_instalacao_valor")
@@ -677,7 +689,7 @@ def _collect_orcamento_row():
     total_instalacao_formatado = st.session_state.get("total_instalacao", "")
     total_instalacao_valor = st.session_state.get("total_instalacao_valor", 0.0)
     total_carregador_formatado = st.session_state.get("total_carregador", "")
-    total_carregador_valor = _parse_to_positive_float(
+    total_carregador_valor = parse_to_positive_float(
         st.session_state.get("total_carregadores", 0.0)
     )
 
@@ -746,6 +758,73 @@ ORCAMENTO_SNAPSHOT_KEYS = [
 ]
 
 
+def _registrar_proposta_gerada():
+    """Grava a proposta gerada com a referência do catálogo de preços usado."""
+    try:
+        dados = registrar_proposta(
+            entrada_cenario_atual(),
+            parse_to_positive_float(st.session_state.get("total_custos_materiais", 0.0)),
+            parse_to_positive_float(st.session_state.get("total_calculo_servico", 0.0)),
+            ordem_venda=st.session_state.get("ordem_venda", "").strip(),
+            cliente=st.session_state.get("cliente_orcamento", ""),
+        )
+    except sqlite3.Error as exc:
+        st.warning(f"Não foi possível registrar a proposta: {exc}")
+        return
+    st.session_state["orcamento_catalogo"] = dados["Catálogo"]
+
+
+def _render_reprecificacao():
+    """Reprecifica as propostas registradas e destaca as desatualizadas."""
+    from motor_reprecificacao import LIMITE_DESATUALIZACAO, reprecificar_arquivo
+
+    with st.expander("🔁 Reprecificar Propostas", expanded=False):
+        col_precos, col_data, col_limite = st.columns(3)
+        with col_precos:
+            precos = st.radio(
+                "Preços", ["Atuais", "Em uma data"], key="reprecificacao_precos"
+            )
+        with col_data:
+            data = st.date_input(
+                "Data dos preços",
+                format="DD/MM/YYYY",
+                key="reprecificacao_data",
+                disabled=precos == "Atuais",
+            )
+        with col_limite:
+            limite = st.number_input(
+                "Variação máxima (%)",
+                min_value=0.0,
+                value=LIMITE_DESATUALIZACAO * 100,
+                step=0.5,
+                key="reprecificacao_limite",
+            )
+        if not st.button("Reprecificar propostas", key="reprecificacao_executar"):
+            return
+        try:
+            resultado = reprecificar_arquivo(
+                data=data if precos == "Em uma data" else None, limite=limite / 100
+            )
+        except sqlite3.Error as exc:
+            st.error(f"Não foi possível ler as propostas: {exc}")
+            return
+        desatualizadas = int(resultado["Desatualizada"].sum())
+        st.markdown(
+            f"**{desatualizadas} de {len(resultado)} proposta(s) desatualizada(s).**"
+        )
+        exibicao = resultado.copy()
+        for coluna in (
+            "Total Materiais",
+            "Total Serviço",
+            "Materiais Reprecificados",
+            "Serviço Reprecificado",
+            "Diferença",
+        ):
+            exibicao[coluna] = exibicao[coluna].map(format_currency)
+        exibicao["Variação"] = resultado["Variação"].map("{:+.1%}".format)
+        st.dataframe(exibicao, hide_index=True)
+
+
 def _get_orcamento_form_snapshot():
     return tuple((key, st.session_state.get(key)) for key in ORCAMENTO_SNAPSHOT_KEYS)
 
@@ -869,7 +948,7 @@ def render_orcamento_tab(tab_orcamento):
             disabled=True,
         )
 
-        total_carregadores = _parse_to_positive_float(
+        total_carregadores = parse_to_positive_float(
             st.session_state.get("total_carregadores", 0.0)
         )
         st.session_state["total_carregador"] = format_currency(
@@ -913,10 +992,15 @@ def render_orcamento_tab(tab_orcamento):
 
             st.session_state["orcamento_doc_bytes"] = buffer.getvalue()
             st.session_state["orcamento_file_name"] = file_name
+            _registrar_proposta_gerada()
 
         doc_bytes = st.session_state.get("orcamento_doc_bytes")
         doc_file_name = st.session_state.get("orcamento_file_name")
         if doc_bytes and doc_file_name:
+            if st.session_state.get("orcamento_catalogo"):
+                st.caption(
+                    f"Catálogo de preços da proposta: {st.session_state['orcamento_catalogo']}"
+                )
             st.download_button(
                 "📄 Baixar Orçamento",
                 data=doc_bytes,
@@ -968,4 +1052,6 @@ def render_orcamento_tab(tab_orcamento):
                 key="relatorio_consolidado_download_button",
             )
 
+        _render_reprecificacao()
+
         st.session_state["orcamento_form_snapshot"] = _get_orcamento_form_snapshot()
@@ -0,0 +1,283 @@
+"""Orçamento em lote a partir de uma planilha de locais.
+
+Cada linha da planilha (CSV com ``;`` ou XLSX) descreve um local de
+instalação. Para cada uma são executados o dimensionamento, o custo de
+materiais, a mão de obra, o deslocamento e o cálculo de serviço, e todas as
+linhas são gravadas em um único arquivo consolidado.
+
+Uso: ``python orcamento_lote.py locais.xlsx -o orcamentos.xlsx [-p PROCESSOS]``
+
+Colunas reconhecidas (apenas ``percursos`` e ``potencia_kw`` são
+obrigatórias):
+
+- ``identificacao``: nome do local, copiado para a saída;
+- ``percursos``: trechos em metros separados por ``+`` ou ``|`` ("30+12");
+- ``potencia_kw``: potência do carregador ("7,4" ou "7,4 kW");
+- ``tensao``: tensão fase-fase em V (padrão 220);
+- ``instalacao``: Monofásico/Bifásico/Trifásico (sugerido se vazio);
+- ``disjuntor``: descrição do disjuntor, substitui o recomendado;
+- ``tipo_cabos``, ``tipo_quadro``, ``tipo_servico``,
+  ``quantidade_carregadores``;
+- ``tecnicos`` ("Eletrotécnico 1|Ajudante") e ``horas_tecnico`` (padrão 8);
+- ``distancia_km``, ``tempo_viagem`` ("2h30min") e ``custo_pedagios``;
+- ``material_adicional``, ``servicos_adicionais``, ``custo_adicional``,
+  ``custo_emissao_trt``, ``custo_projeto_unifilar``, ``lucro_percentual``,
+  ``imposto_percentual`` e ``total_carregadores``.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+import pandas as pd
+
+from calculo_servico import calcular_totais_servico
+from catalogo_precos import obter_tabela_precos
+from Deslocamento import CONFIG_PADRAO, calcula_custo_deslocamento
+from motor_custos import (
+    calcular_custo_mao_obra,
+    calcular_custos_materiais,
+    carregar_tabelas_materiais,
+    valores_hora_profissionais,
+)
+from motor_dimensionamento import DimensionamentoInput, dimensionar
+
+TECNICOS_PADRAO = ("Eletrotécnico 1",)
+
+# Linhas enviadas de uma vez para cada processo
+TAMANHO_BLOCO = 100
+
+# Tabelas carregadas uma única vez por processo (ver ``_inicializar_processo``)
+_TABELAS = None
+_VALOR_HORA: dict[str, float] = {}
+
+
+def _numero(valor, padrao: float = 0.0) -> float:
+    """Converte textos como "7,4 kW" ou "R$ 1.234,56" em float."""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return padrao
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = re.sub(r"[^0-9,.\-]", "", str(valor))
+    if "," in texto and "." in texto:
+        texto = texto.replace(".", "")
+    texto = texto.replace(",", ".")
+    try:
+        return float(texto)
+    except ValueError:
+        return padrao
+
+
+def _texto(valor, padrao: str = "") -> str:
+    """Retorna o valor da célula como texto, tratando células vazias."""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return padrao
+    texto = str(valor).strip()
+    return texto or padrao
+
+
+def _percursos(valor) -> list[float]:
+    """Separa os trechos de percurso ("30+12", "30|12" ou um único número)."""
+    if isinstance(valor, (int, float)):
+        return [] if math.isnan(valor) else [float(valor)]
+    return [
+        _numero(trecho)
+        for trecho in re.split(r"[+|]", _texto(valor))
+        if trecho.strip()
+    ]
+
+
+def _inicializar_processo() -> None:
+    """Carrega as tabelas de preço no processo antes das primeiras linhas."""
+    global _TABELAS
+    _TABELAS = carregar_tabelas_materiais()
+    _VALOR_HORA.clear()
+    try:
+        profissionais = obter_tabela_precos(
+            "valores_profissionais.csv", sep=";", converter_precos=True
+        )
+    except FileNotFoundError:
+        return
+    _VALOR_HORA.update(valores_hora_profissionais(profissionais))
+
+
+def orcar_local(linha: dict) -> dict:
+    """Calcula o orçamento completo de uma linha da planilha de locais."""
+    if _TABELAS is None:
+        _inicializar_processo()
+
+    percursos = _percursos(linha.get("percursos"))
+    soma_distancias = sum(percursos)
+    tensao = _numero(linha.get("tensao"), 220.0)
+    tipo_cabos = _texto(linha.get("tipo_cabos"), "Cabo PVC")
+    tipo_servico = _texto(linha.get("tipo_servico"))
+
+    entrada = DimensionamentoInput(
+        potencia_kw=_numero(linha.get("potencia_kw")),
+        distancia_m=soma_distancias,
+        tensoes_ff=(tensao, tensao, tensao),
+        tipo_cabos=tipo_cabos,
+        quantidade_carregadores=int(_numero(linha.get("quantidade_carregadores"), 1)),
+        tipo_quadro=_texto(linha.get("tipo_quadro"), "PVC"),
+        instalacao=_texto(linha.get("instalacao")) or None,
+    )
+    resultado = dimensionar(entrada)
+    disjuntor = _texto(linha.get("disjuntor"))
+    if disjuntor:
+        resultado = replace(resultado, disjuntor=disjuntor)
+
+    materiais = calcular_custos_materiais(
+        resultado,
+        soma_distancias,
+        tipo_cabos,
+        _TABELAS,
+        tipo_servico=tipo_servico,
+        material_adicional=_numero(linha.get("material_adicional")),
+    )
+
+    tecnicos = [
+        tecnico.strip()
+        for tecnico in _texto(linha.get("tecnicos")).split("|")
+        if tecnico.strip()
+    ] or list(TECNICOS_PADRAO)
+    servicos_adicionais = _numero(linha.get("servicos_adicionais"))
+    horas = _numero(linha.get("horas_tecnico"), 8.0)
+    mao_obra = (
+        calcular_custo_mao_obra(
+            [(tecnico, horas) for tecnico in tecnicos], _VALOR_HORA
+        ).total
+        + servicos_adicionais
+    )
+
+    distancia_km = _numero(linha.get("distancia_km"))
+    deslocamento = 0.0
+    if distancia_km > 0:
+        deslocamento = calcula_custo_deslocamento(
+            distancia_km,
+            _texto(linha.get("tempo_viagem")),
+            _numero(linha.get("custo_pedagios")),
+            CONFIG_PADRAO,
+        )
+
+    custo_emissao_trt = _numero(linha.get("custo_emissao_trt"), 80.0)
+    custo_projeto_unifilar = _numero(linha.get("custo_projeto_unifilar"), 500.0)
+    totais = calcular_totais_servico(
+        materiais.total,
+        mao_obra,
+        custo_deslocamento=deslocamento,
+        custo_adicional=_numero(linha.get("custo_adicional")),
+        servicos_adicionais=servicos_adicionais,
+        custo_emissao_trt=custo_emissao_trt,
+        custo_projeto_unifilar=custo_projeto_unifilar,
+        lucro_percentual=_numero(linha.get("lucro_percentual"), 35.0),
+        imposto_percentual=_numero(linha.get("imposto_percentual"), 11.0),
+        total_carregadores=_numero(linha.get("total_carregadores")),
+    )
+
+    return {
+        "Identificação": _texto(linha.get("identificacao")),
+        "Distância (m)": soma_distancias,
+        "Potência (kW)": entrada.potencia_kw,
+        "Corrente (A)": _numero(resultado.corrente_calculada, math.nan),
+        "Instalação": resultado.instalacao_sistema,
+        "Bitola Fase": resultado.bitola_fase,
+        "Bitola Neutro": resultado.bitola_neutro,
+        "Bitola Terra": resultado.bitola_terra,
+        "Eletroduto": resultado.tamanho_eletroduto,
+        "Disjuntor": resultado.disjuntor,
+        "IDR": resultado.idr,
+        "DPS": resultado.dps,
+        "Avisos": "; ".join(resultado.avisos + materiais.avisos),
+        "Total Cabos": materiais.total_cabos,
+        "Total Infra-Seca": materiais.total_infra_seca,
+        "Total Quadro de Proteção": materiais.total_quadro_protecao,
+        "Total Material Adicional": materiais.total_material_adicional,
+        "Total Materiais": materiais.total,
+        "Total Mão de Obra": mao_obra,
+        "Custo Deslocamento": deslocamento,
+        "Custo Emissão TRT": custo_emissao_trt,
+        "Custo Projeto Unifilar": custo_projeto_unifilar,
+        "Depreciação": totais["depreciacao"],
+        "Lucro": totais["lucro"],
+        "Imposto": totais["imposto"],
+        "Total Instalação": totais["total_instalacao"],
+        "Total Serviço": totais["total_servico"],
+    }
+
+
+def _orcar_bloco(linhas: list[dict]) -> list[dict]:
+    """Processa um bloco de linhas dentro de um processo do pool."""
+    return [orcar_local(linha) for linha in linhas]
+
+
+def ler_locais(caminho, sep: str = ";") -> pd.DataFrame:
+    """Lê a planilha de locais em CSV ou XLSX."""
+    caminho = Path(caminho)
+    if caminho.suffix.lower() in {".xlsx", ".xlsm", ".xls"}:
+        return pd.read_excel(caminho)
+    return pd.read_csv(caminho, sep=sep, decimal=",")
+
+
+def orcar_locais(locais: pd.DataFrame, processos: int | None = None) -> pd.DataFrame:
+    """Orça todas as linhas, distribuindo blocos entre ``processos``."""
+    linhas = locais.to_dict("records")
+    processos = processos or os.cpu_count() or 1
+    blocos = [
+        linhas[inicio : inicio + TAMANHO_BLOCO]
+        for inicio in range(0, len(linhas), TAMANHO_BLOCO)
+    ]
+    if processos <= 1 or len(blocos) <= 1:
+        resultados = _orcar_bloco(linhas)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processos, initializer=_inicializar_processo
+        ) as executor:
+            resultados = [
+                linha for bloco in executor.map(_orcar_bloco, blocos) for linha in bloco
+            ]
+    return pd.DataFrame(resultados)
+
+
+def salvar_orcamentos(orcamentos: pd.DataFrame, caminho, sep: str = ";") -> None:
+    """Grava o resultado consolidado em CSV ou XLSX, conforme a extensão."""
+    caminho = Path(caminho)
+    if caminho.suffix.lower() == ".xlsx":
+        orcamentos.to_excel(caminho, index=False)
+    else:
+        orcamentos.to_csv(caminho, sep=sep, index=False, decimal=",")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Gera orçamentos em lote a partir de uma planilha de locais."
+    )
+    parser.add_argument("entrada", help="planilha de locais (.csv ou .xlsx)")
+    parser.add_argument(
+        "-o", "--saida", default="orcamentos_lote.xlsx", help="arquivo consolidado"
+    )
+    parser.add_argument(
+        "-p", "--processos", type=int, default=None, help="processos em paralelo"
+    )
+    parser.add_argument("--sep", default=";", help="separador dos arquivos CSV")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    locais = ler_locais(args.entrada, sep=args.sep)
+    orcamentos = orcar_locais(locais, processos=args.processos)
+    salvar_orcamentos(orcamentos, args.saida, sep=args.sep)
+    duracao = time.perf_counter() - inicio
+    print(
+        f"{len(orcamentos)} orçamentos gravados em {args.saida} ({duracao:.2f} s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Geração em lote das propostas (.docx) compactadas em um único ZIP.
+
+Lê o arquivo consolidado gerado por ``orcamento_lote.py`` (ou qualquer
+planilha com as chaves usadas pela aba Orçamento) e renderiza uma proposta
+por linha. Cada processo lê os templates de ``TEMPLATE_PATHS`` uma única vez
+e reaproveita o XML já compilado pelo Jinja entre as propostas, o que
+responde pelo ganho em um único núcleo; os documentos prontos são gravados
+no ZIP à medida que chegam, sem manter o lote inteiro em memória. Com mais
+de um núcleo as propostas podem ser divididas entre processos (``-p``, por
+padrão o número de CPUs); em um único núcleo o pool só acrescenta custo.
+
+Uso: ``python propostas_lote.py orcamentos.xlsx -o propostas.zip [-p PROCESSOS]``
+
+Além das colunas de ``orcamento_lote.py`` são aceitas ``cliente``,
+``pronome``, ``descricao_servicos``, ``tipo_servico``,
+``condicoes_pagamento`` e ``tempo_estimado_obra``.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import math
+import os
+import re
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from jinja2 import Environment
+
+from orcamento import (
+    DOCXTPL_MISSING_MESSAGE,
+    DocxTemplate,
+    TEMPLATE_PATHS,
+    format_currency,
+    montar_contexto_orcamento,
+    parse_to_positive_float,
+)
+from orcamento_lote import ler_locais
+
+# Colunas do orçamento em lote e chave equivalente da sessão
+_COLUNAS_SESSAO = {
+    "Total Materiais": "total_custos_materiais",
+    "Total Mão de Obra": "total_custo_mao_obra",
+    "Custo Deslocamento": "total_custo_deslocamento",
+    "Total Serviço": "total_calculo_servico",
+    "Custo Emissão TRT": "custo_emissao_trt",
+    "Custo Projeto Unifilar": "custo_projeto_unifilar",
+    "Distância (m)": "distancia_total_infra",
+    "cliente": "cliente_orcamento",
+    "pronome": "pronome_orcamento",
+    "descricao_servicos": "descricao_servicos",
+    "tipo_servico": "tipo_servico_orcamento",
+    "condicoes_pagamento": "condicoes_pagamento",
+    "tempo_estimado_obra": "tempo_estimado_obra",
+}
+
+# Propostas em andamento por processo antes de esperar pela gravação no ZIP
+_JANELA_POR_PROCESSO = 4
+
+# Templates carregados uma única vez por processo (ver ``_inicializar_processo``)
+_MODELOS: dict[str, bytes] = {}
+_AMBIENTE = None
+
+
+class _AmbienteModelos(Environment):
+    """Ambiente Jinja que compila cada XML de template uma única vez.
+
+    O ``docxtpl`` chama ``from_string`` com o XML do documento a cada
+    ``render``; como o XML de um mesmo template não muda entre propostas, o
+    template compilado é reaproveitado.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._compilados = {}
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals or template_class:
+            return super().from_string(source, globals, template_class)
+        try:
+            return self._compilados[source]
+        except KeyError:
+            compilado = self._compilados[source] = super().from_string(source)
+            return compilado
+
+
+if DocxTemplate is not None:
+
+    class _ModeloProposta(DocxTemplate):
+        """``DocxTemplate`` que ajusta o XML de cada template uma única vez.
+
+        O ``patch_xml`` (expressões regulares sobre o XML inteiro) não depende
+        do contexto, então o resultado é guardado e reaproveitado.
+        """
+
+        _xml_ajustado: dict[str, str] = {}
+
+        def patch_xml(self, src_xml):
+            try:
+                return self._xml_ajustado[src_xml]
+            except KeyError:
+                ajustado = self._xml_ajustado[src_xml] = super().patch_xml(src_xml)
+                return ajustado
+
+else:
+    _ModeloProposta = None
+
+
+def _inicializar_processo(modelo=None) -> None:
+    """Lê os templates do disco uma única vez no processo."""
+    global _AMBIENTE
+    if DocxTemplate is None:
+        raise ModuleNotFoundError(DOCXTPL_MISSING_MESSAGE)
+    _AMBIENTE = _AmbienteModelos()
+    _ModeloProposta._xml_ajustado.clear()
+    _MODELOS.clear()
+    caminhos = [Path(modelo)] if modelo else TEMPLATE_PATHS.values()
+    for caminho in caminhos:
+        if caminho.exists():
+            _MODELOS[str(caminho)] = caminho.read_bytes()
+
+
+def _vazio(valor) -> bool:
+    return valor is None or (isinstance(valor, float) and math.isnan(valor))
+
+
+def _dados_da_linha(linha: dict) -> dict:
+    """Converte uma linha do orçamento em lote para as chaves da sessão."""
+    dados = {chave: valor for chave, valor in linha.items() if not _vazio(valor)}
+    for coluna, chave in _COLUNAS_SESSAO.items():
+        if coluna in dados:
+            dados[chave] = dados[coluna]
+    if "cliente_orcamento" not in dados and "Identificação" in dados:
+        dados["cliente_orcamento"] = dados["Identificação"]
+    if "Total Instalação" in dados:
+        dados["total_instalacao_calculo_servico"] = format_currency(
+            parse_to_positive_float(dados["Total Instalação"])
+        )
+    if "Potência (kW)" in dados:
+        potencia = parse_to_positive_float(dados["Potência (kW)"])
+        dados["potencia_carregador_orcamento"] = f"{potencia:g} kW"
+    if "tempo_estimado_obra" in dados:
+        dados["tempo_estimado_obra"] = int(
+            parse_to_positive_float(dados["tempo_estimado_obra"])
+        )
+    return dados
+
+
+def _nome_arquivo(indice: int, dados: dict) -> str:
+    """Nome da proposta dentro do ZIP, a partir do cliente/identificação."""
+    nome = str(dados.get("cliente_orcamento", "")).strip()
+    nome = re.sub(r"[^0-9A-Za-zÀ-ÿ._ -]+", "_", nome).strip(" ._")
+    return f"{indice + 1:05d} - {nome or 'proposta'}.docx"
+
+
+def renderizar_proposta(tarefa: tuple[int, dict]) -> tuple[str, bytes]:
+    """Renderiza uma proposta e devolve (nome do arquivo, conteúdo .docx)."""
+    if _AMBIENTE is None:
+        _inicializar_processo()
+    indice, linha = tarefa
+    dados = _dados_da_linha(linha)
+    contexto, caminho = montar_contexto_orcamento(dados)
+    conteudo = _MODELOS.get(str(caminho))
+    if conteudo is None:
+        if len(_MODELOS) != 1:
+            raise FileNotFoundError(caminho)
+        # Template único informado em ``--modelo``
+        conteudo = next(iter(_MODELOS.values()))
+    doc = _ModeloProposta(io.BytesIO(conteudo))
+    doc.render(contexto, jinja_env=_AMBIENTE)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return _nome_arquivo(indice, dados), buffer.getvalue()
+
+
+def _pico_memoria_mb() -> tuple[float, float] | None:
+    """Pico de memória residente (MB) deste processo e dos processos filhos."""
+    if resource is None:
+        return None
+    escala = 1024 * 1024 if sys.platform == "darwin" else 1024
+    proprio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / escala
+    filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / escala
+    return proprio, filhos
+
+
+def gerar_propostas_zip(
+    linhas: list[dict], destino, processos: int | None = None, modelo=None
+) -> int:
+    """Renderiza as propostas em paralelo e grava cada uma no ZIP ``destino``.
+
+    No máximo ``_JANELA_POR_PROCESSO`` propostas por processo ficam em
+    memória aguardando a gravação. Retorna o número de documentos gerados.
+    """
+    processos = processos or os.cpu_count() or 1
+    tarefas = list(enumerate(linhas))
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_STORED) as arquivo:
+        if processos <= 1:
+            _inicializar_processo(modelo)
+            for tarefa in tarefas:
+                arquivo.writestr(*renderizar_proposta(tarefa))
+            return len(tarefas)
+
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            initializer=_inicializar_processo,
+            initargs=(modelo,),
+        ) as executor:
+            pendentes = deque()
+            for tarefa in tarefas:
+                pendentes.append(executor.submit(renderizar_proposta, tarefa))
+                if len(pendentes) >= processos * _JANELA_POR_PROCESSO:
+                    arquivo.writestr(*pendentes.popleft().result())
+            while pendentes:
+                arquivo.writestr(*pendentes.popleft().result())
+    return len(tarefas)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Gera as propostas .docx de um orçamento em lote em um ZIP."
+    )
+    parser.add_argument("entrada", help="orçamentos em lote (.csv ou .xlsx)")
+    parser.add_argument("-o", "--saida", default="propostas.zip", help="arquivo ZIP")
+    parser.add_argument(
+        "-p", "--processos", type=int, default=None, help="processos em paralelo"
+    )
+    parser.add_argument(
+        "--modelo", default=None, help="template .docx usado para todas as propostas"
+    )
+    parser.add_argument("--sep", default=";", help="separador dos arquivos CSV")
+    args = parser.parse_args(argv)
+
+    linhas = ler_locais(args.entrada, sep=args.sep).to_dict("records")
+    inicio = time.perf_counter()
+    total = gerar_propostas_zip(
+        linhas, args.saida, processos=args.processos, modelo=args.modelo
+    )
+    duracao = time.perf_counter() - inicio
+    taxa = total / duracao if duracao > 0 else 0.0
+    print(
+        f"{total} propostas gravadas em {args.saida} "
+        f"({duracao:.2f} s, {taxa:.1f} documentos/s)",
+        file=sys.stderr,
+    )
+    pico = _pico_memoria_mb()
+    if pico is not None:
+        print(
+            f"Pico de memória: {pico[0]:.0f} MB (principal), "
+            f"{pico[1]:.0f} MB (maior processo filho)",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
+import pandas as pd
 import streamlit as st
 
+from motor_demanda import (
+    CURVA_PADRAO,
+    CURVAS_SIMULTANEIDADE,
+    OPCAO_FATOR_INFORMADO,
+)
+from motor_percursos import COLUNAS_DERIVACOES, DIRECOES
+
 
 def render_quadro_distribuicao_selector(quantidade_carregadores: int) -> None:
     if quantidade_carregadores > 1:
@@ -54,3 +62,126 @@ def render_quadro_distribuicao_distancias() -> float:
 
     st.session_state["distancia_alimentacao_distribuicao"] = total_quadro
     return total_quadro
+
+
+def render_derivacoes_carregadores(quantidade_carregadores: int) -> None:
+    """Onde cada grupo de carregadores deixa o ramal comum do quadro de distribuição.
+
+    A tabela é salva em ``derivacoes_carregadores``; os carregadores que não
+    estão em nenhuma linha ficam no fim do ramal (soma dos percursos).
+    """
+    if st.session_state.get("quadro_distribuicao", "") != "Sim":
+        return
+    carregadores, posicao, direcao, derivacao = COLUNAS_DERIVACOES
+    with st.expander("🔀 Derivações dos Carregadores", expanded=False):
+        # A tabela de partida fica fixa: o editor guarda apenas as alterações
+        if "derivacoes_carregadores_base" not in st.session_state:
+            st.session_state["derivacoes_carregadores_base"] = pd.DataFrame(
+                {
+                    carregadores: pd.Series(dtype="int64"),
+                    posicao: pd.Series(dtype="float64"),
+                    direcao: pd.Series(dtype="object"),
+                    derivacao: pd.Series(dtype="float64"),
+                }
+            )
+        derivacoes = st.data_editor(
+            st.session_state["derivacoes_carregadores_base"],
+            num_rows="dynamic",
+            hide_index=True,
+            key="derivacoes_carregadores_editor",
+            column_config={
+                carregadores: st.column_config.NumberColumn(min_value=0, step=1),
+                posicao: st.column_config.NumberColumn(min_value=0.0, step=0.5),
+                direcao: st.column_config.SelectboxColumn(options=list(DIRECOES)),
+                derivacao: st.column_config.NumberColumn(min_value=0.0, step=0.5),
+            },
+        )
+        st.session_state["derivacoes_carregadores"] = derivacoes
+        st.caption(
+            "Cada linha é um grupo de carregadores que sai do ramal comum na "
+            "posição indicada; os demais ficam no fim do ramal."
+        )
+        total = int(
+            pd.to_numeric(derivacoes[carregadores], errors="coerce").fillna(0).sum()
+        )
+        if total > quantidade_carregadores:
+            st.warning(
+                f"As derivações somam {total} carregadores; "
+                f"a quantidade informada é {quantidade_carregadores}."
+            )
+
+
+def render_grupos_carregadores(quantidade_carregadores: int) -> None:
+    """Potências por grupo de carregadores iguais, para locais com muitos carregadores.
+
+    Em vez de um seletor por carregador, uma única tabela com potência e
+    quantidade de cada grupo é salva em ``grupos_carregadores``.
+    """
+    # A tabela de partida fica fixa: o editor guarda apenas as alterações
+    if "grupos_carregadores_base" not in st.session_state:
+        st.session_state["grupos_carregadores_base"] = pd.DataFrame(
+            [{"Potência (kW)": 7.4, "Quantidade": quantidade_carregadores}]
+        )
+    grupos = st.data_editor(
+        st.session_state["grupos_carregadores_base"],
+        num_rows="dynamic",
+        hide_index=True,
+        key="grupos_carregadores_editor",
+        column_config={
+            "Potência (kW)": st.column_config.NumberColumn(min_value=0.0, step=0.1),
+            "Quantidade": st.column_config.NumberColumn(min_value=0, step=1),
+        },
+    )
+    st.session_state["grupos_carregadores"] = grupos
+    total = int(pd.to_numeric(grupos["Quantidade"], errors="coerce").fillna(0).sum())
+    if total != quantidade_carregadores:
+        st.warning(
+            f"Os grupos somam {total} carregadores; "
+            f"a quantidade informada é {quantidade_carregadores}."
+        )
+
+
+def descrever_grupos_carregadores() -> list[str]:
+    """Descrição de cada grupo de carregadores (``"10x 7,4 kW"``)."""
+    grupos = st.session_state.get("grupos_carregadores")
+    if not isinstance(grupos, pd.DataFrame):
+        return []
+    descricoes = []
+    for potencia, quantidade in zip(
+        pd.to_numeric(grupos["Potência (kW)"], errors="coerce").fillna(0.0),
+        pd.to_numeric(grupos["Quantidade"], errors="coerce").fillna(0),
+    ):
+        if potencia > 0 and quantidade > 0:
+            descricoes.append(f"{int(quantidade)}x {potencia:g} kW".replace(".", ","))
+    return descricoes
+
+
+def render_demanda_carregadores() -> None:
+    """Curva de simultaneidade e limite da gestão de carga dos carregadores."""
+    with st.expander("⚖️ Demanda dos Carregadores", expanded=False):
+        opcoes_curva = list(CURVAS_SIMULTANEIDADE) + [OPCAO_FATOR_INFORMADO]
+        if st.session_state.get("curva_simultaneidade") not in opcoes_curva:
+            st.session_state["curva_simultaneidade"] = CURVA_PADRAO
+        col_curva, col_limite = st.columns(2)
+        with col_curva:
+            curva = st.selectbox(
+                "Fator de simultaneidade",
+                opcoes_curva,
+                key="curva_simultaneidade",
+            )
+            if curva == OPCAO_FATOR_INFORMADO:
+                st.number_input(
+                    "Fator (0 a 1)",
+                    min_value=0.0,
+                    max_value=1.0,
+                    step=0.05,
+                    value=1.0,
+                    key="fator_simultaneidade_informado",
+                )
+        with col_limite:
+            st.number_input(
+                "Limite da gestão de carga (kW, 0 = sem gestão)",
+                min_value=0.0,
+                step=1.0,
+                key="limite_gestao_carga_kw",
+            )
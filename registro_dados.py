@@ -0,0 +1,223 @@
+"""Registro dos dados salvos pelas abas (visita, dimensionamento, serviço).
+
+Cada "Salvar" grava uma linha em um banco SQLite em modo WAL na pasta
+``Docs Salvos``: a inclusão é um único ``INSERT`` (custo constante,
+independente do tamanho do histórico) e gravações simultâneas de várias
+sessões são serializadas pelo próprio SQLite, sem risco de corromper o
+arquivo. As planilhas Excel passam a ser geradas sob demanda por
+``exportar_xlsx``, que escreve as linhas em modo *write-only* do openpyxl.
+"""
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+PASTA_DOCS = Path(__file__).with_name("Docs Salvos")
+ARQUIVO_REGISTRO = PASTA_DOCS / "registros.sqlite3"
+
+# Tempo máximo (ms) aguardando outra sessão liberar a escrita
+_TEMPO_ESPERA_MS = 10_000
+
+_BANCOS_PRONTOS = set()
+_LOCK_ESQUEMA = threading.Lock()
+
+
+def caminho_planilha(nome_base: str, ordem_venda: str = "") -> Path:
+    """Caminho da planilha de ``nome_base`` para a ordem de venda."""
+    nome = f"{nome_base} {ordem_venda}.xlsx" if ordem_venda else f"{nome_base}.xlsx"
+    return PASTA_DOCS / nome
+
+
+def _valor_json(valor):
+    """Converte valores que o ``json`` não serializa (datas, numpy)."""
+    if isinstance(valor, (_dt.date, _dt.time)):
+        return valor.isoformat()
+    if hasattr(valor, "item"):
+        return valor.item()
+    return str(valor)
+
+
+def _conectar(caminho=None) -> sqlite3.Connection:
+    """Abre o banco de registros, criando o esquema na primeira vez."""
+    caminho = Path(caminho or ARQUIVO_REGISTRO)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    conexao = sqlite3.connect(caminho, timeout=_TEMPO_ESPERA_MS / 1000)
+    conexao.execute(f"PRAGMA busy_timeout = {_TEMPO_ESPERA_MS}")
+    chave = str(caminho.resolve())
+    if chave not in _BANCOS_PRONTOS:
+        with _LOCK_ESQUEMA:
+            conexao.execute("PRAGMA journal_mode = WAL")
+            with conexao:
+                conexao.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS registros (
+                        id INTEGER PRIMARY KEY,
+                        tipo TEXT NOT NULL,
+                        ordem_venda TEXT NOT NULL DEFAULT '',
+                        criado_em TEXT NOT NULL,
+                        dados TEXT NOT NULL
+                    )
+                    """
+                )
+                conexao.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_registros_tipo_ordem "
+                    "ON registros (tipo, ordem_venda, id)"
+                )
+            _BANCOS_PRONTOS.add(chave)
+    conexao.execute("PRAGMA synchronous = NORMAL")
+    return conexao
+
+
+class ErroPlanilhaLegada(Exception):
+    """A planilha antiga existe, mas não pôde ser lida para a importação."""
+
+
+def _existe_registro(conexao, tipo: str, ordem_venda: str) -> bool:
+    cursor = conexao.execute(
+        "SELECT 1 FROM registros WHERE tipo = ? AND ordem_venda = ? LIMIT 1",
+        (tipo, ordem_venda),
+    )
+    return cursor.fetchone() is not None
+
+
+def _linhas_planilha(planilha: Path):
+    """Lê as linhas de uma planilha antiga como dicionários (cabeçalho na 1ª)."""
+    from openpyxl import load_workbook
+
+    livro = load_workbook(planilha, read_only=True)
+    try:
+        linhas = livro.active.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if not cabecalho:
+            return []
+        return [
+            dict(zip(cabecalho, linha))
+            for linha in linhas
+            if any(valor is not None for valor in linha)
+        ]
+    finally:
+        livro.close()
+
+
+def registrar(
+    tipo: str,
+    dados: dict,
+    ordem_venda: str = "",
+    planilha_legada=None,
+    caminho=None,
+) -> int:
+    """Acrescenta ``dados`` ao registro ``tipo`` e devolve o id da linha.
+
+    Se ``planilha_legada`` existir e ainda não houver registros desse tipo
+    para a ordem de venda, as linhas da planilha antiga são importadas antes,
+    para que a exportação não perca o histórico gravado no formato anterior.
+    Se a planilha estiver corrompida ou bloqueada, nada é gravado e
+    :class:`ErroPlanilhaLegada` é lançada.
+    """
+    ordem_venda = str(ordem_venda or "")
+    agora = _dt.datetime.now().isoformat(timespec="seconds")
+    conexao = _conectar(caminho)
+    try:
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            if (
+                planilha_legada is not None
+                and Path(planilha_legada).exists()
+                and not _existe_registro(conexao, tipo, ordem_venda)
+            ):
+                try:
+                    antigas = _linhas_planilha(Path(planilha_legada))
+                except ImportError:
+                    antigas = []
+                except Exception as exc:
+                    raise ErroPlanilhaLegada(
+                        f"não foi possível ler a planilha antiga {planilha_legada} "
+                        f"({exc}); feche-a ou retire-a da pasta e salve novamente"
+                    ) from exc
+                conexao.executemany(
+                    "INSERT INTO registros (tipo, ordem_venda, criado_em, dados) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            tipo,
+                            ordem_venda,
+                            agora,
+                            json.dumps(linha, ensure_ascii=False, default=_valor_json),
+                        )
+                        for linha in antigas
+                    ],
+                )
+            cursor = conexao.execute(
+                "INSERT INTO registros (tipo, ordem_venda, criado_em, dados) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    tipo,
+                    ordem_venda,
+                    agora,
+                    json.dumps(dados, ensure_ascii=False, default=_valor_json),
+                ),
+            )
+            return cursor.lastrowid
+    finally:
+        conexao.close()
+
+
+def _consultar(conexao, tipo: str, ordem_venda):
+    consulta = "SELECT dados FROM registros WHERE tipo = ?"
+    parametros = [tipo]
+    if ordem_venda is not None:
+        consulta += " AND ordem_venda = ?"
+        parametros.append(str(ordem_venda))
+    return conexao.execute(consulta + " ORDER BY id", parametros)
+
+
+def ler_registros(tipo: str, ordem_venda=None, caminho=None):
+    """Itera sobre os registros de ``tipo`` (todas as ordens se ``None``)."""
+    conexao = _conectar(caminho)
+    try:
+        for (dados,) in _consultar(conexao, tipo, ordem_venda):
+            yield json.loads(dados)
+    finally:
+        conexao.close()
+
+
+def exportar_xlsx(tipo: str, destino, ordem_venda=None, caminho=None) -> int:
+    """Grava os registros de ``tipo`` em uma planilha e retorna o nº de linhas.
+
+    ``destino`` pode ser um caminho ou um buffer binário. As colunas seguem a
+    ordem em que apareceram nos registros; os dados são escritos linha a
+    linha com o openpyxl em modo *write-only*, sem montar a planilha inteira
+    em memória.
+    """
+    from openpyxl import Workbook
+
+    colunas = {}
+    for dados in ler_registros(tipo, ordem_venda, caminho):
+        colunas.update(dict.fromkeys(dados))
+    colunas = list(colunas)
+
+    livro = Workbook(write_only=True)
+    planilha = livro.create_sheet()
+    planilha.append(colunas)
+    total = 0
+    for dados in ler_registros(tipo, ordem_venda, caminho):
+        planilha.append([dados.get(coluna) for coluna in colunas])
+        total += 1
+    if isinstance(destino, (str, Path)):
+        Path(destino).parent.mkdir(parents=True, exist_ok=True)
+    livro.save(destino)
+    return total
+
+
+__all__ = [
+    "ARQUIVO_REGISTRO",
+    "ErroPlanilhaLegada",
+    "PASTA_DOCS",
+    "caminho_planilha",
+    "exportar_xlsx",
+    "ler_registros",
+    "registrar",
+]
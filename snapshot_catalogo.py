@@ -0,0 +1,234 @@
+"""Snapshot colunar (Arrow) das tabelas de referência e do catálogo de preços.
+
+Na inicialização o aplicativo analisava as tabelas CSV embutidas em
+``tabelas_eletricas`` e, na primeira renderização, lia e convertia cada
+tabela de preço do catálogo. Aqui cada tabela já preparada é gravada em um
+arquivo Arrow IPC (Feather v2) sem compressão na pasta ``catalogo_snapshot``,
+com os textos repetidos em dicionário e os preços em float64. A leitura é um
+``memory_map`` do arquivo, sem análise de texto; as colunas são copiadas
+para fora do mapeamento (textos como objetos, como no ``pd.read_csv``), de
+modo que o arquivo pode ser substituído enquanto o aplicativo roda e as
+abas continuam tratando as tabelas como texto.
+
+O formato Arrow IPC foi preferido ao Parquet por poder ser mapeado em
+memória sem decodificação; como um arquivo IPC guarda um único esquema, o
+snapshot tem um arquivo por tabela. Cada arquivo registra nos metadados a
+assinatura da origem (o texto embutido ou a versão da tabela no banco do
+catálogo) e só é usado enquanto ela for a mesma; caso contrário a tabela é
+lida da origem.
+
+O snapshot é criado explicitamente, com ``python snapshot_catalogo.py`` na
+pasta do catálogo; importar os módulos não grava nada. Sem a pasta (ou sem
+permissão de escrita) as tabelas são lidas da origem. Com ela, cada nova
+versão de uma tabela de preço é regravada na primeira leitura.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import importlib
+import os
+import time
+from pathlib import Path
+from typing import Callable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+PASTA_SNAPSHOT = "catalogo_snapshot"
+
+# Colunas com o texto original das colunas de preço convertidas
+_PREFIXO_TEXTO = "__texto__"
+_CHAVE_ORIGEM = b"origem"
+
+
+def assinatura_texto(*textos: str) -> str:
+    """Assinatura de conteúdo usada como origem das tabelas embutidas."""
+    resumo = hashlib.blake2b(digest_size=16)
+    for texto in textos:
+        resumo.update(texto.encode("utf-8"))
+        resumo.update(b"\0")
+    return resumo.hexdigest()
+
+
+def _arquivo(pasta, nome: str) -> Path:
+    return Path(pasta) / PASTA_SNAPSHOT / f"{nome}.arrow"
+
+
+def _para_arrow(df: pd.DataFrame, origem: str) -> pa.Table:
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    colunas = [
+        pc.dictionary_encode(coluna) if pa.types.is_string(coluna.type) else coluna
+        for coluna in tabela.columns
+    ]
+    return pa.table(colunas, names=tabela.column_names).replace_schema_metadata(
+        {_CHAVE_ORIGEM: origem.encode("utf-8")}
+    )
+
+
+def _para_colunas(tabela: pa.Table) -> dict[str, np.ndarray]:
+    """Colunas da tabela como arrays NumPy, copiadas para fora do mapeamento.
+
+    Textos voltam como objetos e células vazias como NaN, assim como no
+    ``pd.read_csv``: as abas editam e comparam essas colunas como texto.
+    """
+    colunas = {}
+    for nome, coluna in zip(tabela.column_names, tabela.columns):
+        coluna = coluna.combine_chunks()
+        if pa.types.is_dictionary(coluna.type):
+            valores = np.append(
+                coluna.dictionary.to_numpy(zero_copy_only=False).astype(object), np.nan
+            )
+            indices = coluna.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+            colunas[nome] = valores[indices]
+        else:
+            colunas[nome] = np.array(coluna.to_numpy(zero_copy_only=False))
+    return colunas
+
+
+def gravar(
+    pasta, nome: str, df: pd.DataFrame, origem: str, criar_pasta: bool = True
+) -> bool:
+    """Grava ``df`` no snapshot; retorna ``False`` se a pasta não aceita escrita.
+
+    Com ``criar_pasta=False`` só grava se a pasta do snapshot já existir. O
+    arquivo é escrito ao lado e trocado de uma vez, de modo que leituras
+    simultâneas nunca encontram um arquivo pela metade.
+    """
+    destino = _arquivo(pasta, nome)
+    temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    if not criar_pasta and not destino.parent.is_dir():
+        return False
+    try:
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        tabela = _para_arrow(df, origem)
+        with pa.OSFile(str(temporario), "wb") as saida:
+            with ipc.new_file(saida, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+        os.replace(temporario, destino)
+    except OSError:
+        with contextlib.suppress(OSError):
+            temporario.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def _ler_colunas(pasta, nome: str, origem: str) -> Optional[dict[str, np.ndarray]]:
+    try:
+        with pa.memory_map(str(_arquivo(pasta, nome))) as fonte:
+            leitor = ipc.open_file(fonte)
+            metadados = leitor.schema.metadata or {}
+            if metadados.get(_CHAVE_ORIGEM) != origem.encode("utf-8"):
+                return None
+            return _para_colunas(leitor.read_all())
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def ler(pasta, nome: str, origem: str) -> Optional[pd.DataFrame]:
+    """Tabela do snapshot, ou ``None`` se ausente ou de outra origem."""
+    colunas = _ler_colunas(pasta, nome, origem)
+    return None if colunas is None else pd.DataFrame(colunas)
+
+
+def carregar_tabelas(
+    pasta,
+    origens: Mapping[str, str],
+    construir: Callable[[], Mapping[str, pd.DataFrame]],
+) -> dict[str, pd.DataFrame]:
+    """Tabelas ``origens`` (nome -> assinatura) do snapshot ou de ``construir``.
+
+    Se alguma tabela faltar ou estiver desatualizada, todas são construídas;
+    nada é gravado (ver :func:`gravar_tabelas`).
+    """
+    tabelas = {nome: ler(pasta, nome, origem) for nome, origem in origens.items()}
+    if all(tabela is not None for tabela in tabelas.values()):
+        return tabelas
+    return dict(construir())
+
+
+def gravar_tabelas(
+    pasta, origens: Mapping[str, str], tabelas: Mapping[str, pd.DataFrame]
+) -> bool:
+    """Grava as ``tabelas`` no snapshot; ``False`` se alguma não foi gravada."""
+    return all(
+        [gravar(pasta, nome, tabelas[nome], origem) for nome, origem in origens.items()]
+    )
+
+
+def ler_catalogo(caminho_csv, origem: str) -> Optional[tuple[pd.DataFrame, pd.DataFrame]]:
+    """Tabela de preço (texto original, preços em float64) do snapshot."""
+    caminho = Path(caminho_csv).resolve()
+    colunas = _ler_colunas(caminho.parent, caminho.stem, origem)
+    if colunas is None:
+        return None
+    convertido = {
+        nome: valores
+        for nome, valores in colunas.items()
+        if not nome.startswith(_PREFIXO_TEXTO)
+    }
+    bruto = {
+        nome: colunas.get(f"{_PREFIXO_TEXTO}{nome}", valores)
+        for nome, valores in convertido.items()
+    }
+    return pd.DataFrame(bruto), pd.DataFrame(convertido)
+
+
+def gravar_catalogo(
+    caminho_csv, bruto: pd.DataFrame, convertido: pd.DataFrame, origem: str
+) -> bool:
+    """Grava a tabela de preço com os preços convertidos e o texto original.
+
+    Só grava se o snapshot já foi criado na pasta do CSV (:func:`main`).
+    """
+    caminho = Path(caminho_csv).resolve()
+    combinado = convertido.copy()
+    for coluna in convertido.columns:
+        if not convertido[coluna].equals(bruto[coluna]):
+            combinado[f"{_PREFIXO_TEXTO}{coluna}"] = bruto[coluna]
+    return gravar(caminho.parent, caminho.stem, combinado, origem, criar_pasta=False)
+
+
+def main() -> None:
+    inicio = time.perf_counter()
+    tabelas_eletricas = importlib.import_module("tabelas_eletricas")
+    if not tabelas_eletricas.gravar_snapshot():
+        print("Não foi possível gravar o snapshot das tabelas de referência.")
+    from catalogo_banco import TABELAS_CATALOGO
+    from catalogo_precos import obter_tabela_precos
+
+    pasta = Path.cwd() / PASTA_SNAPSHOT
+    try:
+        pasta.mkdir(exist_ok=True)
+    except OSError as exc:
+        raise SystemExit(f"Não foi possível criar {pasta}: {exc}")
+    gravadas = 0
+    for arquivo in TABELAS_CATALOGO:
+        try:
+            obter_tabela_precos(arquivo, converter_precos=True)
+        except FileNotFoundError:
+            continue
+        gravadas += 1
+    print(
+        f"Snapshot com {gravadas} tabela(s) de preço em "
+        f"{pasta} ({time.perf_counter() - inicio:.3f} s)"
+    )
+
+
+__all__ = [
+    "PASTA_SNAPSHOT",
+    "assinatura_texto",
+    "carregar_tabelas",
+    "gravar",
+    "gravar_catalogo",
+    "gravar_tabelas",
+    "ler",
+    "ler_catalogo",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,9 @@ Inclui a tabela para as fases e a tabela de seção dos fios neutro e terra.
 
 import pandas as pd
 from io import StringIO
+from pathlib import Path
+
+from snapshot_catalogo import assinatura_texto, carregar_tabelas, gravar_tabelas
 
 # Tabela para as fases
 CSV_TABELA = """
@@ -153,21 +156,61 @@ def carregar_tabela(csv: str) -> pd.DataFrame:
         df[col] = df[col].str.replace("mm", "").astype(int)
     return df
 
-# DataFrames prontos para uso imediato
-TABELA_BITOLAS = carregar_tabela(CSV_TABELA)
-TABELA_NEUTRO_TERRA = carregar_tabela(CSV_TABELA_NEUTRO_TERRA)
-TABELA_CABO_ISOLADO_PVC = pd.read_csv(
-    StringIO(CSV_TABELA_CABO_ISOLADO_PVC), sep=";", decimal=",", skiprows=1
-)
-TABELA_CABO_UNIPOLAR_HEPR = pd.read_csv(
-    StringIO(CSV_TABELA_CABO_UNIPOLAR_HEPR), sep=";", decimal=",", skiprows=1
-)
-TABELA_ELETRODUTOS = pd.read_csv(
-    StringIO(CSV_TABELA_ELETRODUTOS), sep=";", decimal=",", skiprows=1
+
+def _construir_tabelas() -> dict[str, pd.DataFrame]:
+    return {
+        "TABELA_BITOLAS": carregar_tabela(CSV_TABELA),
+        "TABELA_NEUTRO_TERRA": carregar_tabela(CSV_TABELA_NEUTRO_TERRA),
+        "TABELA_CABO_ISOLADO_PVC": pd.read_csv(
+            StringIO(CSV_TABELA_CABO_ISOLADO_PVC), sep=";", decimal=",", skiprows=1
+        ),
+        "TABELA_CABO_UNIPOLAR_HEPR": pd.read_csv(
+            StringIO(CSV_TABELA_CABO_UNIPOLAR_HEPR), sep=";", decimal=",", skiprows=1
+        ),
+        "TABELA_ELETRODUTOS": pd.read_csv(
+            StringIO(CSV_TABELA_ELETRODUTOS), sep=";", decimal=",", skiprows=1
+        ),
+    }
+
+
+# DataFrames prontos para uso imediato, lidos do snapshot Arrow (quando
+# gravado por ``python snapshot_catalogo.py``) enquanto os textos acima não
+# mudarem; caso contrário, dos próprios textos
+_ORIGENS = dict.fromkeys(
+    (
+        "TABELA_BITOLAS",
+        "TABELA_NEUTRO_TERRA",
+        "TABELA_CABO_ISOLADO_PVC",
+        "TABELA_CABO_UNIPOLAR_HEPR",
+        "TABELA_ELETRODUTOS",
+    ),
+    assinatura_texto(
+        CSV_TABELA,
+        CSV_TABELA_NEUTRO_TERRA,
+        CSV_TABELA_CABO_ISOLADO_PVC,
+        CSV_TABELA_CABO_UNIPOLAR_HEPR,
+        CSV_TABELA_ELETRODUTOS,
+    ),
 )
+_PASTA = Path(__file__).parent
+_TABELAS = carregar_tabelas(_PASTA, _ORIGENS, _construir_tabelas)
+
+
+def gravar_snapshot(pasta=None) -> bool:
+    """Grava o snapshot das tabelas de referência; ``False`` se não for possível."""
+    pasta = _PASTA if pasta is None else pasta
+    return gravar_tabelas(pasta, _ORIGENS, _construir_tabelas())
+
+
+TABELA_BITOLAS = _TABELAS["TABELA_BITOLAS"]
+TABELA_NEUTRO_TERRA = _TABELAS["TABELA_NEUTRO_TERRA"]
+TABELA_CABO_ISOLADO_PVC = _TABELAS["TABELA_CABO_ISOLADO_PVC"]
+TABELA_CABO_UNIPOLAR_HEPR = _TABELAS["TABELA_CABO_UNIPOLAR_HEPR"]
+TABELA_ELETRODUTOS = _TABELAS["TABELA_ELETRODUTOS"]
 
 __all__ = [
     "carregar_tabela",
+    "gravar_snapshot",
     "TABELA_BITOLAS",
     "TABELA_NEUTRO_TERRA",
     "TABELA_CABO_ISOLADO_PVC",
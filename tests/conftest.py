@@ -0,0 +1,24 @@
+"""Configuração comum dos testes: os módulos do aplicativo ficam na raiz."""
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+
+@pytest.fixture
+def pasta_catalogo(tmp_path, monkeypatch):
+    """Pasta de trabalho temporária com uma cópia dos CSVs de preço.
+
+    O aplicativo lê o catálogo da pasta atual e grava o banco ao lado dos
+    CSVs; assim os testes não alteram os arquivos do repositório.
+    """
+    for arquivo in RAIZ.glob("valores_*.csv"):
+        shutil.copy(arquivo, tmp_path / arquivo.name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,88 @@
+import pytest
+
+import catalogo_precos
+from catalogo_banco import (
+    ConflitoCatalogo,
+    ler_tabela,
+    salvar_tabela,
+    salvar_tabelas,
+    versao_tabela,
+)
+from catalogo_compartilhado import ARQUIVO_SEALTUBO, _Catalogo
+from catalogo_precos import obter_tabela_precos
+
+ELETRODUTOS = "valores_eletrodutos.csv"
+CABOS = "valores_cabos.csv"
+
+
+@pytest.fixture
+def catalogo(pasta_catalogo):
+    yield pasta_catalogo
+    catalogo_precos.limpar_cache_precos()
+
+
+def _com_preco(tabela, material, preco):
+    tabela = tabela.copy()
+    linhas = tabela["Material"].str.contains(material, regex=False, na=False)
+    tabela.loc[linhas, "Preco"] = preco
+    return tabela
+
+
+def test_primeira_consulta_importa_o_csv(catalogo):
+    assert versao_tabela(catalogo / ELETRODUTOS) == 1
+    assert versao_tabela(catalogo / ELETRODUTOS) == 1
+    assert versao_tabela(catalogo / "valores_inexistente.csv") is None
+
+
+def test_gravacao_com_versao_antiga_e_recusada(catalogo):
+    caminho = catalogo / ELETRODUTOS
+    lida = ler_tabela(caminho)
+    versao = versao_tabela(caminho)
+    assert salvar_tabela(caminho, lida, versao_esperada=versao) == versao + 1
+    alterada = _com_preco(lida, "Sealtubo c/capa 1\"", "R$ 99,00")
+    with pytest.raises(ConflitoCatalogo):
+        salvar_tabela(caminho, alterada, versao_esperada=versao)
+    assert versao_tabela(caminho) == versao + 1
+    assert ler_tabela(caminho).equals(lida)
+
+
+def test_conflito_nao_grava_nenhuma_tabela(catalogo):
+    eletrodutos, cabos = catalogo / ELETRODUTOS, catalogo / CABOS
+    versoes = {eletrodutos: versao_tabela(eletrodutos), cabos: versao_tabela(cabos)}
+    salvar_tabela(cabos, ler_tabela(cabos))
+    with pytest.raises(ConflitoCatalogo):
+        salvar_tabelas(
+            {eletrodutos: ler_tabela(eletrodutos), cabos: ler_tabela(cabos)}, versoes
+        )
+    assert versao_tabela(eletrodutos) == versoes[eletrodutos]
+
+
+def test_cache_acompanha_a_versao(catalogo):
+    caminho = catalogo / ELETRODUTOS
+    antes = obter_tabela_precos(caminho, converter_precos=True)
+    salvar_tabela(caminho, _com_preco(ler_tabela(caminho), "Sealtubo c/capa 1\"", "R$ 99,00"))
+    depois = obter_tabela_precos(caminho, converter_precos=True)
+    linha = depois["Material"].str.contains("Sealtubo c/capa 1\"", regex=False, na=False)
+    assert depois.loc[linha, "Preco"].tolist() == [99.0]
+    assert antes.loc[linha, "Preco"].tolist() == [10.69]
+
+
+def test_sealtubo_derivado_acompanha_os_eletrodutos(catalogo):
+    caminho = catalogo / ELETRODUTOS
+    compartilhado = _Catalogo()
+    sealtubo = compartilhado.tabela(catalogo / ARQUIVO_SEALTUBO, ";", True)
+    assert sealtubo["Categoria"].tolist()[1] == "Eletroduto de 1"
+    assert sealtubo["Preco"].tolist()[1] == 10.69
+
+    salvar_tabela(caminho, _com_preco(ler_tabela(caminho), "Sealtubo c/capa 1\"", "R$ 99,00"))
+    # Até a invalidação a sessão segue com a versão carregada
+    assert compartilhado.tabela(catalogo / ARQUIVO_SEALTUBO, ";", True) is sealtubo
+    compartilhado.invalidar()
+    atualizado = compartilhado.tabela(catalogo / ARQUIVO_SEALTUBO, ";", True)
+    assert atualizado["Preco"].tolist()[1] == 99.0
+
+
+def test_catalogo_sem_eletrodutos(catalogo):
+    (catalogo / ELETRODUTOS).unlink()
+    with pytest.raises(FileNotFoundError):
+        _Catalogo().tabela(catalogo / ARQUIVO_SEALTUBO, ";", True)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_precos import _gerar_precos, _parse_float_field
+from catalogo_precos import converter_coluna_moeda
+
+CASOS = [
+    None,
+    np.nan,
+    "",
+    " ",
+    "-",
+    "abc",
+    "R$ 1.234,56",
+    "r$ 3,00",
+    "R$ 1.234,56",
+    "R$ 12,5",
+    "1.234.567,89",
+    "1,234.56",
+    "1234.56",
+    "100.0",
+    "7,",
+    ",5",
+    "-12,30",
+    "R$ -1.000,00",
+    "10 m",
+    "1-2",
+]
+
+
+def _esperado(valores):
+    return [0.0 if pd.isna(v) else _parse_float_field(v) for v in valores]
+
+
+def test_igual_a_conversao_linha_a_linha():
+    precos = _gerar_precos(2_000)
+    np.testing.assert_array_equal(
+        converter_coluna_moeda(precos).to_numpy(), _esperado(precos)
+    )
+
+
+def test_colunas_so_de_texto():
+    precos = _gerar_precos(400).astype(str)
+    np.testing.assert_array_equal(
+        converter_coluna_moeda(precos).to_numpy(), _esperado(precos)
+    )
+
+
+@pytest.mark.parametrize("valor", CASOS, ids=repr)
+def test_casos_limite(valor):
+    assert converter_coluna_moeda(pd.Series([valor], dtype=object))[0] == _esperado([valor])[0]
+
+
+def test_coluna_mista_e_numerica():
+    mista = pd.Series(["R$ 2,50", 3, 4.25, None], index=[5, 6, 7, 8], name="Preço")
+    convertida = converter_coluna_moeda(mista)
+    assert list(convertida) == [2.5, 3.0, 4.25, 0.0]
+    assert list(convertida.index) == [5, 6, 7, 8]
+    assert convertida.name == "Preço"
+    numerica = pd.Series([1, 2], dtype="int64")
+    assert converter_coluna_moeda(numerica).dtype == "float64"
+
+
+def test_preencher_none_mantem_nan():
+    convertida = converter_coluna_moeda(pd.Series(["abc", "1,5"]), preencher=None)
+    assert np.isnan(convertida[0])
+    assert convertida[1] == 1.5
@@ -0,0 +1,75 @@
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import diagnostico
+import fragmentos
+from conftest import RAIZ
+
+CENARIOS = {
+    "um_carregador": {
+        "potencia_carregador": "7,4 kW",
+        "percursos": [("→", 30.0), ("↑", 12.0)],
+        "quantidade_carregadores": 1,
+    },
+    "varios_carregadores": {
+        "potencia_carregador": "22 kW",
+        "percursos": [("→", 80.0)],
+        "quantidade_carregadores": 4,
+        "tipo_cabos": "Cabo HEPR",
+    },
+}
+
+
+@pytest.fixture
+def registro_ativo(monkeypatch, pasta_catalogo):
+    """Diagnóstico ativo: leituras e gravações de cada fragmento registradas."""
+    monkeypatch.setattr(diagnostico, "ATIVO", True)
+    monkeypatch.setattr(fragmentos, "ATIVO", True)
+    if not isinstance(st.session_state, fragmentos._SessaoRegistrada):
+        monkeypatch.setattr(
+            st, "session_state", fragmentos._SessaoRegistrada(st.session_state)
+        )
+
+
+def _executar_app(cenario: dict) -> AppTest:
+    app = AppTest.from_file(str(RAIZ / "app_alferionplus.py"), default_timeout=180)
+    for chave, valor in cenario.items():
+        app.session_state[chave] = valor
+    app.run()
+    assert not app.exception
+    return app
+
+
+@pytest.mark.parametrize("cenario", list(CENARIOS))
+def test_dependencias_cobrem_as_leituras(registro_ativo, cenario):
+    app = _executar_app(CENARIOS[cenario])
+    assert fragmentos.dependencias_nao_declaradas(app.session_state) == {}
+
+
+def test_chave_fora_da_lista_e_apontada(registro_ativo, monkeypatch):
+    declaradas = fragmentos.DEPENDENCIAS["custos_materiais"]
+    assert "tipo_cabos" in declaradas
+    monkeypatch.setitem(
+        fragmentos.DEPENDENCIAS,
+        "custos_materiais",
+        tuple(chave for chave in declaradas if chave != "tipo_cabos"),
+    )
+    app = _executar_app(CENARIOS["um_carregador"])
+    faltando = fragmentos.dependencias_nao_declaradas(app.session_state)
+    assert "tipo_cabos" in faltando["custos_materiais"]
+
+
+def test_sessao_registrada_so_anota_dentro_de_fragmento():
+    sessao = fragmentos._SessaoRegistrada({"a": 1})
+    assert sessao["a"] == 1
+    fragmentos._LOCAL.registro = {"lidas": set(), "escritas": set()}
+    try:
+        assert sessao.get("a") == 1
+        sessao["b"] = 2
+        sessao["_interna"] = 3
+        assert sessao.setdefault("c", 4) == 4
+        registro = fragmentos._LOCAL.registro
+    finally:
+        fragmentos._LOCAL.registro = None
+    assert registro == {"lidas": {"a", "c"}, "escritas": {"b", "c"}}
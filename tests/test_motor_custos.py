@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from conftest import RAIZ
+from motor_custos import (
+    SEALTUBO_PADRAO,
+    VALOR_REFEICAO,
+    calcular_custo_mao_obra,
+    obter_sealtubo,
+    preparar_precos_sealtubo,
+    sealtubo_de_eletrodutos,
+    valores_hora_profissionais,
+)
+from tabelas_eletricas import TABELA_ELETRODUTOS
+
+# Preço do sealtubo de cada tamanho de TABELA_ELETRODUTOS no catálogo
+PRECO_SEALTUBO = {
+    "½”": 0.0,
+    "¾”": 8.70,
+    "1”": 10.69,
+    "1 ¼”": 17.28,
+    "1 ½”": 19.65,
+    "2”": 26.31,
+    "2 ½”": 0.0,
+    "3”": 0.0,
+    "4”": 0.0,
+}
+
+
+def _sealtubo_do_catalogo():
+    eletrodutos = pd.read_csv(RAIZ / "valores_eletrodutos.csv", sep=";")
+    return preparar_precos_sealtubo(sealtubo_de_eletrodutos(eletrodutos))
+
+
+def _sealtubo_sem_categoria():
+    return preparar_precos_sealtubo(
+        pd.DataFrame(SEALTUBO_PADRAO).drop(columns="Categoria")
+    )
+
+
+def test_tabela_cobre_todos_os_tamanhos():
+    assert set(TABELA_ELETRODUTOS["Eletroduto (Pol)"]) == set(PRECO_SEALTUBO)
+
+
+def test_sealtubo_derivado_mantem_categoria():
+    assert list(_sealtubo_do_catalogo()["Categoria"]) == [
+        "Eletroduto de ¾",
+        "Eletroduto de 1",
+        "Eletroduto de 1 ¼",
+        "Eletroduto de 1 ½",
+        "Eletroduto de 2",
+    ]
+
+
+@pytest.mark.parametrize(
+    "tabela",
+    [_sealtubo_do_catalogo, lambda: preparar_precos_sealtubo(None), _sealtubo_sem_categoria],
+    ids=["eletrodutos", "padrao", "sem_categoria"],
+)
+@pytest.mark.parametrize("tamanho", list(PRECO_SEALTUBO))
+def test_sealtubo_pelo_tamanho_exato(tabela, tamanho):
+    material, preco = obter_sealtubo(tabela(), tamanho)
+    assert preco == PRECO_SEALTUBO[tamanho]
+    if preco:
+        # "1 ¼”" -> "... 1 1/4", e não o "1" de outra linha
+        medida = tamanho.rstrip("”").replace("¼", "1/4").replace("½", "1/2")
+        assert material.endswith(" " + medida.replace("¾", "3/4"))
+    else:
+        assert material == ""
+
+
+def test_mao_obra_cobra_horas_e_refeicoes():
+    valores_hora = valores_hora_profissionais(
+        pd.DataFrame(
+            {
+                "Profissional": ["Eletrotécnico 1", "Ajudante", "Ajudante"],
+                "Valor Hora": ["R$ 50,00", "R$ 20,00", "R$ 99,00"],
+            }
+        )
+    )
+    assert valores_hora == {"Eletrotécnico 1": 50.0, "Ajudante": 20.0}
+    custo = calcular_custo_mao_obra(
+        [("Eletrotécnico 1", 10.0), ("Ajudante", 0.0), ("Sem preço", 8.0)], valores_hora
+    )
+    assert custo.total_tecnicos == 500.0
+    # ceil(10/8) = 2; ao menos uma refeição mesmo sem horas
+    assert custo.refeicoes == 2 + 1 + 1
+    assert custo.total_alimentacao == 4 * VALOR_REFEICAO
+    assert custo.total == 500.0 + 4 * VALOR_REFEICAO
+    assert [item["Total"] for item in custo.itens] == [500.0, 0.0, 0.0]
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from motor_dimensionamento import (
+    COLUNAS_POTENCIA,
+    aviso_bitola,
+    aviso_protecao,
+    corrente_nominal_protecao,
+    dimensionar_disjuntor,
+    dimensionar_dps,
+    dimensionar_idr,
+    obter_bitola_cabo,
+    obter_bitolas_cabo_lote,
+)
+from tabelas_eletricas import TABELA_BITOLAS, TABELA_NEUTRO_TERRA
+
+POTENCIAS = [-1.0, 0.0, 1.0, 1.9, 2.8, 3.7, 5.55, 7.4, 9.2, 11.0, 12.9, 14.8, 18.4, 22.0, 33.0, 44.0, 60.0]
+
+
+def _bitola_por_filtro(distancia, potencia_kw, tabela):
+    """Busca linha a linha usada antes de ``searchsorted``."""
+    if potencia_kw <= 0:
+        return None
+    potencia_ref = min(COLUNAS_POTENCIA, key=lambda x: abs(x - potencia_kw))
+    linha = tabela[tabela["Distância (m)"] >= distancia]
+    if linha.empty:
+        return None
+    return float(linha.iloc[0][COLUNAS_POTENCIA[potencia_ref]])
+
+
+def _distancias(tabela):
+    # Cada distância da tabela, os pontos entre elas e valores fora do alcance
+    pontos = tabela["Distância (m)"].astype(float)
+    return sorted({-1.0, *pontos, *(pontos + 0.5), *(pontos - 0.5), pontos.max() + 1})
+
+
+@pytest.mark.parametrize(
+    "tabela", [TABELA_BITOLAS, TABELA_NEUTRO_TERRA], ids=["fase", "neutro_terra"]
+)
+def test_lote_igual_a_busca_por_filtro(tabela):
+    distancias = _distancias(tabela)
+    grade_d, grade_p = np.meshgrid(distancias, POTENCIAS, indexing="ij")
+    lote = obter_bitolas_cabo_lote(grade_d, grade_p, tabela)
+    esperado = np.array(
+        [
+            [_bitola_por_filtro(d, p, tabela) for p in POTENCIAS]
+            for d in distancias
+        ],
+        dtype=float,
+    )
+    np.testing.assert_array_equal(lote, esperado)
+
+
+def test_tabela_fora_de_ordem_e_compilada_na_hora():
+    embaralhada = TABELA_BITOLAS.sample(frac=1, random_state=0)
+    for distancia in _distancias(TABELA_BITOLAS):
+        assert obter_bitola_cabo(distancia, 7.4, embaralhada) == obter_bitola_cabo(
+            distancia, 7.4
+        )
+
+
+def test_bitola_escalar_formatada():
+    assert obter_bitola_cabo(41, 7.4) == "10 mm²"
+    assert obter_bitola_cabo(1_000, 7.4) == ""
+    assert obter_bitola_cabo(10, 0) == ""
+
+
+@pytest.mark.parametrize(
+    "bitola, corrente, nominal",
+    [
+        ("6 mm²", None, 32),
+        ("6 mm²", "", 32),
+        ("6 mm²", "25,3", 32),
+        ("6 mm²", 32.0, 32),
+        ("6 mm²", "32,01", None),
+        ("35 mm²", "33,6", 40),
+        ("185 mm²", "240", 250),
+        ("300 mm²", 330, None),
+        ("400 mm²", 20, None),
+        ("", 20, None),
+    ],
+)
+def test_protecao_pela_corrente_de_projeto(bitola, corrente, nominal):
+    assert corrente_nominal_protecao(bitola, corrente) == nominal
+
+
+def test_protecao_nao_segue_so_a_bitola():
+    # Um carregador de 33 A em cabo longo não leva o disjuntor da bitola
+    assert dimensionar_disjuntor("Trifásico", "70 mm²", "33,6") == "3P 40 A - DIN Curva C"
+    assert dimensionar_idr("Monofásico", "70 mm²", "33,6") == "2P 40 A - IDR Classe A 30 mA"
+    assert dimensionar_dps("Trifásico", "70 mm²", 2, "33,6") == "8x 1P 20 kA - DPS Tipo 2"
+
+
+def test_avisos_de_protecao():
+    assert aviso_protecao("6 mm²", "25") == ""
+    assert aviso_protecao("", "25") == ""
+    assert "excede" in aviso_protecao("6 mm²", "40")
+    assert "(32 A)" in aviso_protecao("6 mm²", "40")
+    assert "manualmente" in aviso_protecao("400 mm²", "40")
+    assert dimensionar_disjuntor("Monofásico", "6 mm²", "40") == ""
+
+
+def test_aviso_sem_bitola():
+    assert aviso_bitola("120", 200, "") != ""
+    assert aviso_bitola("120", 200, "95 mm²") == ""
+    assert aviso_bitola("120", 0, "") == ""
+    assert aviso_bitola("", 200, "") == ""
@@ -0,0 +1,118 @@
+import pandas as pd
+import pytest
+
+from motor_eletrodutos import Circuito
+from motor_percursos import (
+    COLUNAS_DERIVACOES,
+    TRECHO_RAMAL,
+    TRECHO_UNICO,
+    analisar_infra,
+    comprimentos_carregadores,
+    comprimentos_circuitos,
+    derivacoes_da_tabela,
+    metragem_cabos,
+    montar_rede,
+    quantidades_infra_trechos,
+)
+
+ALIMENTADOR = Circuito("Trifásico", 35.0, 35.0, 16.0)
+CARREGADOR = Circuito("Monofásico", 6.0, 6.0, 6.0)
+RAMAL = [("→", 10.0), ("↑", 5.0), ("→", 15.0)]
+TRONCO = [("↓", 20.0)]
+
+
+def _rede(quantidade, derivacoes=()):
+    return montar_rede(RAMAL, ALIMENTADOR, TRONCO, [CARREGADOR] * quantidade, derivacoes)
+
+
+def test_sem_quadro_um_unico_trecho():
+    trechos, circuitos = montar_rede(RAMAL, ALIMENTADOR)
+    assert [t.nome for t in trechos] == [TRECHO_UNICO]
+    assert circuitos == [ALIMENTADOR]
+    assert comprimentos_circuitos(trechos, 1).tolist() == [30.0]
+
+
+def test_sem_derivacoes_todos_no_fim_do_ramal():
+    trechos, circuitos = _rede(3)
+    assert [t.nome for t in trechos][1] == TRECHO_RAMAL
+    assert comprimentos_circuitos(trechos, len(circuitos)).tolist() == [20.0, 30.0, 30.0, 30.0]
+
+
+def test_derivacoes_dividem_o_ramal():
+    derivacoes = [(12.0, [("↓", 4.0)], 2), (30.0, [], 1)]
+    trechos, circuitos = _rede(4, derivacoes)
+    comprimentos = comprimentos_circuitos(trechos, len(circuitos))
+    # O quarto carregador, sem grupo, fica no fim do ramal
+    assert comprimentos.tolist() == [20.0, 16.0, 16.0, 30.0, 30.0]
+    assert comprimentos[1:].tolist() == comprimentos_carregadores(RAMAL, 4, derivacoes)
+    ramais = [t for t in trechos if t.nome.startswith(TRECHO_RAMAL)]
+    assert [t.comprimento for t in ramais] == [12.0, 18.0]
+    assert ramais[0].segmentos == (("→", 10.0), ("↑", 2.0))
+    assert ramais[1].segmentos == (("↑", 3.0), ("→", 15.0))
+
+
+def test_derivacao_no_inicio_nao_cria_trecho_vazio():
+    trechos, circuitos = _rede(2, [(0.0, [("←", 6.0)], 1)])
+    assert all(t.comprimento > 0 for t in trechos)
+    derivacao = trechos[1]
+    assert derivacao.pai == 0 and derivacao.circuitos == (1,)
+    assert comprimentos_circuitos(trechos, len(circuitos)).tolist() == [20.0, 6.0, 30.0]
+
+
+def test_derivacoes_limitadas_ao_ramal_e_aos_carregadores():
+    derivacoes = [(-5.0, [("↓", 1.0)], 1), (99.0, [("↓", 2.0)], 5)]
+    assert comprimentos_carregadores(RAMAL, 3, derivacoes) == [1.0, 32.0, 32.0]
+    trechos, circuitos = _rede(3, derivacoes)
+    assert comprimentos_circuitos(trechos, len(circuitos))[1:].tolist() == [1.0, 32.0, 32.0]
+
+
+def test_metragem_soma_cada_derivacao():
+    trechos, circuitos = _rede(2, [(12.0, [("↓", 4.0)], 1)])
+    metros = metragem_cabos(trechos, circuitos)
+    fase_6 = metros[(metros["Cor"] == "Preto") & (metros["Bitola (mm²)"] == 6.0)]
+    assert fase_6["Metros"].tolist() == [16.0 + 30.0]
+
+
+def test_tabela_de_derivacoes():
+    tabela = pd.DataFrame(
+        [
+            [2, "12", "↓", "4"],
+            [0, 5, "→", 3],
+            ["1", None, "x", None],
+        ],
+        columns=list(COLUNAS_DERIVACOES),
+    )
+    assert derivacoes_da_tabela(tabela) == (
+        (12.0, (("↓", 4.0),), 2),
+        (0.0, (), 1),
+    )
+    assert derivacoes_da_tabela(None) == ()
+    assert derivacoes_da_tabela(pd.DataFrame()) == ()
+
+
+@pytest.mark.parametrize(
+    "segmentos, anterior, esperado",
+    [
+        ([("→", 7.0)], None, {"eletroduto": 3, "condulete": 2, "curva_galv_eletro_90": 0}),
+        ([("→", 3.0), ("→", 3.0)], None, {"eletroduto": 2, "condulete": 1}),
+        ([("→", 2.0), ("↑", 2.0)], None, {"curva_galv_eletro_90": 1}),
+        ([("→", 2.0), ("←", 2.0)], None, {"curva_galv_eletro_90": 2}),
+        ([("↑", 2.0)], "→", {"curva_galv_eletro_90": 1}),
+        ([("→", 2.0), ("↷", 1.5), ("↑", 2.0)], None, {"curva_galv_eletro_90": 0, "sealtubo": 2.5}),
+        ([("→", 0.0)], None, {"eletroduto": 0, "sealtubo": 0.0}),
+    ],
+)
+def test_infra_pelas_direcoes(segmentos, anterior, esperado):
+    quantidades = analisar_infra(segmentos, anterior)
+    assert {item: quantidades[item] for item in esperado} == esperado
+
+
+def test_condulete_t_por_derivacao_extra():
+    trechos, _ = _rede(3, [(12.0, [("↓", 4.0)], 1), (12.0, [("↑", 4.0)], 1)])
+    quantidades = quantidades_infra_trechos(trechos)
+    ramal_ate_derivacao = next(
+        i for i, t in enumerate(trechos) if t.nome.startswith(f"{TRECHO_RAMAL} (0")
+    )
+    # Duas derivações e o resto do ramal saem do mesmo ponto
+    assert quantidades[ramal_ate_derivacao]["condulete_t"] == 2
+    assert sum(q["condulete_t"] for q in quantidades) == 2
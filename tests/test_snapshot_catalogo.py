@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+import snapshot_catalogo
+import tabelas_eletricas
+from snapshot_catalogo import (
+    PASTA_SNAPSHOT,
+    carregar_tabelas,
+    gravar_catalogo,
+    gravar_tabelas,
+    ler,
+)
+
+ORIGENS = tabelas_eletricas._ORIGENS
+
+
+@pytest.fixture
+def construir():
+    """``_construir_tabelas`` que conta as chamadas."""
+    chamadas = []
+
+    def _construir():
+        chamadas.append(1)
+        return tabelas_eletricas._construir_tabelas()
+
+    _construir.chamadas = chamadas
+    return _construir
+
+
+def test_carregar_nao_grava_o_snapshot(tmp_path, construir):
+    tabelas = carregar_tabelas(tmp_path, ORIGENS, construir)
+    assert set(tabelas) == set(ORIGENS)
+    assert construir.chamadas == [1]
+    assert not (tmp_path / PASTA_SNAPSHOT).exists()
+
+
+def test_snapshot_gravado_reproduz_as_tabelas(tmp_path, construir):
+    originais = tabelas_eletricas._construir_tabelas()
+    assert gravar_tabelas(tmp_path, ORIGENS, originais)
+    tabelas = carregar_tabelas(tmp_path, ORIGENS, construir)
+    assert construir.chamadas == []
+    for nome, original in originais.items():
+        pd.testing.assert_frame_equal(tabelas[nome], original)
+
+
+def test_origem_diferente_volta_ao_texto(tmp_path, construir):
+    gravar_tabelas(tmp_path, ORIGENS, tabelas_eletricas._construir_tabelas())
+    origens = dict.fromkeys(ORIGENS, "outra")
+    assert ler(tmp_path, "TABELA_BITOLAS", "outra") is None
+    carregar_tabelas(tmp_path, origens, construir)
+    assert construir.chamadas == [1]
+
+
+def test_pasta_sem_escrita_usa_o_texto(tmp_path, construir):
+    # Um arquivo no lugar da pasta faz a gravação falhar como sem permissão
+    (tmp_path / PASTA_SNAPSHOT).write_text("")
+    tabelas = tabelas_eletricas._construir_tabelas()
+    assert not gravar_tabelas(tmp_path, ORIGENS, tabelas)
+    assert set(carregar_tabelas(tmp_path, ORIGENS, construir)) == set(ORIGENS)
+
+
+def test_catalogo_so_grava_com_snapshot_criado(tmp_path):
+    bruto = pd.DataFrame({"Material": ["Cabo"], "Preco": ["R$ 1,50"]})
+    convertido = bruto.assign(Preco=[1.5])
+    caminho = tmp_path / "valores_teste.csv"
+    assert not gravar_catalogo(caminho, bruto, convertido, "1")
+    assert not (tmp_path / PASTA_SNAPSHOT).exists()
+    (tmp_path / PASTA_SNAPSHOT).mkdir()
+    assert gravar_catalogo(caminho, bruto, convertido, "1")
+    lido_bruto, lido_convertido = snapshot_catalogo.ler_catalogo(caminho, "1")
+    pd.testing.assert_frame_equal(lido_bruto, bruto)
+    pd.testing.assert_frame_equal(lido_convertido, convertido)
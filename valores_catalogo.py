@@ -0,0 +1,190 @@
+import io
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from catalogo_banco import (
+    TABELAS_CATALOGO,
+    ConflitoCatalogo,
+    caminho_banco,
+    exportar_csv,
+    historico_precos,
+    importar_csv,
+    precos_na_data,
+    salvar_tabela,
+    versao_tabela,
+    versoes_catalogo,
+)
+from catalogo_compartilhado import invalidar_catalogo
+
+
+# Editores abertos na sessão: chave do editor -> arquivo da tabela editada
+_EDITORES = "_catalogo_editores"
+_ALTERACOES_EDITOR = ("edited_rows", "added_rows", "deleted_rows")
+
+
+def _editor_alterado(chave_editor: str) -> bool:
+    estado = st.session_state.get(chave_editor)
+    return isinstance(estado, dict) and any(
+        estado.get(campo) for campo in _ALTERACOES_EDITOR
+    )
+
+
+def preparar_editor_catalogo(caminho_csv, chave_editor: str) -> None:
+    """Anota a versão da tabela sobre a qual o editor ``chave_editor`` trabalha.
+
+    Chamada antes de ``st.data_editor``. A versão fica em
+    ``st.session_state[f"{chave_editor}_versao"]`` e só acompanha o banco
+    enquanto o editor não tem alterações pendentes; depois de um conflito na
+    gravação, oferece recarregar a tabela descartando as alterações.
+    """
+    chave_versao = f"{chave_editor}_versao"
+    chave_conflito = f"{chave_editor}_conflito"
+    if st.session_state.get(chave_conflito):
+        st.warning(
+            "Esta tabela foi alterada em outra sessão. Recarregue-a para editar "
+            "a versão atual (as alterações não salvas serão descartadas)."
+        )
+        if st.button("Recarregar tabela", key=f"{chave_editor}_recarregar"):
+            for chave in (chave_editor, chave_versao, chave_conflito):
+                st.session_state.pop(chave, None)
+            st.rerun()
+    st.session_state.setdefault(_EDITORES, {})[chave_editor] = Path(caminho_csv).name
+    if chave_versao not in st.session_state or not _editor_alterado(chave_editor):
+        st.session_state[chave_versao] = versao_tabela(caminho_csv)
+
+
+def salvar_tabela_catalogo(
+    caminho_csv, df: pd.DataFrame, chave_editor: Optional[str] = None
+) -> Optional[int]:
+    """Grava a tabela no catálogo em nome do responsável informado na sessão.
+
+    Com ``chave_editor``, a gravação só ocorre se a tabela ainda estiver na
+    versão anotada por :func:`preparar_editor_catalogo`; se outra sessão a
+    alterou, mostra o conflito e retorna ``None`` sem gravar. A gravação
+    invalida o catálogo compartilhado entre as sessões.
+    """
+    esperada = (
+        None if chave_editor is None
+        else st.session_state.get(f"{chave_editor}_versao")
+    )
+    try:
+        versao = salvar_tabela(
+            caminho_csv,
+            df,
+            versao_esperada=esperada,
+            usuario=st.session_state.get("usuario_catalogo", ""),
+        )
+    except ConflitoCatalogo as exc:
+        st.session_state[f"{chave_editor}_conflito"] = True
+        st.error(f"{exc} Recarregue a tabela e refaça as alterações.")
+        return None
+    # Os outros editores da mesma tabela nesta sessão partiam da versão gravada
+    arquivo = Path(caminho_csv).name
+    for chave, nome in st.session_state.get(_EDITORES, {}).items():
+        chave_versao = f"{chave}_versao"
+        if nome == arquivo and st.session_state.get(chave_versao) == esperada:
+            st.session_state[chave_versao] = versao
+    invalidar_catalogo()
+    return versao
+
+
+def render_valores_catalogo_tab(tab_catalogo):
+    """Renderiza a importação e exportação das tabelas do catálogo em CSV."""
+    with tab_catalogo:
+        st.subheader("Catálogo de Preços")
+        st.caption(
+            "Os preços ficam no banco do catálogo; os arquivos CSV servem "
+            "para importar e exportar as tabelas."
+        )
+        for arquivo in TABELAS_CATALOGO:
+            versao_tabela(arquivo)
+        versoes = versoes_catalogo(caminho_banco(TABELAS_CATALOGO[0]))
+        st.dataframe(
+            versoes.rename(
+                columns={
+                    "tabela": "Tabela",
+                    "arquivo": "Arquivo",
+                    "versao": "Versão",
+                    "atualizado_em": "Atualizado em",
+                }
+            ),
+            hide_index=True,
+        )
+
+        arquivo = st.selectbox("Tabela", TABELAS_CATALOGO, key="catalogo_tabela_csv")
+        col_exportar, col_importar = st.columns(2)
+        with col_exportar:
+            if arquivo in set(versoes["arquivo"]):
+                buffer = io.StringIO()
+                exportar_csv(arquivo, buffer)
+                st.download_button(
+                    label="Exportar CSV",
+                    data=buffer.getvalue().encode("utf-8"),
+                    file_name=arquivo,
+                    mime="text/csv",
+                    key="catalogo_exportar_csv",
+                )
+            else:
+                st.info("Tabela ainda não salva no catálogo.")
+            if st.button("Atualizar arquivos CSV do catálogo", key="catalogo_exportar_todos"):
+                for nome in versoes["arquivo"]:
+                    exportar_csv(nome)
+                st.success(f"{len(versoes)} arquivo(s) CSV atualizados.")
+        with col_importar:
+            enviado = st.file_uploader(
+                "Importar CSV", type="csv", key="catalogo_importar_csv"
+            )
+            if enviado is not None and st.button(
+                "Substituir tabela pelo CSV", key="catalogo_importar"
+            ):
+                try:
+                    versao = importar_csv(
+                        arquivo,
+                        io.StringIO(enviado.getvalue().decode("utf-8")),
+                        usuario=st.session_state.get("usuario_catalogo", ""),
+                    )
+                except (pd.errors.ParserError, UnicodeDecodeError, sqlite3.Error) as exc:
+                    st.error(f"Não foi possível importar o CSV: {exc}")
+                else:
+                    invalidar_catalogo()
+                    st.success(f"{arquivo} importado (versão {versao}).")
+
+        _render_historico(arquivo)
+
+
+def _render_historico(arquivo: str) -> None:
+    """Tendência dos preços da tabela e preços vigentes em uma data."""
+    st.subheader("Histórico de Preços")
+    historico = historico_precos(arquivo)
+    if historico.empty:
+        st.info("Nenhum preço registrado para esta tabela.")
+        return
+    materiais = st.multiselect(
+        "Materiais",
+        sorted(historico["Material"].unique()),
+        max_selections=10,
+        key="catalogo_historico_materiais",
+    )
+    if materiais:
+        selecionados = historico[historico["Material"].isin(materiais)]
+        st.line_chart(
+            selecionados.pivot_table(
+                index="Data", columns="Material", values="Preco", aggfunc="last"
+            ).ffill()
+        )
+        st.dataframe(
+            selecionados[["Data", "Material", "Coluna", "Preco", "Usuario"]],
+            hide_index=True,
+        )
+
+    data = st.date_input(
+        "Preços vigentes em", format="DD/MM/YYYY", key="catalogo_historico_data"
+    )
+    st.dataframe(
+        precos_na_data(arquivo, data)[["Material", "Categoria", "Coluna", "Preco"]],
+        hide_index=True,
+    )
@@ -2,16 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
-
-def _parse_currency_column(series: pd.Series) -> pd.Series:
-    """Convert a column with Brazilian Real currency strings to float values."""
-    return (
-        series.astype(str)
-        .str.replace(r"R\$\s*", "", regex=True)
-        .str.replace(r"\.", "", regex=True)
-        .str.replace(",", ".", regex=True)
-        .pipe(pd.to_numeric, errors="coerce")
-    )
+from valores_catalogo import preparar_editor_catalogo, salvar_tabela_catalogo
+from catalogo_precos import converter_coluna_moeda, obter_tabela_precos
 
 
 def render_valores_ce_tab(tab_ce_valores, format_currency):
@@ -124,7 +116,7 @@ def render_valores_ce_tab(tab_ce_valores, format_currency):
         )
 
         try:
-            df_precos_ce_raw = pd.read_csv("tabela_precos_ce.csv", sep=";")
+            df_precos_ce_raw = obter_tabela_precos("tabela_precos_ce.csv", sep=";")
         except FileNotFoundError:
             df_precos_ce_raw = tabela_precos_ce_padrao.copy()
             df_precos_ce_raw["Atualizado"] = ""
@@ -141,15 +133,16 @@ def render_valores_ce_tab(tab_ce_valores, format_currency):
             df_precos_ce_raw["Preço"] = ""
 
         df_precos_ce_numeric = df_precos_ce_raw.copy()
-        df_precos_ce_numeric["Preço"] = _parse_currency_column(
+        df_precos_ce_numeric["Preço"] = converter_coluna_moeda(
             df_precos_ce_numeric["Preço"]
-        ).fillna(0.0)
+        )
 
         df_precos_ce_display = df_precos_ce_raw.copy()
         df_precos_ce_display["Preço"] = (
             df_precos_ce_numeric["Preço"].apply(format_currency).astype("string")
         )
 
+        preparar_editor_catalogo("tabela_precos_ce.csv", "tabela_precos_ce_editor")
         edited_precos_ce = st.data_editor(
             df_precos_ce_display,
             num_rows="dynamic",
@@ -165,7 +158,6 @@ def render_valores_ce_tab(tab_ce_valores, format_currency):
                 "Atualizado": st.column_config.Column("Atualizado", disabled=True),
             },
         )
-        st.session_state["tabela_precos_ce_df"] = edited_precos_ce
 
         if st.button("Salvar tabela de preços de CE", key="salvar_tabela_precos_ce"):
             df_to_save = edited_precos_ce.copy()
@@ -182,7 +174,9 @@ def render_valores_ce_tab(tab_ce_valores, format_currency):
             if "Atualizado" not in df_original_raw:
                 df_original_raw["Atualizado"] = ""
 
-            df_to_save["Preço"] = _parse_currency_column(df_to_save["Preço"])
+            df_to_save["Preço"] = converter_coluna_moeda(
+                df_to_save["Preço"], preencher=None
+            )
 
             hoje = datetime.today().strftime("%d/%m/%Y")
             alterado = df_to_save["Preço"] != df_original_numeric["Preço"]
@@ -207,8 +201,10 @@ def render_valores_ce_tab(tab_ce_valores, format_currency):
             ]
             df_to_save = df_to_save.reindex(columns=ordered_columns, fill_value="")
 
-            df_to_save.to_csv("tabela_precos_ce.csv", sep=";", index=False)
-            st.session_state["tabela_precos_ce_df"] = df_to_save
-            st.success("Tabela de preços de CE atualizada com sucesso.")
+            versao = salvar_tabela_catalogo(
+                "tabela_precos_ce.csv", df_to_save, "tabela_precos_ce_editor"
+            )
+            if versao is not None:
+                st.success("Tabela de preços de CE atualizada com sucesso.")
 
         st.divider()
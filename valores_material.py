@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
+from valores_catalogo import preparar_editor_catalogo, salvar_tabela_catalogo
+from catalogo_precos import converter_coluna_moeda, obter_tabela_precos
 from dados_transformadores import obter_transformadores_padrao
 
 
@@ -10,17 +12,9 @@ def render_valores_material_tab(tab_material, format_currency):
     with tab_material:
         with st.expander("🔌 Tabela de Preços Cabos", expanded=True):
             try:
-                df_cabos_raw = pd.read_csv("valores_cabos.csv", sep=";")
-                for col in ["Preco 750V", "Preco 1kV"]:
-                    df_cabos_raw[col] = (
-                        df_cabos_raw[col]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
-                    )
+                df_cabos_raw = obter_tabela_precos(
+                    "valores_cabos.csv", sep=";", converter_precos=True
+                )
             except FileNotFoundError:
                 st.info("Nenhum valor de material registrado.")
                 df_cabos_raw = pd.DataFrame(
@@ -38,6 +32,7 @@ def render_valores_material_tab(tab_material, format_currency):
             for col in ["Preco 750V", "Preco 1kV"]:
                 df_cabos_display[col] = df_cabos_display[col].apply(format_currency)
 
+            preparar_editor_catalogo("valores_cabos.csv", "valores_cabos_editor")
             edited_df = st.data_editor(
                 df_cabos_display,
                 num_rows="dynamic",
@@ -47,7 +42,6 @@ def render_valores_material_tab(tab_material, format_currency):
                     "Preco 1kV": st.column_config.TextColumn("Preco 1kV"),
                 },
             )
-            st.session_state["valores_cabos_df"] = edited_df
             if st.button("Salvar valores de cabos"):
                 df_to_save = edited_df.copy()
                 df_original = df_cabos_raw.reindex(df_to_save.index)
@@ -55,13 +49,8 @@ def render_valores_material_tab(tab_material, format_currency):
                 df_to_save["Atualizado 1kV"] = df_original.get("Atualizado 1kV").fillna("")
                 hoje = datetime.today().strftime("%d/%m/%Y")
                 for col in ["Preco 750V", "Preco 1kV"]:
-                    df_to_save[col] = (
-                        df_to_save[col]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save[col] = converter_coluna_moeda(
+                        df_to_save[col], preencher=None
                     )
                 alterado_750 = df_to_save["Preco 750V"] != df_original["Preco 750V"]
                 alterado_1kv = df_to_save["Preco 1kV"] != df_original["Preco 1kV"]
@@ -73,12 +62,17 @@ def render_valores_material_tab(tab_material, format_currency):
                 ] = hoje
                 for col in ["Preco 750V", "Preco 1kV"]:
                     df_to_save[col] = df_to_save[col].fillna(0.0).apply(format_currency)
-                df_to_save.to_csv("valores_cabos.csv", sep=";", index=False)
-                st.success("Valores de cabos atualizados com sucesso.")
+                versao = salvar_tabela_catalogo(
+                    "valores_cabos.csv", df_to_save, "valores_cabos_editor"
+                )
+                if versao is not None:
+                    st.success("Valores de cabos atualizados com sucesso.")
 
         with st.expander("🧰 Tabelas de Infra-Seca", expanded=False):
             try:
-                df_eletrodutos_raw = pd.read_csv("valores_eletrodutos.csv", sep=";")
+                df_eletrodutos_raw = obter_tabela_precos(
+                    "valores_eletrodutos.csv", sep=";", converter_precos=True
+                )
                 df_eletrodutos_raw["Material"] = (
                     df_eletrodutos_raw["Material"]
                     .astype(str)
@@ -86,15 +80,6 @@ def render_valores_material_tab(tab_material, format_currency):
                     .str.replace('"', "", regex=False)
                     .str.strip()
                 )
-                df_eletrodutos_raw["Preco"] = (
-                    df_eletrodutos_raw["Preco"]
-                    .astype(str)
-                    .str.replace(r"R\$\s*", "", regex=True)
-                    .str.replace(r"\.", "", regex=True)
-                    .str.replace(",", ".", regex=True)
-                    .pipe(pd.to_numeric, errors="coerce")
-                    .fillna(0.0)
-                )
 
                 def editar_tabela(df_raw, mask, titulo, key_prefix, botao, sealtubo=False):
                     with st.expander(titulo, expanded=False):
@@ -115,6 +100,9 @@ def render_valores_material_tab(tab_material, format_currency):
                                 "Atualizado", disabled=True
                             ),
                         }
+                        preparar_editor_catalogo(
+                            "valores_eletrodutos.csv", f"{key_prefix}_editor"
+                        )
                         edited = st.data_editor(
                             df_display,
                             num_rows="dynamic",
@@ -128,32 +116,27 @@ def render_valores_material_tab(tab_material, format_currency):
                                 df_original.get("Atualizado").fillna("")
                             )
                             hoje = datetime.today().strftime("%d/%m/%Y")
-                            df_to_save["Preco"] = (
-                                df_to_save["Preco"]
-                                .astype(str)
-                                .str.replace(r"R\$\s*", "", regex=True)
-                                .str.replace(r"\.", "", regex=True)
-                                .str.replace(",", ".", regex=True)
-                                .pipe(pd.to_numeric, errors="coerce")
+                            df_to_save["Preco"] = converter_coluna_moeda(
+                                df_to_save["Preco"], preencher=None
                             )
                             alterado = df_to_save["Preco"] != df_original["Preco"]
                             df_to_save.loc[
                                 alterado & df_to_save["Preco"].notna(), "Atualizado"
                             ] = hoje
                             df_raw.update(df_to_save)
-                            if sealtubo:
-                                st.session_state["valores_sealtubo_df"] = df_to_save[
-                                    ["Material", "Preco"]
-                                ].rename(columns={"Material": "Sealtubo"})
-                            df_to_csv = df_raw.copy()
-                            df_to_csv["Preco"] = df_to_csv["Preco"].fillna(0.0).apply(
+                            df_tabela = df_raw.copy()
+                            df_tabela["Preco"] = df_tabela["Preco"].fillna(0.0).apply(
                                 format_currency
                             )
-                            df_to_csv.to_csv("valores_eletrodutos.csv", sep=";", index=False)
-                            st.session_state["valores_eletrodutos_df"] = df_to_csv
-                            st.success(
-                                f"{botao.replace('Salvar ', '')} atualizados com sucesso."
+                            versao = salvar_tabela_catalogo(
+                                "valores_eletrodutos.csv",
+                                df_tabela,
+                                f"{key_prefix}_editor",
                             )
+                            if versao is not None:
+                                st.success(
+                                    f"{botao.replace('Salvar ', '')} atualizados com sucesso."
+                                )
                     return df_raw
 
                 def editar_conduletes(
@@ -176,6 +159,9 @@ def render_valores_material_tab(tab_material, format_currency):
                         df_grouped["Condulete"] = df_grouped["Tamanho"].apply(tipo_rotulo)
                         df_display = df_grouped[["Condulete", "Preco"]].copy()
                         df_display["Preco"] = df_display["Preco"].apply(format_currency)
+                        preparar_editor_catalogo(
+                            "valores_eletrodutos.csv", f"{key_prefix}_editor"
+                        )
                         edited = st.data_editor(
                             df_display,
                             num_rows="dynamic",
@@ -189,13 +175,8 @@ def render_valores_material_tab(tab_material, format_currency):
                         )
                         if st.button(botao, key=f"{key_prefix}_save"):
                             df_to_save = edited.copy()
-                            df_to_save["Preco"] = (
-                                df_to_save["Preco"]
-                                .astype(str)
-                                .str.replace(r"R\$\s*", "", regex=True)
-                                .str.replace(r"\.", "", regex=True)
-                                .str.replace(",", ".", regex=True)
-                                .pipe(pd.to_numeric, errors="coerce")
+                            df_to_save["Preco"] = converter_coluna_moeda(
+                                df_to_save["Preco"], preencher=None
                             )
                             df_merged = df_grouped.merge(
                                 df_to_save, on="Condulete", suffixes=("_orig", "")
@@ -214,15 +195,19 @@ def render_valores_material_tab(tab_material, format_currency):
                                     df_raw.loc[
                                         df_subset[mask_tam].index, "Preco"
                                     ] = preco_novo
-                            df_to_csv = df_raw.copy()
-                            df_to_csv["Preco"] = df_to_csv["Preco"].fillna(0.0).apply(
+                            df_tabela = df_raw.copy()
+                            df_tabela["Preco"] = df_tabela["Preco"].fillna(0.0).apply(
                                 format_currency
                             )
-                            df_to_csv.to_csv("valores_eletrodutos.csv", sep=";", index=False)
-                            st.session_state["valores_eletrodutos_df"] = df_to_csv
-                            st.success(
-                                f"{botao.replace('Salvar ', '')} atualizados com sucesso."
+                            versao = salvar_tabela_catalogo(
+                                "valores_eletrodutos.csv",
+                                df_tabela,
+                                f"{key_prefix}_editor",
                             )
+                            if versao is not None:
+                                st.success(
+                                    f"{botao.replace('Salvar ', '')} atualizados com sucesso."
+                                )
                     return df_raw
 
                 df_eletrodutos_raw = editar_tabela(
@@ -322,17 +307,8 @@ def render_valores_material_tab(tab_material, format_currency):
 
             with st.expander("⚡ Tabela de Preços Disjuntores DIN", expanded=False):
                 try:
-                    df_disjuntores_din_raw = pd.read_csv(
-                        "valores_disjuntor_din.csv", sep=";"
-                    )
-                    df_disjuntores_din_raw["Preco"] = (
-                        df_disjuntores_din_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
+                    df_disjuntores_din_raw = obter_tabela_precos(
+                        "valores_disjuntor_din.csv", sep=";", converter_precos=True
                     )
                 except FileNotFoundError:
                     df_disjuntores_din_raw = pd.DataFrame(
@@ -344,6 +320,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_disjuntores_din_display["Preco"].apply(format_currency)
                 )
 
+                preparar_editor_catalogo(
+                    "valores_disjuntor_din.csv", "valores_disjuntores_din_editor"
+                )
                 edited_disjuntores_din = st.data_editor(
                     df_disjuntores_din_display,
                     num_rows="dynamic",
@@ -354,20 +333,14 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_disjuntores_din_df"] = edited_disjuntores_din
 
                 if st.button("Salvar valores de disjuntores DIN"):
                     df_to_save = edited_disjuntores_din.copy()
                     df_original = df_disjuntores_din_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -376,20 +349,18 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_disjuntor_din.csv", sep=";", index=False)
-                    st.success("Valores de disjuntores DIN atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_disjuntor_din.csv",
+                        df_to_save,
+                        "valores_disjuntores_din_editor",
+                    )
+                    if versao is not None:
+                        st.success("Valores de disjuntores DIN atualizados com sucesso.")
 
             with st.expander("🛡️ Tabela de Preços IDR", expanded=False):
                 try:
-                    df_idr_raw = pd.read_csv("valores_idr.csv", sep=";")
-                    df_idr_raw["Preco"] = (
-                        df_idr_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
+                    df_idr_raw = obter_tabela_precos(
+                        "valores_idr.csv", sep=";", converter_precos=True
                     )
                 except FileNotFoundError:
                     df_idr_raw = pd.DataFrame(
@@ -405,6 +376,7 @@ def render_valores_material_tab(tab_material, format_currency):
                 df_idr_display = df_idr_raw.copy()
                 df_idr_display["Preco"] = df_idr_display["Preco"].apply(format_currency)
 
+                preparar_editor_catalogo("valores_idr.csv", "valores_idr_editor")
                 edited_idr = st.data_editor(
                     df_idr_display,
                     num_rows="dynamic",
@@ -415,20 +387,14 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_idr_df"] = edited_idr
 
                 if st.button("Salvar valores de IDR"):
                     df_to_save = edited_idr.copy()
                     df_original = df_idr_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -437,20 +403,16 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_idr.csv", sep=";", index=False)
-                    st.success("Valores de IDR atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_idr.csv", df_to_save, "valores_idr_editor"
+                    )
+                    if versao is not None:
+                        st.success("Valores de IDR atualizados com sucesso.")
 
             with st.expander("⚡ Tabela de Preços DPS", expanded=False):
                 try:
-                    df_dps_raw = pd.read_csv("valores_dps.csv", sep=";")
-                    df_dps_raw["Preco"] = (
-                        df_dps_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
+                    df_dps_raw = obter_tabela_precos(
+                        "valores_dps.csv", sep=";", converter_precos=True
                     )
                 except FileNotFoundError:
                     df_dps_raw = pd.DataFrame(
@@ -461,6 +423,7 @@ def render_valores_material_tab(tab_material, format_currency):
                 df_dps_display = df_dps_raw.copy()
                 df_dps_display["Preco"] = df_dps_display["Preco"].apply(format_currency)
 
+                preparar_editor_catalogo("valores_dps.csv", "valores_dps_editor")
                 edited_dps = st.data_editor(
                     df_dps_display,
                     num_rows="dynamic",
@@ -471,20 +434,14 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_dps_df"] = edited_dps
 
                 if st.button("Salvar valores de DPS"):
                     df_to_save = edited_dps.copy()
                     df_original = df_dps_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -493,20 +450,16 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_dps.csv", sep=";", index=False)
-                    st.success("Valores de DPS atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_dps.csv", df_to_save, "valores_dps_editor"
+                    )
+                    if versao is not None:
+                        st.success("Valores de DPS atualizados com sucesso.")
 
             with st.expander("🔩 Tabela de Preços Barra Pente", expanded=False):
                 try:
-                    df_barra_pente_raw = pd.read_csv("valores_barra_pente.csv", sep=";")
-                    df_barra_pente_raw["Preco"] = (
-                        df_barra_pente_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
+                    df_barra_pente_raw = obter_tabela_precos(
+                        "valores_barra_pente.csv", sep=";", converter_precos=True
                     )
                 except FileNotFoundError:
                     df_barra_pente_raw = pd.DataFrame(
@@ -522,6 +475,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     format_currency
                 )
 
+                preparar_editor_catalogo(
+                    "valores_barra_pente.csv", "valores_barra_pente_editor"
+                )
                 edited_barra_pente = st.data_editor(
                     df_barra_pente_display,
                     num_rows="dynamic",
@@ -532,20 +488,14 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_barra_pente_df"] = edited_barra_pente
 
                 if st.button("Salvar valores de barra pente"):
                     df_to_save = edited_barra_pente.copy()
                     df_original = df_barra_pente_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -554,22 +504,18 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_barra_pente.csv", sep=";", index=False)
-                    st.success("Valores de barra pente atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_barra_pente.csv",
+                        df_to_save,
+                        "valores_barra_pente_editor",
+                    )
+                    if versao is not None:
+                        st.success("Valores de barra pente atualizados com sucesso.")
 
             with st.expander("🗄️ Tabela de Preços Paineis e Quadros", expanded=False):
                 try:
-                    df_paineis_quadros_raw = pd.read_csv(
-                        "valores_paineis_quadros.csv", sep=";"
-                    )
-                    df_paineis_quadros_raw["Preco"] = (
-                        df_paineis_quadros_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
+                    df_paineis_quadros_raw = obter_tabela_precos(
+                        "valores_paineis_quadros.csv", sep=";", converter_precos=True
                     )
                 except FileNotFoundError:
                     df_paineis_quadros_raw = pd.DataFrame(
@@ -594,6 +540,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     "Preco"
                 ].apply(format_currency)
 
+                preparar_editor_catalogo(
+                    "valores_paineis_quadros.csv", "valores_paineis_quadros_editor"
+                )
                 edited_paineis_quadros = st.data_editor(
                     df_paineis_quadros_display,
                     num_rows="dynamic",
@@ -604,20 +553,14 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_paineis_quadros_df"] = edited_paineis_quadros
 
                 if st.button("Salvar valores de paineis e quadros"):
                     df_to_save = edited_paineis_quadros.copy()
                     df_original = df_paineis_quadros_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -626,8 +569,13 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_paineis_quadros.csv", sep=";", index=False)
-                    st.success("Valores de paineis e quadros atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_paineis_quadros.csv",
+                        df_to_save,
+                        "valores_paineis_quadros_editor",
+                    )
+                    if versao is not None:
+                        st.success("Valores de paineis e quadros atualizados com sucesso.")
 
         with st.expander("📦 Material Adicional", expanded=False):
 
@@ -635,17 +583,10 @@ def render_valores_material_tab(tab_material, format_currency):
                 "🧰 Tabela de Preços Disjuntor Caixa Moldada", expanded=False
             ):
                 try:
-                    df_disjuntores_raw = pd.read_csv(
-                        "valores_disjuntor_caixa_moldada.csv", sep=";"
-                    )
-                    df_disjuntores_raw["Preco"] = (
-                        df_disjuntores_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
+                    df_disjuntores_raw = obter_tabela_precos(
+                        "valores_disjuntor_caixa_moldada.csv",
+                        sep=";",
+                        converter_precos=True,
                     )
                 except FileNotFoundError:
                     df_disjuntores_raw = pd.DataFrame(
@@ -671,6 +612,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     format_currency
                 )
 
+                preparar_editor_catalogo(
+                    "valores_disjuntor_caixa_moldada.csv", "valores_disjuntores_editor"
+                )
                 edited_disjuntores = st.data_editor(
                     df_disjuntores_display,
                     num_rows="dynamic",
@@ -680,20 +624,14 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_disjuntores_df"] = edited_disjuntores
 
                 if st.button("Salvar valores de disjuntores", key="salvar_disjuntores"):
                     df_to_save = edited_disjuntores.copy()
                     df_original = df_disjuntores_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -702,24 +640,18 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv(
-                        "valores_disjuntor_caixa_moldada.csv", sep=";", index=False
+                    versao = salvar_tabela_catalogo(
+                        "valores_disjuntor_caixa_moldada.csv",
+                        df_to_save,
+                        "valores_disjuntores_editor",
                     )
-                    st.success("Valores de disjuntores atualizados com sucesso.")
+                    if versao is not None:
+                        st.success("Valores de disjuntores atualizados com sucesso.")
 
             with st.expander("🔩 Tabela de Preços Barra Roscada", expanded=False):
                 try:
-                    df_barra_roscada_raw = pd.read_csv(
-                        "valores_barra_roscada.csv", sep=";"
-                    )
-                    df_barra_roscada_raw["Preco"] = (
-                        df_barra_roscada_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
+                    df_barra_roscada_raw = obter_tabela_precos(
+                        "valores_barra_roscada.csv", sep=";", converter_precos=True
                     )
                 except FileNotFoundError:
                     df_barra_roscada_raw = pd.DataFrame(
@@ -732,6 +664,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     format_currency
                 )
 
+                preparar_editor_catalogo(
+                    "valores_barra_roscada.csv", "valores_barra_roscada_editor"
+                )
                 edited_barra_roscada = st.data_editor(
                     df_barra_roscada_display,
                     num_rows="dynamic",
@@ -742,7 +677,6 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_barra_roscada_df"] = edited_barra_roscada
 
                 if st.button(
                     "Salvar valores de barra roscada", key="salvar_barra_roscada"
@@ -751,13 +685,8 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_original = df_barra_roscada_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -766,25 +695,21 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_barra_roscada.csv", sep=";", index=False)
-                    st.success("Valores de barra roscada atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_barra_roscada.csv",
+                        df_to_save,
+                        "valores_barra_roscada_editor",
+                    )
+                    if versao is not None:
+                        st.success("Valores de barra roscada atualizados com sucesso.")
 
             with st.expander("📋 Tabela de Preços Eletrocalhas", expanded=False):
                 try:
-                    df_eletrocalhas_raw = pd.read_csv(
-                        "valores_eletrocalhas.csv", sep=";"
+                    df_eletrocalhas_raw = obter_tabela_precos(
+                        "valores_eletrocalhas.csv", sep=";", converter_precos=True
                     )
                     if "Atualizado" not in df_eletrocalhas_raw.columns:
                         df_eletrocalhas_raw["Atualizado"] = ""
-                    df_eletrocalhas_raw["Preco"] = (
-                        df_eletrocalhas_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
-                    )
                 except FileNotFoundError:
                     eletrocalhas_data = [
                         {"Material": "Eletrocalha perfurada #24 50x50mm", "Preco": 36.00},
@@ -805,6 +730,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     format_currency
                 )
 
+                preparar_editor_catalogo(
+                    "valores_eletrocalhas.csv", "valores_eletrocalhas_editor"
+                )
                 edited_eletrocalhas = st.data_editor(
                     df_eletrocalhas_display,
                     num_rows="dynamic",
@@ -815,7 +743,6 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_eletrocalhas_df"] = edited_eletrocalhas
 
                 if st.button(
                     "Salvar valores de eletrocalhas", key="salvar_eletrocalhas"
@@ -824,13 +751,8 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_original = df_eletrocalhas_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -839,25 +761,23 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_eletrocalhas.csv", sep=";", index=False)
-                    st.success("Valores de eletrocalhas atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_eletrocalhas.csv",
+                        df_to_save,
+                        "valores_eletrocalhas_editor",
+                    )
+                    if versao is not None:
+                        st.success("Valores de eletrocalhas atualizados com sucesso.")
 
             with st.expander("🔌 Tabela de Preços Tomada Industrial", expanded=False):
                 try:
-                    df_tomadas_industriais_raw = pd.read_csv(
-                        "valores_tomadas_industriais.csv", sep=";"
+                    df_tomadas_industriais_raw = obter_tabela_precos(
+                        "valores_tomadas_industriais.csv",
+                        sep=";",
+                        converter_precos=True,
                     )
                     if "Atualizado" not in df_tomadas_industriais_raw.columns:
                         df_tomadas_industriais_raw["Atualizado"] = ""
-                    df_tomadas_industriais_raw["Preco"] = (
-                        df_tomadas_industriais_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
-                    )
                 except FileNotFoundError:
                     tomadas_industriais_data = [
                         {
@@ -883,6 +803,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_tomadas_industriais_display["Preco"].apply(format_currency)
                 )
 
+                preparar_editor_catalogo(
+                    "valores_tomadas_industriais.csv", "valores_tomadas_industriais_editor"
+                )
                 edited_tomadas_industriais = st.data_editor(
                     df_tomadas_industriais_display,
                     num_rows="dynamic",
@@ -893,9 +816,6 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_tomadas_industriais_df"] = (
-                    edited_tomadas_industriais
-                )
 
                 if st.button(
                     "Salvar valores de tomadas industriais",
@@ -905,13 +825,8 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_original = df_tomadas_industriais_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -920,27 +835,23 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv(
-                        "valores_tomadas_industriais.csv", sep=";", index=False
-                    )
-                    st.success(
-                        "Valores de tomadas industriais atualizados com sucesso."
+                    versao = salvar_tabela_catalogo(
+                        "valores_tomadas_industriais.csv",
+                        df_to_save,
+                        "valores_tomadas_industriais_editor",
                     )
+                    if versao is not None:
+                        st.success(
+                            "Valores de tomadas industriais atualizados com sucesso."
+                        )
 
             with st.expander("📟 Tabela de Preços Medidores", expanded=False):
                 try:
-                    df_medidores_raw = pd.read_csv("valores_medidores.csv", sep=";")
+                    df_medidores_raw = obter_tabela_precos(
+                        "valores_medidores.csv", sep=";", converter_precos=True
+                    )
                     if "Atualizado" not in df_medidores_raw.columns:
                         df_medidores_raw["Atualizado"] = ""
-                    df_medidores_raw["Preco"] = (
-                        df_medidores_raw["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
-                        .fillna(0.0)
-                    )
                 except FileNotFoundError:
                     medidores_data = [
                         {"Material": "Medidor Bipolar Wifi", "Preco": 229.00},
@@ -954,6 +865,9 @@ def render_valores_material_tab(tab_material, format_currency):
                     format_currency
                 )
 
+                preparar_editor_catalogo(
+                    "valores_medidores.csv", "valores_medidores_editor"
+                )
                 edited_medidores = st.data_editor(
                     df_medidores_display,
                     num_rows="dynamic",
@@ -964,20 +878,14 @@ def render_valores_material_tab(tab_material, format_currency):
                         "Atualizado": st.column_config.Column("Atualizado", disabled=True),
                     },
                 )
-                st.session_state["valores_medidores_df"] = edited_medidores
 
                 if st.button("Salvar valores de medidores", key="salvar_medidores"):
                     df_to_save = edited_medidores.copy()
                     df_original = df_medidores_raw.reindex(df_to_save.index)
                     df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
                     hoje = datetime.today().strftime("%d/%m/%Y")
-                    df_to_save["Preco"] = (
-                        df_to_save["Preco"]
-                        .astype(str)
-                        .str.replace(r"R\$\s*", "", regex=True)
-                        .str.replace(r"\.", "", regex=True)
-                        .str.replace(",", ".", regex=True)
-                        .pipe(pd.to_numeric, errors="coerce")
+                    df_to_save["Preco"] = converter_coluna_moeda(
+                        df_to_save["Preco"], preencher=None
                     )
                     alterado = df_to_save["Preco"] != df_original["Preco"]
                     df_to_save.loc[
@@ -986,8 +894,11 @@ def render_valores_material_tab(tab_material, format_currency):
                     df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(
                         format_currency
                     )
-                    df_to_save.to_csv("valores_medidores.csv", sep=";", index=False)
-                    st.success("Valores de medidores atualizados com sucesso.")
+                    versao = salvar_tabela_catalogo(
+                        "valores_medidores.csv", df_to_save, "valores_medidores_editor"
+                    )
+                    if versao is not None:
+                        st.success("Valores de medidores atualizados com sucesso.")
 
             with st.expander("⚡ Tabela de Preços de Transformadores", expanded=False):
                 transformadores_data = obter_transformadores_padrao()
@@ -2,21 +2,17 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
+from valores_catalogo import preparar_editor_catalogo, salvar_tabela_catalogo
+from catalogo_precos import converter_coluna_moeda, obter_tabela_precos
+
 
 def render_valores_servico_tab(tab_servico_valores, format_currency):
     """Renderiza a aba de valores de serviço."""
     with tab_servico_valores:
         st.subheader("Tabela de Preços de Serviços")
         try:
-            df_servico = pd.read_csv("valores_servico.csv", sep=";")
-            df_servico["Preco"] = (
-                df_servico["Preco"]
-                .astype(str)
-                .str.replace(r"R\$\s*", "", regex=True)
-                .str.replace(r"\.", "", regex=True)
-                .str.replace(",", ".", regex=True)
-                .pipe(pd.to_numeric, errors="coerce")
-                .fillna(0.0)
+            df_servico = obter_tabela_precos(
+                "valores_servico.csv", sep=";", converter_precos=True
             )
         except FileNotFoundError:
             st.info("Nenhum valor de serviço registrado.")
@@ -24,6 +20,7 @@ def render_valores_servico_tab(tab_servico_valores, format_currency):
 
         df_display = df_servico.copy()
 
+        preparar_editor_catalogo("valores_servico.csv", "valores_servico_editor")
         edited_df = st.data_editor(
             df_display,
             num_rows="dynamic",
@@ -33,30 +30,27 @@ def render_valores_servico_tab(tab_servico_valores, format_currency):
                 "Preco": st.column_config.NumberColumn("Preço", format="R$ %.2f"),
             },
         )
-        st.session_state["valores_servico_df"] = edited_df
 
         if st.button("Salvar valores de serviço"):
             df_to_save = edited_df.copy()
             df_original = df_servico.reindex(df_to_save.index)
             df_to_save["Atualizado"] = df_original.get("Atualizado").fillna("")
             hoje = datetime.today().strftime("%d/%m/%Y")
-            df_to_save["Preco"] = (
-                df_to_save["Preco"]
-                .astype(str)
-                .str.replace(r"R\$\s*", "", regex=True)
-                .str.replace(r"\.", "", regex=True)
-                .str.replace(",", ".", regex=True)
-                .pipe(pd.to_numeric, errors="coerce")
+            df_to_save["Preco"] = converter_coluna_moeda(
+                df_to_save["Preco"], preencher=None
             )
             alterado = df_to_save["Preco"] != df_original["Preco"]
             df_to_save.loc[alterado & df_to_save["Preco"].notna(), "Atualizado"] = hoje
             df_to_save["Preco"] = df_to_save["Preco"].fillna(0.0).apply(format_currency)
-            df_to_save.to_csv("valores_servico.csv", sep=";", index=False)
-            st.success("Valores de serviço atualizados com sucesso.")
+            versao = salvar_tabela_catalogo(
+                "valores_servico.csv", df_to_save, "valores_servico_editor"
+            )
+            if versao is not None:
+                st.success("Valores de serviço atualizados com sucesso.")
 
         st.subheader("Tabela Trabalho por Hora")
         try:
-            df_profissionais_raw = pd.read_csv("valores_profissionais.csv", sep=";")
+            df_profissionais_raw = obter_tabela_precos("valores_profissionais.csv", sep=";")
         except FileNotFoundError:
             df_profissionais_raw = pd.DataFrame(
                 {
@@ -77,14 +71,8 @@ def render_valores_servico_tab(tab_servico_valores, format_currency):
             df_profissionais_raw["Atualizado"] = ""
 
         df_profissionais_numeric = df_profissionais_raw.copy()
-        df_profissionais_numeric["Valor Hora"] = (
+        df_profissionais_numeric["Valor Hora"] = converter_coluna_moeda(
             df_profissionais_numeric["Valor Hora"]
-            .astype(str)
-            .str.replace(r"R\$\s*", "", regex=True)
-            .str.replace(r"\.", "", regex=True)
-            .str.replace(",", ".", regex=True)
-            .pipe(pd.to_numeric, errors="coerce")
-            .fillna(0.0)
         )
 
         df_prof_display = df_profissionais_numeric.copy()
@@ -92,6 +80,9 @@ def render_valores_servico_tab(tab_servico_valores, format_currency):
             format_currency
         )
 
+        preparar_editor_catalogo(
+            "valores_profissionais.csv", "valores_profissionais_editor"
+        )
         edited_prof_df = st.data_editor(
             df_prof_display,
             num_rows="dynamic",
@@ -102,7 +93,6 @@ def render_valores_servico_tab(tab_servico_valores, format_currency):
                 "Atualizado": st.column_config.Column("Atualizado", disabled=True),
             },
         )
-        st.session_state["valores_profissionais_df"] = edited_prof_df
 
         if st.button("Salvar tabela trabalho por hora"):
             df_to_save = edited_prof_df.copy()
@@ -112,13 +102,8 @@ def render_valores_servico_tab(tab_servico_valores, format_currency):
                 df_original_raw["Atualizado"] = ""
             df_to_save["Atualizado"] = df_original_raw["Atualizado"].fillna("")
             hoje = datetime.today().strftime("%d/%m/%Y")
-            df_to_save["Valor Hora"] = (
-                df_to_save["Valor Hora"]
-                .astype(str)
-                .str.replace(r"R\$\s*", "", regex=True)
-                .str.replace(r"\.", "", regex=True)
-                .str.replace(",", ".", regex=True)
-                .pipe(pd.to_numeric, errors="coerce")
+            df_to_save["Valor Hora"] = converter_coluna_moeda(
+                df_to_save["Valor Hora"], preencher=None
             )
             alterado = df_to_save["Valor Hora"] != df_original["Valor Hora"]
             df_to_save.loc[
@@ -129,7 +114,9 @@ def render_valores_servico_tab(tab_servico_valores, format_currency):
                 .fillna(0.0)
                 .apply(format_currency)
             )
-            df_to_save.to_csv("valores_profissionais.csv", sep=";", index=False)
-            st.session_state["valores_profissionais_df"] = df_to_save
-            st.success("Tabela trabalho por hora atualizada com sucesso.")
+            versao = salvar_tabela_catalogo(
+                "valores_profissionais.csv", df_to_save, "valores_profissionais_editor"
+            )
+            if versao is not None:
+                st.success("Tabela trabalho por hora atualizada com sucesso.")
 